@@ -0,0 +1,108 @@
+"""
+Custo por linha e memória do mapeamento de linhas para modelos, antes e depois do mapeamento
+posicional (app/core/mapeamento.py). As linhas vêm do próprio PostgreSQL (generate_series, com
+as colunas de 'pedidos'), então nenhuma tabela é lida ou alterada.
+
+    python -m app.benchmark_mapeamento [--linhas 100000] [--repeticoes 3]
+
+antes:  DictCursor + busca de coluna por nome (como _map_row_to_model) + objeto com __dict__
+depois: cursor de tuplas + posições pré-calculadas + Pedido com __slots__
+"""
+import gc
+import sys
+import time
+import argparse
+import tracemalloc
+
+from dotenv import load_dotenv
+from psycopg2.extras import DictCursor
+
+from app.core import mapeamento
+from app.core.database import DB_APPLICATION_NAME, _get_db_connection
+from app.models.pedido_model import Pedido
+from app.repositories.pedido_repository import COLUNAS_PEDIDO
+
+SQL_LINHAS = """
+    SELECT g AS id, g %% 5000 + 1 AS id_item_contrato, g / 10 + 1 AS id_aocs,
+           (g %% 97 + 1)::numeric(10, 2) AS quantidade_pedida, DATE '2025-01-01' + g %% 365 AS data_pedido,
+           'Pendente'::varchar AS status_entrega, 0::numeric(10, 2) AS quantidade_entregue
+    FROM generate_series(1, %s) AS g
+"""
+
+# O modelo como era antes dos __slots__: mesmo __init__, atributos num __dict__ por instância
+PedidoComDict = type("PedidoComDict", (), {"__init__": Pedido.__init__})
+
+
+def _mapear_por_nome(linhas: list) -> list:
+    pedidos = []
+    for row in linhas:
+        try:
+            pedidos.append(PedidoComDict(
+                id=row['id'],
+                id_item_contrato=row['id_item_contrato'],
+                id_aocs=row['id_aocs'],
+                quantidade_pedida=row['quantidade_pedida'],
+                status_entrega=row['status_entrega'],
+                quantidade_entregue=row['quantidade_entregue'],
+                data_pedido=row['data_pedido']
+            ))
+        except KeyError:
+            pass
+    return pedidos
+
+
+def _antes(db_conn, linhas: int) -> list:
+    with db_conn.cursor(cursor_factory=DictCursor) as cursor:
+        cursor.execute(SQL_LINHAS, (linhas,))
+        return _mapear_por_nome(cursor.fetchall())
+
+
+def _depois(db_conn, linhas: int) -> list:
+    with db_conn.cursor(cursor_factory=mapeamento.CursorTuplas) as cursor:
+        cursor.execute(SQL_LINHAS, (linhas,))
+        return mapeamento.mapear(cursor, cursor.fetchall(), Pedido, COLUNAS_PEDIDO)
+
+
+def medir(funcao, db_conn, linhas: int, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao(db_conn, linhas)
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao(db_conn, linhas)
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+
+    melhor = min(tempos)
+    return {"total_s": melhor, "us_por_linha": melhor / linhas * 1e6,
+            "pico_mb": pico / 2**20, "retido_mb": retido / 2**20, "bytes_por_linha": retido / linhas}
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Benchmark do mapeamento de linhas para modelos.")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    db_conn = _get_db_connection(application_name=f"{DB_APPLICATION_NAME}:benchmark_mapeamento")
+    try:
+        db_conn.autocommit = True
+        print(f"{args.linhas} linhas, melhor de {args.repeticoes} execuções (consulta + fetchall + mapeamento)")
+        print(f"{'':8}{'total (s)':>11}{'µs/linha':>10}{'pico (MB)':>11}{'retido (MB)':>13}{'bytes/linha':>13}")
+        for nome, funcao in (("antes", _antes), ("depois", _depois)):
+            r = medir(funcao, db_conn, args.linhas, args.repeticoes)
+            print(f"{nome:8}{r['total_s']:>11.3f}{r['us_por_linha']:>10.2f}{r['pico_mb']:>11.1f}"
+                  f"{r['retido_mb']:>13.1f}{r['bytes_por_linha']:>13.0f}")
+    finally:
+        db_conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,268 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import brotli
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core import miniaturas
+from app.core.armazenamento import Armazenamento, ArmazenamentoLocal
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(APP_DIR)
+# Uploads antigos (um arquivo por anexo, em static/uploads/{tipo_entidade}/{id}/)
+UPLOAD_DIR = os.path.join(APP_DIR, "static", "uploads")
+# Conteúdo endereçado pelo SHA-256: um único arquivo por conteúdo, fora do /static público.
+# Com ANEXO_STORAGE=s3 os blobs vão para o bucket e este diretório guarda só os temporários.
+BLOB_DIR = os.environ.get("ANEXO_BLOB_DIR", os.path.join(BASE_DIR, "storage", "anexos"))
+ANEXO_STORAGE = os.environ.get("ANEXO_STORAGE", "local").lower()
+
+ANEXO_MAX_BYTES = int(os.environ.get("ANEXO_MAX_BYTES", 25 * 1024 * 1024))
+ANEXO_CHUNK_BYTES = 1024 * 1024
+
+# Compressão em repouso (brotli) para conteúdo que comprime bem: XML de NF-e, CSV, TIFF/BMP sem compressão...
+ANEXO_COMPRESSAO = os.environ.get("ANEXO_COMPRESSAO", "true").lower() == "true"
+ANEXO_BROTLI_QUALIDADE = int(os.environ.get("ANEXO_BROTLI_QUALIDADE", 5))
+# Só guarda comprimido se economizar pelo menos 10%
+ANEXO_COMPRESSAO_TAXA_MINIMA = 0.9
+COMPRESSAO_BROTLI = "br"
+EXTENSOES_COMPRIMIVEIS = (".xml", ".csv", ".txt", ".json", ".html", ".htm", ".svg", ".tif", ".tiff", ".bmp", ".log", ".ofx", ".rtf")
+TIPOS_COMPRIMIVEIS = ("text/", "application/xml", "application/json", "image/tiff", "image/bmp", "image/svg+xml")
+
+
+class ArquivoMuitoGrandeError(ValueError):
+    pass
+
+
+class BlobCorrompidoError(Exception):
+    """Blob comprimido truncado ou corrompido no armazenamento."""
+    pass
+
+
+class ArquivoRecebido:
+    def __init__(self, caminho_temporario: str, tamanho_bytes: int, hash_sha256: str):
+        self.caminho_temporario: str = caminho_temporario
+        self.tamanho_bytes: int = tamanho_bytes
+        self.hash_sha256: str = hash_sha256
+        # Preenchidos por comprimir_se_vantajoso(): o temporário passa a ser o conteúdo comprimido
+        self.compressao: str | None = None
+        self.tamanho_armazenado: int = tamanho_bytes
+
+
+def extensao_segura(nome_arquivo: str | None) -> str:
+    extensao = os.path.splitext(nome_arquivo or "")[1].lower()
+    return extensao if extensao[1:].isalnum() and len(extensao) <= 10 else ""
+
+
+def nome_logico(subdiretorio: str, nome_arquivo: str | None) -> str:
+    """Identificador único do anexo (coluna nome_seguro); o conteúdo fica no blob."""
+    return f"{subdiretorio}/{uuid.uuid4().hex}{extensao_segura(nome_arquivo)}"
+
+
+_armazenamento_remoto: Armazenamento | None = None
+
+
+def armazenamento() -> Armazenamento:
+    global _armazenamento_remoto
+    if ANEXO_STORAGE == "s3":
+        if _armazenamento_remoto is None:
+            from app.core.armazenamento_s3 import ArmazenamentoS3
+            _armazenamento_remoto = ArmazenamentoS3.do_ambiente()
+        return _armazenamento_remoto
+    return ArmazenamentoLocal(BLOB_DIR)
+
+
+def chave_blob(hash_sha256: str) -> str:
+    return f"{hash_sha256[:2]}/{hash_sha256[2:4]}/{hash_sha256}"
+
+
+def _eh_hash(nome: str) -> bool:
+    return len(nome) == 64 and all(c in "0123456789abcdef" for c in nome)
+
+
+def caminho_blob(hash_sha256: str) -> str | None:
+    """Caminho no disco do blob; None quando o armazenamento é remoto."""
+    return armazenamento().caminho_local(chave_blob(hash_sha256))
+
+
+def url_download_blob(hash_sha256: str, nome_download: str | None, content_encoding: str | None = None) -> str | None:
+    return armazenamento().url_assinada(chave_blob(hash_sha256), nome_download, content_encoding=content_encoding)
+
+
+def _dir_temporario() -> str:
+    return os.path.join(BLOB_DIR, "tmp")
+
+
+def novo_temporario() -> str:
+    """Caminho para um temporário local (uploads em andamento, cópias de migração)."""
+    os.makedirs(_dir_temporario(), exist_ok=True)
+    return os.path.join(_dir_temporario(), uuid.uuid4().hex)
+
+
+def remover_arquivo(caminho: str) -> None:
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+
+
+async def receber_upload(file: UploadFile, max_bytes: int | None = None) -> ArquivoRecebido:
+    """
+    Copia o upload em blocos para um arquivo temporário (escrita em threadpool, sem bloquear
+    o event loop), calculando o SHA-256 no caminho. Acima do limite, descarta o temporário
+    e lança ArquivoMuitoGrandeError. O destino é decidido pelo AnexoRepository (publicar_blob).
+    """
+    limite = ANEXO_MAX_BYTES if max_bytes is None else max_bytes
+    caminho_tmp = await run_in_threadpool(novo_temporario)
+
+    sha256 = hashlib.sha256()
+    tamanho = 0
+    destino = await run_in_threadpool(open, caminho_tmp, "wb")
+    try:
+        while chunk := await file.read(ANEXO_CHUNK_BYTES):
+            tamanho += len(chunk)
+            if tamanho > limite:
+                raise ArquivoMuitoGrandeError(f"O arquivo excede o tamanho máximo de {limite // (1024 * 1024)} MB.")
+            sha256.update(chunk)
+            await run_in_threadpool(destino.write, chunk)
+        await run_in_threadpool(destino.close)
+    except BaseException:
+        destino.close()
+        await run_in_threadpool(remover_arquivo, caminho_tmp)
+        raise
+
+    return ArquivoRecebido(caminho_tmp, tamanho, sha256.hexdigest())
+
+
+def e_comprimivel(nome_arquivo: str | None, content_type: str | None) -> bool:
+    # A extensão decide; o Content-Type (informado pelo navegador) só vale para arquivos sem extensão
+    if extensao_segura(nome_arquivo):
+        return nome_arquivo.lower().endswith(EXTENSOES_COMPRIMIVEIS)
+    return bool(content_type) and content_type.lower().startswith(TIPOS_COMPRIMIVEIS)
+
+
+def comprimir_se_vantajoso(arquivo: ArquivoRecebido, nome_arquivo: str | None, content_type: str | None) -> None:
+    """
+    Comprime o temporário com brotli (em streaming, bloco a bloco) quando o tipo é elegível
+    e o ganho compensa; caso contrário mantém o original. Síncrona: chame via threadpool.
+    """
+    if not ANEXO_COMPRESSAO or not e_comprimivel(nome_arquivo, content_type):
+        return
+
+    caminho_comprimido = novo_temporario()
+    compressor = brotli.Compressor(quality=ANEXO_BROTLI_QUALIDADE)
+    with open(arquivo.caminho_temporario, "rb") as origem, open(caminho_comprimido, "wb") as destino:
+        while chunk := origem.read(ANEXO_CHUNK_BYTES):
+            destino.write(compressor.process(chunk))
+        destino.write(compressor.finish())
+
+    tamanho_comprimido = os.path.getsize(caminho_comprimido)
+    if tamanho_comprimido > arquivo.tamanho_bytes * ANEXO_COMPRESSAO_TAXA_MINIMA:
+        remover_arquivo(caminho_comprimido)
+        return
+
+    remover_arquivo(arquivo.caminho_temporario)
+    arquivo.caminho_temporario = caminho_comprimido
+    arquivo.compressao = COMPRESSAO_BROTLI
+    arquivo.tamanho_armazenado = tamanho_comprimido
+    logger.debug(f"Anexo {arquivo.hash_sha256} comprimido: {arquivo.tamanho_bytes} -> {tamanho_comprimido} bytes.")
+
+
+def descomprimir_em_blocos(blocos, compressao: str | None, hash_sha256: str | None = None):
+    if compressao != COMPRESSAO_BROTLI:
+        yield from blocos
+        return
+    descompressor = brotli.Decompressor()
+    try:
+        for chunk in blocos:
+            if dados := descompressor.process(chunk):
+                yield dados
+    except brotli.error as e:
+        logger.error(f"Blob {hash_sha256} corrompido: falha ao descomprimir ({e}).")
+        raise BlobCorrompidoError(f"Conteúdo comprimido inválido (blob {hash_sha256}).") from e
+    # Sem isso um blob truncado sairia como um corpo menor, sem erro
+    if not descompressor.is_finished():
+        logger.error(f"Blob {hash_sha256} truncado: o fluxo brotli terminou antes do fim.")
+        raise BlobCorrompidoError(f"Conteúdo comprimido incompleto (blob {hash_sha256}).")
+
+
+def publicar_blob(caminho_temporario: str, hash_sha256: str, compressao: str | None = None) -> None:
+    """
+    Grava o temporário como blob do hash (substituindo um arquivo órfão, se houver).
+    Deve ser chamado com o lock do hash obtido e só quando o blob ainda não está
+    registrado em anexos_blobs (AnexoRepository). O temporário é consumido.
+    """
+    destino = armazenamento()
+    chave = chave_blob(hash_sha256)
+    if isinstance(destino, ArmazenamentoLocal):
+        destino.mover_arquivo(caminho_temporario, chave)
+    else:
+        # O hash do conteúdo só confere com os bytes gravados quando não há compressão
+        destino.enviar_arquivo(caminho_temporario, chave, None if compressao else hash_sha256)
+        remover_arquivo(caminho_temporario)
+
+
+def remover_blob(hash_sha256: str) -> None:
+    armazenamento().remover(chave_blob(hash_sha256))
+    miniaturas.remover(hash_sha256)
+    logger.info(f"Blob {hash_sha256} removido do armazenamento (sem referências).")
+
+
+def ler_blob(hash_sha256: str, compressao: str | None = None):
+    """Conteúdo original do blob (descomprimido em streaming, se for o caso)."""
+    yield from descomprimir_em_blocos(armazenamento().ler_em_blocos(chave_blob(hash_sha256)), compressao, hash_sha256)
+
+
+def ler_arquivo(caminho: str):
+    with open(caminho, "rb") as f:
+        while chunk := f.read(ANEXO_CHUNK_BYTES):
+            yield chunk
+
+
+def copiar_blob_para_temporario(hash_sha256: str, compressao: str | None = None) -> str:
+    """Conteúdo original do blob (remoto e/ou comprimido) num temporário local; quem chama o remove."""
+    caminho_tmp = novo_temporario()
+    with open(caminho_tmp, "wb") as f:
+        for chunk in ler_blob(hash_sha256, compressao):
+            f.write(chunk)
+    return caminho_tmp
+
+
+def calcular_hash_arquivo(caminho: str) -> tuple[str, int]:
+    sha256 = hashlib.sha256()
+    tamanho = 0
+    with open(caminho, "rb") as f:
+        while chunk := f.read(ANEXO_CHUNK_BYTES):
+            sha256.update(chunk)
+            tamanho += len(chunk)
+    return sha256.hexdigest(), tamanho
+
+
+def listar_hashes_blobs():
+    """Percorre o armazenamento (ignorando temporários) e gera os hashes encontrados."""
+    for chave in armazenamento().listar():
+        nome = chave.rsplit("/", 1)[-1]
+        if _eh_hash(nome):
+            yield nome
+
+
+def limpar_temporarios(idade_minima_segundos: int) -> int:
+    """Remove temporários de uploads interrompidos, mais velhos que a idade mínima."""
+    diretorio = _dir_temporario()
+    if not os.path.isdir(diretorio):
+        return 0
+    limite = time.time() - idade_minima_segundos
+    removidos = 0
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        try:
+            if os.stat(caminho).st_mtime < limite:
+                os.remove(caminho)
+                removidos += 1
+        except FileNotFoundError:
+            continue
+    return removidos
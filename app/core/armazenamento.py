@@ -0,0 +1,92 @@
+"""
+Drivers de armazenamento dos blobs de anexos. As chaves são caminhos relativos
+('ab/cd/<sha256>'); o driver decide onde os bytes ficam:
+
+- ArmazenamentoLocal: diretório no disco da instância (ANEXO_BLOB_DIR).
+- ArmazenamentoS3 (app.core.armazenamento_s3): bucket S3 compatível (AWS, MinIO, R2...),
+  permitindo mais de um nó web sem disco compartilhado.
+"""
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+CHUNK_BYTES = 1024 * 1024
+
+
+class Armazenamento(ABC):
+    """
+    Interface comum dos drivers (métodos síncronos: chame via threadpool em rotas async).
+    Um driver sem algum dos métodos abstratos falha já ao ser instanciado.
+    """
+
+    @abstractmethod
+    def existe(self, chave: str) -> bool: ...
+
+    @abstractmethod
+    def enviar_arquivo(self, caminho_origem: str, chave: str, hash_sha256: str | None = None) -> None:
+        """Grava o conteúdo do arquivo local na chave. O arquivo de origem é mantido."""
+
+    @abstractmethod
+    def ler_em_blocos(self, chave: str) -> Iterator[bytes]: ...
+
+    @abstractmethod
+    def remover(self, chave: str) -> None: ...
+
+    @abstractmethod
+    def listar(self, prefixo: str = "") -> Iterator[str]: ...
+
+    def caminho_local(self, chave: str) -> str | None:
+        """Caminho no disco, quando o driver é local (permite FileResponse/sendfile)."""
+        return None
+
+    def url_assinada(self, chave: str, nome_download: str | None = None, expira_em: int = 300,
+                     content_encoding: str | None = None) -> str | None:
+        """
+        URL temporária para o cliente baixar direto do armazenamento (drivers remotos).
+        content_encoding: valor do Content-Encoding que o armazenamento deve devolver (blob comprimido).
+        """
+        return None
+
+
+class ArmazenamentoLocal(Armazenamento):
+    def __init__(self, raiz: str):
+        self.raiz = raiz
+
+    def caminho_local(self, chave: str) -> str:
+        return os.path.join(self.raiz, *chave.split("/"))
+
+    def existe(self, chave: str) -> bool:
+        return os.path.isfile(self.caminho_local(chave))
+
+    def enviar_arquivo(self, caminho_origem: str, chave: str, hash_sha256: str | None = None) -> None:
+        destino = self.caminho_local(chave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        tmp = f"{destino}.tmp-{os.getpid()}"
+        shutil.copyfile(caminho_origem, tmp)
+        os.replace(tmp, destino)
+
+    def mover_arquivo(self, caminho_origem: str, chave: str) -> None:
+        """Atalho do driver local: rename em vez de cópia (mesmo sistema de arquivos)."""
+        destino = self.caminho_local(chave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(caminho_origem, destino)
+
+    def ler_em_blocos(self, chave: str) -> Iterator[bytes]:
+        with open(self.caminho_local(chave), "rb") as f:
+            while chunk := f.read(CHUNK_BYTES):
+                yield chunk
+
+    def remover(self, chave: str) -> None:
+        try:
+            os.remove(self.caminho_local(chave))
+        except FileNotFoundError:
+            pass
+
+    def listar(self, prefixo: str = "") -> Iterator[str]:
+        for raiz, _, nomes in os.walk(self.raiz):
+            relativo = os.path.relpath(raiz, self.raiz).replace(os.sep, "/")
+            for nome in nomes:
+                chave = nome if relativo == "." else f"{relativo}/{nome}"
+                if chave.startswith(prefixo):
+                    yield chave
@@ -0,0 +1,219 @@
+"""
+Driver S3 compatível (AWS S3, MinIO, Cloudflare R2, Backblaze B2...) usando httpx e
+assinatura AWS Signature Version 4 feita aqui mesmo, sem boto3.
+
+Configuração (ANEXO_STORAGE=s3):
+    ANEXO_S3_ENDPOINT     ex.: https://s3.us-east-1.amazonaws.com ou http://localhost:9000
+    ANEXO_S3_BUCKET
+    ANEXO_S3_REGIAO       padrão us-east-1
+    ANEXO_S3_ACCESS_KEY / ANEXO_S3_SECRET_KEY
+    ANEXO_S3_PREFIXO      prefixo das chaves no bucket (padrão 'anexos/')
+    JOBS_S3_PREFIXO       prefixo dos artefatos de jobs com JOBS_STORAGE=s3 (padrão 'jobs/')
+
+Endereçamento path-style (endpoint/bucket/chave), aceito por todos os provedores acima.
+"""
+import os
+import hmac
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Iterator
+from urllib.parse import quote, urlsplit, parse_qsl
+import xml.etree.ElementTree as ET
+
+import httpx
+
+from app.core.armazenamento import Armazenamento, CHUNK_BYTES
+
+logger = logging.getLogger(__name__)
+
+ALGORITMO = "AWS4-HMAC-SHA256"
+HASH_VAZIO = hashlib.sha256(b"").hexdigest()
+PAYLOAD_NAO_ASSINADO = "UNSIGNED-PAYLOAD"
+NAMESPACE_S3 = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+def _hmac(chave: bytes, mensagem: str) -> bytes:
+    return hmac.new(chave, mensagem.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _chave_assinatura(secret_key: str, data: str, regiao: str) -> bytes:
+    chave = _hmac(f"AWS4{secret_key}".encode("utf-8"), data)
+    chave = _hmac(chave, regiao)
+    chave = _hmac(chave, "s3")
+    return _hmac(chave, "aws4_request")
+
+
+def _query_canonica(params: list[tuple[str, str]]) -> str:
+    return "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params))
+
+
+def _assinatura(secret_key: str, regiao: str, amz_date: str, requisicao_canonica: str) -> tuple[str, str]:
+    escopo = f"{amz_date[:8]}/{regiao}/s3/aws4_request"
+    texto = "\n".join([ALGORITMO, amz_date, escopo, hashlib.sha256(requisicao_canonica.encode("utf-8")).hexdigest()])
+    chave = _chave_assinatura(secret_key, amz_date[:8], regiao)
+    return escopo, hmac.new(chave, texto.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def assinar_requisicao(metodo: str, url: str, headers: dict[str, str], payload_hash: str,
+                       access_key: str, secret_key: str, regiao: str, agora: datetime) -> dict[str, str]:
+    """
+    Retorna os headers (host, x-amz-date, x-amz-content-sha256, Authorization) da requisição.
+    Todos os headers recebidos entram na assinatura. A URL já deve vir com o caminho codificado.
+    """
+    partes = urlsplit(url)
+    amz_date = agora.strftime("%Y%m%dT%H%M%SZ")
+
+    assinados = {k.lower(): " ".join(str(v).split()) for k, v in headers.items()}
+    assinados["host"] = partes.netloc
+    assinados["x-amz-date"] = amz_date
+    assinados["x-amz-content-sha256"] = payload_hash
+    nomes = sorted(assinados)
+
+    requisicao_canonica = "\n".join([
+        metodo,
+        partes.path or "/",
+        _query_canonica(parse_qsl(partes.query, keep_blank_values=True)),
+        "".join(f"{nome}:{assinados[nome]}\n" for nome in nomes),
+        ";".join(nomes),
+        payload_hash,
+    ])
+    escopo, assinatura = _assinatura(secret_key, regiao, amz_date, requisicao_canonica)
+
+    assinados["authorization"] = (
+        f"{ALGORITMO} Credential={access_key}/{escopo}, SignedHeaders={';'.join(nomes)}, Signature={assinatura}"
+    )
+    return assinados
+
+
+def assinar_url(metodo: str, url: str, access_key: str, secret_key: str, regiao: str,
+                agora: datetime, expira_em: int) -> str:
+    """URL pré-assinada (assinatura na query string, válida por expira_em segundos)."""
+    partes = urlsplit(url)
+    amz_date = agora.strftime("%Y%m%dT%H%M%SZ")
+    escopo = f"{amz_date[:8]}/{regiao}/s3/aws4_request"
+
+    params = parse_qsl(partes.query, keep_blank_values=True) + [
+        ("X-Amz-Algorithm", ALGORITMO),
+        ("X-Amz-Credential", f"{access_key}/{escopo}"),
+        ("X-Amz-Date", amz_date),
+        ("X-Amz-Expires", str(expira_em)),
+        ("X-Amz-SignedHeaders", "host"),
+    ]
+    query = _query_canonica(params)
+    requisicao_canonica = "\n".join([
+        metodo, partes.path or "/", query, f"host:{partes.netloc}\n", "host", PAYLOAD_NAO_ASSINADO,
+    ])
+    _, assinatura = _assinatura(secret_key, regiao, amz_date, requisicao_canonica)
+    return f"{partes.scheme}://{partes.netloc}{partes.path}?{query}&X-Amz-Signature={assinatura}"
+
+
+class ArmazenamentoS3(Armazenamento):
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 regiao: str = "us-east-1", prefixo: str = "", cliente: httpx.Client | None = None):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.regiao = regiao
+        self.prefixo = prefixo
+        self.cliente = cliente or httpx.Client(timeout=httpx.Timeout(30.0, read=300.0))
+
+    @classmethod
+    def do_ambiente(cls, prefixo: str | None = None) -> "ArmazenamentoS3":
+        """Bucket configurado no .env; 'prefixo' substitui ANEXO_S3_PREFIXO (ex.: artefatos de jobs)."""
+        endpoint = os.environ.get("ANEXO_S3_ENDPOINT")
+        bucket = os.environ.get("ANEXO_S3_BUCKET")
+        if not endpoint or not bucket:
+            raise ValueError("Erro: ANEXO_STORAGE=s3 exige ANEXO_S3_ENDPOINT e ANEXO_S3_BUCKET. Verifique seu .env")
+        return cls(
+            endpoint=endpoint,
+            bucket=bucket,
+            access_key=os.environ.get("ANEXO_S3_ACCESS_KEY", ""),
+            secret_key=os.environ.get("ANEXO_S3_SECRET_KEY", ""),
+            regiao=os.environ.get("ANEXO_S3_REGIAO", "us-east-1"),
+            prefixo=prefixo if prefixo is not None else os.environ.get("ANEXO_S3_PREFIXO", "anexos/"),
+        )
+
+    def _url(self, chave: str = "") -> str:
+        url = f"{self.endpoint}/{quote(self.bucket)}"
+        return f"{url}/{quote(self.prefixo + chave, safe='/~')}" if chave else url
+
+    def _headers(self, metodo: str, url: str, payload_hash: str = HASH_VAZIO, headers: dict | None = None) -> dict:
+        return assinar_requisicao(metodo, url, headers or {}, payload_hash, self.access_key,
+                                  self.secret_key, self.regiao, datetime.now(timezone.utc))
+
+    def existe(self, chave: str) -> bool:
+        url = self._url(chave)
+        resposta = self.cliente.head(url, headers=self._headers("HEAD", url))
+        if resposta.status_code == 404:
+            return False
+        resposta.raise_for_status()
+        return True
+
+    def enviar_arquivo(self, caminho_origem: str, chave: str, hash_sha256: str | None = None) -> None:
+        """
+        PUT em streaming (sem carregar o arquivo na memória). Com o hash do conteúdo, ele vai
+        em x-amz-content-sha256 e o próprio S3 recusa o upload se os bytes não conferirem.
+        """
+        url = self._url(chave)
+        tamanho = os.path.getsize(caminho_origem)
+
+        def blocos():
+            with open(caminho_origem, "rb") as f:
+                while chunk := f.read(CHUNK_BYTES):
+                    yield chunk
+
+        headers = self._headers("PUT", url, hash_sha256 or PAYLOAD_NAO_ASSINADO,
+                                {"content-type": "application/octet-stream"})
+        headers["content-length"] = str(tamanho)
+        resposta = self.cliente.put(url, headers=headers, content=blocos())
+        resposta.raise_for_status()
+        logger.debug(f"Objeto '{chave}' enviado ao bucket '{self.bucket}' ({tamanho} bytes).")
+
+    def ler_em_blocos(self, chave: str) -> Iterator[bytes]:
+        url = self._url(chave)
+        with self.cliente.stream("GET", url, headers=self._headers("GET", url)) as resposta:
+            resposta.raise_for_status()
+            yield from resposta.iter_bytes(CHUNK_BYTES)
+
+    def remover(self, chave: str) -> None:
+        url = self._url(chave)
+        resposta = self.cliente.delete(url, headers=self._headers("DELETE", url))
+        if resposta.status_code != 404:
+            resposta.raise_for_status()
+
+    def listar(self, prefixo: str = "") -> Iterator[str]:
+        token = None
+        while True:
+            params = [("list-type", "2"), ("prefix", self.prefixo + prefixo)]
+            if token:
+                params.append(("continuation-token", token))
+            url = f"{self._url()}?{_query_canonica(params)}"
+            resposta = self.cliente.get(url, headers=self._headers("GET", url))
+            resposta.raise_for_status()
+
+            raiz = ET.fromstring(resposta.content)
+            for conteudo in raiz.iter(f"{NAMESPACE_S3}Contents"):
+                yield conteudo.findtext(f"{NAMESPACE_S3}Key")[len(self.prefixo):]
+
+            if raiz.findtext(f"{NAMESPACE_S3}IsTruncated") != "true":
+                return
+            token = raiz.findtext(f"{NAMESPACE_S3}NextContinuationToken")
+
+    def url_assinada(self, chave: str, nome_download: str | None = None, expira_em: int = 300,
+                     content_encoding: str | None = None) -> str:
+        url = self._url(chave)
+        params = []
+        if nome_download:
+            params.append(f"response-content-disposition={quote(_content_disposition(nome_download), safe='')}")
+        if content_encoding:
+            params.append(f"response-content-encoding={quote(content_encoding, safe='')}")
+        if params:
+            url += "?" + "&".join(params)
+        return assinar_url("GET", url, self.access_key, self.secret_key, self.regiao,
+                           datetime.now(timezone.utc), expira_em)
+
+
+def _content_disposition(nome_download: str) -> str:
+    return f"attachment; filename*=utf-8''{quote(nome_download)}"
@@ -0,0 +1,59 @@
+"""
+Busca textual de itens sobre a coluna gerada itenscontrato.descricao_busca (sem acentos,
+minúscula; ver normalizar_busca() no schema). Cada palavra vira um LIKE '%palavra%', que o
+índice trigram (GIN, pg_trgm) atende; a ordenação por relevância usa similarity() quando a
+extensão está instalada e, sem ela, a posição do termo na descrição.
+"""
+import logging
+from psycopg2.extensions import connection
+
+logger = logging.getLogger(__name__)
+
+_trigram_disponivel: bool | None = None
+
+
+def trigram_disponivel(db_conn: connection) -> bool:
+    """Consultado uma vez por processo: a extensão não aparece nem some com a aplicação no ar."""
+    global _trigram_disponivel
+    if _trigram_disponivel is None:
+        with db_conn.cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            _trigram_disponivel = cursor.fetchone()[0]
+        if not _trigram_disponivel:
+            logger.warning("Extensão pg_trgm não instalada: busca de itens sem índice trigram e sem similarity().")
+    return _trigram_disponivel
+
+
+def escapar_like(termo: str) -> str:
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filtro(coluna: str, busca: str) -> tuple[str, list]:
+    """Trecho ' AND ...' exigindo todas as palavras da busca, em qualquer ordem e posição."""
+    palavras = busca.split()
+    sql = "".join(f" AND {coluna} LIKE '%%' || normalizar_busca(%s) || '%%'" for _ in palavras)
+    return sql, [escapar_like(p) for p in palavras]
+
+
+def ordem_relevancia(db_conn: connection, coluna: str, busca: str) -> tuple[str, list]:
+    """Expressão de ORDER BY (mais relevante primeiro) e seus parâmetros."""
+    termo = " ".join(busca.split())
+    if trigram_disponivel(db_conn):
+        return f"similarity({coluna}, normalizar_busca(%s)) DESC", [termo]
+    return f"NULLIF(strpos({coluna}, normalizar_busca(%s)), 0), length({coluna})", [termo]
+
+
+def colunas_relevancia(db_conn: connection, coluna: str, busca: str) -> tuple[str, list, list[str]]:
+    """
+    A mesma relevância como colunas do SELECT, para paginação por cursor: trecho ', expr AS ...',
+    seus parâmetros e as chaves de ordenação (no formato de paginacao.consultar, nunca NULL).
+    """
+    termo = " ".join(busca.split())
+    if trigram_disponivel(db_conn):
+        return f", similarity({coluna}, normalizar_busca(%s))::float8 AS relevancia", [termo], ["-relevancia"]
+    return (
+        f", COALESCE(NULLIF(strpos({coluna}, normalizar_busca(%s)), 0), 2147483647) AS relevancia"
+        f", length({coluna}) AS relevancia_tamanho",
+        [termo],
+        ["relevancia", "relevancia_tamanho"],
+    )
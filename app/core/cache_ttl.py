@@ -0,0 +1,46 @@
+"""
+Cache em memória do processo, com expiração (TTL) e limite de entradas (descarta as menos
+usadas). Para consultas pequenas e repetidas em sequência, como o autocomplete enquanto o
+usuário digita; cada worker do uvicorn tem o seu.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    def __init__(self, ttl_segundos: float, max_itens: int = 1000):
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self._dados: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Rotas síncronas rodam no threadpool: acesso concorrente ao mesmo dicionário
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        with self._lock:
+            entrada = self._dados.get(chave, _AUSENTE)
+            if entrada is _AUSENTE:
+                return padrao
+            expira_em, valor = entrada
+            if expira_em <= time.monotonic():
+                del self._dados[chave]
+                return padrao
+            self._dados.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_itens:
+                self._dados.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self) -> int:
+        return len(self._dados)
@@ -1,16 +1,44 @@
 import os
 import psycopg2
+from fastapi import Request
 from psycopg2.extras import DictCursor
+from app.core.transacao import ConexaoTransacional
 
-def _get_db_connection():
+# Tempo máximo de cada instrução nas requisições web (0 = sem limite); o worker de jobs não usa
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+# Prefixo do application_name: em pg_stat_activity aparece "gestaopro:<rota>"
+DB_APPLICATION_NAME = os.environ.get("DB_APPLICATION_NAME", "gestaopro")
+
+METODOS_SEGUROS = {"GET", "HEAD", "OPTIONS"}
+
+def _parametros_sessao(application_name: str | None, statement_timeout_ms: int | None,
+                       somente_leitura: bool) -> dict:
+    """Parâmetros de sessão enviados na própria conexão (sem SET, sem ida e volta a mais)."""
+    parametros = {}
+    if application_name:
+        parametros["application_name"] = application_name[:63]  # Limite do PostgreSQL (NAMEDATALEN)
+    opcoes = []
+    if statement_timeout_ms:
+        opcoes.append(f"-c statement_timeout={int(statement_timeout_ms)}")
+    if somente_leitura:
+        opcoes.append("-c default_transaction_read_only=on")
+    if opcoes:
+        parametros["options"] = " ".join(opcoes)
+    return parametros
+
+def _get_db_connection(application_name: str | None = None, statement_timeout_ms: int | None = None,
+                       somente_leitura: bool = False):
+    parametros = _parametros_sessao(application_name, statement_timeout_ms, somente_leitura)
     database_url = os.environ.get('DATABASE_URL')
-    
+
     if database_url:
         if os.environ.get('RENDER') == 'true':
-            return psycopg2.connect(database_url, sslmode='require', cursor_factory=DictCursor)
+            return psycopg2.connect(database_url, sslmode='require', cursor_factory=DictCursor,
+                                    connection_factory=ConexaoTransacional, **parametros)
         else:
-            return psycopg2.connect(database_url, cursor_factory=DictCursor)
-    
+            return psycopg2.connect(database_url, cursor_factory=DictCursor,
+                                    connection_factory=ConexaoTransacional, **parametros)
+
     db_host = os.environ.get("DB_HOST")
     db_name = os.environ.get("DB_NAME")
     db_user = os.environ.get("DB_USER")
@@ -18,20 +46,41 @@ def _get_db_connection():
 
     if not db_host:
         raise ValueError("Erro: Variável de ambiente DB_HOST não definida. Verifique seu .env")
-        
+
     return psycopg2.connect(
         host=db_host,
         database=db_name,
         user=db_user,
         password=db_pass,
-        cursor_factory=DictCursor
+        cursor_factory=DictCursor,
+        connection_factory=ConexaoTransacional,
+        **parametros
     )
 
-def get_db():
+def _nome_aplicacao(request: Request) -> str:
+    rota = request.scope.get("route")
+    nome = getattr(rota, "name", None)
+    return f"{DB_APPLICATION_NAME}:{nome}" if nome else DB_APPLICATION_NAME
+
+def get_db(request: Request = None):
+    """
+    Métodos seguros (GET/HEAD/OPTIONS) recebem conexão em autocommit e somente leitura: nenhuma
+    transação fica aberta (idle in transaction) até o close. Escritas seguem com transação explícita.
+    """
     conn = None
     try:
-        conn = _get_db_connection()
-        yield conn  
+        if request is None:
+            conn = _get_db_connection()
+        else:
+            somente_leitura = request.method in METODOS_SEGUROS
+            conn = _get_db_connection(
+                application_name=_nome_aplicacao(request),
+                statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+                somente_leitura=somente_leitura,
+            )
+            if somente_leitura:
+                conn.autocommit = True
+        yield conn
     finally:
         if conn:
-            conn.close() 
\ No newline at end of file
+            conn.close()
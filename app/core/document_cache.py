@@ -0,0 +1,102 @@
+import os
+import shutil
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR = os.environ.get("DOCUMENT_CACHE_DIR", os.path.join(BASE_DIR, "cache", "documentos"))
+CACHE_MAX_BYTES = int(os.environ.get("DOCUMENT_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+
+def nome_documento(variante: str, versao: str, formato: str) -> str:
+    """Ex.: aocs-3f2a...e1.pdf — a versão é o hash das linhas que geraram o documento."""
+    return f"{variante}-{versao}.{formato}"
+
+
+def _dir_entidade(tipo_entidade: str, id_entidade: int) -> str:
+    return os.path.join(CACHE_DIR, tipo_entidade, str(id_entidade))
+
+
+def obter(tipo_entidade: str, id_entidade: int, nome: str) -> str | None:
+    """Retorna o caminho do documento em cache (marcando-o como usado) ou None."""
+    caminho = os.path.join(_dir_entidade(tipo_entidade, id_entidade), nome)
+    try:
+        os.utime(caminho)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Falha ao acessar documento em cache '{caminho}': {e}")
+        return None
+    return caminho
+
+
+def salvar(tipo_entidade: str, id_entidade: int, nome: str, conteudo: bytes) -> str | None:
+    """
+    Grava o documento de forma atômica e remove versões anteriores da mesma variante.
+    Falhas de disco só são registradas: o cache nunca deve quebrar a impressão.
+    """
+    diretorio = _dir_entidade(tipo_entidade, id_entidade)
+    caminho = os.path.join(diretorio, nome)
+    variante, _, resto = nome.rpartition("-")
+    extensao = resto.rsplit(".", 1)[-1]
+
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        fd, caminho_tmp = tempfile.mkstemp(dir=diretorio, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+        os.replace(caminho_tmp, caminho)
+
+        for antigo in os.listdir(diretorio):
+            if antigo != nome and antigo.startswith(f"{variante}-") and antigo.endswith(f".{extensao}"):
+                os.remove(os.path.join(diretorio, antigo))
+
+        _aplicar_limite()
+        return caminho
+    except OSError as e:
+        logger.warning(f"Falha ao gravar documento em cache '{caminho}': {e}")
+        return None
+
+
+def invalidar(tipo_entidade: str, id_entidade: int) -> None:
+    diretorio = _dir_entidade(tipo_entidade, id_entidade)
+    try:
+        shutil.rmtree(diretorio)
+        logger.info(f"Cache de documentos invalidado para {tipo_entidade} ID {id_entidade}.")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Falha ao invalidar cache de documentos de {tipo_entidade} ID {id_entidade}: {e}")
+
+
+def _aplicar_limite() -> None:
+    """Remove os documentos menos usados recentemente (mtime) até caber em CACHE_MAX_BYTES."""
+    arquivos = []
+    total = 0
+    for raiz, _, nomes in os.walk(CACHE_DIR):
+        for nome in nomes:
+            if nome.startswith(".tmp-"):
+                continue
+            caminho = os.path.join(raiz, nome)
+            try:
+                st = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            arquivos.append((st.st_mtime, st.st_size, caminho))
+            total += st.st_size
+
+    if total <= CACHE_MAX_BYTES:
+        return
+
+    arquivos.sort()
+    for _, tamanho, caminho in arquivos:
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+            logger.debug(f"Documento '{caminho}' removido do cache (LRU).")
+        except FileNotFoundError:
+            total -= tamanho
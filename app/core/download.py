@@ -0,0 +1,151 @@
+"""
+Entrega de arquivos de anexos: ETag forte (SHA-256 do conteúdo), requisições condicionais
+(If-None-Match / If-Modified-Since -> 304), Range (via FileResponse) e, opcionalmente,
+delegação dos bytes ao proxy reverso (X-Accel-Redirect no nginx, X-Sendfile no Apache).
+Blobs comprimidos em repouso (brotli) vão como estão para quem aceita 'br'; os demais
+clientes recebem o conteúdo descomprimido em streaming.
+"""
+import os
+import logging
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+
+from fastapi import Request
+from starlette.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+
+from app.core import anexo_storage
+
+logger = logging.getLogger(__name__)
+
+# "", "x-accel-redirect" ou "x-sendfile"
+DOWNLOAD_OFFLOAD = os.environ.get("ANEXO_DOWNLOAD_OFFLOAD", "").lower()
+# Location 'internal' do nginx apontando para ANEXO_BLOB_DIR (ex.: location /_anexos/ { internal; alias ...; })
+ACCEL_REDIRECT_PREFIXO = os.environ.get("ANEXO_ACCEL_REDIRECT_PREFIXO", "/_anexos/")
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_forte(hash_sha256: str, content_encoding: str | None = None) -> str:
+    # Representações diferentes (original x comprimida) precisam de ETags diferentes
+    return f'"{hash_sha256}-{content_encoding}"' if content_encoding else f'"{hash_sha256}"'
+
+
+def aceita_encoding(request: Request, encoding: str) -> bool:
+    for item in request.headers.get("accept-encoding", "").split(","):
+        nome, _, parametros = item.strip().partition(";")
+        if nome.strip().lower() != encoding:
+            continue
+        qualidade = parametros.strip().removeprefix("q=")
+        try:
+            return not parametros or float(qualidade) > 0
+        except ValueError:
+            return True
+    return False
+
+
+def _content_disposition(nome_download: str) -> str:
+    nome_codificado = quote(nome_download)
+    if nome_codificado != nome_download:
+        return f"attachment; filename*=utf-8''{nome_codificado}"
+    return f'attachment; filename="{nome_download}"'
+
+
+def nao_modificado(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Comparação fraca (RFC 9110 13.1.2): W/"x" casa com "x"
+        etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in etags or etag.removeprefix("W/") in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _caminho_offload(caminho: str) -> str | None:
+    """Só os blobs têm local interno no proxy; uploads antigos continuam servidos pela aplicação."""
+    raiz = os.path.realpath(anexo_storage.BLOB_DIR)
+    real = os.path.realpath(caminho)
+    if os.path.commonpath([raiz, real]) != raiz:
+        return None
+    if DOWNLOAD_OFFLOAD == "x-sendfile":
+        return real
+    relativo = os.path.relpath(real, raiz).replace(os.sep, "/")
+    return ACCEL_REDIRECT_PREFIXO.rstrip("/") + "/" + quote(relativo)
+
+
+def responder_arquivo(request: Request, caminho: str, nome_download: str, hash_sha256: str | None = None,
+                      media_type: str = "application/octet-stream", content_encoding: str | None = None) -> Response:
+    """content_encoding: o arquivo está comprimido e vai assim mesmo (o cliente aceita a codificação)."""
+    stat_result = os.stat(caminho)
+    etag = _etag_forte(hash_sha256, content_encoding) if hash_sha256 else None
+    headers = {
+        "cache-control": CACHE_CONTROL,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if etag:
+        headers["etag"] = etag
+    if content_encoding:
+        headers["content-encoding"] = content_encoding
+        headers["vary"] = "Accept-Encoding"
+
+    resposta = FileResponse(caminho, media_type=media_type, filename=nome_download,
+                            headers=headers, stat_result=stat_result)
+
+    if nao_modificado(request, resposta.headers["etag"], stat_result.st_mtime):
+        cabecalhos_304 = {
+            "etag": resposta.headers["etag"],
+            "last-modified": resposta.headers["last-modified"],
+            "cache-control": CACHE_CONTROL,
+        }
+        if content_encoding:
+            cabecalhos_304["vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=cabecalhos_304)
+
+    if DOWNLOAD_OFFLOAD in ("x-accel-redirect", "x-sendfile") and not content_encoding:
+        destino = _caminho_offload(caminho)
+        if destino:
+            header = "x-accel-redirect" if DOWNLOAD_OFFLOAD == "x-accel-redirect" else "x-sendfile"
+            # Corpo vazio: o proxy lê o arquivo (sendfile) e trata Range sozinho
+            return Response(status_code=200, media_type=media_type, headers={
+                header: destino,
+                "content-disposition": _content_disposition(nome_download),
+                "etag": resposta.headers["etag"],
+                "last-modified": resposta.headers["last-modified"],
+                "cache-control": CACHE_CONTROL,
+            })
+
+    return resposta
+
+
+def responder_descomprimido(request: Request, blocos, nome_download: str, hash_sha256: str, tamanho_bytes: int,
+                            media_type: str = "application/octet-stream") -> Response:
+    """
+    Conteúdo original de um blob comprimido, descomprimido em streaming. O tamanho original é
+    conhecido (anexos.tamanho_bytes), então o Content-Length vai certo; Range não é suportado
+    nesse caminho (sem Accept-Ranges, o cliente baixa inteiro).
+    """
+    etag = _etag_forte(hash_sha256)
+    headers = {"etag": etag, "cache-control": CACHE_CONTROL, "vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") is not None and nao_modificado(request, etag, 0):
+        return Response(status_code=304, headers=headers)
+
+    headers["content-disposition"] = _content_disposition(nome_download)
+    headers["content-length"] = str(tamanho_bytes)
+    if request.method == "HEAD":
+        return Response(status_code=200, media_type=media_type, headers=headers)
+    return StreamingResponse(blocos, media_type=media_type, headers=headers)
+
+
+def redirecionar(request: Request, url: str, hash_sha256: str) -> Response:
+    """Armazenamento remoto: 304 pelo ETag quando possível, senão redireciona para a URL assinada."""
+    etag = _etag_forte(hash_sha256)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and nao_modificado(request, etag, 0):
+        return Response(status_code=304, headers={"etag": etag, "cache-control": CACHE_CONTROL})
+    # A URL expira: o redirecionamento em si não pode ficar em cache
+    return RedirectResponse(url, status_code=307, headers={"cache-control": "no-store"})
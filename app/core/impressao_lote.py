@@ -0,0 +1,60 @@
+import os
+import logging
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.core import jobs, pdf_renderer
+from app.repositories.impressao_repository import ImpressaoRepository
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(APP_DIR, "templates")
+LOTE_MAX_DOCUMENTOS = int(os.environ.get("IMPRESSAO_LOTE_MAX_DOCUMENTOS", 500))
+# Limite do render do lote inteiro; o processo do render é encerrado se passar disso
+LOTE_TIMEOUT_SEGUNDOS = float(os.environ.get("IMPRESSAO_LOTE_TIMEOUT_SEGUNDOS", 300))
+
+TIPO_JOB = "impressao_lote"
+
+# Renderização fora de uma requisição: não há 'request' para url_path_for
+_env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape())
+
+
+TEMPLATES_LOTE = {
+    "aocs": "aocs_lote_template.html",
+    "ci": "ci_lote_template.html",
+}
+
+
+def renderizar_lote_html(documentos: list[dict], tipo: str = "aocs") -> str:
+    template = _env.get_template(TEMPLATES_LOTE[tipo])
+    return template.render(documentos=documentos, brasao_url="/static/images/brasao.png")
+
+
+@jobs.tarefa(TIPO_JOB)
+def gerar_impressao_lote(ctx: jobs.ContextoJob) -> str:
+    # Jobs enfileirados antes da impressão de CIs não trazem 'tipo'
+    tipo = ctx.parametros.get("tipo", "aocs")
+    formato = ctx.parametros.get("formato", "pdf")
+    repo = ImpressaoRepository(ctx.db_conn)
+
+    if tipo == "ci":
+        ids = ctx.parametros["ids_ci"]
+        ctx.reportar(10, f"Carregando {len(ids)} CIs.")
+        documentos = repo.get_documentos_ci(ids)
+    else:
+        ids = ctx.parametros["ids_aocs"]
+        ctx.reportar(10, f"Carregando {len(ids)} AOCS.")
+        documentos = repo.get_documentos_aocs(ids)
+
+    ctx.reportar(40, "Montando documento.")
+    html = renderizar_lote_html(documentos, tipo)
+
+    if formato == "pdf":
+        ctx.reportar(60, "Gerando PDF.")
+        conteudo = pdf_renderer.render_pdf_sync(html, timeout=LOTE_TIMEOUT_SEGUNDOS)
+    else:
+        conteudo = html.encode("utf-8")
+
+    logger.info(f"Impressão em lote do job ID {ctx.job.id} gerada ({len(documentos)} documentos {tipo}, {formato}).")
+    return ctx.gravar_artefato(f"lote_{tipo}.{formato}", conteudo)
@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import tempfile
+from typing import Callable
+from psycopg2.extensions import connection
+
+from app.core.armazenamento import Armazenamento, ArmazenamentoLocal
+from app.models.job_model import Job
+from app.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+JOBS_DIR = os.environ.get("JOBS_DIR", os.path.join(BASE_DIR, "cache", "jobs"))
+# Onde ficam os artefatos: o worker grava e o web lê, então com processos em máquinas diferentes
+# (ex.: dynos 'web' e 'worker' do Procfile) o armazenamento precisa ser compartilhado (s3).
+# Por padrão segue o driver dos anexos.
+JOBS_STORAGE = os.environ.get("JOBS_STORAGE", os.environ.get("ANEXO_STORAGE", "local")).lower()
+JOBS_S3_PREFIXO = os.environ.get("JOBS_S3_PREFIXO", "jobs/")
+
+# Intervalo mínimo entre heartbeats de pulsar() (cada um é um UPDATE + commit)
+JOBS_HEARTBEAT_INTERVALO_SEGUNDOS = float(os.environ.get("JOBS_HEARTBEAT_INTERVALO_SEGUNDOS", 30))
+
+# Módulos que registram tarefas; o worker os importa na inicialização
+MODULOS_TAREFAS = ("app.core.impressao_lote", "app.core.varredura_anexos")
+
+_tarefas: dict[str, Callable] = {}
+_armazenamento_remoto: Armazenamento | None = None
+
+
+class ReservaPerdidaError(Exception):
+    """O job foi devolvido à fila (heartbeat vencido) enquanto este worker ainda o executava."""
+    pass
+
+
+def tarefa(tipo: str):
+    """Registra a função que executa os jobs do tipo informado."""
+    def registrar(funcao: Callable) -> Callable:
+        _tarefas[tipo] = funcao
+        return funcao
+    return registrar
+
+
+def get_tarefa(tipo: str) -> Callable | None:
+    return _tarefas.get(tipo)
+
+
+def armazenamento() -> Armazenamento:
+    """Driver dos artefatos; a coluna jobs.artefato guarda a chave dentro dele."""
+    global _armazenamento_remoto
+    if JOBS_STORAGE == "s3":
+        if _armazenamento_remoto is None:
+            from app.core.armazenamento_s3 import ArmazenamentoS3
+            _armazenamento_remoto = ArmazenamentoS3.do_ambiente(prefixo=JOBS_S3_PREFIXO)
+        return _armazenamento_remoto
+    return ArmazenamentoLocal(JOBS_DIR)
+
+
+class ContextoJob:
+    """O que uma tarefa recebe: o job, a conexão do worker, progresso e gravação do resultado."""
+
+    def __init__(self, job: Job, db_conn: connection):
+        self.job = job
+        self.db_conn = db_conn
+        self.repo = JobRepository(db_conn)
+        self._ultimo_heartbeat = time.monotonic()
+
+    @property
+    def parametros(self) -> dict:
+        return self.job.parametros
+
+    def _reserva_perdida(self) -> ReservaPerdidaError:
+        return ReservaPerdidaError(f"Job ID {self.job.id} não pertence mais a este worker (tentativa {self.job.tentativas}).")
+
+    def reportar(self, progresso: int, mensagem: str | None = None) -> None:
+        # Também renova o heartbeat
+        if not self.repo.atualizar_progresso(self.job.id, self.job.tentativas, progresso, mensagem):
+            raise self._reserva_perdida()
+        self._ultimo_heartbeat = time.monotonic()
+
+    def pulsar(self) -> None:
+        """
+        Sinaliza que a tarefa continua viva, para laços longos sem progresso a reportar. Sem
+        heartbeat por JOBS_HEARTBEAT_LIMITE_SEGUNDOS (worker.py), o job volta à fila.
+        """
+        if time.monotonic() - self._ultimo_heartbeat >= JOBS_HEARTBEAT_INTERVALO_SEGUNDOS:
+            if not self.repo.registrar_heartbeat(self.job.id, self.job.tentativas):
+                raise self._reserva_perdida()
+            self._ultimo_heartbeat = time.monotonic()
+
+    def gravar_artefato(self, nome_arquivo: str, conteudo: bytes) -> str:
+        """Grava o resultado no armazenamento de artefatos e devolve a chave (id/tentativa/nome)."""
+        # A tentativa na chave impede que um worker que perdeu a reserva sobrescreva o artefato do atual
+        chave = f"{self.job.id}/{self.job.tentativas}/{os.path.basename(nome_arquivo)}"
+        destino = armazenamento()
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        descritor, caminho_tmp = tempfile.mkstemp(dir=JOBS_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as f:
+                f.write(conteudo)
+            if isinstance(destino, ArmazenamentoLocal):
+                destino.mover_arquivo(caminho_tmp, chave)
+            else:
+                destino.enviar_arquivo(caminho_tmp, chave)
+        finally:
+            if os.path.exists(caminho_tmp):
+                os.remove(caminho_tmp)
+        return chave
@@ -0,0 +1,80 @@
+import json
+import logging
+
+from app.core import anexo_storage
+
+logger = logging.getLogger(__name__)
+
+# Folga para os campos e boundaries do multipart além do próprio arquivo
+MARGEM_MULTIPART_BYTES = 64 * 1024
+
+
+class CorpoMuitoGrandeError(Exception):
+    pass
+
+
+class LimiteUploadMiddleware:
+    """
+    Recusa com 413 uploads acima de ANEXO_MAX_BYTES antes de o corpo ser lido e gravado
+    pelo parser de multipart: pelo Content-Length, ou contando os bytes recebidos quando
+    o cliente envia sem ele (chunked).
+    """
+
+    def __init__(self, app, caminhos: tuple[str, ...]):
+        self.app = app
+        self.caminhos = caminhos
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.caminhos):
+            await self.app(scope, receive, send)
+            return
+
+        limite = anexo_storage.ANEXO_MAX_BYTES + MARGEM_MULTIPART_BYTES
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limite:
+            logger.warning(f"Upload recusado em '{scope['path']}': Content-Length {int(content_length)} acima do limite.")
+            await self._responder_413(send)
+            return
+
+        recebido = 0
+        excedeu = False
+        resposta_iniciada = False
+
+        async def receive_com_limite():
+            nonlocal recebido, excedeu
+            message = await receive()
+            if message["type"] == "http.request":
+                recebido += len(message.get("body", b""))
+                if recebido > limite:
+                    excedeu = True
+                    raise CorpoMuitoGrandeError()
+            return message
+
+        async def send_controlado(message):
+            nonlocal resposta_iniciada
+            # O erro de parsing vira 400 dentro do FastAPI; aqui ele é trocado pelo 413
+            if excedeu:
+                if message["type"] == "http.response.start" and not resposta_iniciada:
+                    resposta_iniciada = True
+                    await self._responder_413(send)
+                return
+            if message["type"] == "http.response.start":
+                resposta_iniciada = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_com_limite, send_controlado)
+        except CorpoMuitoGrandeError:
+            if not resposta_iniciada:
+                await self._responder_413(send)
+
+    @staticmethod
+    async def _responder_413(send):
+        corpo = json.dumps({"detail": "O arquivo excede o tamanho máximo permitido."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode())]
+        })
+        await send({"type": "http.response.body", "body": corpo})
@@ -0,0 +1,114 @@
+"""
+Mapeamento posicional de linhas para os modelos, nas listagens grandes. Com um cursor de tuplas
+(sem DictCursor) e as posições das colunas calculadas uma vez por consulta a partir de
+cursor.description, cada linha vira um objeto com uma única chamada, sem dicionário intermediário
+nem busca de coluna por nome.
+
+Para exportações (NDJSON), iterar() lê por um cursor nomeado (do lado do servidor), em lotes:
+a memória do processo não cresce com o tamanho da tabela.
+"""
+import uuid
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Callable, Iterator
+
+import psycopg2.extensions
+
+# Cursor padrão do psycopg2 (linhas como tuplas); a conexão da aplicação usa DictCursor por padrão
+CursorTuplas = psycopg2.extensions.cursor
+
+# Linhas por FETCH do cursor nomeado
+LOTE_STREAM = 2000
+
+
+def extrator(cursor, colunas: tuple[str, ...]) -> Callable[[tuple], tuple]:
+    """Função linha -> valores de 'colunas', na ordem pedida (posições resolvidas uma vez)."""
+    posicoes = {descricao.name: i for i, descricao in enumerate(cursor.description)}
+    indices = [posicoes[coluna] for coluna in colunas]
+    if len(indices) == 1:
+        indice = indices[0]
+        return lambda linha: (linha[indice],)
+    return itemgetter(*indices)
+
+
+def mapear(cursor, linhas: list, construtor: Callable, colunas: tuple[str, ...]) -> list:
+    """construtor(*valores) para cada linha, com os valores na ordem de 'colunas'."""
+    pegar = extrator(cursor, colunas)
+    return [construtor(*pegar(linha)) for linha in linhas]
+
+
+class Campo:
+    """Campo de uma resposta parcial (?fields=): as colunas que ele usa e como montar o atributo."""
+    __slots__ = ("colunas", "montar")
+
+    def __init__(self, *colunas: str, montar: Callable | None = None):
+        self.colunas = colunas
+        self.montar = montar  # Sem ele, o atributo é o valor da (única) coluna
+
+
+def campos_simples(*nomes: str) -> dict[str, Campo]:
+    """Atributos que são a coluna de mesmo nome."""
+    return {nome: Campo(nome) for nome in nomes}
+
+
+def colunas_dos_campos(campos_modelo: dict[str, Campo], campos: tuple[str, ...]) -> list[str]:
+    colunas = []
+    for nome in campos:
+        colunas.extend(c for c in campos_modelo[nome].colunas if c not in colunas)
+    return colunas
+
+
+def mapear_parcial(cursor, linhas: list, classe: type, campos_modelo: dict[str, Campo],
+                   campos: tuple[str, ...]) -> list:
+    """
+    Objetos de 'classe' só com os atributos de 'campos' (criados sem __init__; os demais slots
+    ficam vazios). Servem apenas para serializar a resposta parcial.
+    """
+    posicoes = {descricao.name: i for i, descricao in enumerate(cursor.description)}
+    plano = [(nome, [posicoes[c] for c in campos_modelo[nome].colunas], campos_modelo[nome].montar)
+             for nome in campos]
+    objetos = []
+    for linha in linhas:
+        objeto = classe.__new__(classe)
+        for nome, indices, montar in plano:
+            setattr(objeto, nome, montar(*[linha[i] for i in indices]) if montar else linha[indices[0]])
+        objetos.append(objeto)
+    return objetos
+
+
+def como_dict(modelo) -> dict:
+    """Atributos de um modelo (com __slots__, sem __dict__) para respostas montadas à mão."""
+    return {nome: getattr(modelo, nome) for nome in modelo.__slots__}
+
+
+@contextmanager
+def cursor_nomeado(db_conn, cursor_factory=CursorTuplas, lote: int = LOTE_STREAM):
+    """
+    Cursor do lado do servidor (DECLARE/FETCH de 'lote' linhas). Só existe dentro de uma transação:
+    numa conexão em autocommit (GETs) abre uma, somente leitura, e a desfaz ao terminar.
+    """
+    autocommit = db_conn.autocommit
+    if autocommit:
+        db_conn.autocommit = False
+    cursor = db_conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=cursor_factory)
+    cursor.itersize = lote
+    try:
+        yield cursor
+    finally:
+        if not db_conn.closed:  # Cliente desconectado: a conexão pode já ter sido fechada
+            cursor.close()
+            if autocommit:
+                db_conn.rollback()
+                db_conn.autocommit = True
+
+
+def iterar(db_conn, sql: str, params: list | tuple, construtor: Callable, colunas: tuple[str, ...],
+           lote: int = LOTE_STREAM) -> Iterator:
+    """Como mapear(), mas gerando os objetos à medida que os lotes chegam do cursor nomeado."""
+    with cursor_nomeado(db_conn, lote=lote) as cursor:
+        cursor.execute(sql, params)
+        pegar = None
+        for linha in cursor:
+            if pegar is None:
+                pegar = extrator(cursor, colunas)  # description só existe depois do primeiro FETCH
+            yield construtor(*pegar(linha))
@@ -0,0 +1,86 @@
+"""
+Miniaturas de anexos de imagem, geradas sob demanda e guardadas em disco pela chave do
+conteúdo (SHA-256) e tamanho: o mesmo arquivo anexado em vários lugares gera uma só miniatura.
+O redimensionamento roda num pool de threads próprio, limitado, para não disputar o
+threadpool das rotas síncronas.
+"""
+import os
+import asyncio
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MINIATURAS_DIR = os.environ.get("ANEXO_MINIATURAS_DIR", os.path.join(BASE_DIR, "cache", "miniaturas"))
+MINIATURAS_THREADS = int(os.environ.get("ANEXO_MINIATURAS_THREADS", 2))
+
+# Tamanhos fixos (lado maior, em px): limita as variações guardadas por conteúdo
+TAMANHOS = (64, 128, 256, 512)
+TAMANHO_PADRAO = 128
+EXTENSOES_IMAGEM = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff")
+
+_executor = ThreadPoolExecutor(max_workers=MINIATURAS_THREADS, thread_name_prefix="miniaturas")
+
+
+class NaoEImagemError(ValueError):
+    pass
+
+
+def e_imagem(nome_arquivo: str | None) -> bool:
+    return bool(nome_arquivo) and nome_arquivo.lower().endswith(EXTENSOES_IMAGEM)
+
+
+def tamanho_permitido(tamanho: int) -> int:
+    """Arredonda para o menor tamanho fixo que atende ao pedido."""
+    return next((t for t in TAMANHOS if t >= tamanho), TAMANHOS[-1])
+
+
+def formato_para(accept: str | None) -> str:
+    return "webp" if accept and "image/webp" in accept else "jpeg"
+
+
+def caminho(chave: str, tamanho: int, formato: str) -> str:
+    return os.path.join(MINIATURAS_DIR, chave[:2], f"{chave}-{tamanho}.{formato}")
+
+
+def gerar(origem: str, destino: str, tamanho: int, formato: str) -> None:
+    try:
+        with Image.open(origem) as imagem:
+            # JPEG: decodifica já reduzido (escala 1/2, 1/4, 1/8), bem mais rápido em fotos grandes
+            imagem.draft("RGB", (tamanho, tamanho))
+            imagem = ImageOps.exif_transpose(imagem)
+            imagem.thumbnail((tamanho, tamanho))
+            modo = "RGBA" if formato == "webp" and imagem.mode in ("RGBA", "LA", "P") else "RGB"
+            imagem = imagem.convert(modo)
+
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            fd, caminho_tmp = tempfile.mkstemp(dir=os.path.dirname(destino), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                imagem.save(f, format=formato.upper(), quality=80)
+            os.replace(caminho_tmp, destino)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise NaoEImagemError(f"Não foi possível gerar a miniatura: {e}") from e
+
+
+async def executar(funcao, *args):
+    """Roda a geração no pool de miniaturas (fora do event loop)."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, funcao, *args)
+
+
+def remover(chave: str) -> None:
+    """Apaga as miniaturas de um conteúdo (chamado quando o blob deixa de existir)."""
+    diretorio = os.path.join(MINIATURAS_DIR, chave[:2])
+    try:
+        nomes = os.listdir(diretorio)
+    except FileNotFoundError:
+        return
+    for nome in nomes:
+        if nome.startswith(f"{chave}-"):
+            try:
+                os.remove(os.path.join(diretorio, nome))
+            except FileNotFoundError:
+                pass
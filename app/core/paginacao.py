@@ -0,0 +1,174 @@
+"""
+Paginação por cursor (keyset): em vez de OFFSET, cada página começa logo depois (ou antes) da
+tupla de ordenação da última linha vista, sempre terminada por uma chave única (em geral o ID).
+A página 1000 custa o mesmo que a primeira e nenhuma página precisa contar o resultado inteiro;
+o total, quando pedido, é a estimativa do planejador (EXPLAIN), não um COUNT(*).
+
+O cursor é opaco para o cliente (JSON em base64url) e leva uma assinatura da ordenação e dos
+filtros: um cursor gerado para outra ordenação é recusado em vez de devolver uma página errada.
+"""
+import json
+import base64
+import hashlib
+from datetime import date
+from decimal import Decimal
+
+from starlette.requests import Request
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+
+class CursorInvalidoError(ValueError):
+    pass
+
+
+class Pagina:
+    def __init__(self, itens: list, proximo: str | None = None, anterior: str | None = None,
+                 total_estimado: int | None = None):
+        self.itens = itens
+        self.proximo = proximo
+        self.anterior = anterior
+        self.total_estimado = total_estimado
+        # Cursor da última linha mesmo sem próxima página: retomar depois (sincronização incremental)
+        self.ultimo: str | None = None
+
+
+def _ordem(chaves: list[str]) -> list[tuple[str, bool]]:
+    """'-coluna' = descendente."""
+    return [(chave.lstrip("-"), chave.startswith("-")) for chave in chaves]
+
+
+def _assinatura(chaves: list[str], contexto) -> str:
+    texto = json.dumps([chaves, contexto], default=str, sort_keys=True)
+    return hashlib.sha1(texto.encode()).hexdigest()[:10]
+
+
+def _valor_json(valor):
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def codificar(valores: list, assinatura: str) -> str:
+    dados = json.dumps({"a": assinatura, "v": [_valor_json(v) for v in valores]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decodificar(token: str, assinatura: str, quantidade: int) -> list:
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        valores = dados["v"]
+        valido = (dados["a"] == assinatura and isinstance(valores, list) and len(valores) == quantidade
+                  and all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in valores))
+    except (ValueError, TypeError, KeyError):
+        valido = False
+    if not valido:
+        raise CursorInvalidoError("Cursor de paginação inválido (ou de outra ordenação/filtro).")
+    return valores
+
+
+def _condicao(ordem: list[tuple[str, bool]], valores: list, para_tras: bool) -> tuple[str, list]:
+    """Linhas estritamente depois (ou antes, para_tras) da tupla 'valores' na ordem dada."""
+    if len({descendente for _, descendente in ordem}) == 1:
+        operador = "<" if ordem[0][1] != para_tras else ">"
+        colunas = ", ".join(coluna for coluna, _ in ordem)
+        marcadores = ", ".join(["%s"] * len(ordem))
+        return f"({colunas}) {operador} ({marcadores})", list(valores)
+
+    # Direções mistas (ex.: data DESC, número ASC) não cabem numa comparação de tuplas:
+    # (a < x) OR (a = x AND b > y) OR ...
+    termos, params = [], []
+    for i, (coluna, descendente) in enumerate(ordem):
+        iguais = [f"{c} = %s" for c, _ in ordem[:i]]
+        operador = "<" if descendente != para_tras else ">"
+        termos.append("(" + " AND ".join(iguais + [f"{coluna} {operador} %s"]) + ")")
+        params.extend(valores[:i + 1])
+    return "(" + " OR ".join(termos) + ")", params
+
+
+def estimar_total(cursor, sql: str, params: list | tuple = ()) -> int:
+    """Linhas estimadas pelo planejador para a consulta (sem executá-la)."""
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", list(params))
+    plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]["Plan"]["Plan Rows"])
+
+
+def consultar(cursor, sql: str, params: list | tuple, chaves: list[str], limite: int = LIMITE_PADRAO,
+              after: str | None = None, before: str | None = None, contexto=None,
+              com_total: bool = False, colunas: list[str] | None = None) -> Pagina:
+    """
+    Uma página de 'sql' (um SELECT sem ORDER BY/LIMIT) ordenada por 'chaves', colunas do
+    resultado cuja combinação é única. 'contexto' entra na assinatura do cursor (filtros,
+    termo buscado...). As linhas vêm como o cursor as devolve (DictRow ou tuplas), com todas as
+    colunas de 'sql' ou só 'colunas' (mais as de ordenação, que o cursor de paginação usa).
+    """
+    if after and before:
+        raise CursorInvalidoError("Informe 'after' ou 'before', não os dois.")
+    ordem = _ordem(chaves)
+    assinatura = _assinatura(chaves, contexto)
+    para_tras = bool(before)
+    token = after or before
+
+    where, params_cursor = "", []
+    if token:
+        condicao, params_cursor = _condicao(ordem, decodificar(token, assinatura, len(ordem)), para_tras)
+        where = f"WHERE {condicao}"
+    order_by = ", ".join(f"{coluna} {'DESC' if descendente != para_tras else 'ASC'}" for coluna, descendente in ordem)
+
+    selecao = "*"
+    if colunas:
+        selecao = ", ".join([*colunas, *(c for c, _ in ordem if c not in colunas)])
+
+    cursor.execute(
+        f"SELECT {selecao} FROM ({sql}) AS pagina {where} ORDER BY {order_by} LIMIT %s",
+        [*params, *params_cursor, limite + 1],
+    )
+    linhas = cursor.fetchall()
+    ha_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+    if para_tras:
+        linhas.reverse()
+
+    # Por posição: vale para DictRow e para cursores de tuplas (app/core/mapeamento.py)
+    posicoes = {descricao.name: i for i, descricao in enumerate(cursor.description)}
+
+    def token_da(linha) -> str:
+        return codificar([linha[posicoes[coluna]] for coluna, _ in ordem], assinatura)
+
+    pagina = Pagina(linhas)
+    if linhas:
+        pagina.ultimo = token_da(linhas[-1])
+        if para_tras:
+            pagina.proximo = token_da(linhas[-1])
+            pagina.anterior = token_da(linhas[0]) if ha_mais else None
+        else:
+            pagina.proximo = token_da(linhas[-1]) if ha_mais else None
+            pagina.anterior = token_da(linhas[0]) if after else None
+
+    if com_total:
+        if not token and not ha_mais:
+            pagina.total_estimado = len(linhas)  # Cabe numa página: o total é exato
+        else:
+            pagina.total_estimado = estimar_total(cursor, sql, params)
+    return pagina
+
+
+def cabecalhos(request: Request, pagina: Pagina) -> dict:
+    """Link (RFC 8288) para a próxima/anterior e o total estimado, para listas devolvidas como array JSON."""
+    url = request.url.remove_query_params(["after", "before"])
+    links = []
+    if pagina.proximo:
+        links.append(f'<{url.include_query_params(after=pagina.proximo)}>; rel="next"')
+    if pagina.anterior:
+        links.append(f'<{url.include_query_params(before=pagina.anterior)}>; rel="prev"')
+    headers = {}
+    if links:
+        headers["link"] = ", ".join(links)
+    if pagina.total_estimado is not None:
+        headers["x-total-estimado"] = str(pagina.total_estimado)
+    return headers
@@ -0,0 +1,209 @@
+import os
+import signal
+import asyncio
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+
+# Assets usados pelo cabeçalho dos documentos (relatorios_base.html)
+ASSETS_PRECARREGADOS = ("images/logo.png", "images/brasao.png")
+
+PDF_MAX_WORKERS = int(os.environ.get("PDF_MAX_WORKERS", 2))
+PDF_MAX_CONCORRENTES = int(os.environ.get("PDF_MAX_CONCORRENTES", PDF_MAX_WORKERS))
+PDF_TIMEOUT_SEGUNDOS = float(os.environ.get("PDF_TIMEOUT_SEGUNDOS", 30))
+# Tolerância além do prazo para o worker interromper a renderização sozinho, antes de ser encerrado
+PDF_MARGEM_ENCERRAMENTO = float(os.environ.get("PDF_MARGEM_ENCERRAMENTO", 5))
+
+# Os templates referenciam os assets por caminho absoluto (/static/...).
+# Esta base só serve para resolvê-los; nada é buscado na rede.
+PDF_BASE_URL = "http://gestaopro.local/"
+
+
+class PdfIndisponivelError(RuntimeError):
+    pass
+
+
+class PdfTimeoutError(TimeoutError):
+    pass
+
+
+class _TempoEsgotado(BaseException):
+    """Levantada pelo alarme; BaseException para não ser engolida por um 'except Exception' do WeasyPrint."""
+
+
+def _estourou(signum, frame):
+    raise _TempoEsgotado()
+
+
+@contextmanager
+def limite_de_tempo(segundos: float | None):
+    """
+    Interrompe o bloco com PdfTimeoutError após 'segundos' (SIGALRM). Só vale na thread principal
+    de um processo, que é onde rodam os workers do pool e o worker de jobs; fora dela, não limita.
+    """
+    if not segundos or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    anterior = signal.signal(signal.SIGALRM, _estourou)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    except _TempoEsgotado:
+        raise PdfTimeoutError(f"A geração do PDF excedeu {segundos:.0f} segundos.") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+# --- Estado de cada processo worker (preenchido pelo initializer) ---
+_assets: dict[str, bytes] = {}
+_font_config = None
+_html_class = None
+
+
+def _inicializar_worker():
+    """Roda uma vez por processo: importa o WeasyPrint, carrega fontes e imagens."""
+    global _font_config, _html_class
+    try:
+        from weasyprint import HTML
+        from weasyprint.text.fonts import FontConfiguration
+    except (ImportError, OSError) as e:
+        logger.error(f"WeasyPrint indisponível no worker de PDF: {e}")
+        return
+
+    for caminho_relativo in ASSETS_PRECARREGADOS:
+        caminho = os.path.join(STATIC_DIR, caminho_relativo)
+        try:
+            with open(caminho, "rb") as f:
+                _assets[f"/static/{caminho_relativo}"] = f.read()
+        except OSError as e:
+            logger.warning(f"Asset '{caminho}' não pôde ser pré-carregado: {e}")
+
+    _font_config = FontConfiguration()
+    _html_class = HTML
+
+    # Aquece o cache do fontconfig para que o primeiro documento real não pague o custo
+    HTML(string="<p>.</p>").write_pdf(font_config=_font_config)
+
+
+def _url_fetcher(url: str) -> dict:
+    caminho = urlparse(url).path
+
+    if caminho in _assets:
+        return {"string": _assets[caminho], "mime_type": "image/png"}
+
+    if caminho.startswith("/static/"):
+        arquivo = os.path.normpath(os.path.join(STATIC_DIR, caminho[len("/static/"):]))
+        if arquivo.startswith(STATIC_DIR + os.sep) and os.path.isfile(arquivo):
+            with open(arquivo, "rb") as f:
+                return {"string": f.read()}
+
+    # Fontes remotas (@import do Google Fonts) e qualquer outra URL externa são ignoradas:
+    # o WeasyPrint registra o aviso e usa as fontes locais do fallback.
+    raise ValueError(f"Recurso externo bloqueado na renderização de PDF: {url}")
+
+
+def _renderizar(html: str, timeout: float | None = None) -> bytes:
+    if _html_class is None:
+        raise PdfIndisponivelError("WeasyPrint não está disponível neste servidor.")
+    with limite_de_tempo(timeout):
+        documento = _html_class(string=html, base_url=PDF_BASE_URL, url_fetcher=_url_fetcher)
+        return documento.write_pdf(font_config=_font_config)
+
+
+_executor: ProcessPoolExecutor | None = None
+_semaforo: asyncio.Semaphore | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 'spawn' evita herdar conexões de banco e threads do processo web
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_worker
+        )
+        logger.info(f"Pool de renderização de PDF iniciado com {PDF_MAX_WORKERS} worker(s).")
+    return _executor
+
+
+def _descartar_pool(executor: ProcessPoolExecutor) -> None:
+    """Encerra os processos do pool (inclusive o que está preso) e deixa o próximo render criar outro."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    # O executor não expõe como matar um worker ocupado: shutdown() só impede novas tarefas
+    for processo in list((executor._processes or {}).values()):
+        processo.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def render_pdf(html: str) -> bytes:
+    """
+    Renderiza o HTML em PDF fora da thread da requisição.
+    Limita renderizações simultâneas e interrompe a renderização após PDF_TIMEOUT_SEGUNDOS: o
+    próprio worker desiste (alarme) e, se não responder, o pool é encerrado e recriado. A vaga
+    do semáforo só é devolvida quando o worker está de fato livre.
+    """
+    global _semaforo
+    if _semaforo is None:
+        _semaforo = asyncio.Semaphore(PDF_MAX_CONCORRENTES)
+
+    async with _semaforo:
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        futuro = loop.run_in_executor(executor, _renderizar, html, PDF_TIMEOUT_SEGUNDOS)
+        try:
+            # shield: o prazo daqui não cancela o futuro (não pararia o worker, só a espera)
+            return await asyncio.wait_for(asyncio.shield(futuro), timeout=PDF_TIMEOUT_SEGUNDOS + PDF_MARGEM_ENCERRAMENTO)
+        except PdfTimeoutError:
+            logger.error(f"Renderização de PDF excedeu {PDF_TIMEOUT_SEGUNDOS}s e foi interrompida.")
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"Worker de PDF não interrompeu a renderização após {PDF_TIMEOUT_SEGUNDOS}s; pool reiniciado.")
+            futuro.add_done_callback(lambda f: f.cancelled() or f.exception())
+            _descartar_pool(executor)
+            raise PdfTimeoutError(f"A geração do PDF excedeu {PDF_TIMEOUT_SEGUNDOS:.0f} segundos.")
+        except BrokenProcessPool:
+            logger.error("Pool de renderização de PDF perdeu um worker; será recriado.")
+            _descartar_pool(executor)
+            raise PdfIndisponivelError("A geração do PDF foi interrompida; tente novamente.")
+
+
+def render_pdf_sync(html: str, timeout: float | None = None) -> bytes:
+    """
+    Para processos que rodam fora do servidor web (worker de jobs): renderiza no pool, sem event
+    loop, com o mesmo limite de render_pdf(). Um render preso além de 'timeout' (mais a margem)
+    tem o processo encerrado, em vez de prender o worker de jobs.
+    """
+    timeout = timeout or PDF_TIMEOUT_SEGUNDOS
+    executor = _get_executor()
+    futuro = executor.submit(_renderizar, html, timeout)
+    try:
+        return futuro.result(timeout=timeout + PDF_MARGEM_ENCERRAMENTO)
+    except FuturoTimeoutError:
+        logger.error(f"Worker de PDF não interrompeu a renderização após {timeout}s; pool reiniciado.")
+        _descartar_pool(executor)
+        raise PdfTimeoutError(f"A geração do PDF excedeu {timeout:.0f} segundos.")
+    except BrokenProcessPool:
+        logger.error("Pool de renderização de PDF perdeu um worker; será recriado.")
+        _descartar_pool(executor)
+        raise PdfIndisponivelError("A geração do PDF foi interrompida; tente novamente.")
+
+
+def encerrar_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Pool de renderização de PDF encerrado.")
@@ -0,0 +1,184 @@
+"""
+Resposta JSON rápida para as listagens grandes. Em vez de validar cada objeto contra o
+response_model e passar o resultado pelo jsonable_encoder, os modelos (vindos direto do SQL)
+viram dicionários com os campos do schema de resposta e são serializados de uma vez, com
+Decimal como string e date em ISO 8601, como o Pydantic já devolvia.
+
+Usa orjson (requirements.txt); o json da biblioteca padrão fica só como reserva, para um
+ambiente sem a dependência instalada. A validação pelo schema continua disponível (API_VALIDAR_LISTAGENS=true, ou validar=True na chamada) para comparar
+a vazão dos dois caminhos ou investigar um dado suspeito.
+
+As mesmas listagens saem como NDJSON (um objeto JSON por linha) com Accept: application/x-ndjson
+ou ?stream=1: os objetos são gerados de um iterador (cursor nomeado) e enviados em blocos, sem
+montar a lista inteira.
+
+?fields=id,numero_contrato restringe a resposta aos campos pedidos (campos()); os repositórios
+usam a mesma tupla para ler só as colunas necessárias.
+"""
+import os
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Union, get_args, get_origin
+from types import UnionType
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+API_VALIDAR_LISTAGENS = os.environ.get("API_VALIDAR_LISTAGENS", "false").lower() == "true"
+
+MEDIA_NDJSON = "application/x-ndjson"
+# Bytes acumulados antes de cada envio (menos escritas no socket, sem atrasar o primeiro byte)
+NDJSON_BLOCO_BYTES = 64 * 1024
+
+
+class CampoInvalidoError(ValueError):
+    pass
+
+
+def campos(fields: str | None, schema: type[BaseModel]) -> tuple[str, ...] | None:
+    """'id,numero_contrato' -> ('id', 'numero_contrato'), na ordem do schema; None = todos."""
+    if not fields:
+        return None
+    pedidos = {nome.strip() for nome in fields.split(",") if nome.strip()}
+    invalidos = pedidos - schema.model_fields.keys()
+    if invalidos:
+        raise CampoInvalidoError(f"Campo(s) inválido(s) em 'fields': {', '.join(sorted(invalidos))}. "
+                                 f"Disponíveis: {', '.join(schema.model_fields)}.")
+    return tuple(nome for nome in schema.model_fields if nome in pedidos) or None
+
+
+def _padrao(valor: Any) -> Any:
+    """Tipos que o codificador não conhece: Decimal, datas (só no json padrão) e modelos com __slots__."""
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    slots = getattr(type(valor), "__slots__", None)
+    if slots is not None:
+        nomes = (slots,) if isinstance(slots, str) else slots
+        return {nome: getattr(valor, nome) for nome in nomes}
+    raise TypeError(f"Objeto do tipo {type(valor).__name__} não é serializável em JSON")
+
+
+def dumps(conteudo: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao)
+    return json.dumps(conteudo, default=_padrao, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class RespostaJSON(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _schema_aninhado(anotacao) -> type[BaseModel] | None:
+    """O schema de um campo 'X' ou 'X | None', quando X é um BaseModel."""
+    if isinstance(anotacao, type) and issubclass(anotacao, BaseModel):
+        return anotacao
+    if get_origin(anotacao) in (Union, UnionType):
+        for arg in get_args(anotacao):
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                return arg
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plano(schema: type[BaseModel]) -> tuple:
+    """(campo, plano do schema aninhado ou None) para cada campo de 'schema', calculado uma vez."""
+    plano = []
+    for nome, campo in schema.model_fields.items():
+        aninhado = _schema_aninhado(campo.annotation)
+        plano.append((nome, _plano(aninhado) if aninhado else None))
+    return tuple(plano)
+
+
+@lru_cache(maxsize=256)
+def _plano_parcial(schema: type[BaseModel], campos: tuple[str, ...] | None) -> tuple:
+    if campos is None:
+        return _plano(schema)
+    return tuple((nome, subplano) for nome, subplano in _plano(schema) if nome in campos)
+
+
+def _extrair(objeto: Any, plano: tuple) -> dict:
+    dados = {}
+    for nome, subplano in plano:
+        valor = getattr(objeto, nome)
+        if subplano is not None and valor is not None:
+            valor = _extrair(valor, subplano)
+        dados[nome] = valor
+    return dados
+
+
+@lru_cache(maxsize=None)
+def _adaptador(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def listagem(itens: list, schema: type[BaseModel], headers: dict | None = None,
+             validar: bool | None = None, campos: tuple[str, ...] | None = None) -> Response:
+    """
+    Resposta de uma listagem com os campos de 'schema' (ou só 'campos'). Sem validação (padrão),
+    os objetos são lidos por atributo e confiados como vieram do banco; com validação, passam
+    pelo Pydantic. Uma resposta parcial não é validada: os objetos não têm os demais campos.
+    """
+    if validar is None:
+        validar = API_VALIDAR_LISTAGENS
+    if validar and campos is None:
+        adaptador = _adaptador(schema)
+        corpo = adaptador.dump_json(adaptador.validate_python(itens, from_attributes=True))
+        return Response(corpo, media_type="application/json", headers=headers)
+    plano = _plano_parcial(schema, campos)
+    return RespostaJSON([_extrair(item, plano) for item in itens], headers=headers)
+
+
+def alteracoes(alteracoes, schema: type[BaseModel], validar: bool | None = None) -> RespostaJSON:
+    """Resposta da sincronização incremental (app/core/sincronizacao.py), com os alterados no formato de 'schema'."""
+    if validar is None:
+        validar = API_VALIDAR_LISTAGENS
+    if validar:
+        adaptador = _adaptador(schema)
+        alterados = adaptador.dump_python(adaptador.validate_python(alteracoes.alterados, from_attributes=True), mode="json")
+    else:
+        plano = _plano(schema)
+        alterados = [_extrair(item, plano) for item in alteracoes.alterados]
+    return RespostaJSON({"alterados": alterados, "removidos": alteracoes.removidos,
+                         "cursor": alteracoes.cursor, "tem_mais": alteracoes.tem_mais})
+
+
+def quer_ndjson(request: Request, stream: bool = False) -> bool:
+    return stream or MEDIA_NDJSON in request.headers.get("accept", "")
+
+
+def _linhas_ndjson(objetos: Iterable, schema: type[BaseModel], validar: bool,
+                   campos: tuple[str, ...] | None = None) -> Iterator[bytes]:
+    plano = _plano_parcial(schema, campos)
+    validar = validar and campos is None
+    bloco = bytearray()
+    for objeto in objetos:
+        if validar:
+            bloco += schema.model_validate(objeto, from_attributes=True).model_dump_json().encode("utf-8")
+        else:
+            bloco += dumps(_extrair(objeto, plano))
+        bloco += b"\n"
+        if len(bloco) >= NDJSON_BLOCO_BYTES:
+            yield bytes(bloco)
+            bloco.clear()
+    if bloco:
+        yield bytes(bloco)
+
+
+def ndjson(objetos: Iterable, schema: type[BaseModel], validar: bool | None = None,
+           campos: tuple[str, ...] | None = None) -> StreamingResponse:
+    """Uma linha JSON por objeto, com os campos de 'schema' (ou só 'campos'), consumindo 'objetos' sob demanda."""
+    if validar is None:
+        validar = API_VALIDAR_LISTAGENS
+    return StreamingResponse(_linhas_ndjson(objetos, schema, validar, campos), media_type=MEDIA_NDJSON)
@@ -0,0 +1,74 @@
+"""
+Sincronização incremental ("o que mudou desde..."): em vez de baixar a coleção inteira, o cliente
+pede as linhas alteradas (updated_at, mantido por trigger) e as excluídas (registros_excluidos)
+depois de um momento ('since') ou de onde parou ('cursor'), na ordem (alterado_em, id).
+
+O cursor devolvido aponta para a última alteração entregue e deve ser guardado pelo cliente para
+a próxima sincronização, mesmo quando não há mais páginas.
+
+updated_at é o momento da escrita, mas a linha só fica visível no commit: uma transação ainda
+aberta pode confirmar depois linhas mais antigas que o cursor já entregue, que seriam puladas.
+Por isso a consulta só vai até o início da transação de escrita mais antiga ainda aberta
+(pg_stat_activity, lido antes do snapshot da consulta) e, no máximo, até SYNC_ATRASO_SEGUNDOS
+atrás, margem para uma escrita que ainda não recebeu xid. O papel da aplicação precisa enxergar
+as sessões das demais conexões (o mesmo usuário ou pg_read_all_stats).
+"""
+import os
+from datetime import datetime
+from typing import Callable
+
+from app.core import paginacao
+
+SYNC_ATRASO_SEGUNDOS = float(os.environ.get("SYNC_ATRASO_SEGUNDOS", 5))
+
+CHAVES = ["alterado_em", "id"]
+
+SQL_LIMITE_VISIVEL = """
+    SELECT LEAST(
+        statement_timestamp() - make_interval(secs => %s),
+        (SELECT min(xact_start) FROM pg_stat_activity
+         WHERE backend_xid IS NOT NULL AND datname = current_database() AND pid <> pg_backend_pid())
+    )
+"""
+
+
+class Alteracoes:
+    def __init__(self, alterados: list, removidos: list[int], cursor: str | None, tem_mais: bool):
+        self.alterados = alterados
+        self.removidos = removidos
+        self.cursor = cursor
+        self.tem_mais = tem_mais
+
+
+def consultar(db_conn, tabela: str, buscar_por_ids: Callable[[list[int]], list], since: datetime | None = None,
+              cursor: str | None = None, limite: int = paginacao.LIMITE_PADRAO) -> Alteracoes:
+    """
+    Alterações de 'tabela' (uma das tabelas com updated_at e trigger de exclusão). As chaves vêm de
+    uma consulta pelos índices (updated_at, id) e (tabela, excluido_em); as linhas alteradas, de
+    'buscar_por_ids' do repositório.
+    """
+    sql = f"""
+        SELECT updated_at AS alterado_em, id, FALSE AS removido
+        FROM {tabela}
+        WHERE updated_at > %s AND updated_at < %s
+        UNION ALL
+        SELECT excluido_em, id_registro, TRUE
+        FROM registros_excluidos
+        WHERE tabela = %s AND excluido_em > %s AND excluido_em < %s
+    """
+    desde = since or "-infinity"
+    with db_conn.cursor() as cur:
+        # Em instrução separada e anterior: uma transação que confirmar entre as duas já é visível.
+        # pg_stat_activity é lido uma vez por transação; sem autocommit, a leitura seria a anterior.
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute(SQL_LIMITE_VISIVEL, (SYNC_ATRASO_SEGUNDOS,))
+        ate = cur.fetchone()[0]
+        params = [desde, ate, tabela, desde, ate]
+        pagina = paginacao.consultar(cur, sql, params, CHAVES, limite, after=cursor, contexto=tabela)
+
+    ids_alterados = [linha[1] for linha in pagina.itens if not linha[2]]
+    por_id = {modelo.id: modelo for modelo in buscar_por_ids(ids_alterados)} if ids_alterados else {}
+    # Excluída entre as duas consultas: some daqui e aparece como removida na próxima sincronização
+    alterados = [por_id[id] for id in ids_alterados if id in por_id]
+    removidos = [linha[1] for linha in pagina.itens if linha[2]]
+    return Alteracoes(alterados, removidos, pagina.ultimo or cursor, pagina.proximo is not None)
@@ -0,0 +1,109 @@
+"""
+Unidade de trabalho: várias operações de repositório numa só transação, com um único commit.
+
+Os repositórios fazem commit()/rollback() por conta própria. Dentro de 'with uow(db_conn):'
+esses commits viram no-op (a transação só é confirmada na saída do bloco externo) e o
+rollback() de um repositório desfaz apenas até o savepoint mais interno. Blocos uow()
+aninhados abrem savepoints: uma falha dentro deles desfaz só o próprio bloco, e quem
+captura a exceção pode continuar a transação externa. Se um erro de banco foi engolido no
+nível externo (repositório que devolve um valor padrão), a transação está abortada: o uow()
+desfaz tudo e lança TransacaoAbortadaError em vez de um COMMIT que o PostgreSQL trocaria por
+ROLLBACK sem erro.
+
+    with uow(db_conn):
+        aocs = AocsRepository(db_conn).create(aocs_req)
+        for pedido_req in pedidos:
+            PedidoRepository(db_conn).create(aocs.id, pedido_req)
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg2.extensions
+
+
+class TransacaoAbortadaError(psycopg2.DatabaseError):
+    """A transação do uow() falhou no meio (erro engolido por um repositório) e foi desfeita."""
+    pass
+
+
+class ConexaoTransacional(psycopg2.extensions.connection):
+    """Conexão usada pela aplicação (connection_factory de _get_db_connection)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.nivel_uow = 0
+        self.savepoints: list[str] = []
+
+    def commit(self):
+        if self.nivel_uow:
+            return  # Confirmado uma vez só, na saída do uow() externo
+        super().commit()
+
+    def rollback(self):
+        if not self.nivel_uow:
+            return super().rollback()
+        if self.savepoints:
+            with self.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {self.savepoints[-1]}")
+        # Sem savepoint, a exceção que acompanha o rollback chega ao uow() externo, que desfaz tudo
+
+    def _commit_real(self):
+        super().commit()
+
+    def _rollback_real(self):
+        super().rollback()
+
+
+@contextmanager
+def uow(db_conn) -> Iterator[None]:
+    if not isinstance(db_conn, ConexaoTransacional):
+        # Conexão comum (scripts, testes com mock): cada repositório continua fazendo seu commit
+        try:
+            yield
+            db_conn.commit()
+        except BaseException:
+            db_conn.rollback()
+            raise
+        return
+
+    if db_conn.nivel_uow == 0:
+        autocommit = db_conn.autocommit
+        if autocommit:
+            db_conn.autocommit = False
+        db_conn.nivel_uow = 1
+        try:
+            yield
+        except BaseException:
+            db_conn.nivel_uow = 0
+            db_conn._rollback_real()
+            raise
+        else:
+            db_conn.nivel_uow = 0
+            if db_conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                db_conn._rollback_real()
+                raise TransacaoAbortadaError("A transação foi abortada por um erro anterior e nada foi gravado.")
+            db_conn._commit_real()
+        finally:
+            db_conn.nivel_uow = 0
+            if autocommit:
+                db_conn.autocommit = True
+        return
+
+    nome = f"uow_{len(db_conn.savepoints) + 1}"
+    with db_conn.cursor() as cursor:
+        cursor.execute(f"SAVEPOINT {nome}")
+    db_conn.savepoints.append(nome)
+    db_conn.nivel_uow += 1
+    try:
+        yield
+    except BaseException:
+        with db_conn.cursor() as cursor:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {nome}")
+            cursor.execute(f"RELEASE SAVEPOINT {nome}")
+        raise
+    else:
+        with db_conn.cursor() as cursor:
+            cursor.execute(f"RELEASE SAVEPOINT {nome}")
+    finally:
+        db_conn.savepoints.pop()
+        db_conn.nivel_uow -= 1
@@ -0,0 +1,16 @@
+import logging
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+
+def valor_por_extenso(valor: Decimal) -> str:
+    """Valor em reais por extenso, como impresso nas CIs de pagamento."""
+    try:
+        from num2words import num2words
+        return num2words(valor, lang='pt_BR', to='currency')
+    except ImportError:
+        return f"{valor} reais"
+    except Exception as e:
+        logger.warning(f"Erro ao gerar valor por extenso: {e}")
+        return "---"
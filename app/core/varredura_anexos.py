@@ -0,0 +1,219 @@
+"""
+Reconciliação entre o armazenamento dos anexos e a tabela 'anexos', nas duas direções:
+
+- arquivos órfãos: arquivos em static/uploads que nenhum anexo antigo (em_blob = false) referencia;
+- registros sem arquivo: anexos cujo arquivo (upload antigo ou blob) não existe mais.
+
+A varredura é incremental: os arquivos são percorridos em ordem, diretório a diretório, e os
+registros por ID (keyset), em lotes. O cursor devolvido permite continuar de onde parou sem
+carregar o índice inteiro. Por padrão só relata; com corrigir=True remove os arquivos órfãos
+(mais antigos que ANEXO_VARREDURA_IDADE_MINIMA) e os registros sem arquivo.
+"""
+import os
+import csv
+import io
+import time
+import logging
+from typing import Callable, Iterator
+
+from psycopg2.extensions import connection
+
+from app.core import anexo_storage, jobs
+from app.repositories.anexo_repository import AnexoRepository
+
+logger = logging.getLogger(__name__)
+
+TIPO_JOB = "varredura_anexos"
+LOTE_VARREDURA = int(os.environ.get("ANEXO_VARREDURA_LOTE", 500))
+# Arquivo mais novo que isso pode ser de uma operação ainda em andamento: só é relatado
+IDADE_MINIMA_ORFAOS = int(os.environ.get("ANEXO_VARREDURA_IDADE_MINIMA", 3600))
+
+FASE_ARQUIVOS = "arquivos"
+FASE_REGISTROS = "registros"
+
+
+class Ocorrencia:
+    def __init__(self, tipo: str, referencia: str, detalhe: str, acao: str):
+        self.tipo = tipo
+        self.referencia = referencia
+        self.detalhe = detalhe
+        self.acao = acao
+
+
+def percorrer_uploads(raiz: str, apos: str | None = None) -> Iterator[str]:
+    """Caminhos relativos (com '/') dos arquivos de raiz, em ordem, a partir do primeiro depois de 'apos'."""
+    yield from _percorrer(raiz, (), tuple(apos.split("/")) if apos else ())
+
+
+def _percorrer(diretorio: str, prefixo: tuple, cursor: tuple) -> Iterator[str]:
+    try:
+        # Só um diretório por vez em memória
+        entradas = sorted(os.scandir(diretorio), key=lambda e: e.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for entrada in entradas:
+        partes = prefixo + (entrada.name,)
+        if cursor and partes < cursor[:len(partes)]:
+            continue  # Já visto (arquivo ou subárvore inteira)
+        if entrada.is_dir(follow_symlinks=False):
+            yield from _percorrer(entrada.path, partes, cursor if partes == cursor[:len(partes)] else ())
+        elif entrada.is_file(follow_symlinks=False) and partes > cursor:
+            yield "/".join(partes)
+
+
+def _varrer_arquivos(repo: AnexoRepository, upload_dir: str, apos: str | None, limite: int | None,
+                     corrigir: bool, resultado: dict, ocorrencias: list[Ocorrencia],
+                     a_cada_lote: Callable[[], None]) -> str | None:
+    """Retorna o último caminho verificado quando para pelo limite; None quando chegou ao fim."""
+    lote: list[str] = []
+    verificados = 0
+    for nome in percorrer_uploads(upload_dir, apos):
+        lote.append(nome)
+        verificados += 1
+        if len(lote) >= LOTE_VARREDURA:
+            _conferir_arquivos(repo, upload_dir, lote, corrigir, resultado, ocorrencias)
+            lote = []
+            a_cada_lote()
+        if limite is not None and verificados >= limite:
+            _conferir_arquivos(repo, upload_dir, lote, corrigir, resultado, ocorrencias)
+            return nome
+    _conferir_arquivos(repo, upload_dir, lote, corrigir, resultado, ocorrencias)
+    return None
+
+
+def _conferir_arquivos(repo: AnexoRepository, upload_dir: str, nomes: list[str], corrigir: bool,
+                       resultado: dict, ocorrencias: list[Ocorrencia]) -> None:
+    if not nomes:
+        return
+    resultado["arquivos_verificados"] += len(nomes)
+    registrados = repo.get_nomes_seguros_legados(nomes)
+    limite_idade = time.time() - IDADE_MINIMA_ORFAOS
+
+    for nome in nomes:
+        if nome in registrados:
+            continue
+        caminho = os.path.join(upload_dir, *nome.split("/"))
+        try:
+            recente = os.path.getmtime(caminho) > limite_idade
+        except FileNotFoundError:
+            continue  # Removido entre a listagem e a conferência
+        resultado["arquivos_orfaos"] += 1
+        acao = "relatado"
+        if corrigir and recente:
+            acao = "mantido (recente)"
+        elif corrigir:
+            anexo_storage.remover_arquivo(caminho)
+            resultado["corrigidos"] += 1
+            acao = "removido"
+        logger.warning(f"Varredura de anexos: arquivo órfão '{nome}' ({acao}).")
+        ocorrencias.append(Ocorrencia("arquivo_orfao", nome, "Sem registro em anexos", acao))
+
+
+def _varrer_registros(repo: AnexoRepository, upload_dir: str, apos_id: int, limite: int | None,
+                      corrigir: bool, resultado: dict, ocorrencias: list[Ocorrencia],
+                      a_cada_lote: Callable[[], None]) -> int | None:
+    """Retorna o último ID verificado quando para pelo limite; None quando chegou ao fim."""
+    verificados = 0
+    while True:
+        tamanho_pagina = LOTE_VARREDURA if limite is None else min(LOTE_VARREDURA, limite - verificados)
+        pagina = repo.get_pagina_por_id(apos_id, tamanho_pagina)
+        if not pagina:
+            return None
+
+        blobs_existentes: dict[str, bool] = {}
+        for anexo in pagina:
+            apos_id = anexo.id
+            verificados += 1
+            resultado["registros_verificados"] += 1
+            if anexo.em_blob:
+                if anexo.hash_sha256 not in blobs_existentes:
+                    blobs_existentes[anexo.hash_sha256] = anexo_storage.armazenamento().existe(
+                        anexo_storage.chave_blob(anexo.hash_sha256)
+                    )
+                existe, referencia = blobs_existentes[anexo.hash_sha256], f"blob {anexo.hash_sha256}"
+            else:
+                referencia = anexo.nome_seguro
+                existe = os.path.isfile(os.path.join(upload_dir, anexo.nome_seguro))
+            if existe:
+                continue
+
+            resultado["registros_sem_arquivo"] += 1
+            acao = "relatado"
+            if corrigir:
+                repo.delete(anexo.id)
+                resultado["corrigidos"] += 1
+                acao = "registro removido"
+            logger.warning(f"Varredura de anexos: anexo ID {anexo.id} sem arquivo ({referencia}, {acao}).")
+            ocorrencias.append(Ocorrencia("registro_sem_arquivo", f"anexo {anexo.id}", referencia, acao))
+
+        if limite is not None and verificados >= limite:
+            return apos_id
+        a_cada_lote()
+
+
+def varrer(db_conn: connection, corrigir: bool = False, cursor: dict | None = None, limite: int | None = None,
+           upload_dir: str | None = None, ocorrencias: list[Ocorrencia] | None = None,
+           ao_mudar_fase: Callable[[str], None] | None = None,
+           a_cada_lote: Callable[[], None] | None = None) -> dict:
+    """
+    Executa a varredura (ou um trecho dela, com 'limite' itens por chamada). resultado["cursor"]
+    é None quando terminou; senão, passe-o de volta para continuar. 'a_cada_lote' é chamado
+    entre os lotes (heartbeat do job).
+    """
+    a_cada_lote = a_cada_lote or (lambda: None)
+    repo = AnexoRepository(db_conn)
+    upload_dir = upload_dir or anexo_storage.UPLOAD_DIR
+    ocorrencias = ocorrencias if ocorrencias is not None else []
+    cursor = cursor or {"fase": FASE_ARQUIVOS, "posicao": None}
+    resultado = {"arquivos_verificados": 0, "arquivos_orfaos": 0, "registros_verificados": 0,
+                 "registros_sem_arquivo": 0, "corrigidos": 0, "cursor": None}
+
+    if cursor["fase"] == FASE_ARQUIVOS:
+        if ao_mudar_fase:
+            ao_mudar_fase(FASE_ARQUIVOS)
+        posicao = _varrer_arquivos(repo, upload_dir, cursor["posicao"], limite, corrigir, resultado, ocorrencias,
+                                   a_cada_lote)
+        if posicao is not None:
+            resultado["cursor"] = {"fase": FASE_ARQUIVOS, "posicao": posicao}
+            return resultado
+        cursor = {"fase": FASE_REGISTROS, "posicao": 0}
+        if limite is not None:
+            limite = max(limite - resultado["arquivos_verificados"], 0)
+            if limite == 0:
+                resultado["cursor"] = cursor
+                return resultado
+
+    if ao_mudar_fase:
+        ao_mudar_fase(FASE_REGISTROS)
+    posicao = _varrer_registros(repo, upload_dir, cursor["posicao"] or 0, limite, corrigir, resultado, ocorrencias,
+                                a_cada_lote)
+    if posicao is not None:
+        resultado["cursor"] = {"fase": FASE_REGISTROS, "posicao": posicao}
+
+    resumo = {chave: valor for chave, valor in resultado.items() if chave != "cursor"}
+    logger.info(f"Varredura de anexos {'concluída' if posicao is None else 'parcial'}: {resumo}")
+    return resultado
+
+
+def relatorio_csv(ocorrencias: list[Ocorrencia]) -> bytes:
+    saida = io.StringIO()
+    escritor = csv.writer(saida, delimiter=";")
+    escritor.writerow(["tipo", "referencia", "detalhe", "acao"])
+    for o in ocorrencias:
+        escritor.writerow([o.tipo, o.referencia, o.detalhe, o.acao])
+    return saida.getvalue().encode("utf-8-sig")  # BOM: o Excel abre com acentos corretos
+
+
+@jobs.tarefa(TIPO_JOB)
+def executar_varredura(ctx: jobs.ContextoJob) -> str:
+    corrigir = bool(ctx.parametros.get("corrigir", False))
+    ocorrencias: list[Ocorrencia] = []
+    progresso = {FASE_ARQUIVOS: (10, "Conferindo arquivos de static/uploads."),
+                 FASE_REGISTROS: (50, "Conferindo registros de anexos.")}
+
+    resultado = varrer(ctx.db_conn, corrigir=corrigir, ocorrencias=ocorrencias,
+                       ao_mudar_fase=lambda fase: ctx.reportar(*progresso[fase]), a_cada_lote=ctx.pulsar)
+
+    ctx.reportar(90, f"{resultado['arquivos_orfaos']} arquivo(s) órfão(s), "
+                     f"{resultado['registros_sem_arquivo']} registro(s) sem arquivo.")
+    return ctx.gravar_artefato("varredura_anexos.csv", relatorio_csv(ocorrencias))
@@ -0,0 +1,83 @@
+"""
+ZIP gerado em streaming: o zipfile escreve num destino sem seek (usa data descriptors
+para CRC/tamanhos) e cada pedaço produzido é repassado ao cliente na hora, sem montar
+o arquivo em memória nem em disco.
+"""
+import io
+import zipfile
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator
+
+# Formatos já comprimidos: guardados como estão (STORED), recomprimir só gasta CPU
+EXTENSOES_JA_COMPRIMIDAS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".zip", ".rar", ".7z", ".gz",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".mp4", ".mp3",
+)
+
+
+class _SaidaSemSeek(io.RawIOBase):
+    def __init__(self):
+        self._partes: list[bytes] = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def esvaziar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+class EntradaZip:
+    def __init__(self, nome: str, ler: Callable[[], Iterator[bytes]], data: date | None = None):
+        self.nome = nome
+        self.ler = ler
+        self.data = data
+
+
+def _zip_info(entrada: EntradaZip) -> zipfile.ZipInfo:
+    momento = datetime.combine(entrada.data, datetime.min.time()) if entrada.data else datetime.now()
+    info = zipfile.ZipInfo(entrada.nome, date_time=momento.timetuple()[:6])
+    if entrada.nome.lower().endswith(EXTENSOES_JA_COMPRIMIDAS):
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def gerar_zip(entradas: Iterable[EntradaZip]) -> Iterator[bytes]:
+    saida = _SaidaSemSeek()
+    with zipfile.ZipFile(saida, "w") as arquivo_zip:
+        for entrada in entradas:
+            with arquivo_zip.open(_zip_info(entrada), "w") as destino:
+                for chunk in entrada.ler():
+                    destino.write(chunk)
+                    if dados := saida.esvaziar():
+                        yield dados
+            if dados := saida.esvaziar():
+                yield dados
+    if dados := saida.esvaziar():
+        yield dados
+
+
+def nomes_unicos(nomes: Iterable[str]) -> Iterator[str]:
+    """'nota.pdf', 'nota.pdf' -> 'nota.pdf', 'nota (2).pdf' (o ZIP aceitaria, os descompactadores não)."""
+    vistos: set[str] = set()
+    for nome in nomes:
+        candidato = nome
+        base, extensao = candidato.rsplit(".", 1) if "." in candidato.rsplit("/", 1)[-1] else (candidato, None)
+        n = 2
+        while candidato.lower() in vistos:
+            candidato = f"{base} ({n}).{extensao}" if extensao else f"{base} ({n})"
+            n += 1
+        vistos.add(candidato.lower())
+        yield candidato
@@ -16,15 +16,17 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from jose import jwt, JWTError
  
 from app.routers import (
-    agente_router, anexo_router, aocs_router, categoria_router, 
-    ci_pagamento_router, contrato_router, dotacao_router, 
-    instrumento_router, item_router, local_router, modalidade_router, 
+    agente_router, anexo_router, aocs_router, autocomplete_router, categoria_router, 
+    ci_pagamento_router, contrato_router, dotacao_router, impressao_router,
+    instrumento_router, item_router, job_router, local_router, modalidade_router, 
     numero_modalidade_router, pedido_router, processo_licitatorio_router, 
     tipo_documento_router, unidade_router, auth_router, user_router, ui_router
 )
 
 from app.core.logging_config import setup_logging
 from app.core.database import get_db
+from app.core import pdf_renderer
+from app.core.limite_upload import LimiteUploadMiddleware
 from app.core.security import (
     create_access_token, 
     ACCESS_TOKEN_EXPIRE_MINUTES, 
@@ -39,6 +41,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Aplicação Gestão Pública API iniciada.")
     yield
+    pdf_renderer.encerrar_pool()
     logger.info("Aplicação Gestão Pública API encerrada.")
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__)) 
@@ -51,6 +54,8 @@ app = FastAPI(
     lifespan=lifespan  
 )
 
+app.add_middleware(LimiteUploadMiddleware, caminhos=("/api/anexos/upload",))
+
 app.mount("/static", StaticFiles(directory=os.path.join(APP_DIR, "static")), name="static")
 
 @app.middleware("http")
@@ -126,12 +131,15 @@ app.include_router(user_router.router, prefix="/api")
 app.include_router(agente_router.router, prefix="/api")
 app.include_router(anexo_router.router, prefix="/api") 
 app.include_router(aocs_router.router, prefix="/api")
+app.include_router(autocomplete_router.router, prefix="/api")
 app.include_router(categoria_router.router, prefix="/api")
 app.include_router(ci_pagamento_router.router, prefix="/api") 
 app.include_router(contrato_router.router, prefix="/api")
 app.include_router(dotacao_router.router, prefix="/api")
+app.include_router(impressao_router.router, prefix="/api")
 app.include_router(instrumento_router.router, prefix="/api")
 app.include_router(item_router.router, prefix="/api")
+app.include_router(job_router.router, prefix="/api")
 app.include_router(local_router.router, prefix="/api")
 app.include_router(modalidade_router.router, prefix="/api")
 app.include_router(numero_modalidade_router.router, prefix="/api")
@@ -0,0 +1,155 @@
+"""
+Manutenção do armazenamento deduplicado de anexos (tabela 'anexos_blobs').
+
+    python -m app.manutencao_anexos gc              # remove blobs sem referência e arquivos órfãos
+    python -m app.manutencao_anexos recontar        # corrige a contagem de referências
+    python -m app.manutencao_anexos migrar-legado   # move uploads antigos para os blobs
+    python -m app.manutencao_anexos migrar-armazenamento [--origem DIR] [--remover-origem]
+                                                    # copia blobs locais para o armazenamento configurado (ex.: S3)
+    python -m app.manutencao_anexos varrer [--corrigir] [--limite N] [--cursor JSON]
+                                                    # arquivos órfãos e registros sem arquivo (relatório)
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+
+from dotenv import load_dotenv
+from psycopg2.extensions import connection
+
+from app.core import anexo_storage, varredura_anexos
+from app.core.armazenamento import ArmazenamentoLocal
+from app.core.database import DB_APPLICATION_NAME, _get_db_connection
+from app.core.logging_config import setup_logging
+from app.repositories.anexo_repository import AnexoRepository
+
+logger = logging.getLogger(__name__)
+
+# Temporários mais novos que isso podem ser de um upload ainda em andamento
+IDADE_MINIMA_TEMPORARIOS = int(os.environ.get("ANEXO_GC_IDADE_TEMPORARIOS", 3600))
+LOTE_CONSULTA = 500
+
+
+def coletar_lixo(db_conn: connection) -> dict:
+    repo = AnexoRepository(db_conn)
+    resultado = {"sem_referencia": 0, "arquivos_orfaos": 0, "temporarios": 0}
+
+    for hash_sha256 in repo.get_hashes_blobs_sem_referencia():
+        if repo.remover_blob_se_orfao(hash_sha256):
+            resultado["sem_referencia"] += 1
+
+    # Arquivos sem registro em anexos_blobs (ex.: upload publicado e depois revertido)
+    lote = []
+    for hash_sha256 in anexo_storage.listar_hashes_blobs():
+        lote.append(hash_sha256)
+        if len(lote) >= LOTE_CONSULTA:
+            resultado["arquivos_orfaos"] += _remover_orfaos(repo, lote)
+            lote = []
+    if lote:
+        resultado["arquivos_orfaos"] += _remover_orfaos(repo, lote)
+
+    resultado["temporarios"] = anexo_storage.limpar_temporarios(IDADE_MINIMA_TEMPORARIOS)
+    logger.info(f"GC de anexos concluído: {resultado}")
+    return resultado
+
+
+def _remover_orfaos(repo: AnexoRepository, hashes: list[str]) -> int:
+    registrados = repo.get_hashes_registrados(hashes)
+    return sum(1 for h in hashes if h not in registrados and repo.remover_blob_se_orfao(h))
+
+
+def migrar_legado(db_conn: connection, upload_dir: str | None = None) -> int:
+    """Copia cada upload antigo para o blob do seu conteúdo e apaga o arquivo original."""
+    repo = AnexoRepository(db_conn)
+    upload_dir = upload_dir or anexo_storage.UPLOAD_DIR
+    migrados = 0
+    ignorados = set()
+
+    while True:
+        anexos = [a for a in repo.get_fora_do_blob(LOTE_CONSULTA + len(ignorados)) if a.id not in ignorados]
+        if not anexos:
+            return migrados
+
+        for anexo in anexos:
+            caminho_antigo = os.path.join(upload_dir, anexo.nome_seguro)
+            if not os.path.isfile(caminho_antigo):
+                logger.warning(f"Anexo ID {anexo.id}: arquivo '{caminho_antigo}' não encontrado, não migrado.")
+                ignorados.add(anexo.id)
+                continue
+
+            hash_sha256, tamanho = anexo_storage.calcular_hash_arquivo(caminho_antigo)
+            caminho_tmp = anexo_storage.novo_temporario()
+            shutil.copyfile(caminho_antigo, caminho_tmp)
+            try:
+                repo.mover_para_blob(anexo.id, hash_sha256, tamanho, caminho_tmp)
+            finally:
+                anexo_storage.remover_arquivo(caminho_tmp)
+
+            anexo_storage.remover_arquivo(caminho_antigo)
+            migrados += 1
+            logger.info(f"Anexo ID {anexo.id} migrado para o blob {hash_sha256}.")
+
+
+def migrar_armazenamento(origem_dir: str | None = None, remover_origem: bool = False) -> int:
+    """
+    Copia os blobs de um diretório local para o armazenamento configurado (ANEXO_STORAGE).
+    As chaves não mudam, então o banco não é alterado; blobs já presentes no destino são pulados.
+    """
+    origem = ArmazenamentoLocal(origem_dir or anexo_storage.BLOB_DIR)
+    destino = anexo_storage.armazenamento()
+    if isinstance(destino, ArmazenamentoLocal) and os.path.realpath(destino.raiz) == os.path.realpath(origem.raiz):
+        raise ValueError("Origem e destino são o mesmo diretório. Configure ANEXO_STORAGE=s3 para migrar.")
+
+    copiados = 0
+    for chave in list(origem.listar()):
+        hash_sha256 = chave.rsplit("/", 1)[-1]
+        if chave != anexo_storage.chave_blob(hash_sha256):
+            continue  # temporários e arquivos estranhos ao layout dos blobs
+        if not destino.existe(chave):
+            caminho = origem.caminho_local(chave)
+            # Blobs comprimidos não têm o hash do nome: a verificação de integridade no envio vale só para os demais
+            conferido = hash_sha256 if anexo_storage.calcular_hash_arquivo(caminho)[0] == hash_sha256 else None
+            destino.enviar_arquivo(caminho, chave, conferido)
+            copiados += 1
+            logger.info(f"Blob {hash_sha256} copiado para o novo armazenamento.")
+        if remover_origem:
+            origem.remover(chave)
+    return copiados
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_dotenv()
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Manutenção dos anexos do GestãoPro.")
+    parser.add_argument("comando", choices=["gc", "recontar", "migrar-legado", "migrar-armazenamento", "varrer"])
+    parser.add_argument("--origem", help="Diretório local dos blobs a migrar (padrão: ANEXO_BLOB_DIR)")
+    parser.add_argument("--remover-origem", action="store_true")
+    parser.add_argument("--corrigir", action="store_true", help="varrer: remove arquivos órfãos e registros sem arquivo")
+    parser.add_argument("--limite", type=int, help="varrer: máximo de itens nesta execução")
+    parser.add_argument("--cursor", type=json.loads, help="varrer: continua de onde a execução anterior parou")
+    args = parser.parse_args(argv)
+
+    if args.comando == "migrar-armazenamento":
+        print(f"{migrar_armazenamento(args.origem, args.remover_origem)} blob(s) copiado(s).")
+        return
+
+    db_conn = _get_db_connection(application_name=f"{DB_APPLICATION_NAME}:manutencao_anexos")
+    try:
+        if args.comando == "gc":
+            print(coletar_lixo(db_conn))
+        elif args.comando == "varrer":
+            resultado = varredura_anexos.varrer(db_conn, args.corrigir, args.cursor, args.limite)
+            print(json.dumps(resultado, ensure_ascii=False))
+        elif args.comando == "recontar":
+            print(f"{AnexoRepository(db_conn).recontar_referencias()} blob(s) com contagem corrigida.")
+        else:
+            print(f"{migrar_legado(db_conn)} anexo(s) migrado(s).")
+    finally:
+        db_conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,12 @@
 from datetime import date
 
 class Anexo:
+    __slots__ = (
+        "id", "nome_original", "nome_seguro", "data_upload", "tipo_documento", "tipo_entidade",
+        "id_contrato", "id_aocs", "hash_sha256", "tamanho_bytes", "em_blob", "compressao",
+        "tamanho_armazenado", "taxa_compressao",
+    )
+
     def __init__(self,
                  id: int,
                  nome_original: str | None,
@@ -9,7 +15,12 @@ class Anexo:
                  tipo_entidade: str,
                  tipo_documento: str | None = None,
                  id_contrato: int | None = None, 
-                 id_aocs: int | None = None      
+                 id_aocs: int | None = None,
+                 hash_sha256: str | None = None,
+                 tamanho_bytes: int | None = None,
+                 em_blob: bool = False,
+                 compressao: str | None = None,
+                 tamanho_armazenado: int | None = None
                  ):
         
         self.id: int = id
@@ -20,4 +31,14 @@ class Anexo:
         self.tipo_entidade: str = tipo_entidade
         
         self.id_contrato: int | None = id_contrato
-        self.id_aocs: int | None = id_aocs
\ No newline at end of file
+        self.id_aocs: int | None = id_aocs
+        self.hash_sha256: str | None = hash_sha256
+        self.tamanho_bytes: int | None = tamanho_bytes
+        # True quando o conteúdo está no armazenamento deduplicado (anexos_blobs)
+        self.em_blob: bool = em_blob
+        # Compressão em repouso ('br' = brotli) e bytes efetivamente ocupados no armazenamento
+        self.compressao: str | None = compressao
+        self.tamanho_armazenado: int | None = tamanho_armazenado
+        self.taxa_compressao: float | None = (
+            round(tamanho_bytes / tamanho_armazenado, 2) if compressao and tamanho_bytes and tamanho_armazenado else None
+        )
\ No newline at end of file
@@ -1,6 +1,12 @@
 from datetime import date
 
 class Aocs:
+    __slots__ = (
+        "id", "numero_aocs", "data_criacao", "justificativa", "id_unidade_requisitante",
+        "id_local_entrega", "id_agente_responsavel", "id_dotacao", "numero_pedido", "tipo_pedido",
+        "empenho",
+    )
+
     def __init__(self,
                  id: int,
                  numero_aocs: str,
@@ -1,4 +1,6 @@
 class Categoria:
+    __slots__ = ("id", "nome", "ativo")
+
     def __init__(self, id: int, nome: str, ativo: bool):
         self.id: int = id
         self.nome: str = nome
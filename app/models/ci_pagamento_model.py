@@ -2,6 +2,12 @@ from datetime import date
 from decimal import Decimal
 
 class CiPagamento: 
+    __slots__ = (
+        "id", "id_aocs", "id_pedido", "numero_ci", "data_ci", "numero_nota_fiscal",
+        "serie_nota_fiscal", "codigo_acesso_nota", "data_nota_fiscal", "valor_nota_fiscal",
+        "id_dotacao_pagamento", "observacoes_pagamento", "id_solicitante", "id_secretaria",
+    )
+
     def __init__(self,
                  id: int,
                  id_aocs: int,
@@ -2,6 +2,12 @@ from datetime import date
 from app.models.fornecedor_vo import Fornecedor
 
 class Contrato: 
+    __slots__ = (
+        "id", "id_categoria", "numero_contrato", "fornecedor", "data_inicio", "data_fim",
+        "data_criacao", "ativo", "id_instrumento_contratual", "id_modalidade",
+        "id_numero_modalidade", "id_processo_licitatorio",
+    )
+
     def __init__(self,
                  id: int,
                  id_categoria: int,
@@ -1,3 +1,5 @@
 class DescricaoItem: 
+    __slots__ = ("descricao")
+
     def __init__(self, descricao: str): 
         self.descricao: str = descricao 
\ No newline at end of file
@@ -1,4 +1,6 @@
 class Dotacao:
+    __slots__ = ("id", "info_orcamentaria")
+
     def __init__(self, id: int, info_orcamentaria: str):
         self.id: int = id
         self.info_orcamentaria: str = info_orcamentaria
\ No newline at end of file
@@ -1,4 +1,6 @@
 class Fornecedor:
+    __slots__ = ("nome", "cpf_cnpj", "email", "telefone")
+
     def __init__(self,
                  nome: str,
                  cpf_cnpj: str | None = None,
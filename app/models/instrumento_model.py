@@ -1,4 +1,6 @@
 class Instrumento:
+    __slots__ = ("id", "nome")
+
     def __init__(self, id: int, nome: str):
         self.id: int = id
         self.nome: str = nome
\ No newline at end of file
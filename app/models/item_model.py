@@ -2,6 +2,11 @@ from decimal import Decimal
 from .descricao_item_vo import DescricaoItem 
 
 class Item:
+    __slots__ = (
+        "id", "id_contrato", "numero_item", "descricao", "marca", "unidade_medida", "quantidade",
+        "valor_unitario", "ativo",
+    )
+
     def __init__(self,
                  id: int,
                  id_contrato: int,
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+class Job:
+    __slots__ = (
+        "id", "tipo", "parametros", "status", "progresso", "tentativas", "max_tentativas",
+        "executar_apos", "criado_em", "mensagem", "artefato", "erro", "criado_por", "iniciado_em",
+        "concluido_em", "heartbeat_em",
+    )
+
+    def __init__(self,
+                 id: int,
+                 tipo: str,
+                 parametros: dict,
+                 status: str,
+                 progresso: int,
+                 tentativas: int,
+                 max_tentativas: int,
+                 executar_apos: datetime,
+                 criado_em: datetime,
+                 mensagem: str | None = None,
+                 artefato: str | None = None,
+                 erro: str | None = None,
+                 criado_por: str | None = None,
+                 iniciado_em: datetime | None = None,
+                 concluido_em: datetime | None = None,
+                 heartbeat_em: datetime | None = None):
+        self.id: int = id
+        self.tipo: str = tipo
+        self.parametros: dict = parametros
+        self.status: str = status
+        self.progresso: int = progresso
+        self.tentativas: int = tentativas
+        self.max_tentativas: int = max_tentativas
+        self.executar_apos: datetime = executar_apos
+        self.criado_em: datetime = criado_em
+        self.mensagem: str | None = mensagem
+        self.artefato: str | None = artefato
+        self.erro: str | None = erro
+        self.criado_por: str | None = criado_por
+        self.iniciado_em: datetime | None = iniciado_em
+        self.concluido_em: datetime | None = concluido_em
+        self.heartbeat_em: datetime | None = heartbeat_em
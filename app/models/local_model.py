@@ -1,4 +1,6 @@
 class Local:
+    __slots__ = ("id", "descricao")
+
     def __init__(self, id: int, descricao: str):
         self.id: int = id
         self.descricao: str = descricao
\ No newline at end of file
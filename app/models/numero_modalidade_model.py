@@ -1,4 +1,6 @@
 class NumeroModalidade: 
+    __slots__ = ("id", "numero_ano")
+
     def __init__(self, id: int, numero_ano: str): 
         self.id: int = id
         self.numero_ano: str = numero_ano
\ No newline at end of file
@@ -2,6 +2,11 @@ from datetime import date
 from decimal import Decimal
 
 class Pedido: 
+    __slots__ = (
+        "id", "id_item_contrato", "id_aocs", "quantidade_pedida", "data_pedido", "status_entrega",
+        "quantidade_entregue",
+    )
+
     def __init__(self,
                  id: int,
                  id_item_contrato: int,
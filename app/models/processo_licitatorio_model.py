@@ -1,4 +1,6 @@
 class ProcessoLicitatorio: 
+    __slots__ = ("id", "numero")
+
     def __init__(self, id: int, numero: str): 
         self.id: int = id
         self.numero: str = numero
\ No newline at end of file
@@ -1,6 +1,8 @@
 from werkzeug.security import check_password_hash
 
 class User:
+    __slots__ = ("id", "username", "password_hash", "nivel_acesso", "ativo")
+
     def __init__(self, id: int, username: str, password_hash: str, nivel_acesso: int, ativo: bool):
         self.id: int = id 
         self.username: str = username
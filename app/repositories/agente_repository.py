@@ -144,47 +144,27 @@ class AgenteRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, nome: str) -> Agente:
-        """Busca um Agente pelo nome ou cria um novo se não existir."""
-        try:
-            agente = self.get_by_nome(nome)
-            if agente:
-                return agente
-        except Exception:
-             logger.exception(f"Erro ao buscar agente '{nome}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO agentesresponsaveis (nome) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO agentesresponsaveis (nome) VALUES (%s)
+                ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+                RETURNING *
+            """
             cursor.execute(sql, (nome,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_agente = self._map_row_to_model(new_data)
-            if not new_agente:
-                 log_message = f"Falha ao mapear agente '{nome}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Agente '{nome}' não encontrado/erro na busca, criado novo com ID {new_agente.id}.")
-            return new_agente
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar agente '{nome}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            agente_existente = self.get_by_nome(nome)
-            if agente_existente:
-                return agente_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar agente '{nome}' após conflito de inserção em get_or_create."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear agente '{nome}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
-        except (Exception, psycopg2.DatabaseError) as error: 
+        except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para agente '{nome}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para agente '{nome}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
@@ -3,6 +3,7 @@ from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
 from datetime import date
 import logging
+from app.core import anexo_storage
 from app.models.anexo_model import Anexo
 from app.schemas.anexo_schema import AnexoCreate 
 from .tipo_documento_repository import TipoDocumentoRepository
@@ -26,23 +27,96 @@ class AnexoRepository:
                 tipo_documento=row.get('tipo_documento'), 
                 tipo_entidade=row['tipo_entidade'],
                 id_contrato=row.get('id_contrato'),
-                id_aocs=row.get('id_aocs')
+                id_aocs=row.get('id_aocs'),
+                hash_sha256=row.get('hash_sha256'),
+                tamanho_bytes=row.get('tamanho_bytes'),
+                em_blob=bool(row.get('em_blob', False)),
+                compressao=row.get('compressao'),
+                tamanho_armazenado=row.get('tamanho_armazenado')
             )
         except (KeyError, TypeError) as e:
             logger.error(f"Erro de mapeamento Anexo: {e}. Linha do DB: {row}")
             return None
 
-    def create(self, anexo_create_data: AnexoCreate) -> Anexo:
+    def _bloquear_blob(self, cursor, hash_sha256: str) -> None:
+        # Serializa, por conteúdo, a publicação e a remoção do arquivo do blob (liberado no commit/rollback)
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", (hash_sha256,))
+
+    def _remover_arquivo_blob(self, hash_sha256: str) -> None:
+        """
+        Chamado depois do commit que apagou o registro do blob: o arquivo só sai depois que a
+        remoção do registro está confirmada (um commit que falha não deixa registro sem arquivo).
+        Volta a pegar o lock do hash e não apaga nada se um upload concorrente já registrou o
+        conteúdo de novo. Se falhar, o arquivo fica sem registro e o GC (coletar_lixo) o remove.
+        """
+        if getattr(self.db_conn, "nivel_uow", 0):
+            # Dentro de uow() o commit ainda não aconteceu: fica para o GC
+            return
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            self._bloquear_blob(cursor, hash_sha256)
+            cursor.execute("SELECT 1 FROM anexos_blobs WHERE hash_sha256 = %s", (hash_sha256,))
+            if not cursor.fetchone():
+                anexo_storage.remover_blob(hash_sha256)
+            self.db_conn.commit()
+        except Exception as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Arquivo do blob {hash_sha256} não removido ({error}); o GC o remove depois.")
+        finally:
+            if cursor:
+                cursor.close()
+
+    def _registrar_blob(self, cursor, hash_sha256: str, tamanho_bytes: int | None, caminho_temporario: str,
+                        compressao: str | None, tamanho_armazenado: int | None) -> tuple[str | None, int | None]:
+        """
+        Referencia o blob do hash, publicando o temporário só se o blob ainda não está registrado
+        (senão o temporário é descartado). Retorna (compressao, tamanho_armazenado) do blob
+        efetivo: um upload duplicado herda o formato de quem gravou o conteúdo primeiro.
+        """
+        self._bloquear_blob(cursor, hash_sha256)
+        cursor.execute("""
+            UPDATE anexos_blobs SET referencias = referencias + 1
+            WHERE hash_sha256 = %s RETURNING compressao, tamanho_armazenado
+        """, (hash_sha256,))
+        existente = cursor.fetchone()
+        if existente:
+            anexo_storage.remover_arquivo(caminho_temporario)
+            return existente[0], existente[1]
+
+        anexo_storage.publicar_blob(caminho_temporario, hash_sha256, compressao)
+        cursor.execute("""
+            INSERT INTO anexos_blobs (hash_sha256, tamanho_bytes, referencias, compressao, tamanho_armazenado)
+            VALUES (%s, %s, 1, %s, %s)
+        """, (hash_sha256, tamanho_bytes, compressao, tamanho_armazenado))
+        return compressao, tamanho_armazenado
+
+    def create(self, anexo_create_data: AnexoCreate, caminho_temporario: str | None = None) -> Anexo:
+        """
+        Com caminho_temporario (upload recebido por anexo_storage.receber_upload), o conteúdo
+        vai para o blob do hash: se já existir, o temporário é descartado e só a contagem de
+        referências sobe. Registro do anexo e referência ao blob são gravados na mesma transação.
+        """
         cursor = None
+        em_blob = bool(caminho_temporario and anexo_create_data.hash_sha256)
+        compressao = tamanho_armazenado = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+
+            if em_blob:
+                compressao, tamanho_armazenado = self._registrar_blob(
+                    cursor, anexo_create_data.hash_sha256, anexo_create_data.tamanho_bytes, caminho_temporario,
+                    anexo_create_data.compressao, anexo_create_data.tamanho_armazenado
+                )
             
             cols = ["tipo_entidade", "nome_original", "nome_seguro", 
-                    "data_upload", "tipo_documento"]
+                    "data_upload", "tipo_documento", "hash_sha256", "tamanho_bytes", "em_blob",
+                    "compressao", "tamanho_armazenado"]
             
             params = [anexo_create_data.tipo_entidade, anexo_create_data.nome_original, 
                       anexo_create_data.nome_seguro, anexo_create_data.data_upload, 
-                      anexo_create_data.tipo_documento]
+                      anexo_create_data.tipo_documento, anexo_create_data.hash_sha256,
+                      anexo_create_data.tamanho_bytes, em_blob, compressao, tamanho_armazenado]
 
             if anexo_create_data.tipo_entidade == 'contrato':
                 cols.append("id_contrato")
@@ -137,18 +211,40 @@ class AnexoRepository:
                 cursor.close()
 
     def delete(self, id: int) -> tuple[bool, Anexo | None]:
+        """
+        Remove o registro e a referência ao blob. O arquivo do blob só é apagado quando
+        a última referência sai, depois do commit (_remover_arquivo_blob).
+        """
         cursor = None
         anexo_para_deletar = self.get_by_id(id)
         if not anexo_para_deletar:
              logger.warning(f"Tentativa de deletar anexo ID {id} falhou (não encontrado).")
              return False, None
 
+        blob_liberado = None
         try:
             cursor = self.db_conn.cursor()
+            hash_blob = anexo_para_deletar.hash_sha256 if anexo_para_deletar.em_blob else None
+            if hash_blob:
+                self._bloquear_blob(cursor, hash_blob)
+
             sql = "DELETE FROM anexos WHERE id = %s"
             cursor.execute(sql, (id,))
             rowcount = cursor.rowcount
+
+            if rowcount > 0 and hash_blob:
+                cursor.execute("""
+                    UPDATE anexos_blobs SET referencias = referencias - 1
+                    WHERE hash_sha256 = %s RETURNING referencias
+                """, (hash_blob,))
+                restantes = cursor.fetchone()
+                if restantes and restantes[0] <= 0:
+                    cursor.execute("DELETE FROM anexos_blobs WHERE hash_sha256 = %s", (hash_blob,))
+                    blob_liberado = hash_blob
+
             self.db_conn.commit()
+            if blob_liberado:
+                self._remover_arquivo_blob(blob_liberado)
 
             if rowcount > 0:
                 logger.info(f"Registro de Anexo ID {id} ('{anexo_para_deletar.nome_original}') deletado.")
@@ -167,4 +263,148 @@ class AnexoRepository:
              raise
         finally:
             if cursor:
-                cursor.close()
\ No newline at end of file
+                cursor.close()
+
+    def remover_blob_se_orfao(self, hash_sha256: str) -> bool:
+        """
+        Usado pelo garbage collector: apaga registro e arquivo do blob se nenhum anexo
+        aponta para ele (contagem zerada ou arquivo sem registro, ex.: upload que falhou
+        depois de publicar o blob).
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            self._bloquear_blob(cursor, hash_sha256)
+            cursor.execute("SELECT 1 FROM anexos WHERE hash_sha256 = %s AND em_blob LIMIT 1", (hash_sha256,))
+            if cursor.fetchone():
+                self.db_conn.commit()
+                return False
+
+            cursor.execute("DELETE FROM anexos_blobs WHERE hash_sha256 = %s", (hash_sha256,))
+            self.db_conn.commit()
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao remover blob órfão {hash_sha256}: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+        self._remover_arquivo_blob(hash_sha256)
+        return True
+
+    def get_hashes_blobs_sem_referencia(self) -> list[str]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute("SELECT hash_sha256 FROM anexos_blobs WHERE referencias <= 0")
+            return [row[0] for row in cursor.fetchall()]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao listar blobs sem referência: {error}")
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_hashes_registrados(self, hashes: list[str]) -> set[str]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute("SELECT hash_sha256 FROM anexos_blobs WHERE hash_sha256 = ANY(%s)", (hashes,))
+            return {row[0] for row in cursor.fetchall()}
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao consultar blobs registrados: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def recontar_referencias(self) -> int:
+        """Corrige a contagem de referências a partir da tabela anexos. Retorna quantos blobs mudaram."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute("""
+                UPDATE anexos_blobs b SET referencias = c.total
+                FROM (
+                    SELECT b2.hash_sha256, COUNT(a.id) AS total
+                    FROM anexos_blobs b2
+                    LEFT JOIN anexos a ON a.hash_sha256 = b2.hash_sha256 AND a.em_blob
+                    GROUP BY b2.hash_sha256
+                ) c
+                WHERE c.hash_sha256 = b.hash_sha256 AND b.referencias <> c.total
+            """)
+            corrigidos = cursor.rowcount
+            self.db_conn.commit()
+            return corrigidos
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao recontar referências de blobs: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_fora_do_blob(self, limite: int = 100) -> list[Anexo]:
+        """Anexos antigos, gravados como arquivo próprio em static/uploads."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT * FROM anexos WHERE NOT em_blob ORDER BY id LIMIT %s", (limite,))
+            return [anexo for anexo in (self._map_row_to_model(row) for row in cursor.fetchall()) if anexo]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao listar anexos fora do armazenamento deduplicado: {error}")
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_pagina_por_id(self, apos_id: int = 0, limite: int = 500) -> list[Anexo]:
+        """Página de anexos em ordem de ID a partir de apos_id (keyset, sem OFFSET): usada na varredura incremental."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT * FROM anexos WHERE id > %s ORDER BY id LIMIT %s", (apos_id, limite))
+            return [anexo for anexo in (self._map_row_to_model(row) for row in cursor.fetchall()) if anexo]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao listar anexos após o ID {apos_id}: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_nomes_seguros_legados(self, nomes: list[str]) -> set[str]:
+        """Quais dos caminhos (relativos a static/uploads) pertencem a anexos antigos registrados."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute("SELECT nome_seguro FROM anexos WHERE NOT em_blob AND nome_seguro = ANY(%s)", (nomes,))
+            return {row[0] for row in cursor.fetchall()}
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao consultar nomes de anexos registrados: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def mover_para_blob(self, id: int, hash_sha256: str, tamanho_bytes: int, caminho_temporario: str) -> None:
+        """Publica a cópia temporária do arquivo antigo como blob e aponta o anexo para ele."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            compressao, tamanho_armazenado = self._registrar_blob(
+                cursor, hash_sha256, tamanho_bytes, caminho_temporario, None, tamanho_bytes
+            )
+            cursor.execute("""
+                UPDATE anexos SET hash_sha256 = %s, tamanho_bytes = %s, em_blob = true,
+                                  compressao = %s, tamanho_armazenado = %s
+                WHERE id = %s
+            """, (hash_sha256, tamanho_bytes, compressao, tamanho_armazenado, id))
+            self.db_conn.commit()
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao mover anexo ID {id} para o blob {hash_sha256}: {error}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
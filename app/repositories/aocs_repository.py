@@ -1,8 +1,10 @@
 import psycopg2
 from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
-from datetime import date
+from datetime import date, datetime
 import logging
+from typing import Iterator
+from app.core import document_cache, mapeamento, paginacao, sincronizacao
 from app.models.aocs_model import Aocs
 from app.schemas.aocs_schema import AocsCreateRequest, AocsUpdateRequest 
 from .unidade_repository import UnidadeRepository
@@ -12,6 +14,39 @@ from .dotacao_repository import DotacaoRepository
 
 logger = logging.getLogger(__name__)
 
+CAMPOS_AOCS = mapeamento.campos_simples(
+    "id", "numero_aocs", "data_criacao", "justificativa", "numero_pedido", "empenho",
+    "id_unidade_requisitante", "id_local_entrega", "id_agente_responsavel", "id_dotacao",
+)
+
+# Hash de todas as linhas que aparecem nos documentos impressos de uma AOCS
+# (cabeçalho, lookups, pedidos, itens e contrato). Muda sempre que o documento mudaria.
+SQL_VERSAO_DOCUMENTO_AOCS = """
+    SELECT md5(concat_ws('|',
+        a::text, u::text, l::text, ag::text, d::text,
+        (SELECT string_agg(concat_ws(',', p::text, ic::text, c::text, ins::text), ';' ORDER BY p.id)
+           FROM pedidos p
+           JOIN itenscontrato ic ON ic.id = p.id_item_contrato
+           JOIN contratos c ON c.id = ic.id_contrato
+           LEFT JOIN instrumentocontratual ins ON ins.id = c.id_instrumento_contratual
+          WHERE p.id_aocs = a.id)
+    ))
+    FROM aocs a
+    LEFT JOIN unidadesrequisitantes u ON u.id = a.id_unidade_requisitante
+    LEFT JOIN locaisentrega l ON l.id = a.id_local_entrega
+    LEFT JOIN agentesresponsaveis ag ON ag.id = a.id_agente_responsavel
+    LEFT JOIN dotacao d ON d.id = a.id_dotacao
+    WHERE a.id = {id_aocs}
+"""
+
+# Coluna da AOCS -> (tabela, coluna única) do cadastro auxiliar referenciado
+LOOKUPS_AOCS = {
+    "id_unidade_requisitante": ("unidadesrequisitantes", "nome"),
+    "id_local_entrega": ("locaisentrega", "descricao"),
+    "id_agente_responsavel": ("agentesresponsaveis", "nome"),
+    "id_dotacao": ("dotacao", "info_orcamentaria"),
+}
+
 class AocsRepository:
     def __init__(self, db_conn: connection):
         self.db_conn = db_conn
@@ -40,18 +75,35 @@ class AocsRepository:
             logger.error(f"Erro de mapeamento AOCS: Coluna '{e}' não encontrada.")
             return None
 
+    def _resolver_lookups(self, cursor, valores: dict[str, str]) -> dict[str, int]:
+        """
+        Busca ou cria (upsert) os cadastros auxiliares de uma vez: {coluna da AOCS: texto} ->
+        {coluna da AOCS: ID}, numa única instrução e sem commit (fica na transação da AOCS).
+        """
+        if not valores:
+            return {}
+        ctes, selects, params = [], [], []
+        for i, (coluna_fk, valor) in enumerate(valores.items()):
+            tabela, coluna = LOOKUPS_AOCS[coluna_fk]
+            ctes.append(f"l{i} AS (INSERT INTO {tabela} ({coluna}) VALUES (%s) "
+                        f"ON CONFLICT ({coluna}) DO UPDATE SET {coluna} = EXCLUDED.{coluna} RETURNING id)")
+            selects.append(f"l{i}.id AS {coluna_fk}")
+            params.append(valor)
+        origens = ", ".join(f"l{i}" for i in range(len(valores)))
+        cursor.execute(f"WITH {', '.join(ctes)} SELECT {', '.join(selects)} FROM {origens}", params)
+        return dict(cursor.fetchone())
+
     def create(self, aocs_req: AocsCreateRequest) -> Aocs:
         cursor = None
         try:
-            uni = self.unidade_repo.get_or_create(aocs_req.unidade_requisitante_nome)
-            
-            loc = self.local_repo.get_or_create(aocs_req.local_entrega_descricao) 
-            
-            age = self.agente_repo.get_or_create(aocs_req.agente_responsavel_nome)
-            
-            dot = self.dotacao_repo.get_or_create(aocs_req.dotacao_info_orcamentaria) 
-            
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            fks = self._resolver_lookups(cursor, {
+                "id_unidade_requisitante": aocs_req.unidade_requisitante_nome,
+                "id_local_entrega": aocs_req.local_entrega_descricao,
+                "id_agente_responsavel": aocs_req.agente_responsavel_nome,
+                "id_dotacao": aocs_req.dotacao_info_orcamentaria,
+            })
+
             sql = """
                 INSERT INTO aocs (numero_aocs, justificativa, data_criacao,
                                 id_unidade_requisitante, id_local_entrega,
@@ -61,11 +113,13 @@ class AocsRepository:
             """ 
             params = (
                 aocs_req.numero_aocs, aocs_req.justificativa, aocs_req.data_criacao,
-                uni.id, loc.id, age.id, dot.id,
+                fks["id_unidade_requisitante"], fks["id_local_entrega"],
+                fks["id_agente_responsavel"], fks["id_dotacao"],
                 aocs_req.numero_pedido, aocs_req.empenho
             )
             cursor.execute(sql, params)
             new_data = cursor.fetchone()
+            # Um só commit: cadastros auxiliares novos e a AOCS entram (ou não) juntos
             self.db_conn.commit()
 
             new_aocs = self._map_row_to_model(new_data)
@@ -132,6 +186,71 @@ class AocsRepository:
         finally:
             if cursor: cursor.close()
 
+    def get_pagina(self, limite: int = paginacao.LIMITE_PADRAO, after: str | None = None,
+                   before: str | None = None, com_total: bool = False,
+                   campos: tuple[str, ...] | None = None) -> paginacao.Pagina:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            colunas = mapeamento.colunas_dos_campos(CAMPOS_AOCS, campos) if campos else None
+            pagina = paginacao.consultar(cursor, "SELECT * FROM aocs", [], ["-data_criacao", "-id"], limite,
+                                         after, before, com_total=com_total, colunas=colunas)
+            if campos:
+                pagina.itens = mapeamento.mapear_parcial(cursor, pagina.itens, Aocs, CAMPOS_AOCS, campos)
+            else:
+                pagina.itens = [a for a in map(self._map_row_to_model, pagina.itens) if a is not None]
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao paginar AOCS: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_by_ids(self, ids: list[int]) -> list[Aocs]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT * FROM aocs WHERE id = ANY(%s)", (list(ids),))
+            return [a for a in map(self._map_row_to_model, cursor.fetchall()) if a is not None]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao buscar AOCS por IDs: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_alteracoes(self, since: datetime | None = None, cursor: str | None = None,
+                       limite: int = paginacao.LIMITE_PADRAO) -> sincronizacao.Alteracoes:
+        return sincronizacao.consultar(self.db_conn, "aocs", self.get_by_ids, since, cursor, limite)
+
+    def iterar_todas(self) -> Iterator[Aocs]:
+        """Todas as AOCS, na ordem da listagem, lidas em lotes (exportação NDJSON)."""
+        try:
+            with mapeamento.cursor_nomeado(self.db_conn, DictCursor) as cursor:
+                cursor.execute("SELECT * FROM aocs ORDER BY data_criacao DESC, id DESC")
+                for row in cursor:
+                    aocs = self._map_row_to_model(row)
+                    if aocs is not None:
+                        yield aocs
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao exportar AOCS: {error}")
+            raise
+
+    def get_versao_documento(self, id: int) -> str | None:
+        """Versão (hash) dos dados impressos da AOCS; usada como chave do cache de documentos."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(f"SELECT ({SQL_VERSAO_DOCUMENTO_AOCS.format(id_aocs='%s')})", (id,))
+            data = cursor.fetchone()
+            return data[0] if data else None
+        except (Exception, psycopg2.DatabaseError) as error:
+             logger.exception(f"Erro inesperado ao calcular versão do documento da AOCS ID {id}: {error}")
+             return None
+        finally:
+            if cursor: cursor.close()
+
     def update(self, id: int, aocs_req: AocsUpdateRequest) -> Aocs | None:
         cursor = None
         fields_to_update = []
@@ -139,29 +258,19 @@ class AocsRepository:
         resolved_fks = {} 
 
         try:
-            if aocs_req.unidade_requisitante_nome is not None:
-                uni = self.unidade_repo.get_or_create(aocs_req.unidade_requisitante_nome)
-                resolved_fks['id_unidade_requisitante'] = uni.id
-                fields_to_update.append("id_unidade_requisitante = %s")
-                params.append(uni.id)
-
-            if aocs_req.local_entrega_descricao is not None:
-                loc = self.local_repo.get_or_create(aocs_req.local_entrega_descricao)
-                resolved_fks['id_local_entrega'] = loc.id
-                fields_to_update.append("id_local_entrega = %s")
-                params.append(loc.id)
-
-            if aocs_req.agente_responsavel_nome is not None:
-                age = self.agente_repo.get_or_create(aocs_req.agente_responsavel_nome)
-                resolved_fks['id_agente_responsavel'] = age.id
-                fields_to_update.append("id_agente_responsavel = %s")
-                params.append(age.id)
-
-            if aocs_req.dotacao_info_orcamentaria is not None:
-                dot = self.dotacao_repo.get_or_create(aocs_req.dotacao_info_orcamentaria)
-                resolved_fks['id_dotacao'] = dot.id
-                fields_to_update.append("id_dotacao = %s")
-                params.append(dot.id)
+            lookups = {
+                "id_unidade_requisitante": aocs_req.unidade_requisitante_nome,
+                "id_local_entrega": aocs_req.local_entrega_descricao,
+                "id_agente_responsavel": aocs_req.agente_responsavel_nome,
+                "id_dotacao": aocs_req.dotacao_info_orcamentaria,
+            }
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            resolved_fks = self._resolver_lookups(
+                cursor, {coluna: valor for coluna, valor in lookups.items() if valor is not None}
+            )
+            for coluna, id_fk in resolved_fks.items():
+                fields_to_update.append(f"{coluna} = %s")
+                params.append(id_fk)
 
             if aocs_req.numero_aocs is not None:
                 fields_to_update.append("numero_aocs = %s")
@@ -185,13 +294,13 @@ class AocsRepository:
 
             params.append(id) 
 
-            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
             set_clause = ", ".join(fields_to_update)
             sql = f"UPDATE aocs SET {set_clause} WHERE id = %s RETURNING *"
 
             cursor.execute(sql, params) 
             updated_data = cursor.fetchone()
             self.db_conn.commit()
+            document_cache.invalidar("aocs", id)
 
             updated_aocs = self._map_row_to_model(updated_data)
             if updated_aocs:
@@ -223,6 +332,7 @@ class AocsRepository:
             cursor.execute(sql, (id,))
             rowcount = cursor.rowcount
             self.db_conn.commit()
+            document_cache.invalidar("aocs", id)
 
             if rowcount > 0:
                 logger.info(f"AOCS ID {id} ('{aocs_para_deletar.numero_aocs}') deletada (Pedidos associados podem ter sido deletados via CASCADE).")
@@ -0,0 +1,68 @@
+import psycopg2
+from psycopg2.extensions import connection
+import logging
+from app.core import busca
+
+logger = logging.getLogger(__name__)
+
+class AutocompleteRepository:
+    """
+    Consultas enxutas para sugestões enquanto o usuário digita: só as colunas exibidas,
+    LIMIT pequeno e filtros atendidos por índice (prefixo em btree text_pattern_ops,
+    trecho em trigram). Cada método retorna tuplas (id, texto, detalhe).
+    """
+    def __init__(self, db_conn: connection):
+        self.db_conn = db_conn
+
+    def _consultar(self, sql: str, params: list, descricao: str) -> list[tuple]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao buscar sugestões de {descricao}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def itens(self, termo: str, limite: int, id_categoria: int | None = None) -> list[tuple]:
+        filtro_sql, filtro_params = busca.filtro("ic.descricao_busca", termo)
+        ordem_sql, ordem_params = busca.ordem_relevancia(self.db_conn, "ic.descricao_busca", termo)
+        params = list(filtro_params)
+        filtro_categoria = ""
+        if id_categoria is not None:
+            filtro_categoria = " AND c.id_categoria = %s"
+            params.append(id_categoria)
+        sql = f"""
+            SELECT ic.id, ic.descricao, c.numero_contrato
+            FROM itenscontrato ic
+            JOIN contratos c ON c.id = ic.id_contrato
+            WHERE ic.ativo AND c.ativo {filtro_sql}{filtro_categoria}
+            ORDER BY {ordem_sql}, ic.id
+            LIMIT %s
+        """
+        return self._consultar(sql, params + ordem_params + [limite], "itens")
+
+    def fornecedores(self, termo: str, limite: int) -> list[tuple]:
+        # Mesmo fornecedor em vários contratos: uma sugestão por nome, com o CNPJ como detalhe
+        filtro_sql, filtro_params = busca.filtro("normalizar_busca(fornecedor)", termo)
+        sql = f"""
+            SELECT NULL, fornecedor, MIN(cpf_cnpj)
+            FROM contratos
+            WHERE TRUE {filtro_sql}
+            GROUP BY fornecedor
+            ORDER BY normalizar_busca(fornecedor) LIKE normalizar_busca(%s) || '%%' DESC, fornecedor
+            LIMIT %s
+        """
+        return self._consultar(sql, filtro_params + [busca.escapar_like(termo.strip()), limite], "fornecedores")
+
+    def aocs(self, termo: str, limite: int) -> list[tuple]:
+        sql = """
+            SELECT id, numero_aocs, numero_pedido
+            FROM aocs
+            WHERE upper(numero_aocs) LIKE upper(%s) || '%%'
+            ORDER BY upper(numero_aocs)
+            LIMIT %s
+        """
+        return self._consultar(sql, [busca.escapar_like(termo.strip()), limite], "AOCS")
@@ -182,51 +182,31 @@ class CategoriaRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, nome: str) -> Categoria:
-        try:
-            categoria = self.get_by_nome(nome, buscar_inativos=False)
-            if categoria:
-                return categoria
-        except Exception:
-             logger.exception(f"Erro ao buscar categoria '{nome}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO Categorias (nome) VALUES (%s) RETURNING *" 
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO Categorias (nome) VALUES (%s)
+                ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+                RETURNING *
+            """
             cursor.execute(sql, (nome,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_categoria = self._map_row_to_model(new_data)
-            if not new_categoria:
-                 log_message = f"Falha ao mapear categoria '{nome}' recém-criada em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Categoria '{nome}' não encontrada/inativa, criada nova com ID {new_categoria.id}.")
-            return new_categoria
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar categoria '{nome}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            categoria_existente = self.get_by_nome(nome, buscar_inativos=True)
-            if categoria_existente:
-                logger.info(f"Categoria '{nome}' encontrada (pode estar inativa) após conflito de inserção.")
-                return categoria_existente
-            else:
-                log_message = f"Erro INESPERADO: Categoria '{nome}' não encontrada após conflito de inserção em get_or_create."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear categoria '{nome}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para categoria '{nome}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para categoria '{nome}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
-    
+            if cursor: cursor.close()
+
     def change_status(self, id: int, status: bool) -> Categoria | None:
         cursor = None
         try:
@@ -3,15 +3,31 @@ from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
 from datetime import date
 import logging
+from app.core import document_cache, mapeamento, paginacao
 from app.models.ci_pagamento_model import CiPagamento 
-from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest, CiPagamentoUpdateRequest 
-from .aocs_repository import AocsRepository
+from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest, CiPagamentoCreateIdsRequest, CiPagamentoUpdateRequest 
+from .aocs_repository import AocsRepository, SQL_VERSAO_DOCUMENTO_AOCS
 from .agente_repository import AgenteRepository
 from .unidade_repository import UnidadeRepository
 from .dotacao_repository import DotacaoRepository
 
 logger = logging.getLogger(__name__)
 
+CAMPOS_CI_PAGAMENTO = mapeamento.campos_simples(
+    "id", "id_aocs", "id_pedido", "numero_ci", "data_ci", "numero_nota_fiscal", "serie_nota_fiscal",
+    "codigo_acesso_nota", "data_nota_fiscal", "valor_nota_fiscal", "id_dotacao_pagamento",
+    "observacoes_pagamento", "id_solicitante", "id_secretaria",
+)
+
+# FK violada no INSERT -> campo do pedido, para a mensagem de erro
+FKS_CI_PAGAMENTO = {
+    "fk_aocs": ("AOCS", "id_aocs"),
+    "fk_ci_pedido": ("Pedido", "id_pedido"),
+    "fk_dotacao": ("Dotação", "id_dotacao_pagamento"),
+    "fk_secretaria": ("Secretaria", "id_secretaria"),
+    "fk_solicitante": ("Solicitante", "id_solicitante"),
+}
+
 class CiPagamentoRepository: 
     def __init__(self, db_conn: connection):
         self.db_conn = db_conn
@@ -98,6 +114,54 @@ class CiPagamentoRepository:
         finally:
             if cursor: cursor.close()
 
+    def create_por_ids(self, ci_req: CiPagamentoCreateIdsRequest) -> CiPagamento:
+        """
+        Um único INSERT: as FKs são conferidas pelo próprio banco (violação -> ValueError) e,
+        sem id_pedido, o primeiro pedido da AOCS é escolhido na mesma instrução.
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            sql = """
+                INSERT INTO ci_pagamento (id_aocs, numero_ci, data_ci, numero_nota_fiscal,
+                                          serie_nota_fiscal, codigo_acesso_nota, data_nota_fiscal,
+                                          valor_nota_fiscal, id_dotacao_pagamento,
+                                          observacoes_pagamento, id_solicitante, id_secretaria, id_pedido)
+                VALUES (%(id_aocs)s, %(numero_ci)s, %(data_ci)s, %(numero_nota_fiscal)s,
+                        %(serie_nota_fiscal)s, %(codigo_acesso_nota)s, %(data_nota_fiscal)s,
+                        %(valor_nota_fiscal)s, %(id_dotacao_pagamento)s,
+                        %(observacoes_pagamento)s, %(id_solicitante)s, %(id_secretaria)s,
+                        COALESCE(%(id_pedido)s, (SELECT MIN(id) FROM pedidos WHERE id_aocs = %(id_aocs)s)))
+                RETURNING *
+            """
+            cursor.execute(sql, ci_req.model_dump())
+            new_data = cursor.fetchone()
+            self.db_conn.commit()
+
+            new_ci = self._map_row_to_model(new_data)
+            if not new_ci:
+                logger.error("Falha ao mapear dados da CI Pagamento recém-criada.")
+                raise Exception("Falha ao mapear dados da CI Pagamento recém-criada.")
+
+            logger.info(f"CI Pagamento criada com ID {new_ci.id} (Num: '{new_ci.numero_ci}') para AOCS ID {new_ci.id_aocs}")
+            return new_ci
+
+        except psycopg2.errors.ForeignKeyViolation as error:
+            if self.db_conn: self.db_conn.rollback()
+            nome, campo = FKS_CI_PAGAMENTO.get(error.diag.constraint_name, ("Registro relacionado", None))
+            valor = getattr(ci_req, campo) if campo else None
+            logger.warning(f"FK inválida ao criar CI ({error.diag.constraint_name}, Req: {ci_req}).")
+            raise ValueError(f"{nome} ID {valor} não encontrado(a).") from error
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            if isinstance(error, psycopg2.IntegrityError):
+                 logger.warning(f"Erro de integridade ao criar CI (Num CI/NF duplicado?) (Req: {ci_req}): {error}")
+            else:
+                 logger.exception(f"Erro inesperado ao criar CI (Req: {ci_req}): {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
     def get_by_id(self, id: int) -> CiPagamento | None:
         cursor = None
         try:
@@ -130,6 +194,21 @@ class CiPagamentoRepository:
         finally:
             if cursor: cursor.close()
 
+    def get_by_aocs_id(self, id_aocs: int) -> list[CiPagamento]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            # Atendida por idx_ci_pagamento_id_aocs, já na ordem da listagem
+            sql = "SELECT * FROM ci_pagamento WHERE id_aocs = %s ORDER BY data_ci DESC, id DESC"
+            cursor.execute(sql, (id_aocs,))
+            ci_list = [self._map_row_to_model(row) for row in cursor.fetchall() if row]
+            return [ci for ci in ci_list if ci is not None]
+        except (Exception, psycopg2.DatabaseError) as error:
+             logger.exception(f"Erro inesperado ao listar CIs de Pagamento da AOCS ID ({id_aocs}): {error}")
+             return []
+        finally:
+            if cursor: cursor.close()
+
     def get_all(self) -> list[CiPagamento]:
         cursor = None
         ci_list = []
@@ -147,6 +226,48 @@ class CiPagamentoRepository:
         finally:
             if cursor: cursor.close()
 
+    def get_pagina(self, limite: int = paginacao.LIMITE_PADRAO, after: str | None = None,
+                   before: str | None = None, com_total: bool = False,
+                   campos: tuple[str, ...] | None = None) -> paginacao.Pagina:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            colunas = mapeamento.colunas_dos_campos(CAMPOS_CI_PAGAMENTO, campos) if campos else None
+            pagina = paginacao.consultar(cursor, "SELECT * FROM ci_pagamento", [], ["-data_ci", "-id"], limite,
+                                         after, before, com_total=com_total, colunas=colunas)
+            if campos:
+                pagina.itens = mapeamento.mapear_parcial(cursor, pagina.itens, CiPagamento, CAMPOS_CI_PAGAMENTO, campos)
+            else:
+                pagina.itens = [ci for ci in map(self._map_row_to_model, pagina.itens) if ci is not None]
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao paginar CIs de Pagamento: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_versao_documento(self, id: int) -> str | None:
+        """Versão (hash) dos dados impressos da CI, incluindo os da AOCS vinculada."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            sql = f"""
+                SELECT md5(concat_ws('|', ci::text, ag::text, ({SQL_VERSAO_DOCUMENTO_AOCS.format(id_aocs='ci.id_aocs')})))
+                FROM ci_pagamento ci
+                LEFT JOIN agentesresponsaveis ag ON ag.id = ci.id_solicitante
+                WHERE ci.id = %s
+            """
+            cursor.execute(sql, (id,))
+            data = cursor.fetchone()
+            return data[0] if data else None
+        except (Exception, psycopg2.DatabaseError) as error:
+             logger.exception(f"Erro inesperado ao calcular versão do documento da CI ID {id}: {error}")
+             return None
+        finally:
+            if cursor: cursor.close()
+
     def update(self, id: int, ci_req: CiPagamentoUpdateRequest) -> CiPagamento | None:
         cursor = None
         fields_to_update = []
@@ -211,6 +332,7 @@ class CiPagamentoRepository:
             cursor.execute(sql, params)
             updated_data = cursor.fetchone()
             self.db_conn.commit()
+            document_cache.invalidar("ci", id)
 
             updated_ci = self._map_row_to_model(updated_data)
             if updated_ci:
@@ -244,6 +366,7 @@ class CiPagamentoRepository:
             cursor.execute(sql, (id,))
             rowcount = cursor.rowcount
             self.db_conn.commit()
+            document_cache.invalidar("ci", id)
 
             if rowcount > 0:
                 logger.info(f"CI Pagamento ID {id} ('{ci_para_deletar.numero_ci}') deletada.")
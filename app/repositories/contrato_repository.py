@@ -1,8 +1,10 @@
 import psycopg2
 from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
-from datetime import date
+from datetime import date, datetime
 import logging
+from typing import Iterator
+from app.core import mapeamento, paginacao, sincronizacao
 from app.models.contrato_model import Contrato
 from app.models.fornecedor_vo import Fornecedor
 from app.schemas.contrato_schema import ContratoCreateRequest, ContratoUpdateRequest
@@ -14,6 +16,14 @@ from .processo_licitatorio_repository import ProcessoLicitatorioRepository
 
 logger = logging.getLogger(__name__)
 
+CAMPOS_CONTRATO = {
+    **mapeamento.campos_simples(
+        "id", "id_categoria", "numero_contrato", "data_inicio", "data_fim", "data_criacao", "ativo",
+        "id_instrumento_contratual", "id_modalidade", "id_numero_modalidade", "id_processo_licitatorio",
+    ),
+    "fornecedor": mapeamento.Campo("fornecedor", "cpf_cnpj", "email", "telefone", montar=Fornecedor),
+}
+
 class ContratoRepository: 
     def __init__(self, db_conn: connection):
         self.db_conn = db_conn
@@ -162,6 +172,64 @@ class ContratoRepository:
         finally:
             if cursor: cursor.close()
 
+    def get_pagina(self, mostrar_inativos: bool = False, limite: int = paginacao.LIMITE_PADRAO,
+                   after: str | None = None, before: str | None = None, com_total: bool = False,
+                   campos: tuple[str, ...] | None = None) -> paginacao.Pagina:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            sql = "SELECT * FROM contratos"
+            if not mostrar_inativos:
+                sql += " WHERE ativo = TRUE"
+            colunas = mapeamento.colunas_dos_campos(CAMPOS_CONTRATO, campos) if campos else None
+            pagina = paginacao.consultar(cursor, sql, [], ["-data_fim", "numero_contrato"], limite, after, before,
+                                         contexto=mostrar_inativos, com_total=com_total, colunas=colunas)
+            if campos:
+                pagina.itens = mapeamento.mapear_parcial(cursor, pagina.itens, Contrato, CAMPOS_CONTRATO, campos)
+            else:
+                pagina.itens = [c for c in map(self._map_row_to_model, pagina.itens) if c is not None]
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao paginar Contratos (Inativos: {mostrar_inativos}): {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_by_ids(self, ids: list[int]) -> list[Contrato]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT * FROM contratos WHERE id = ANY(%s)", (list(ids),))
+            return [c for c in map(self._map_row_to_model, cursor.fetchall()) if c is not None]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao buscar Contratos por IDs: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_alteracoes(self, since: datetime | None = None, cursor: str | None = None,
+                       limite: int = paginacao.LIMITE_PADRAO) -> sincronizacao.Alteracoes:
+        return sincronizacao.consultar(self.db_conn, "contratos", self.get_by_ids, since, cursor, limite)
+
+    def iterar(self, mostrar_inativos: bool = False) -> Iterator[Contrato]:
+        """Mesmo filtro e ordem de get_pagina, sem limite, lidos em lotes (exportação NDJSON)."""
+        sql = "SELECT * FROM contratos"
+        if not mostrar_inativos:
+            sql += " WHERE ativo = TRUE"
+        sql += " ORDER BY data_fim DESC, numero_contrato"
+        try:
+            with mapeamento.cursor_nomeado(self.db_conn, DictCursor) as cursor:
+                cursor.execute(sql)
+                for row in cursor:
+                    contrato = self._map_row_to_model(row)
+                    if contrato is not None:
+                        yield contrato
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao exportar Contratos (Inativos: {mostrar_inativos}): {error}")
+            raise
+
     def update(self, id: int, contrato_req: ContratoUpdateRequest) -> Contrato | None:
         cursor = None
         fields_to_update = []
@@ -145,46 +145,27 @@ class DotacaoRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, info_orcamentaria: str) -> Dotacao:
-        try:
-            dotacao = self.get_by_info_orcamentaria(info_orcamentaria) 
-            if dotacao:
-                return dotacao
-        except Exception:
-             logger.exception(f"Erro ao buscar dotação '{info_orcamentaria}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO dotacao (info_orcamentaria) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO dotacao (info_orcamentaria) VALUES (%s)
+                ON CONFLICT (info_orcamentaria) DO UPDATE SET info_orcamentaria = EXCLUDED.info_orcamentaria
+                RETURNING *
+            """
             cursor.execute(sql, (info_orcamentaria,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_dotacao = self._map_row_to_model(new_data)
-            if not new_dotacao:
-                 log_message = f"Falha ao mapear dotação '{info_orcamentaria}' recém-criada em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Dotação '{info_orcamentaria}' não encontrada/erro na busca, criada nova com ID {new_dotacao.id}.")
-            return new_dotacao
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar dotação '{info_orcamentaria}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            dotacao_existente = self.get_by_info_orcamentaria(info_orcamentaria) 
-            if dotacao_existente:
-                return dotacao_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar dotação '{info_orcamentaria}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear dotação '{info_orcamentaria}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para dotação '{info_orcamentaria}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para dotação '{info_orcamentaria}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
@@ -0,0 +1,264 @@
+import psycopg2
+from psycopg2.extensions import connection
+from psycopg2.extras import DictCursor
+from datetime import date
+from decimal import Decimal
+import logging
+from app.core import utils
+
+logger = logging.getLogger(__name__)
+
+class ImpressaoRepository:
+    """Consultas em conjunto (= ANY) para montar vários documentos de AOCS ou CI de uma vez."""
+
+    def __init__(self, db_conn: connection):
+        self.db_conn = db_conn
+
+    def buscar_ids_aocs(self, numeros_aocs: list[str] | None = None, data_inicio: date | None = None,
+                        data_fim: date | None = None, unidade_requisitante_nome: str | None = None,
+                        status_entrega: str | None = None, limite: int = 500) -> list[int]:
+        cursor = None
+        filtros = []
+        params = []
+
+        if numeros_aocs:
+            filtros.append("a.numero_aocs = ANY(%s)")
+            params.append(numeros_aocs)
+        if data_inicio:
+            filtros.append("a.data_criacao >= %s")
+            params.append(data_inicio)
+        if data_fim:
+            filtros.append("a.data_criacao <= %s")
+            params.append(data_fim)
+        if unidade_requisitante_nome:
+            filtros.append("u.nome = %s")
+            params.append(unidade_requisitante_nome)
+        if status_entrega:
+            filtros.append("EXISTS (SELECT 1 FROM pedidos p WHERE p.id_aocs = a.id AND p.status_entrega = %s)")
+            params.append(status_entrega)
+
+        where_clause = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        params.append(limite)
+
+        try:
+            cursor = self.db_conn.cursor()
+            sql = f"""
+                SELECT a.id
+                FROM aocs a
+                LEFT JOIN unidadesrequisitantes u ON u.id = a.id_unidade_requisitante
+                {where_clause}
+                ORDER BY a.data_criacao, a.numero_aocs
+                LIMIT %s
+            """
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao filtrar AOCS para impressão em lote: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_documentos_aocs(self, ids_aocs: list[int]) -> list[dict]:
+        """
+        Monta o contexto de impressão (mesmo formato de imprimir_aocs) para todas as AOCS
+        com duas consultas, independentemente da quantidade.
+        """
+        if not ids_aocs:
+            return []
+
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("""
+                SELECT a.id, a.numero_aocs, a.justificativa, a.data_criacao,
+                       u.nome AS unidade_requisitante, l.descricao AS local_entrega,
+                       ag.nome AS agente_responsavel, d.info_orcamentaria
+                FROM aocs a
+                LEFT JOIN unidadesrequisitantes u ON u.id = a.id_unidade_requisitante
+                LEFT JOIN locaisentrega l ON l.id = a.id_local_entrega
+                LEFT JOIN agentesresponsaveis ag ON ag.id = a.id_agente_responsavel
+                LEFT JOIN dotacao d ON d.id = a.id_dotacao
+                WHERE a.id = ANY(%s)
+                ORDER BY a.data_criacao, a.numero_aocs
+            """, (list(ids_aocs),))
+            cabecalhos = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT p.id_aocs, p.quantidade_pedida,
+                       ic.numero_item, ic.descricao, ic.unidade_medida, ic.valor_unitario,
+                       c.numero_contrato, c.fornecedor, c.cpf_cnpj, ins.nome AS instrumento
+                FROM pedidos p
+                JOIN itenscontrato ic ON ic.id = p.id_item_contrato
+                JOIN contratos c ON c.id = ic.id_contrato
+                LEFT JOIN instrumentocontratual ins ON ins.id = c.id_instrumento_contratual
+                WHERE p.id_aocs = ANY(%s)
+                ORDER BY p.id_aocs, p.id
+            """, (list(ids_aocs),))
+            linhas_itens = cursor.fetchall()
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao carregar AOCS para impressão em lote: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+        itens_por_aocs: dict[int, list] = {}
+        for linha in linhas_itens:
+            itens_por_aocs.setdefault(linha['id_aocs'], []).append(linha)
+
+        documentos = []
+        for cab in cabecalhos:
+            linhas = itens_por_aocs.get(cab['id'], [])
+            itens = []
+            total_geral = Decimal('0.0')
+            for linha in linhas:
+                subtotal = linha['quantidade_pedida'] * linha['valor_unitario']
+                total_geral += subtotal
+                itens.append({
+                    "numero_item_contrato": linha['numero_item'],
+                    "descricao": linha['descricao'],
+                    "unidade_medida": linha['unidade_medida'],
+                    "quantidade_pedida": linha['quantidade_pedida'],
+                    "valor_unitario": linha['valor_unitario'],
+                    "subtotal": subtotal
+                })
+
+            # Assim como na impressão individual, o contrato é o do primeiro pedido
+            nome_instrumento = nome_fornecedor = cnpj_fornecedor = "N/D"
+            if linhas:
+                primeiro = linhas[0]
+                nome_fornecedor = primeiro['fornecedor']
+                cnpj_fornecedor = primeiro['cpf_cnpj']
+                if primeiro['instrumento']:
+                    nome_instrumento = f"{primeiro['instrumento']} Nº {primeiro['numero_contrato']}"
+                else:
+                    nome_instrumento = f"Contrato Nº {primeiro['numero_contrato']}"
+
+            data_doc = cab['data_criacao'] or date.today()
+            documentos.append({
+                "aocs": {
+                    "numero_aocs": cab['numero_aocs'],
+                    "unidade_requisitante": cab['unidade_requisitante'] or "N/D",
+                    "justificativa": cab['justificativa'],
+                    "instrumento_contratual": nome_instrumento,
+                    "fornecedor": nome_fornecedor,
+                    "cnpj": cnpj_fornecedor,
+                    "info_orcamentaria": cab['info_orcamentaria'] or "N/D",
+                    "local_entrega": cab['local_entrega'] or "N/D",
+                    "local_data": f"Braúnas/MG, {data_doc.strftime('%d/%m/%Y')}",
+                    "agente_responsavel": cab['agente_responsavel'] or "Responsável"
+                },
+                "itens": itens,
+                "total_geral": total_geral
+            })
+        return documentos
+
+    def buscar_ids_ci(self, numeros_ci: list[str] | None = None, numeros_aocs: list[str] | None = None,
+                      data_inicio: date | None = None, data_fim: date | None = None,
+                      unidade_requisitante_nome: str | None = None, limite: int = 500) -> list[int]:
+        cursor = None
+        filtros = []
+        params = []
+
+        if numeros_ci:
+            filtros.append("ci.numero_ci = ANY(%s)")
+            params.append(numeros_ci)
+        if numeros_aocs:
+            filtros.append("a.numero_aocs = ANY(%s)")
+            params.append(numeros_aocs)
+        if data_inicio:
+            filtros.append("ci.data_ci >= %s")
+            params.append(data_inicio)
+        if data_fim:
+            filtros.append("ci.data_ci <= %s")
+            params.append(data_fim)
+        if unidade_requisitante_nome:
+            filtros.append("u.nome = %s")
+            params.append(unidade_requisitante_nome)
+
+        where_clause = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        params.append(limite)
+
+        try:
+            cursor = self.db_conn.cursor()
+            sql = f"""
+                SELECT ci.id
+                FROM ci_pagamento ci
+                JOIN aocs a ON a.id = ci.id_aocs
+                LEFT JOIN unidadesrequisitantes u ON u.id = a.id_unidade_requisitante
+                {where_clause}
+                ORDER BY ci.data_ci, ci.numero_ci
+                LIMIT %s
+            """
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao filtrar CIs para impressão em lote: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_documentos_ci(self, ids_ci: list[int]) -> list[dict]:
+        """
+        Monta o contexto de impressão (mesmo formato de imprimir_ci) para todas as CIs
+        com uma única consulta, independentemente da quantidade.
+        """
+        if not ids_ci:
+            return []
+
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            # O fornecedor é o do contrato do primeiro pedido da AOCS, como na impressão individual
+            cursor.execute("""
+                SELECT ci.numero_ci, ci.data_ci, ci.numero_nota_fiscal, ci.data_nota_fiscal,
+                       ci.valor_nota_fiscal, ci.observacoes_pagamento, a.justificativa,
+                       u.nome AS secretaria, sol.nome AS solicitante, ag.nome AS agente_responsavel,
+                       forn.fornecedor, forn.cpf_cnpj
+                FROM ci_pagamento ci
+                JOIN aocs a ON a.id = ci.id_aocs
+                LEFT JOIN unidadesrequisitantes u ON u.id = a.id_unidade_requisitante
+                LEFT JOIN agentesresponsaveis sol ON sol.id = ci.id_solicitante
+                LEFT JOIN agentesresponsaveis ag ON ag.id = a.id_agente_responsavel
+                LEFT JOIN LATERAL (
+                    SELECT c.fornecedor, c.cpf_cnpj
+                    FROM pedidos p
+                    JOIN itenscontrato ic ON ic.id = p.id_item_contrato
+                    JOIN contratos c ON c.id = ic.id_contrato
+                    WHERE p.id_aocs = a.id
+                    ORDER BY p.id
+                    LIMIT 1
+                ) forn ON TRUE
+                WHERE ci.id = ANY(%s)
+                ORDER BY ci.data_ci, ci.numero_ci
+            """, (list(ids_ci),))
+            linhas = cursor.fetchall()
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao carregar CIs para impressão em lote: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+        documentos = []
+        for linha in linhas:
+            # Solicitante gravado na CI primeiro, com o responsável da AOCS como fallback
+            if linha['solicitante']:
+                nome_solicitante = linha['solicitante']
+            else:
+                nome_solicitante = linha['agente_responsavel'] or "Responsável"
+
+            documentos.append({
+                "numero_ci": linha['numero_ci'],
+                "secretaria": linha['secretaria'] or "Secretaria Municipal",
+                "data_ci": linha['data_ci'].strftime('%d/%m/%Y') if linha['data_ci'] else "N/D",
+                "ilmo_sr": "Secretário de Finanças",
+                "valor_nf": linha['valor_nota_fiscal'],
+                "valor_por_extenso": utils.valor_por_extenso(linha['valor_nota_fiscal']),
+                "numero_nf": linha['numero_nota_fiscal'],
+                "data_nf": linha['data_nota_fiscal'].strftime('%d/%m/%Y') if linha['data_nota_fiscal'] else "N/D",
+                "fornecedor": linha['fornecedor'] or "N/D",
+                "cnpj": linha['cpf_cnpj'] or "N/D",
+                "referencia": linha['observacoes_pagamento'] if linha['observacoes_pagamento'] else linha['justificativa'],
+                "observacoes": linha['observacoes_pagamento'],
+                "solicitante": nome_solicitante,
+            })
+        return documentos
@@ -149,46 +149,27 @@ class InstrumentoRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, nome: str) -> Instrumento:
-        try:
-            instrumento = self.get_by_nome(nome)
-            if instrumento:
-                return instrumento
-        except Exception:
-             logger.exception(f"Erro ao buscar instrumento '{nome}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO instrumentocontratual (nome) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO instrumentocontratual (nome) VALUES (%s)
+                ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+                RETURNING *
+            """
             cursor.execute(sql, (nome,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_instrumento = self._map_row_to_model(new_data)
-            if not new_instrumento:
-                 log_message = f"Falha ao mapear instrumento '{nome}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Instrumento '{nome}' não encontrado/erro na busca, criado novo com ID {new_instrumento.id}.")
-            return new_instrumento
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar instrumento '{nome}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            instrumento_existente = self.get_by_nome(nome)
-            if instrumento_existente:
-                return instrumento_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar instrumento '{nome}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear instrumento '{nome}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para instrumento '{nome}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para instrumento '{nome}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
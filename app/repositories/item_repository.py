@@ -2,6 +2,9 @@ import psycopg2
 from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
 import logging
+from datetime import datetime
+from typing import Iterator
+from app.core import busca as busca_itens, mapeamento, paginacao, sincronizacao
 from app.models.descricao_item_vo import DescricaoItem 
 from app.models.item_model import Item 
 from app.schemas.item_schema import ItemRequest 
@@ -9,6 +12,28 @@ from .contrato_repository import ContratoRepository
 
 logger = logging.getLogger(__name__)
 
+# sort_by aceito nas listas de itens com saldo -> coluna do resultado
+COLUNAS_ORDENAVEIS_SALDO = {
+    "descricao": "descricao",
+    "contrato": "numero_contrato",
+    "saldo": "saldo",
+    "valor": "valor_unitario",
+    "valor_unitario": "valor_unitario",
+    "numero_item": "numero_item",
+}
+
+# Listagens: mapeamento por posição (app/core/mapeamento.py), na ordem de _item_de_valores()
+COLUNAS_ITEM = ("id", "id_contrato", "numero_item", "descricao", "unidade_medida", "quantidade",
+                "valor_unitario", "ativo", "marca")
+
+# 'descricao' é a coluna embrulhada no DescricaoItem, como em _item_de_valores
+CAMPOS_ITEM = {**mapeamento.campos_simples(*COLUNAS_ITEM), "descricao": mapeamento.Campo("descricao", montar=DescricaoItem)}
+
+def _item_de_valores(id, id_contrato, numero_item, descricao, unidade_medida, quantidade,
+                     valor_unitario, ativo, marca) -> Item:
+    return Item(id, id_contrato, numero_item, DescricaoItem(descricao), unidade_medida, quantidade,
+                valor_unitario, ativo, marca)
+
 class ItemRepository: 
     def __init__(self, db_conn: connection):
         self.db_conn = db_conn
@@ -101,15 +126,11 @@ class ItemRepository:
 
     def get_by_contrato_id(self, id_contrato: int) -> list[Item]:
         cursor = None
-        items_list = []
         try:
-            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
             sql = "SELECT * FROM itenscontrato WHERE id_contrato = %s ORDER BY numero_item"
             cursor.execute(sql, (id_contrato,))
-            all_data = cursor.fetchall()
-            items_list = [self._map_row_to_model(row) for row in all_data if row]
-            items_list = [item for item in items_list if item is not None]
-            return items_list
+            return mapeamento.mapear(cursor, cursor.fetchall(), _item_de_valores, COLUNAS_ITEM)
         except (Exception, psycopg2.DatabaseError) as error:
              logger.exception(f"Erro inesperado ao listar Itens para Contrato ID {id_contrato}: {error}")
              return []
@@ -132,24 +153,146 @@ class ItemRepository:
 
     def get_all(self, mostrar_inativos: bool = False) -> list[Item]:
         cursor = None
-        items_list = []
         try:
-            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
             sql = "SELECT * FROM itenscontrato"
             if not mostrar_inativos:
                 sql += " WHERE ativo = TRUE"
             sql += " ORDER BY id_contrato, numero_item" 
             cursor.execute(sql)
-            all_data = cursor.fetchall()
-            items_list = [self._map_row_to_model(row) for row in all_data if row]
-            items_list = [item for item in items_list if item is not None]
-            return items_list
+            return mapeamento.mapear(cursor, cursor.fetchall(), _item_de_valores, COLUNAS_ITEM)
         except (Exception, psycopg2.DatabaseError) as error:
              logger.exception(f"Erro inesperado ao listar todos os Itens (Inativos: {mostrar_inativos}): {error}")
              return []
         finally:
             if cursor: cursor.close()
 
+    def get_pagina(self, mostrar_inativos: bool = False, id_contrato: int | None = None,
+                   limite: int = paginacao.LIMITE_PADRAO, after: str | None = None, before: str | None = None,
+                   com_total: bool = False, campos: tuple[str, ...] | None = None) -> paginacao.Pagina:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
+            condicoes, params = [], []
+            if not mostrar_inativos:
+                condicoes.append("ativo = TRUE")
+            if id_contrato is not None:
+                condicoes.append("id_contrato = %s")
+                params.append(id_contrato)
+            sql = "SELECT * FROM itenscontrato" + (" WHERE " + " AND ".join(condicoes) if condicoes else "")
+            # (id_contrato, numero_item) é único e indexado (constraint UNIQUE)
+            colunas = mapeamento.colunas_dos_campos(CAMPOS_ITEM, campos) if campos else None
+            pagina = paginacao.consultar(cursor, sql, params, ["id_contrato", "numero_item"], limite, after, before,
+                                         contexto=[mostrar_inativos, id_contrato], com_total=com_total,
+                                         colunas=colunas)
+            if campos:
+                pagina.itens = mapeamento.mapear_parcial(cursor, pagina.itens, Item, CAMPOS_ITEM, campos)
+            else:
+                pagina.itens = mapeamento.mapear(cursor, pagina.itens, _item_de_valores, COLUNAS_ITEM)
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao paginar Itens (Inativos: {mostrar_inativos}, Contrato ID: {id_contrato}): {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_by_ids(self, ids: list[int]) -> list[Item]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
+            cursor.execute("SELECT * FROM itenscontrato WHERE id = ANY(%s)", (list(ids),))
+            return mapeamento.mapear(cursor, cursor.fetchall(), _item_de_valores, COLUNAS_ITEM)
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao buscar Itens por IDs: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_alteracoes(self, since: datetime | None = None, cursor: str | None = None,
+                       limite: int = paginacao.LIMITE_PADRAO) -> sincronizacao.Alteracoes:
+        return sincronizacao.consultar(self.db_conn, "itenscontrato", self.get_by_ids, since, cursor, limite)
+
+    def iterar(self, mostrar_inativos: bool = False, id_contrato: int | None = None) -> Iterator[Item]:
+        """Mesmos filtros e ordem de get_pagina, sem limite, lidos em lotes (exportação NDJSON)."""
+        condicoes, params = [], []
+        if not mostrar_inativos:
+            condicoes.append("ativo = TRUE")
+        if id_contrato is not None:
+            condicoes.append("id_contrato = %s")
+            params.append(id_contrato)
+        sql = "SELECT * FROM itenscontrato" + (" WHERE " + " AND ".join(condicoes) if condicoes else "")
+        sql += " ORDER BY id_contrato, numero_item"
+        try:
+            yield from mapeamento.iterar(self.db_conn, sql, params, _item_de_valores, COLUNAS_ITEM)
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao exportar Itens (Inativos: {mostrar_inativos}, Contrato ID: {id_contrato}): {error}")
+            raise
+
+    def get_com_saldo_por_categoria(self, id_categoria: int, busca: str | None = None, sort_by: str = "descricao",
+                                    order: str = "asc", limite: int = 10, after: str | None = None,
+                                    before: str | None = None, com_total: bool = False) -> paginacao.Pagina:
+        """
+        Itens ativos (de contratos ativos) da categoria, com total pedido e saldo, paginados por
+        cursor. sort_by 'relevancia' só vale com busca. Itens da página como dicts.
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            where_clause = "WHERE c.id_categoria = %s AND c.ativo = TRUE AND ic.ativo = TRUE"
+            where_params = [id_categoria]
+            if busca:
+                # Sem acentos/maiúsculas, pela coluna normalizada (índice trigram)
+                filtro_sql, filtro_params = busca_itens.filtro("ic.descricao_busca", busca)
+                where_clause += filtro_sql
+                where_params.extend(filtro_params)
+
+            colunas_relevancia, select_params = "", []
+            if sort_by == "relevancia" and busca:
+                colunas_relevancia, select_params, chaves = busca_itens.colunas_relevancia(
+                    self.db_conn, "ic.descricao_busca", busca)
+                chaves = chaves + ["id"]
+            else:
+                coluna = COLUNAS_ORDENAVEIS_SALDO.get(sort_by, "descricao")
+                sinal = "-" if order == "desc" else ""
+                chaves = [sinal + coluna, sinal + "id"]
+
+            sql = f"""
+                SELECT
+                    ic.*,
+                    c.id AS id_contrato,
+                    c.numero_contrato,
+                    c.fornecedor,
+                    COALESCE(pedidos_sum.total_pedido, 0) AS total_pedido,
+                    (ic.quantidade - COALESCE(pedidos_sum.total_pedido, 0)) AS saldo
+                    {colunas_relevancia}
+                FROM itenscontrato ic
+                JOIN contratos c ON ic.id_contrato = c.id
+                LEFT JOIN (
+                    SELECT id_item_contrato, SUM(quantidade_pedida) as total_pedido
+                    FROM pedidos GROUP BY id_item_contrato
+                ) AS pedidos_sum ON ic.id = pedidos_sum.id_item_contrato
+                {where_clause}
+            """
+            pagina = paginacao.consultar(cursor, sql, select_params + where_params, chaves, limite, after, before,
+                                         contexto=[id_categoria, busca], com_total=com_total)
+            itens = []
+            for row in pagina.itens:
+                item = dict(row)
+                for coluna in ("descricao_busca", "relevancia", "relevancia_tamanho"):
+                    item.pop(coluna, None)
+                itens.append(item)
+            pagina.itens = itens
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro ao buscar itens com saldo para Categoria ID {id_categoria}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
     def update(self, id: int, item_req: ItemRequest) -> Item | None:
         cursor = None
         item_antigo = self.get_by_id(id) 
@@ -0,0 +1,239 @@
+import psycopg2
+from psycopg2.extensions import connection
+from psycopg2.extras import DictCursor, Json
+import logging
+from app.models.job_model import Job
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDENTE = "pendente"
+STATUS_PROCESSANDO = "processando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+# Canal do LISTEN/NOTIFY que acorda os workers quando um job é enfileirado
+CANAL_JOBS = "jobs_novos"
+
+# As escritas do worker sobre um job reservado só valem enquanto a reserva for dele: o job
+# continua 'processando' e 'tentativas' é o valor que reservar_proximo devolveu. Se liberar_travados
+# devolveu o job à fila (e outro worker o pegou), o worker antigo não altera mais a linha.
+FILTRO_RESERVA = f"id = %s AND status = '{STATUS_PROCESSANDO}' AND tentativas = %s"
+
+class JobRepository:
+    def __init__(self, db_conn: connection):
+        self.db_conn = db_conn
+
+    def _map_row_to_model(self, row: DictCursor | None) -> Job | None:
+        if not row:
+            return None
+        try:
+            return Job(
+                id=row['id'],
+                tipo=row['tipo'],
+                parametros=row['parametros'],
+                status=row['status'],
+                progresso=row['progresso'],
+                tentativas=row['tentativas'],
+                max_tentativas=row['max_tentativas'],
+                executar_apos=row['executar_apos'],
+                criado_em=row['criado_em'],
+                mensagem=row.get('mensagem'),
+                artefato=row.get('artefato'),
+                erro=row.get('erro'),
+                criado_por=row.get('criado_por'),
+                iniciado_em=row.get('iniciado_em'),
+                concluido_em=row.get('concluido_em'),
+                heartbeat_em=row.get('heartbeat_em')
+            )
+        except KeyError as e:
+            logger.error(f"Erro de mapeamento Job: Coluna '{e}' não encontrada.")
+            return None
+
+    def create(self, tipo: str, parametros: dict, criado_por: str | None = None, max_tentativas: int = 3) -> Job:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            sql = """
+                INSERT INTO jobs (tipo, parametros, criado_por, max_tentativas)
+                VALUES (%s, %s, %s, %s)
+                RETURNING *
+            """
+            cursor.execute(sql, (tipo, Json(parametros), criado_por, max_tentativas))
+            new_data = cursor.fetchone()
+            cursor.execute(f"NOTIFY {CANAL_JOBS}")
+            self.db_conn.commit()
+
+            new_job = self._map_row_to_model(new_data)
+            logger.info(f"Job '{tipo}' enfileirado com ID {new_job.id}.")
+            return new_job
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao enfileirar job '{tipo}': {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_by_id(self, id: int) -> Job | None:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT * FROM jobs WHERE id = %s", (id,))
+            return self._map_row_to_model(cursor.fetchone())
+        except (Exception, psycopg2.DatabaseError) as error:
+             logger.exception(f"Erro inesperado ao buscar Job por ID ({id}): {error}")
+             return None
+        finally:
+            if cursor: cursor.close()
+
+    def reservar_proximo(self) -> Job | None:
+        """
+        Marca o próximo job pendente como 'processando' e o devolve.
+        SKIP LOCKED permite vários workers disputando a fila sem se bloquear.
+        O 'tentativas' do job devolvido identifica a reserva nas escritas seguintes.
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            sql = """
+                UPDATE jobs SET status = %s, tentativas = tentativas + 1,
+                                iniciado_em = now(), heartbeat_em = now(), erro = NULL
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = %s AND executar_apos <= now()
+                    ORDER BY executar_apos, id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING *
+            """
+            cursor.execute(sql, (STATUS_PROCESSANDO, STATUS_PENDENTE))
+            data = cursor.fetchone()
+            self.db_conn.commit()
+            return self._map_row_to_model(data)
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao reservar próximo job: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def atualizar_progresso(self, id: int, tentativa: int, progresso: int, mensagem: str | None = None) -> bool:
+        """Retorna False quando a reserva (id, tentativa) não vale mais."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(
+                f"UPDATE jobs SET progresso = %s, mensagem = COALESCE(%s, mensagem), heartbeat_em = now() WHERE {FILTRO_RESERVA}",
+                (max(0, min(100, int(progresso))), mensagem, id, tentativa)
+            )
+            atualizado = cursor.rowcount == 1
+            self.db_conn.commit()
+            return atualizado
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao atualizar progresso do Job ID {id}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def registrar_heartbeat(self, id: int, tentativa: int) -> bool:
+        """O worker continua trabalhando no job (sem progresso novo a reportar). False: reserva perdida."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(f"UPDATE jobs SET heartbeat_em = now() WHERE {FILTRO_RESERVA}", (id, tentativa))
+            atualizado = cursor.rowcount == 1
+            self.db_conn.commit()
+            return atualizado
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao registrar heartbeat do Job ID {id}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def concluir(self, id: int, tentativa: int, artefato: str | None = None) -> bool:
+        """Retorna False (sem alterar o job) quando a reserva (id, tentativa) não vale mais."""
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(
+                f"""UPDATE jobs SET status = %s, progresso = 100, artefato = %s, concluido_em = now()
+                    WHERE {FILTRO_RESERVA}""",
+                (STATUS_CONCLUIDO, artefato, id, tentativa)
+            )
+            concluido = cursor.rowcount == 1
+            self.db_conn.commit()
+            if concluido:
+                logger.info(f"Job ID {id} concluído.")
+            else:
+                logger.warning(f"Job ID {id} não foi concluído: a reserva da tentativa {tentativa} não vale mais.")
+            return concluido
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao concluir Job ID {id}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def falhar(self, id: int, tentativa: int, erro: str, atraso_segundos: int = 30) -> str | None:
+        """
+        Registra a falha. Enquanto houver tentativas o job volta para a fila
+        com atraso crescente; depois disso fica com status 'erro'. Retorna o novo status,
+        ou None (sem alterar o job) quando a reserva (id, tentativa) não vale mais.
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            sql = f"""
+                UPDATE jobs SET
+                    erro = %s,
+                    status = CASE WHEN tentativas < max_tentativas THEN %s ELSE %s END,
+                    executar_apos = now() + make_interval(secs => %s * tentativas),
+                    concluido_em = CASE WHEN tentativas < max_tentativas THEN NULL ELSE now() END
+                WHERE {FILTRO_RESERVA}
+                RETURNING status
+            """
+            cursor.execute(sql, (erro, STATUS_PENDENTE, STATUS_ERRO, atraso_segundos, id, tentativa))
+            data = cursor.fetchone()
+            self.db_conn.commit()
+            if not data:
+                logger.warning(f"Falha do Job ID {id} descartada ({erro}): a reserva da tentativa {tentativa} não vale mais.")
+                return None
+            novo_status = data[0]
+            logger.warning(f"Job ID {id} falhou ({erro}); novo status: '{novo_status}'.")
+            return novo_status
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao registrar falha do Job ID {id}: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def liberar_travados(self, limite_heartbeat_segundos: int) -> int:
+        """
+        Devolve à fila (ou encerra, sem tentativas) jobs 'processando' sem heartbeat há mais de
+        'limite_heartbeat_segundos': o worker morreu no meio. O tempo total de execução não conta.
+        """
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(
+                """UPDATE jobs SET
+                       status = CASE WHEN tentativas < max_tentativas THEN %s ELSE %s END,
+                       erro = 'Worker interrompido durante a execução.',
+                       concluido_em = CASE WHEN tentativas < max_tentativas THEN NULL ELSE now() END
+                   WHERE status = %s AND COALESCE(heartbeat_em, iniciado_em) < now() - make_interval(secs => %s)""",
+                (STATUS_PENDENTE, STATUS_ERRO, STATUS_PROCESSANDO, limite_heartbeat_segundos)
+            )
+            rowcount = cursor.rowcount
+            self.db_conn.commit()
+            if rowcount:
+                logger.warning(f"{rowcount} job(s) travado(s) devolvido(s) à fila.")
+            return rowcount
+        except (Exception, psycopg2.DatabaseError) as error:
+            if self.db_conn: self.db_conn.rollback()
+            logger.exception(f"Erro inesperado ao liberar jobs travados: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
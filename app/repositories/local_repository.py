@@ -148,46 +148,27 @@ class LocalRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, descricao: str) -> Local:
-        try:
-            local_obj = self.get_by_descricao(descricao)
-            if local_obj:
-                return local_obj
-        except Exception:
-             logger.exception(f"Erro ao buscar local '{descricao}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO locaisentrega (descricao) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO locaisentrega (descricao) VALUES (%s)
+                ON CONFLICT (descricao) DO UPDATE SET descricao = EXCLUDED.descricao
+                RETURNING *
+            """
             cursor.execute(sql, (descricao,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_local = self._map_row_to_model(new_data)
-            if not new_local:
-                 log_message = f"Falha ao mapear local '{descricao}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Local '{descricao}' não encontrado/erro na busca, criado novo com ID {new_local.id}.")
-            return new_local
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar local '{descricao}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            local_existente = self.get_by_descricao(descricao) 
-            if local_existente:
-                return local_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar local '{descricao}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear local '{descricao}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para local '{descricao}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para local '{descricao}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
@@ -148,46 +148,27 @@ class ModalidadeRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, nome: str) -> Modalidade:
-        try:
-            modalidade = self.get_by_nome(nome)
-            if modalidade:
-                return modalidade
-        except Exception:
-             logger.exception(f"Erro ao buscar modalidade '{nome}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO modalidade (nome) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO modalidade (nome) VALUES (%s)
+                ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+                RETURNING *
+            """
             cursor.execute(sql, (nome,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_modalidade = self._map_row_to_model(new_data)
-            if not new_modalidade:
-                 log_message = f"Falha ao mapear modalidade '{nome}' recém-criada em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Modalidade '{nome}' não encontrada/erro na busca, criada nova com ID {new_modalidade.id}.")
-            return new_modalidade
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar modalidade '{nome}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            modalidade_existente = self.get_by_nome(nome)
-            if modalidade_existente:
-                return modalidade_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar modalidade '{nome}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear modalidade '{nome}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para modalidade '{nome}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para modalidade '{nome}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
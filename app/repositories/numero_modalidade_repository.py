@@ -148,46 +148,27 @@ class NumeroModalidadeRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, numero_ano: str) -> NumeroModalidade:
-        try:
-            num_mod = self.get_by_numero_ano(numero_ano) 
-            if num_mod:
-                return num_mod
-        except Exception:
-             logger.exception(f"Erro ao buscar numero_modalidade '{numero_ano}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO numeromodalidade (numero_ano) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO numeromodalidade (numero_ano) VALUES (%s)
+                ON CONFLICT (numero_ano) DO UPDATE SET numero_ano = EXCLUDED.numero_ano
+                RETURNING *
+            """
             cursor.execute(sql, (numero_ano,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_num_mod = self._map_row_to_model(new_data)
-            if not new_num_mod:
-                 log_message = f"Falha ao mapear numero_modalidade '{numero_ano}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"NumeroModalidade '{numero_ano}' não encontrado/erro na busca, criado novo com ID {new_num_mod.id}.")
-            return new_num_mod
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar numero_modalidade '{numero_ano}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            num_mod_existente = self.get_by_numero_ano(numero_ano)
-            if num_mod_existente:
-                return num_mod_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar numero_modalidade '{numero_ano}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear numero_modalidade '{numero_ano}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para numero_modalidade '{numero_ano}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para numero_modalidade '{numero_ano}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
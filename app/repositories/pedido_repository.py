@@ -1,9 +1,11 @@
 import psycopg2
 from psycopg2.extensions import connection
 from psycopg2.extras import DictCursor
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal 
 import logging
+from typing import Iterator
+from app.core import document_cache, mapeamento, paginacao, sincronizacao
 from app.models.pedido_model import Pedido 
 from app.schemas.pedido_schema import PedidoCreateRequest, PedidoUpdateRequest, RegistrarEntregaLoteRequest 
 from .item_repository import ItemRepository 
@@ -11,6 +13,11 @@ from .aocs_repository import AocsRepository
 
 logger = logging.getLogger(__name__)
 
+# Na ordem dos parâmetros de Pedido(): as listagens mapeiam por posição (app/core/mapeamento.py)
+COLUNAS_PEDIDO = ("id", "id_item_contrato", "id_aocs", "quantidade_pedida", "data_pedido",
+                  "status_entrega", "quantidade_entregue")
+CAMPOS_PEDIDO = mapeamento.campos_simples(*COLUNAS_PEDIDO)
+
 class PedidoRepository: 
     def __init__(self, db_conn: connection):
         self.db_conn = db_conn
@@ -112,6 +119,7 @@ class PedidoRepository:
             cursor.execute(sql, params)
             new_data = cursor.fetchone()
             self.db_conn.commit()
+            document_cache.invalidar("aocs", aocs.id)
 
             new_pedido = self._map_row_to_model(new_data)
             if not new_pedido:
@@ -154,9 +162,8 @@ class PedidoRepository:
 
     def get_by_aocs_id(self, id_aocs: int) -> list[Pedido]:
         cursor = None
-        pedidos_list = []
         try:
-            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
             sql = """
                 SELECT p.*, a.data_criacao as data_pedido
                 FROM pedidos p
@@ -165,10 +172,7 @@ class PedidoRepository:
                 ORDER BY p.id -- Ou pelo numero_item se fizer JOIN com itenscontrato
             """
             cursor.execute(sql, (id_aocs,))
-            all_data = cursor.fetchall()
-            pedidos_list = [self._map_row_to_model(row) for row in all_data if row]
-            pedidos_list = [p for p in pedidos_list if p is not None]
-            return pedidos_list
+            return mapeamento.mapear(cursor, cursor.fetchall(), Pedido, COLUNAS_PEDIDO)
         except (Exception, psycopg2.DatabaseError) as error:
              logger.exception(f"Erro inesperado ao listar Pedidos para AOCS ID {id_aocs}: {error}")
              return []
@@ -177,9 +181,8 @@ class PedidoRepository:
 
     def get_all(self) -> list[Pedido]:
         cursor = None
-        pedidos_list = []
         try:
-            cursor = self.db_conn.cursor(cursor_factory=DictCursor)
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
             sql = """
                 SELECT p.*, a.data_criacao as data_pedido
                 FROM pedidos p
@@ -187,16 +190,78 @@ class PedidoRepository:
                 ORDER BY p.id_aocs, p.id
             """
             cursor.execute(sql)
-            all_data = cursor.fetchall()
-            pedidos_list = [self._map_row_to_model(row) for row in all_data if row]
-            pedidos_list = [p for p in pedidos_list if p is not None]
-            return pedidos_list
+            return mapeamento.mapear(cursor, cursor.fetchall(), Pedido, COLUNAS_PEDIDO)
         except (Exception, psycopg2.DatabaseError) as error:
              logger.exception(f"Erro inesperado ao listar todos os Pedidos: {error}")
              return []
         finally:
             if cursor: cursor.close()
 
+    def get_pagina(self, limite: int = paginacao.LIMITE_PADRAO, after: str | None = None,
+                   before: str | None = None, com_total: bool = False,
+                   campos: tuple[str, ...] | None = None) -> paginacao.Pagina:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
+            # Colunas explícitas: com p.* haveria duas 'data_pedido' e a seleção por nome (fields) seria ambígua
+            sql = """
+                SELECT p.id, p.id_item_contrato, p.id_aocs, p.quantidade_pedida, a.data_criacao as data_pedido,
+                       p.status_entrega, p.quantidade_entregue
+                FROM pedidos p
+                JOIN aocs a ON p.id_aocs = a.id
+            """
+            colunas = mapeamento.colunas_dos_campos(CAMPOS_PEDIDO, campos) if campos else None
+            pagina = paginacao.consultar(cursor, sql, [], ["id_aocs", "id"], limite, after, before,
+                                         com_total=com_total, colunas=colunas)
+            if campos:
+                pagina.itens = mapeamento.mapear_parcial(cursor, pagina.itens, Pedido, CAMPOS_PEDIDO, campos)
+            else:
+                pagina.itens = mapeamento.mapear(cursor, pagina.itens, Pedido, COLUNAS_PEDIDO)
+            return pagina
+        except paginacao.CursorInvalidoError:
+            raise
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao paginar Pedidos: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_by_ids(self, ids: list[int]) -> list[Pedido]:
+        cursor = None
+        try:
+            cursor = self.db_conn.cursor(cursor_factory=mapeamento.CursorTuplas)
+            sql = """
+                SELECT p.*, a.data_criacao as data_pedido
+                FROM pedidos p
+                JOIN aocs a ON p.id_aocs = a.id
+                WHERE p.id = ANY(%s)
+            """
+            cursor.execute(sql, (list(ids),))
+            return mapeamento.mapear(cursor, cursor.fetchall(), Pedido, COLUNAS_PEDIDO)
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao buscar Pedidos por IDs: {error}")
+            raise
+        finally:
+            if cursor: cursor.close()
+
+    def get_alteracoes(self, since: datetime | None = None, cursor: str | None = None,
+                       limite: int = paginacao.LIMITE_PADRAO) -> sincronizacao.Alteracoes:
+        return sincronizacao.consultar(self.db_conn, "pedidos", self.get_by_ids, since, cursor, limite)
+
+    def iterar_todos(self) -> Iterator[Pedido]:
+        """Todos os pedidos, na ordem da listagem, lidos em lotes (exportação NDJSON)."""
+        sql = """
+            SELECT p.*, a.data_criacao as data_pedido
+            FROM pedidos p
+            JOIN aocs a ON p.id_aocs = a.id
+            ORDER BY p.id_aocs, p.id
+        """
+        try:
+            yield from mapeamento.iterar(self.db_conn, sql, [], Pedido, COLUNAS_PEDIDO)
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.exception(f"Erro inesperado ao exportar Pedidos: {error}")
+            raise
+
     def update(self, id: int, pedido_req: PedidoUpdateRequest) -> Pedido | None:
         cursor = None
         fields_to_update = []
@@ -230,6 +295,7 @@ class PedidoRepository:
 
             updated_pedido = self._map_row_to_model(updated_data)
             if updated_pedido:
+                 document_cache.invalidar("aocs", updated_pedido.id_aocs)
                  logger.info(f"Pedido ID {id} atualizado.") 
             else:
                  logger.warning(f"Tentativa de atualizar Pedido ID {id} falhou (não encontrado).")
@@ -258,6 +324,7 @@ class PedidoRepository:
             cursor.execute(sql, (id,))
             rowcount = cursor.rowcount
             self.db_conn.commit()
+            document_cache.invalidar("aocs", pedido_para_deletar.id_aocs)
 
             if rowcount > 0:
                 logger.info(f"Pedido ID {id} (Item ID: {pedido_para_deletar.id_item_contrato}, AOCS ID: {pedido_para_deletar.id_aocs}) deletado e saldo liberado.")
@@ -274,28 +341,17 @@ class PedidoRepository:
         finally:
             if cursor: cursor.close()
             
-    def get_pendentes_paginados(self, page: int = 1, limit: int = 10) -> dict:
+    def get_pendentes_paginados(self, limit: int = 10, after: str | None = None, before: str | None = None,
+                                com_total: bool = False) -> dict:
         """
-        Busca AOCS que possuem itens pendentes (agrupado por AOCS).
+        Busca AOCS que possuem itens pendentes (agrupado por AOCS), das mais antigas para as
+        mais recentes, paginadas por cursor (after/before).
         """
         cursor = None
-        offset = (page - 1) * limit
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            
-            # 1. Contar TOTAL de AOCS Únicas com pendências
-            sql_count = """
-                SELECT COUNT(DISTINCT a.id) as total
-                FROM aocs a
-                JOIN pedidos p ON p.id_aocs = a.id
-                WHERE p.status_entrega NOT IN ('Entregue', 'Cancelado')
-            """
-            cursor.execute(sql_count)
-            total = cursor.fetchone()['total']
 
-            # 2. Buscar Dados das AOCS Únicas
-            # Usamos DISTINCT para garantir que a AOCS apareça só uma vez
-            # Removemos 'p.id' e 'p.status_entrega' do select para permitir o DISTINCT
+            # DISTINCT: a AOCS aparece uma vez por contrato, não uma vez por pedido
             sql_data = """
                 SELECT DISTINCT
                     a.id,
@@ -308,20 +364,23 @@ class PedidoRepository:
                 JOIN itenscontrato ic ON p.id_item_contrato = ic.id
                 JOIN contratos c ON ic.id_contrato = c.id
                 WHERE p.status_entrega NOT IN ('Entregue', 'Cancelado')
-                ORDER BY dias_passados DESC
-                LIMIT %s OFFSET %s
             """
-            cursor.execute(sql_data, (limit, offset))
-            rows = cursor.fetchall()
-            
+            # Mais dias de espera primeiro = data de criação mais antiga primeiro
+            pagina = paginacao.consultar(cursor, sql_data, [], ["data_pedido", "id", "numero_contrato"], limit,
+                                         after, before, com_total=com_total)
+
             return {
-                "itens": [dict(row) for row in rows],
-                "total": total
+                "itens": [dict(row) for row in pagina.itens],
+                "proximo": pagina.proximo,
+                "anterior": pagina.anterior,
+                "total": pagina.total_estimado
             }
-            
+
+        except paginacao.CursorInvalidoError:
+            raise
         except Exception as error:
              logger.exception(f"Erro ao buscar AOCS pendentes: {error}")
-             return {"itens": [], "total": 0}
+             return {"itens": [], "proximo": None, "anterior": None, "total": 0}
         finally:
             if cursor: cursor.close()
     
@@ -334,6 +393,7 @@ class PedidoRepository:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
             
             itens_processados = 0
+            aocs_afetadas = set()
             
             for item_req in dados_lote.itens:
                 # 1. Busca dados atuais do pedido para validar saldo
@@ -364,9 +424,12 @@ class PedidoRepository:
                 """
                 cursor.execute(update_sql, (nova_qtd_entregue, novo_status, item_req.id_pedido))
                 itens_processados += 1
+                aocs_afetadas.add(pedido_atual.id_aocs)
 
             # Se chegou aqui sem erro, comita tudo
             self.db_conn.commit()
+            for id_aocs in aocs_afetadas:
+                document_cache.invalidar("aocs", id_aocs)
             return {"sucesso": True, "qtd_itens": itens_processados}
 
         except Exception as error:
@@ -148,46 +148,27 @@ class ProcessoLicitatorioRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, numero: str) -> ProcessoLicitatorio:
-        try:
-            proc = self.get_by_numero(numero) 
-            if proc:
-                return proc
-        except Exception:
-             logger.exception(f"Erro ao buscar processo licitatório '{numero}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO processoslicitatorios (numero) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO processoslicitatorios (numero) VALUES (%s)
+                ON CONFLICT (numero) DO UPDATE SET numero = EXCLUDED.numero
+                RETURNING *
+            """
             cursor.execute(sql, (numero,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_proc = self._map_row_to_model(new_data)
-            if not new_proc:
-                 log_message = f"Falha ao mapear processo licitatório '{numero}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"Processo Licitatório '{numero}' não encontrado/erro na busca, criado novo com ID {new_proc.id}.")
-            return new_proc
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar processo licitatório '{numero}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            proc_existente = self.get_by_numero(numero) 
-            if proc_existente:
-                return proc_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar processo licitatório '{numero}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear processo licitatório '{numero}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para processo licitatório '{numero}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para processo licitatório '{numero}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
@@ -148,46 +148,27 @@ class TipoDocumentoRepository:
             if cursor: cursor.close()
 
     def get_or_create(self, nome: str) -> TipoDocumento:
-        try:
-            tipo_doc = self.get_by_nome(nome)
-            if tipo_doc:
-                return tipo_doc
-        except Exception:
-             logger.exception(f"Erro ao buscar tipo de documento '{nome}' em get_or_create. Tentando criar...")
-
+        """Um único INSERT ... ON CONFLICT, sem commit: participa da transação de quem chama."""
         cursor = None
         try:
             cursor = self.db_conn.cursor(cursor_factory=DictCursor)
-            sql = "INSERT INTO tipos_documento (nome) VALUES (%s) RETURNING *"
+            # DO UPDATE (sem efeito) em vez de DO NOTHING: assim o RETURNING devolve também a linha existente
+            sql = """
+                INSERT INTO tipos_documento (nome) VALUES (%s)
+                ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+                RETURNING *
+            """
             cursor.execute(sql, (nome,))
-            new_data = cursor.fetchone()
-            self.db_conn.commit()
-            new_tipo_doc = self._map_row_to_model(new_data)
-            if not new_tipo_doc:
-                 log_message = f"Falha ao mapear tipo de documento '{nome}' recém-criado em get_or_create."
-                 logger.error(log_message)
-                 raise Exception(log_message)
-
-            logger.info(f"TipoDocumento '{nome}' não encontrado/erro na busca, criado novo com ID {new_tipo_doc.id}.")
-            return new_tipo_doc
-
-        except psycopg2.IntegrityError:
-            logging.warning(f"IntegrityError ao criar tipo de documento '{nome}' em get_or_create. Já existe. Buscando novamente.")
-            self.db_conn.rollback()
-            if cursor and not cursor.closed: cursor.close()
-
-            tipo_doc_existente = self.get_by_nome(nome)
-            if tipo_doc_existente:
-                return tipo_doc_existente
-            else:
-                log_message = f"Erro INESPERADO ao buscar tipo de documento '{nome}' após conflito de inserção."
-                logger.exception(log_message)
+            registro = self._map_row_to_model(cursor.fetchone())
+            if not registro:
+                log_message = f"Falha ao mapear tipo de documento '{nome}' em get_or_create."
+                logger.error(log_message)
                 raise Exception(log_message)
+            return registro
 
         except (Exception, psycopg2.DatabaseError) as error:
              if self.db_conn: self.db_conn.rollback()
-             logger.exception(f"Erro inesperado na criação do get_or_create para tipo de documento '{nome}': {error}")
+             logger.exception(f"Erro inesperado no get_or_create para tipo de documento '{nome}': {error}")
              raise
         finally:
-            if cursor and not cursor.closed:
-                cursor.close()
\ No newline at end of file
+            if cursor: cursor.close()
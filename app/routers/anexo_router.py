@@ -1,16 +1,20 @@
 import os
-import shutil
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from psycopg2.extensions import connection
 import logging
 
 from app.core.database import get_db
+from app.core import anexo_storage, download, miniaturas, varredura_anexos, zip_stream
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.schemas.anexo_schema import AnexoCreate, AnexoResponse
+from app.schemas.job_schema import JobResponse
 from app.repositories.anexo_repository import AnexoRepository
+from app.repositories.job_repository import JobRepository
+from app.routers.job_router import job_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +24,83 @@ router = APIRouter(
     dependencies=[Depends(require_access_level(2))] # Requer nível 2 para gerenciar
 )
 
-# Defina o diretório de upload (ajuste conforme sua estrutura)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-UPLOAD_DIR = os.path.join(BASE_DIR, "static", "uploads")
+UPLOAD_DIR = anexo_storage.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+def _caminho_arquivo(anexo) -> str | None:
+    """Caminho local do conteúdo; None quando o blob está em armazenamento remoto (S3)."""
+    if anexo.em_blob:
+        return anexo_storage.caminho_blob(anexo.hash_sha256)
+    # Anexos antigos: nome_seguro guarda o caminho relativo (ex.: aocs/79/1764611548_arquivo.pdf)
+    return os.path.join(UPLOAD_DIR, anexo.nome_seguro)
+
+def _ler_conteudo(anexo):
+    if anexo.em_blob:
+        return anexo_storage.ler_blob(anexo.hash_sha256, anexo.compressao)
+    return anexo_storage.ler_arquivo(_caminho_arquivo(anexo))
+
+def _nome_no_zip(anexo) -> str:
+    nome = (anexo.nome_original or f"anexo_{anexo.id}").replace("\\", "_").replace("/", "_")
+    pasta = (anexo.tipo_documento or "Documento").replace("\\", "_").replace("/", "_")
+    return f"{pasta}/{nome}"
+
+@router.get("/bundle", name="bundle_anexos")
+def bundle_anexos(
+    tipo_entidade: str = Query(...),
+    id: int = Query(...),
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Todos os anexos de um contrato/AOCS num ZIP gerado em streaming (sem montar o arquivo)."""
+    if tipo_entidade not in ("contrato", "aocs"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo de entidade inválido: '{tipo_entidade}'.")
+
+    repo = AnexoRepository(db_conn)
+    anexos = repo.get_by_entidade(id, tipo_entidade)
+    if not anexos:
+        raise HTTPException(status_code=404, detail="Nenhum anexo encontrado.")
+
+    disponiveis, ausentes = [], []
+    for anexo in anexos:
+        caminho = _caminho_arquivo(anexo)
+        (ausentes if caminho is not None and not os.path.exists(caminho) else disponiveis).append(anexo)
+
+    entradas = [
+        zip_stream.EntradaZip(nome, lambda anexo=anexo: _ler_conteudo(anexo), anexo.data_upload)
+        for anexo, nome in zip(disponiveis, zip_stream.nomes_unicos(_nome_no_zip(a) for a in disponiveis))
+    ]
+    if ausentes:
+        logger.warning(f"Bundle de {tipo_entidade} ID {id}: {len(ausentes)} arquivo(s) físico(s) ausente(s).")
+        aviso = "Arquivos não encontrados no servidor:\n" + "".join(f"- {a.nome_original} (anexo ID {a.id})\n" for a in ausentes)
+        entradas.append(zip_stream.EntradaZip("ARQUIVOS_AUSENTES.txt", lambda: iter([aviso.encode("utf-8")])))
+
+    logger.info(f"Usuário '{current_user.username}' baixou os {len(entradas)} anexo(s) de {tipo_entidade} ID {id} em ZIP.")
+    return StreamingResponse(
+        zip_stream.gerar_zip(entradas),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="anexos_{tipo_entidade}_{id}.zip"'}
+    )
+
+@router.post("/varredura", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED,
+             dependencies=[Depends(require_access_level(1))])
+def create_varredura_anexos(
+    request: Request,
+    corrigir: bool = Query(False),
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Enfileira a reconciliação arquivos x registros de anexos; o relatório (CSV) sai como artefato do job."""
+    try:
+        job = JobRepository(db_conn).create(
+            varredura_anexos.TIPO_JOB, {"corrigir": corrigir}, criado_por=current_user.username, max_tentativas=1
+        )
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao enfileirar varredura de anexos por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+    logger.info(f"Usuário '{current_user.username}' enfileirou varredura de anexos (Job ID {job.id}, corrigir={corrigir}).")
+    return job_response(request, job)
+
 @router.post("/upload/", status_code=status.HTTP_201_CREATED)
 async def upload_file(
     tipo_entidade: str = Form(...),
@@ -35,6 +111,10 @@ async def upload_file(
     db_conn: connection = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    # tipo_entidade compõe o caminho no disco: só os tipos conhecidos são aceitos
+    if tipo_entidade not in ("contrato", "aocs"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo de entidade inválido: '{tipo_entidade}'.")
+
     try:
         # Lógica para tipo de documento "NOVO"
         tipo_doc_final = tipo_documento
@@ -42,39 +122,36 @@ async def upload_file(
             tipo_doc_final = tipo_documento_novo
             # Opcional: Salvar o novo tipo na tabela tipos_documento se desejar
         
-        # 1. Salvar arquivo no disco
-        # Cria estrutura de pastas organizada: uploads/contrato/123/arquivo.pdf
-        entidade_dir = os.path.join(UPLOAD_DIR, tipo_entidade, str(id_entidade))
-        os.makedirs(entidade_dir, exist_ok=True)
-        
-        # Gera nome seguro e único para evitar sobrescrita
-        import time
-        timestamp = int(time.time())
-        nome_seguro = f"{timestamp}_{file.filename.replace(' ', '_')}"
-        file_path = os.path.join(entidade_dir, nome_seguro)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Caminho relativo para salvar no banco (para ser servido depois)
-        # Ex: contrato/123/169876543_arquivo.pdf
-        caminho_relativo = f"{tipo_entidade}/{id_entidade}/{nome_seguro}"
+        # 1. Receber o arquivo (temporário + SHA-256); o destino é o blob do conteúdo
+        arquivo = await anexo_storage.receber_upload(file)
+        # XML, CSV, TIFF...: guardados comprimidos (brotli) quando compensa
+        await run_in_threadpool(anexo_storage.comprimir_se_vantajoso, arquivo, file.filename, file.content_type)
 
-        # 2. Salvar metadados no Banco
+        # 2. Salvar metadados no Banco (e publicar o blob, se ainda não existir)
         anexo_data = AnexoCreate(
             nome_original=file.filename,
-            nome_seguro=caminho_relativo, # Salvamos o caminho relativo aqui
+            nome_seguro=anexo_storage.nome_logico(f"{tipo_entidade}/{id_entidade}", file.filename),
+            hash_sha256=arquivo.hash_sha256,
+            tamanho_bytes=arquivo.tamanho_bytes,
+            compressao=arquivo.compressao,
+            tamanho_armazenado=arquivo.tamanho_armazenado,
             tipo_documento=tipo_doc_final,
             tipo_entidade=tipo_entidade,
             id_entidade=id_entidade
         )
         
         repo = AnexoRepository(db_conn)
-        novo_anexo = repo.create(anexo_data)
+        try:
+            novo_anexo = repo.create(anexo_data, caminho_temporario=arquivo.caminho_temporario)
+        finally:
+            anexo_storage.remover_arquivo(arquivo.caminho_temporario)
         
-        logger.info(f"Usuário '{current_user.username}' fez upload Anexo ID {novo_anexo.id} ('{novo_anexo.nome_original}')")
-        return {"mensagem": "Upload realizado com sucesso", "anexo": novo_anexo}
+        logger.info(f"Usuário '{current_user.username}' fez upload Anexo ID {novo_anexo.id} ('{novo_anexo.nome_original}', {arquivo.tamanho_bytes} bytes)")
+        return {"mensagem": "Upload realizado com sucesso", "anexo": AnexoResponse.model_validate(novo_anexo)}
 
+    except anexo_storage.ArquivoMuitoGrandeError as e:
+        logger.warning(f"Upload de '{file.filename}' por '{current_user.username}' recusado: {e}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro ao criar registro do anexo '{file.filename}' no BD por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao salvar anexo: {str(e)}")
@@ -92,17 +169,17 @@ def delete_anexo(
         raise HTTPException(status_code=404, detail="Anexo não encontrado")
         
     try:
-        # 1. Remove do Banco
+        # 1. Remove do Banco (o blob só é apagado quando não há mais referências)
         repo.delete(id)
         
-        # 2. Remove do Disco
-        # Reconstrói o caminho completo
-        file_path = os.path.join(UPLOAD_DIR, anexo.nome_seguro) # nome_seguro guarda o caminho relativo
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logger.info(f"Arquivo físico '{file_path}' removido.")
-        else:
-            logger.warning(f"Arquivo físico não encontrado para remoção: {file_path}")
+        # 2. Anexos antigos, fora do armazenamento deduplicado: remove o arquivo próprio
+        if not anexo.em_blob:
+            file_path = _caminho_arquivo(anexo)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                logger.info(f"Arquivo físico '{file_path}' removido.")
+            else:
+                logger.warning(f"Arquivo físico não encontrado para remoção: {file_path}")
             
         logger.info(f"Usuário '{current_user.username}' deletou Anexo ID {id}.")
         return
@@ -112,9 +189,10 @@ def delete_anexo(
         raise HTTPException(status_code=500, detail="Erro interno ao excluir anexo.")
 
 # --- NOVA ROTA PARA DOWNLOAD ---
-@router.get("/{id}/download", name="download_anexo_file")
+@router.api_route("/{id}/download", methods=["GET", "HEAD"], name="download_anexo_file")
 def download_anexo(
     id: int,
+    request: Request,
     db_conn: connection = Depends(get_db),
     # current_user: User = Depends(get_current_user) # Opcional: proteger download
 ):
@@ -124,16 +202,94 @@ def download_anexo(
     if not anexo:
         raise HTTPException(status_code=404, detail="Anexo não encontrado")
     
-    # Reconstrói o caminho completo
-    # O campo nome_seguro no banco deve conter algo como: aocs/79/1764611548_arquivo.pdf
-    file_path = os.path.join(UPLOAD_DIR, anexo.nome_seguro)
+    file_path = _caminho_arquivo(anexo)
+    # Blob comprimido em repouso: vai comprimido para quem aceita (sem Range, que valeria sobre os bytes comprimidos)
+    comprimido_para_cliente = (
+        anexo.compressao is not None
+        and download.aceita_encoding(request, anexo.compressao)
+        and "range" not in request.headers
+    )
+
+    if file_path is None:
+        if anexo.compressao and not comprimido_para_cliente:
+            return download.responder_descomprimido(
+                request, anexo_storage.ler_blob(anexo.hash_sha256, anexo.compressao),
+                nome_download=anexo.nome_original, hash_sha256=anexo.hash_sha256, tamanho_bytes=anexo.tamanho_bytes
+            )
+        # Armazenamento remoto: o cliente baixa direto do bucket por uma URL pré-assinada
+        url = anexo_storage.url_download_blob(anexo.hash_sha256, anexo.nome_original,
+                                              content_encoding=anexo.compressao)
+        return download.redirecionar(request, url, hash_sha256=anexo.hash_sha256)
     
     if not os.path.exists(file_path):
         logger.error(f"Arquivo físico não encontrado no disco: {file_path}")
         raise HTTPException(status_code=404, detail="Arquivo físico não encontrado no servidor.")
-        
-    return FileResponse(
-        path=file_path, 
-        filename=anexo.nome_original, # Nome original para o usuário baixar
-        media_type='application/octet-stream' # Força download
-    )
\ No newline at end of file
+
+    if anexo.compressao and not comprimido_para_cliente:
+        return download.responder_descomprimido(
+            request, anexo_storage.ler_blob(anexo.hash_sha256, anexo.compressao),
+            nome_download=anexo.nome_original, hash_sha256=anexo.hash_sha256, tamanho_bytes=anexo.tamanho_bytes
+        )
+
+    # Range, ETag forte (hash do conteúdo), 304 e offload para o proxy (ANEXO_DOWNLOAD_OFFLOAD)
+    return download.responder_arquivo(
+        request,
+        file_path,
+        nome_download=anexo.nome_original, # Nome original para o usuário baixar
+        hash_sha256=anexo.hash_sha256,
+        content_encoding=anexo.compressao
+    )
+
+
+def _gerar_miniatura(anexo, destino: str, tamanho: int, formato: str) -> None:
+    """Roda no pool de miniaturas: resolve a origem (local ou baixada do bucket) e redimensiona."""
+    origem = _caminho_arquivo(anexo)
+    temporario = None
+    if origem is None or anexo.compressao:
+        origem = temporario = anexo_storage.copiar_blob_para_temporario(anexo.hash_sha256, anexo.compressao)
+    try:
+        miniaturas.gerar(origem, destino, tamanho, formato)
+    finally:
+        if temporario:
+            anexo_storage.remover_arquivo(temporario)
+
+@router.get("/{id}/thumbnail", name="thumbnail_anexo")
+async def thumbnail_anexo(
+    id: int,
+    request: Request,
+    size: int = Query(miniaturas.TAMANHO_PADRAO, ge=16, le=1024),
+    db_conn: connection = Depends(get_db)
+):
+    repo = AnexoRepository(db_conn)
+    anexo = await run_in_threadpool(repo.get_by_id, id)
+
+    if not anexo:
+        raise HTTPException(status_code=404, detail="Anexo não encontrado")
+    if not miniaturas.e_imagem(anexo.nome_original):
+        raise HTTPException(status_code=415, detail="O anexo não é uma imagem.")
+
+    tamanho = miniaturas.tamanho_permitido(size)
+    formato = miniaturas.formato_para(request.headers.get("accept"))
+    # Anexos antigos sem hash: a chave é o próprio anexo (o arquivo dele nunca muda)
+    chave = anexo.hash_sha256 or f"anexo-{anexo.id}"
+    caminho = miniaturas.caminho(chave, tamanho, formato)
+    headers = {
+        "etag": f'"{chave}-{tamanho}.{formato}"',
+        "cache-control": "private, max-age=604800",
+        "vary": "Accept",
+    }
+
+    if download.nao_modificado(request, headers["etag"], 0):
+        return Response(status_code=304, headers=headers)
+
+    if not os.path.exists(caminho):
+        origem = _caminho_arquivo(anexo)
+        if origem is not None and not os.path.exists(origem):
+            raise HTTPException(status_code=404, detail="Arquivo físico não encontrado no servidor.")
+        try:
+            await miniaturas.executar(_gerar_miniatura, anexo, caminho, tamanho, formato)
+        except miniaturas.NaoEImagemError as e:
+            logger.warning(f"Miniatura do anexo ID {id} não gerada: {e}")
+            raise HTTPException(status_code=415, detail="O anexo não é uma imagem válida.")
+
+    return FileResponse(caminho, media_type=f"image/{formato}", headers=headers)
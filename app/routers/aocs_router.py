@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from psycopg2.extensions import connection
 import psycopg2
 import logging
+from datetime import datetime
+from app.core import paginacao, resposta_json
+from app.core.transacao import uow
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.models.aocs_model import Aocs
-from app.schemas.aocs_schema import AocsCreateRequest, AocsUpdateRequest, AocsResponse
+from app.schemas.aocs_schema import AocsCreateRequest, AocsComPedidosCreateRequest, AocsComPedidosResponse, AocsUpdateRequest, AocsResponse
+from app.schemas.sincronizacao_schema import AlteracoesResponse
 from app.repositories.aocs_repository import AocsRepository
+from app.schemas.pedido_schema import PedidoResponse
+from app.repositories.pedido_repository import PedidoRepository
 
 logger = logging.getLogger(__name__)
 
@@ -47,18 +53,83 @@ def create_aocs(
         logger.exception(f"Erro inesperado ao criar AOCS por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
-@router.get("/", response_model=list[AocsResponse])
+@router.post("/com-pedidos",
+             response_model=AocsComPedidosResponse,
+             status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(require_access_level(2))])
+def create_aocs_com_pedidos(
+    aocs_req: AocsComPedidosCreateRequest,
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        # Um commit para a AOCS e todos os itens: ou entra o pedido inteiro, ou nada
+        with uow(db_conn):
+            nova_aocs = AocsRepository(db_conn).create(aocs_req)
+            pedido_repo = PedidoRepository(db_conn)
+            pedidos = [pedido_repo.create(nova_aocs.id, pedido_req) for pedido_req in aocs_req.pedidos]
+        logger.info(f"Usuário '{current_user.username}' criou AOCS ID {nova_aocs.id} ('{nova_aocs.numero_aocs}') com {len(pedidos)} pedido(s).")
+        return AocsComPedidosResponse(
+            **AocsResponse.model_validate(nova_aocs).model_dump(),
+            pedidos=[PedidoResponse.model_validate(p) for p in pedidos]
+        )
+    except ValueError as e: 
+        logger.warning(f"Erro de validação (ValueError) ao criar AOCS com pedidos por '{current_user.username}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail=str(e)
+        )
+    except psycopg2.IntegrityError:
+        logger.warning(f"Tentativa de criar AOCS com número duplicado: '{aocs_req.numero_aocs}' por '{current_user.username}'.")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A AOCS '{aocs_req.numero_aocs}' já existe."
+        )
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao criar AOCS com pedidos por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+@router.get("/", response_model=list[AocsResponse], response_class=resposta_json.RespostaJSON)
 def get_all_aocs(
+    request: Request,
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    total: bool = Query(False),
+    fields: str | None = Query(None),
+    stream: bool = Query(False),
     db_conn: connection = Depends(get_db)
 ):
     try:
         repo = AocsRepository(db_conn)
-        lista_aocs = repo.get_all() 
-        return lista_aocs
+        campos = resposta_json.campos(fields, AocsResponse)
+        if resposta_json.quer_ndjson(request, stream):
+            return resposta_json.ndjson(repo.iterar_todas(), AocsResponse, campos=campos)
+        pagina = repo.get_pagina(limite, after, before, com_total=total, campos=campos)
+        return resposta_json.listagem(pagina.itens, AocsResponse, paginacao.cabecalhos(request, pagina), campos=campos)
+    except (paginacao.CursorInvalidoError, resposta_json.CampoInvalidoError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar AOCS: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
+@router.get("/alteracoes", response_model=AlteracoesResponse[AocsResponse], response_class=resposta_json.RespostaJSON)
+def get_alteracoes_aocs(
+    since: datetime | None = Query(None),
+    cursor: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    db_conn: connection = Depends(get_db)
+):
+    """AOCS alterados e excluídos desde 'since' (primeira sincronização) ou desde o 'cursor' devolvido na anterior."""
+    try:
+        repo = AocsRepository(db_conn)
+        return resposta_json.alteracoes(repo.get_alteracoes(since, cursor, limite), AocsResponse)
+    except paginacao.CursorInvalidoError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao listar alterações de AOCS (since={since}): {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
 @router.get("/{id}", response_model=AocsResponse)
 def get_aocs_by_id(
     id: int,
@@ -0,0 +1,61 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from psycopg2.extensions import connection
+import logging
+from app.core.cache_ttl import CacheTTL
+from app.core.database import get_db
+from app.core.security import require_access_level
+from app.schemas.autocomplete_schema import SugestaoResponse
+from app.repositories.autocomplete_repository import AutocompleteRepository
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/autocomplete",
+    tags=["Autocomplete"],
+    dependencies=[Depends(require_access_level(3))]
+)
+
+AUTOCOMPLETE_CACHE_TTL = float(os.environ.get("AUTOCOMPLETE_CACHE_TTL", 30))
+# Termos menores que isso casam com quase tudo: não vale a consulta
+TAMANHO_MINIMO = {"itens": 2, "fornecedores": 2, "aocs": 1}
+
+_cache = CacheTTL(AUTOCOMPLETE_CACHE_TTL, max_itens=2000)
+
+@router.get("/{tipo}", response_model=list[SugestaoResponse])
+def autocomplete(
+    tipo: str,
+    response: Response,
+    q: str = Query(""),
+    limite: int = Query(10, ge=1, le=50),
+    categoria: int | None = Query(None),
+    db_conn: connection = Depends(get_db)
+):
+    if tipo not in TAMANHO_MINIMO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo de autocomplete inválido: '{tipo}'.")
+
+    termo = " ".join(q.split())
+    response.headers["Cache-Control"] = f"private, max-age={int(AUTOCOMPLETE_CACHE_TTL)}"
+    if len(termo) < TAMANHO_MINIMO[tipo]:
+        return []
+
+    chave = (tipo, termo.lower(), categoria, limite)
+    sugestoes = _cache.obter(chave)
+    if sugestoes is not None:
+        return sugestoes
+
+    repo = AutocompleteRepository(db_conn)
+    try:
+        if tipo == "itens":
+            linhas = repo.itens(termo, limite, categoria)
+        elif tipo == "fornecedores":
+            linhas = repo.fornecedores(termo, limite)
+        else:
+            linhas = repo.aocs(termo, limite)
+    except Exception as e:
+        logger.exception(f"Erro inesperado no autocomplete de {tipo} (q='{termo}'): {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+    sugestoes = [SugestaoResponse(id=id, texto=texto, detalhe=detalhe) for id, texto, detalhe in linhas]
+    _cache.guardar(chave, sugestoes)
+    return sugestoes
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from psycopg2.extensions import connection
 import psycopg2
 import logging
+from app.core import paginacao, resposta_json
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.models.ci_pagamento_model import CiPagamento 
-from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest, CiPagamentoUpdateRequest, CiPagamentoResponse
+from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest, CiPagamentoCreateIdsRequest, CiPagamentoUpdateRequest, CiPagamentoResponse
 from app.repositories.ci_pagamento_repository import CiPagamentoRepository 
 
 logger = logging.getLogger(__name__)
@@ -45,14 +46,50 @@ def create_ci_pagamento(
         logger.exception(f"Erro inesperado ao criar CI por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
-@router.get("/", response_model=list[CiPagamentoResponse])
+@router.post("/por-ids",
+             response_model=CiPagamentoResponse,
+             status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(require_access_level(2))])
+def create_ci_pagamento_por_ids(
+    ci_req: CiPagamentoCreateIdsRequest,
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        repo = CiPagamentoRepository(db_conn)
+        nova_ci = repo.create_por_ids(ci_req)
+        logger.info(f"Usuário '{current_user.username}' criou CI Pagamento ID {nova_ci.id} ('{nova_ci.numero_ci}').")
+        return nova_ci
+    except ValueError as e:
+        logger.warning(f"FK inválida ao criar CI por '{current_user.username}': {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except psycopg2.IntegrityError:
+        logger.warning(f"Tentativa de criar CI duplicada (Num CI/NF?): '{ci_req.numero_ci}' / '{ci_req.numero_nota_fiscal}' por '{current_user.username}'.")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A CI ou Nota Fiscal '{ci_req.numero_ci}' / '{ci_req.numero_nota_fiscal}' já existe."
+        )
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao criar CI por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+@router.get("/", response_model=list[CiPagamentoResponse], response_class=resposta_json.RespostaJSON)
 def get_all_ci_pagamentos( 
+    request: Request,
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    total: bool = Query(False),
+    fields: str | None = Query(None),
     db_conn: connection = Depends(get_db)
 ):
     try:
         repo = CiPagamentoRepository(db_conn)
-        ci_list = repo.get_all() 
-        return ci_list
+        campos = resposta_json.campos(fields, CiPagamentoResponse)
+        pagina = repo.get_pagina(limite, after, before, com_total=total, campos=campos)
+        return resposta_json.listagem(pagina.itens, CiPagamentoResponse, paginacao.cabecalhos(request, pagina), campos=campos)
+    except (paginacao.CursorInvalidoError, resposta_json.CampoInvalidoError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar CIs de Pagamento: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
@@ -103,6 +140,18 @@ def get_ci_pagamento_by_pedido_id(
         logger.exception(f"Erro inesperado ao buscar CI Pagamento por Pedido ID {id_pedido}: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
+@router.get("/por-aocs/{id_aocs}", response_model=list[CiPagamentoResponse])
+def get_ci_pagamentos_by_aocs_id( 
+    id_aocs: int,
+    db_conn: connection = Depends(get_db)
+):
+    try:
+        repo = CiPagamentoRepository(db_conn)
+        return repo.get_by_aocs_id(id_aocs)
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao listar CIs Pagamento da AOCS ID {id_aocs}: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
 @router.put("/{id}",
             response_model=CiPagamentoResponse,
             dependencies=[Depends(require_access_level(2))])
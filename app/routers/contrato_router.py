@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from psycopg2.extensions import connection
 import psycopg2
 import logging
+from datetime import datetime
+from app.core import paginacao, resposta_json
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.models.contrato_model import Contrato
 from app.schemas.contrato_schema import ContratoCreateRequest, ContratoUpdateRequest, ContratoResponse
+from app.schemas.sincronizacao_schema import AlteracoesResponse
 from app.repositories.contrato_repository import ContratoRepository
 
 logger = logging.getLogger(__name__)
@@ -44,19 +47,48 @@ def create_contrato(
         logger.exception(f"Erro inesperado ao criar Contrato por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
-@router.get("/", response_model=list[ContratoResponse])
+@router.get("/", response_model=list[ContratoResponse], response_class=resposta_json.RespostaJSON)
 def get_all_contratos( 
+    request: Request,
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    total: bool = Query(False),
+    fields: str | None = Query(None),
+    stream: bool = Query(False),
     mostrar_inativos: bool = False, 
     db_conn: connection = Depends(get_db)
 ):
     try:
         repo = ContratoRepository(db_conn)
-        contratos = repo.get_all(mostrar_inativos) 
-        return contratos
+        campos = resposta_json.campos(fields, ContratoResponse)
+        if resposta_json.quer_ndjson(request, stream):
+            return resposta_json.ndjson(repo.iterar(mostrar_inativos), ContratoResponse, campos=campos)
+        pagina = repo.get_pagina(mostrar_inativos, limite, after, before, com_total=total, campos=campos)
+        return resposta_json.listagem(pagina.itens, ContratoResponse, paginacao.cabecalhos(request, pagina), campos=campos)
+    except (paginacao.CursorInvalidoError, resposta_json.CampoInvalidoError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar Contratos (inativos={mostrar_inativos}): {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
+@router.get("/alteracoes", response_model=AlteracoesResponse[ContratoResponse], response_class=resposta_json.RespostaJSON)
+def get_alteracoes_contratos(
+    since: datetime | None = Query(None),
+    cursor: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    db_conn: connection = Depends(get_db)
+):
+    """Contratos alterados e excluídos desde 'since' (primeira sincronização) ou desde o 'cursor' devolvido na anterior."""
+    try:
+        repo = ContratoRepository(db_conn)
+        return resposta_json.alteracoes(repo.get_alteracoes(since, cursor, limite), ContratoResponse)
+    except paginacao.CursorInvalidoError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao listar alterações de Contratos (since={since}): {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
 @router.get("/{id}", response_model=ContratoResponse)
 def get_contrato_by_id( 
     id: int,
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from psycopg2.extensions import connection
+import logging
+from app.core.database import get_db
+from app.core.security import get_current_user, require_access_level
+from app.core import impressao_lote
+from app.models.user_model import User
+from app.schemas.impressao_schema import ImpressaoLoteRequest
+from app.schemas.job_schema import JobResponse
+from app.repositories.impressao_repository import ImpressaoRepository
+from app.repositories.job_repository import JobRepository
+from app.routers.job_router import job_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/impressao-lote",
+    tags=["Impressão em Lote"],
+    dependencies=[Depends(require_access_level(2))]
+)
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_impressao_lote(
+    lote_req: ImpressaoLoteRequest,
+    request: Request,
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    repo = ImpressaoRepository(db_conn)
+    rotulo = "CIs" if lote_req.tipo == "ci" else "AOCS"
+    try:
+        if lote_req.tipo == "ci":
+            ids = repo.buscar_ids_ci(
+                numeros_ci=lote_req.numeros_ci,
+                numeros_aocs=lote_req.numeros_aocs,
+                data_inicio=lote_req.data_inicio,
+                data_fim=lote_req.data_fim,
+                unidade_requisitante_nome=lote_req.unidade_requisitante_nome,
+                limite=impressao_lote.LOTE_MAX_DOCUMENTOS + 1
+            )
+        else:
+            ids = repo.buscar_ids_aocs(
+                numeros_aocs=lote_req.numeros_aocs,
+                data_inicio=lote_req.data_inicio,
+                data_fim=lote_req.data_fim,
+                unidade_requisitante_nome=lote_req.unidade_requisitante_nome,
+                status_entrega=lote_req.status_entrega,
+                limite=impressao_lote.LOTE_MAX_DOCUMENTOS + 1
+            )
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao selecionar {rotulo} para impressão em lote por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+    if not ids:
+        nenhum = "Nenhuma CI encontrada" if lote_req.tipo == "ci" else "Nenhuma AOCS encontrada"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{nenhum} para os critérios informados.")
+    if len(ids) > impressao_lote.LOTE_MAX_DOCUMENTOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O lote excede o limite de {impressao_lote.LOTE_MAX_DOCUMENTOS} {rotulo}. Refine os filtros."
+        )
+
+    try:
+        job = JobRepository(db_conn).create(
+            impressao_lote.TIPO_JOB,
+            {"tipo": lote_req.tipo, f"ids_{lote_req.tipo}": ids, "formato": lote_req.formato},
+            criado_por=current_user.username
+        )
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao enfileirar impressão em lote por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+    logger.info(f"Usuário '{current_user.username}' enfileirou impressão em lote (Job ID {job.id}) com {len(ids)} {rotulo}.")
+    return job_response(request, job)
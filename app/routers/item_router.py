@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from psycopg2.extensions import connection
 import psycopg2
 import logging
+from datetime import datetime
+from app.core import paginacao, resposta_json
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.models.item_model import Item
 from app.schemas.item_schema import ItemRequest, ItemResponse
+from app.schemas.sincronizacao_schema import AlteracoesResponse
 from app.repositories.item_repository import ItemRepository
 
 logger = logging.getLogger(__name__)
@@ -44,8 +47,15 @@ def create_item(
         logger.exception(f"Erro inesperado ao criar Item por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
-@router.get("/", response_model=list[ItemResponse])
+@router.get("/", response_model=list[ItemResponse], response_class=resposta_json.RespostaJSON)
 def get_itens( 
+    request: Request,
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    total: bool = Query(False),
+    fields: str | None = Query(None),
+    stream: bool = Query(False),
     contrato_id: int | None = None,
     descricao: str | None = None, 
     mostrar_inativos: bool = False,
@@ -53,27 +63,49 @@ def get_itens(
 ):
     repo = ItemRepository(db_conn)
     items_list = [] 
+    cabecalhos = None
     try:
+        campos = resposta_json.campos(fields, ItemResponse)
         if descricao:
             item = repo.get_by_descricao(descricao)
             items_list = [item] if item else []
             if not mostrar_inativos and items_list:
                 items_list = [i for i in items_list if i.ativo]
-        elif contrato_id:
-            items_contrato = repo.get_by_contrato_id(contrato_id)
-            if not mostrar_inativos:
-                items_list = [item for item in items_contrato if item.ativo]
-            else:
-                items_list = items_contrato
+        elif resposta_json.quer_ndjson(request, stream):
+            return resposta_json.ndjson(repo.iterar(mostrar_inativos, contrato_id or None), ItemResponse, campos=campos)
         else:
-            items_list = repo.get_all(mostrar_inativos)
-
-        return items_list
+            pagina = repo.get_pagina(mostrar_inativos, contrato_id or None, limite, after, before, com_total=total,
+                                     campos=campos)
+            cabecalhos = paginacao.cabecalhos(request, pagina)
+            items_list = pagina.itens
+
+        if resposta_json.quer_ndjson(request, stream):
+            return resposta_json.ndjson(items_list, ItemResponse, campos=campos)
+        return resposta_json.listagem(items_list, ItemResponse, cabecalhos, campos=campos)
+    except (paginacao.CursorInvalidoError, resposta_json.CampoInvalidoError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar itens (filtros: ctId={contrato_id}, desc={descricao}, inat={mostrar_inativos}): {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 
+@router.get("/alteracoes", response_model=AlteracoesResponse[ItemResponse], response_class=resposta_json.RespostaJSON)
+def get_alteracoes_itens(
+    since: datetime | None = Query(None),
+    cursor: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    db_conn: connection = Depends(get_db)
+):
+    """Itens alterados e excluídos desde 'since' (primeira sincronização) ou desde o 'cursor' devolvido na anterior."""
+    try:
+        repo = ItemRepository(db_conn)
+        return resposta_json.alteracoes(repo.get_alteracoes(since, cursor, limite), ItemResponse)
+    except paginacao.CursorInvalidoError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao listar alterações de Itens (since={since}): {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
 @router.get("/{id}", response_model=ItemResponse)
 def get_item_by_id( 
     id: int,
@@ -0,0 +1,71 @@
+import mimetypes
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from psycopg2.extensions import connection
+import logging
+from app.core import jobs
+from app.core.database import get_db
+from app.core.security import get_current_user, require_access_level
+from app.models.job_model import Job
+from app.models.user_model import User
+from app.schemas.job_schema import JobResponse
+from app.repositories.job_repository import JobRepository, STATUS_CONCLUIDO
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+    dependencies=[Depends(require_access_level(2))]
+)
+
+def job_response(request: Request, job: Job) -> JobResponse:
+    resposta = JobResponse.model_validate(job)
+    resposta.url_status = str(request.url_for("get_job", id=job.id))
+    if job.status == STATUS_CONCLUIDO and job.artefato:
+        resposta.url_download = str(request.url_for("download_job", id=job.id))
+    return resposta
+
+def _get_job_do_usuario(repo: JobRepository, id: int, current_user: User) -> Job:
+    job = repo.get_by_id(id)
+    # Administradores veem todos os jobs; os demais, apenas os próprios
+    if not job or (current_user.nivel_acesso > 1 and job.criado_por != current_user.username):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job não encontrado.")
+    return job
+
+@router.get("/{id}", response_model=JobResponse, name="get_job")
+def get_job(
+    id: int,
+    request: Request,
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    repo = JobRepository(db_conn)
+    return job_response(request, _get_job_do_usuario(repo, id, current_user))
+
+@router.get("/{id}/download", name="download_job")
+def download_job(
+    id: int,
+    db_conn: connection = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    repo = JobRepository(db_conn)
+    job = _get_job_do_usuario(repo, id, current_user)
+
+    if job.status != STATUS_CONCLUIDO or not job.artefato:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"O resultado do job ainda não está disponível (status: {job.status}).")
+
+    # O artefato foi gravado pelo worker (outro processo ou máquina): lido do armazenamento compartilhado
+    armazenamento = jobs.armazenamento()
+    if not armazenamento.existe(job.artefato):
+        logger.error(f"Artefato do Job ID {id} não encontrado no armazenamento: '{job.artefato}'.")
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="O arquivo gerado pelo job não está mais disponível.")
+
+    nome_arquivo = job.artefato.rsplit("/", 1)[-1]
+    media_type = mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream"
+    headers = {"Content-Disposition": f'inline; filename="{nome_arquivo}"'}
+    logger.info(f"Usuário '{current_user.username}' baixou o resultado do Job ID {id}.")
+    caminho = armazenamento.caminho_local(job.artefato)
+    if caminho:
+        return FileResponse(caminho, media_type=media_type, headers=headers)
+    return StreamingResponse(armazenamento.ler_em_blocos(job.artefato), media_type=media_type, headers=headers)
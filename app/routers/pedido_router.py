@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from psycopg2.extensions import connection
 import psycopg2
 import logging
+from datetime import datetime
+from app.core import paginacao, resposta_json
 from typing import List 
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
 from app.models.user_model import User
 from app.models.pedido_model import Pedido 
 from app.schemas.pedido_schema import PedidoCreateRequest, PedidoUpdateRequest, PedidoResponse
+from app.schemas.sincronizacao_schema import AlteracoesResponse
 from app.repositories.pedido_repository import PedidoRepository 
 from app.schemas.pedido_schema import (
     PedidoCreateRequest, 
@@ -53,14 +56,26 @@ def create_pedido(
         logger.exception(f"Erro inesperado ao criar Pedido por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
-@router.get("/", response_model=List[PedidoResponse])
+@router.get("/", response_model=List[PedidoResponse], response_class=resposta_json.RespostaJSON)
 def get_all_pedidos( 
+    request: Request,
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    total: bool = Query(False),
+    fields: str | None = Query(None),
+    stream: bool = Query(False),
     db_conn: connection = Depends(get_db)
 ):
     try:
         repo = PedidoRepository(db_conn)
-        pedidos = repo.get_all() 
-        return pedidos
+        campos = resposta_json.campos(fields, PedidoResponse)
+        if resposta_json.quer_ndjson(request, stream):
+            return resposta_json.ndjson(repo.iterar_todos(), PedidoResponse, campos=campos)
+        pagina = repo.get_pagina(limite, after, before, com_total=total, campos=campos)
+        return resposta_json.listagem(pagina.itens, PedidoResponse, paginacao.cabecalhos(request, pagina), campos=campos)
+    except (paginacao.CursorInvalidoError, resposta_json.CampoInvalidoError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar todos os pedidos: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
@@ -78,6 +93,23 @@ def get_pedidos_by_aocs_id(
         logger.exception(f"Erro inesperado ao listar pedidos para AOCS ID {id_aocs}: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
+@router.get("/alteracoes", response_model=AlteracoesResponse[PedidoResponse], response_class=resposta_json.RespostaJSON)
+def get_alteracoes_pedidos(
+    since: datetime | None = Query(None),
+    cursor: str | None = Query(None),
+    limite: int = Query(paginacao.LIMITE_PADRAO, ge=1, le=paginacao.LIMITE_MAXIMO),
+    db_conn: connection = Depends(get_db)
+):
+    """Pedidos alterados e excluídos desde 'since' (primeira sincronização) ou desde o 'cursor' devolvido na anterior."""
+    try:
+        repo = PedidoRepository(db_conn)
+        return resposta_json.alteracoes(repo.get_alteracoes(since, cursor, limite), PedidoResponse)
+    except paginacao.CursorInvalidoError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao listar alterações de Pedidos (since={since}): {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
 @router.get("/{id}", response_model=PedidoResponse)
 def get_pedido_by_id( 
     id: int,
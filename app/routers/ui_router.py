@@ -5,11 +5,11 @@ import psycopg2
 from psycopg2.extras import DictCursor
 from datetime import date, datetime, timezone, timedelta
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from fastapi import (APIRouter, Depends, Form, HTTPException, Query, Request,
                      Response, status)
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi import Body
 from psycopg2.extensions import connection
@@ -22,6 +22,7 @@ from app.repositories.user_repository import UserRepository
 from types import SimpleNamespace
 
 from app.core.database import get_db
+from app.core import document_cache, mapeamento, miniaturas, paginacao, pdf_renderer, resposta_json, utils
 from app.repositories.categoria_repository import CategoriaRepository
 from app.repositories.contrato_repository import ContratoRepository
 from app.repositories.item_repository import ItemRepository
@@ -38,7 +39,7 @@ from app.repositories.instrumento_repository import InstrumentoRepository
 from app.repositories.modalidade_repository import ModalidadeRepository
 from app.repositories.numero_modalidade_repository import NumeroModalidadeRepository
 from app.repositories.processo_licitatorio_repository import ProcessoLicitatorioRepository
-from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest
+from app.schemas.ci_pagamento_schema import CiPagamentoCreateRequest, CiPagamentoCreateIdsRequest
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="", tags=["UI - Páginas Web"])
@@ -58,6 +59,7 @@ VERSAO_SOFTWARE = "3.0.0"
 ITENS_POR_PAGINA = 10 
 
 templates.env.globals['versao_software'] = VERSAO_SOFTWARE
+templates.env.tests['imagem'] = miniaturas.e_imagem
 
 class ItemGenerico(BaseModel):
     nome: str
@@ -120,6 +122,51 @@ RELATORIOS_DISPONIVEIS = {
     'lista_contratos': {'titulo': 'Lista de Contratos Ativos', 'descricao': '...', 'ordenacao_opcoes': {}}
 }
 
+FORMATO_IMPRESSAO_PATTERN = "^(html|pdf)$"
+
+def _nome_arquivo_pdf(nome_arquivo: str) -> str:
+    nome_seguro = nome_arquivo.replace("/", "-").replace('"', "").encode("ascii", "ignore").decode()
+    return f'inline; filename="{nome_seguro}.pdf"'
+
+def _chave_cache(tipo_entidade: str, id_entidade: int, variante: str, versao: str | None, formato: str) -> tuple | None:
+    """Sem versão (erro ao calcular o hash) o documento é gerado normalmente, sem cache."""
+    if not versao:
+        return None
+    return (tipo_entidade, id_entidade, document_cache.nome_documento(variante, versao, formato))
+
+def _resposta_em_cache(chave: tuple | None, formato: str, nome_arquivo: str):
+    caminho = document_cache.obter(*chave) if chave else None
+    if not caminho:
+        return None
+    if formato == "pdf":
+        return FileResponse(caminho, media_type="application/pdf",
+                            headers={"Content-Disposition": _nome_arquivo_pdf(nome_arquivo)})
+    return FileResponse(caminho, media_type="text/html; charset=utf-8")
+
+async def _responder_documento(template_name: str, context: dict, formato: str, nome_arquivo: str, chave_cache: tuple | None = None):
+    """Devolve o documento de impressão como HTML ou, com ?format=pdf, renderizado em PDF."""
+    html = templates.get_template(template_name).render(context)
+
+    if formato != "pdf":
+        if chave_cache:
+            document_cache.salvar(*chave_cache, html.encode("utf-8"))
+        return HTMLResponse(html)
+
+    try:
+        pdf = await pdf_renderer.render_pdf(html)
+    except pdf_renderer.PdfTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except pdf_renderer.PdfIndisponivelError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    if chave_cache:
+        document_cache.salvar(*chave_cache, pdf)
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": _nome_arquivo_pdf(nome_arquivo)}
+    )
+
 @router.get("/login", response_class=HTMLResponse, name="login")
 async def login_ui(request: Request, msg: str = None, category: str = None):
     """Renderiza a página de login."""
@@ -181,15 +228,15 @@ async def read_root(request: Request):
 @router.get("/home", response_class=HTMLResponse, name="home_ui", dependencies=[Depends(require_access_level(3))])
 async def home_ui(
     request: Request, 
-    page: int = Query(1, alias="page"), # Recebe o número da página
+    after: str | None = Query(None),
+    before: str | None = Query(None),
     current_user=Depends(get_current_user), 
     db_conn: connection = Depends(get_db)
 ):
     indicadores = {"contratos_ativos": 0, "pedidos_mes": 0, "contratos_a_vencer": 0}
     
-    # Variáveis de Paginação
-    pedidos_pendentes = []
-    total_paginas = 1
+    # Pedidos pendentes, paginados por cursor (anterior/próxima)
+    pendentes = paginacao.Pagina([])
     ITENS_DASHBOARD = 10 # Limite por página
     
     try:
@@ -199,16 +246,10 @@ async def home_ui(
          indicadores["contratos_ativos"] = cursor.fetchone()[0]
          cursor.close()
          
-         # 2. Pedidos Pendentes Paginados (NOVA LÓGICA)
+         # 2. Pedidos Pendentes Paginados
          pedido_repo = PedidoRepository(db_conn)
-         resultado = pedido_repo.get_pendentes_paginados(page=page, limit=ITENS_DASHBOARD)
-         
-         pedidos_pendentes = resultado['itens']
-         total_registros = resultado['total']
-         
-         # Cálculo de páginas (Arredonda para cima: 11 itens / 10 = 1.1 -> 2 páginas)
-         if total_registros > 0:
-             total_paginas = math.ceil(total_registros / ITENS_DASHBOARD)
+         resultado = pedido_repo.get_pendentes_paginados(limit=ITENS_DASHBOARD, after=after, before=before)
+         pendentes = paginacao.Pagina(resultado['itens'], resultado['proximo'], resultado['anterior'])
          
     except Exception as e:
          logger.error(f"Erro ao buscar dados do dashboard: {e}")
@@ -219,11 +260,8 @@ async def home_ui(
     context = {
         "current_user": current_user,
         "indicadores": indicadores,
-        "pedidos_pendentes": pedidos_pendentes,
-        
-        # Variáveis necessárias para o _pagination.html funcionar
-        "pagina_atual": page,
-        "total_paginas": total_paginas,
+        "pedidos_pendentes": pendentes.itens,
+        "pendentes": pendentes,
         "query_params": query_params,
         
         "get_flashed_messages": lambda **kwargs: []
@@ -637,10 +675,11 @@ async def importar_itens_ui(
 async def contratos_por_categoria(
     request: Request, 
     id_categoria: int, 
-    page: int = Query(1, alias="page"),
     busca: str = Query(None),
-    sort_by: str = Query("descricao"),
+    sort_by: str | None = Query(None),
     order: str = Query("asc"),
+    after: str | None = Query(None),
+    before: str | None = Query(None),
     current_user=Depends(get_current_user), 
     db_conn: connection = Depends(get_db)
 ):
@@ -649,81 +688,28 @@ async def contratos_por_categoria(
     if not categoria: 
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
-    itens = []
-    total_paginas = 1
-    query_params = dict(request.query_params)
+    # Cursor fica de fora: os links de ordenação voltam para a primeira página
+    query_params = {k: v for k, v in request.query_params.items() if k not in ("after", "before")}
+    if not sort_by:
+        sort_by = 'relevancia' if busca else 'descricao'
 
     ITENS_POR_PAGINA = 10 
-    cursor = None
-
+    pagina = paginacao.Pagina([])
     try:
-        cursor = db_conn.cursor(cursor_factory=DictCursor)
-
-        params = [id_categoria]
-        where_clause = "WHERE c.id_categoria = %s AND c.ativo = TRUE AND ic.ativo = TRUE"
-
-        if busca:
-            where_clause += " AND ic.descricao ILIKE %s"
-            params.append(f"%{busca}%")
-
-        colunas_ordenaveis = {
-            'descricao': 'ic.descricao', 
-            'contrato': 'c.numero_contrato',
-            'saldo': 'saldo', 
-            'valor': 'ic.valor_unitario', 
-            'numero_item': 'ic.numero_item'
-        }
-        coluna_ordenacao = colunas_ordenaveis.get(sort_by, 'ic.descricao')
-        direcao_ordenacao = 'DESC' if order == 'desc' else 'ASC'
-        order_by_clause = f"ORDER BY {coluna_ordenacao} {direcao_ordenacao}"
-
-        offset = (page - 1) * ITENS_POR_PAGINA
-        limit_offset_clause = "LIMIT %s OFFSET %s"
-        params.extend([ITENS_POR_PAGINA, offset])
-
-        sql_select = f"""
-            SELECT
-                ic.*, 
-                c.id AS id_contrato, 
-                c.numero_contrato, 
-                c.fornecedor,
-                COALESCE(pedidos_sum.total_pedido, 0) AS total_pedido,
-                (ic.quantidade - COALESCE(pedidos_sum.total_pedido, 0)) AS saldo,
-                COUNT(*) OVER() as total_geral
-            FROM itenscontrato ic
-            JOIN contratos c ON ic.id_contrato = c.id
-            LEFT JOIN (
-                SELECT id_item_contrato, SUM(quantidade_pedida) as total_pedido
-                FROM pedidos GROUP BY id_item_contrato
-            ) AS pedidos_sum ON ic.id = pedidos_sum.id_item_contrato
-            {where_clause} 
-            {order_by_clause} 
-            {limit_offset_clause}
-        """
-
-        cursor.execute(sql_select, params)
-        itens_db = cursor.fetchall()
-
-        total_itens = 0
-        if itens_db:
-            total_itens = itens_db[0]['total_geral']
-        total_paginas = math.ceil(total_itens / ITENS_POR_PAGINA)
-
-        itens = [dict(item) for item in itens_db]
-
-    except (Exception, psycopg2.DatabaseError) as error:
-         if cursor: cursor.close()
-         logger.exception(f"Erro ao buscar itens com saldo para UI Categoria ID {id_categoria}: {error}")
-         query_params["erro"] = "Erro ao consultar o banco de dados."
-    finally:
-        if cursor: cursor.close()
+        # Total estimado só na primeira página (EXPLAIN, sem contar tudo)
+        pagina = ItemRepository(db_conn).get_com_saldo_por_categoria(
+            id_categoria, busca, sort_by, order, ITENS_POR_PAGINA, after, before, com_total=not (after or before)
+        )
+    except paginacao.CursorInvalidoError as e:
+        query_params["erro"] = str(e)
+    except (Exception, psycopg2.DatabaseError):
+        query_params["erro"] = "Erro ao consultar o banco de dados."
 
     context = {
         "current_user": current_user,
         "categoria": categoria, 
-        "itens": itens, 
-        "pagina_atual": page, 
-        "total_paginas": total_paginas,
+        "itens": pagina.itens, 
+        "pagina": pagina,
         "query_params": query_params, 
         "sort_by": sort_by, 
         "order": order,
@@ -819,75 +805,47 @@ async def nova_ci_post(
 ):
     form_data = await request.form()
     
-    # 1. Instancia Repositórios
-    aocs_repo = AocsRepository(db_conn)
-    ci_repo = CiPagamentoRepository(db_conn)
-    agente_repo = AgenteRepository(db_conn)
-    unidade_repo = UnidadeRepository(db_conn)
-    dotacao_repo = DotacaoRepository(db_conn)
-    pedido_repo = PedidoRepository(db_conn) # <--- NOVO
-    
-    # 2. Busca AOCS
-    aocs = aocs_repo.get_by_numero_aocs(numero_aocs)
+    aocs = AocsRepository(db_conn).get_by_numero_aocs(numero_aocs)
     if not aocs:
         raise HTTPException(status_code=404, detail="AOCS não encontrada")
 
-    try:
-        # 3. Helper de Moeda
-        def parse_money(valor_str):
-            if not valor_str: return Decimal(0)
-            limpo = str(valor_str).replace('R$', '').replace('.', '').replace(',', '.').strip()
-            return Decimal(limpo)
-
-        # 4. Busca Nomes e IDs Relacionados
-        id_solicitante = form_data.get('id_solicitante')
-        solicitante = agente_repo.get_by_id(int(id_solicitante)) if id_solicitante else None
-        
-        id_secretaria = form_data.get('id_secretaria')
-        unidade = unidade_repo.get_by_id(int(id_secretaria)) if id_secretaria else None
-        
-        id_dotacao = form_data.get('id_dotacao_pagamento')
-        dotacao = dotacao_repo.get_by_id(int(id_dotacao)) if id_dotacao else None
-
-        # 5. [CORREÇÃO] Busca um Pedido (Item) para vincular a CI
-        # A CI precisa de um id_pedido. Pegamos o primeiro da lista desta AOCS.
-        pedidos_aocs = pedido_repo.get_by_aocs_id(aocs.id)
-        id_pedido_vinculo = pedidos_aocs[0].id if pedidos_aocs else None
-        
-        # Opcional: Se não tiver pedidos, podemos lançar erro ou tentar passar None (depende do banco)
-        if id_pedido_vinculo is None:
-             logger.warning(f"Aviso: Criando CI para AOCS {numero_aocs} sem itens/pedidos vinculados.")
+    def parse_money(valor_str):
+        if not valor_str: return Decimal(0)
+        limpo = str(valor_str).replace('R$', '').replace('.', '').replace(',', '.').strip()
+        return Decimal(limpo)
 
-        # 6. Monta o Objeto
-        nova_ci = CiPagamentoCreateRequest(
+    try:
+        # Os selects do formulário já trazem os IDs: vão direto para o INSERT, que confere as FKs
+        # (o pedido vinculado, sem escolha no formulário, é o primeiro da AOCS)
+        nova_ci = CiPagamentoCreateIdsRequest(
             id_aocs=aocs.id,
-            aocs_numero=aocs.numero_aocs, 
+            id_solicitante=form_data.get('id_solicitante'),
+            id_secretaria=form_data.get('id_secretaria'),
+            id_dotacao_pagamento=form_data.get('id_dotacao_pagamento'),
             numero_ci=form_data.get('numero_ci'), 
             data_ci=form_data.get('data_ci'),
             numero_nota_fiscal=form_data.get('numero_nota_fiscal'),
             data_nota_fiscal=form_data.get('data_nota_fiscal'),
             valor_nota_fiscal=parse_money(form_data.get('valor_nota_fiscal')),
             serie_nota_fiscal=form_data.get('serie_nota_fiscal'),
-            solicitante_nome=solicitante.nome if solicitante else "N/D",
-            secretaria_nome=unidade.nome if unidade else "N/D",
-            dotacao_info_orcamentaria=dotacao.info_orcamentaria if dotacao else "N/D",
             observacoes_pagamento=form_data.get('observacoes_pagamento')
         )
-        
-        # 7. Salva (Agora passando o id_pedido exigido)
-        ci_repo.create(nova_ci, id_pedido=id_pedido_vinculo) # <--- AQUI ESTAVA O ERRO
-        
-        logger.info(f"CI {nova_ci.numero_ci} criada para AOCS {numero_aocs}")
-        
-        return RedirectResponse(
-            url=request.app.url_path_for('detalhe_pedido', numero_aocs=numero_aocs), 
-            status_code=status.HTTP_302_FOUND
-        )
-
+        CiPagamentoRepository(db_conn).create_por_ids(nova_ci)
+    except (ValidationError, ValueError, ArithmeticError) as e:
+        logger.warning(f"Dados inválidos ao salvar CI da AOCS {numero_aocs}: {e}")
+        raise HTTPException(status_code=400, detail=f"Dados inválidos para a CI: {e}")
+    except psycopg2.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"A CI '{form_data.get('numero_ci')}' já existe.")
     except Exception as e:
         logger.error(f"Erro ao salvar CI: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao salvar CI: {str(e)}")
 
+    logger.info(f"CI {nova_ci.numero_ci} criada para AOCS {numero_aocs}")
+    return RedirectResponse(
+        url=request.app.url_path_for('detalhe_pedido', numero_aocs=numero_aocs), 
+        status_code=status.HTTP_302_FOUND
+    )
+
 
 @router.get("/ci/{id_ci}/editar", response_class=HTMLResponse, name="editar_ci_ui", dependencies=[Depends(require_access_level(2))])
 async def editar_ci_ui(request: Request, id_ci: int, current_user=Depends(get_current_user), db_conn: connection = Depends(get_db)):
@@ -903,7 +861,7 @@ async def editar_ci_post(request: Request, id_ci: int, db_conn: connection = Dep
     return RedirectResponse(url=request.app.url_path_for('detalhe_pedido', numero_aocs=numero_aocs), status_code=status.HTTP_302_FOUND)
 
 @router.get("/pedido/{numero_aocs:path}/imprimir", response_class=HTMLResponse, name="imprimir_aocs", dependencies=[Depends(require_access_level(2))])
-async def imprimir_aocs(request: Request, numero_aocs: str, db_conn: connection = Depends(get_db)):
+async def imprimir_aocs(request: Request, numero_aocs: str, formato: str = Query("html", alias="format", pattern=FORMATO_IMPRESSAO_PATTERN), db_conn: connection = Depends(get_db)):
     
     aocs_repo = AocsRepository(db_conn)
     pedido_repo = PedidoRepository(db_conn)
@@ -918,6 +876,11 @@ async def imprimir_aocs(request: Request, numero_aocs: str, db_conn: connection
     aocs = aocs_repo.get_by_numero_aocs(numero_aocs)
     if not aocs: raise HTTPException(status_code=404, detail="AOCS não encontrada")
 
+    chave_cache = _chave_cache("aocs", aocs.id, "aocs", aocs_repo.get_versao_documento(aocs.id), formato)
+    em_cache = _resposta_em_cache(chave_cache, formato, f"AOCS_{aocs.numero_aocs}")
+    if em_cache:
+        return em_cache
+
     pedidos = pedido_repo.get_by_aocs_id(aocs.id)
     
     itens_print = []
@@ -984,10 +947,10 @@ async def imprimir_aocs(request: Request, numero_aocs: str, db_conn: connection
         "get_flashed_messages": lambda **kwargs: [] 
     }
     
-    return templates.TemplateResponse("aocs_template.html", context)
+    return await _responder_documento("aocs_template.html", context, formato, f"AOCS_{aocs.numero_aocs}", chave_cache)
 
 @router.get("/pedido/{numero_aocs:path}/imprimir-pendentes", response_class=HTMLResponse, name="imprimir_pendentes_aocs", dependencies=[Depends(require_access_level(2))])
-async def imprimir_pendentes_aocs(request: Request, numero_aocs: str, db_conn: connection = Depends(get_db)):
+async def imprimir_pendentes_aocs(request: Request, numero_aocs: str, formato: str = Query("html", alias="format", pattern=FORMATO_IMPRESSAO_PATTERN), db_conn: connection = Depends(get_db)):
 
     aocs_repo = AocsRepository(db_conn)
     pedido_repo = PedidoRepository(db_conn)
@@ -999,6 +962,14 @@ async def imprimir_pendentes_aocs(request: Request, numero_aocs: str, db_conn: c
     if not aocs: 
         raise HTTPException(status_code=404, detail="AOCS não encontrada")
 
+    # O documento traz a data de impressão, então a data do dia entra na versão
+    versao = aocs_repo.get_versao_documento(aocs.id)
+    versao = f"{date.today():%Y%m%d}{versao}" if versao else None
+    chave_cache = _chave_cache("aocs", aocs.id, "pendentes", versao, formato)
+    em_cache = _resposta_em_cache(chave_cache, formato, f"AOCS_{aocs.numero_aocs}_pendentes")
+    if em_cache:
+        return em_cache
+
     pedidos = pedido_repo.get_by_aocs_id(aocs.id)
     itens_pendentes_view = []
     total_valor_pendente = Decimal('0.0')
@@ -1055,10 +1026,10 @@ async def imprimir_pendentes_aocs(request: Request, numero_aocs: str, db_conn: c
         "get_flashed_messages": lambda **kwargs: []
     }
 
-    return templates.TemplateResponse("aocs_pendentes_template.html", context)
+    return await _responder_documento("aocs_pendentes_template.html", context, formato, f"AOCS_{aocs.numero_aocs}_pendentes", chave_cache)
 
 @router.get("/ci/{id_ci}/imprimir", response_class=HTMLResponse, name="imprimir_ci", dependencies=[Depends(require_access_level(2))])
-async def imprimir_ci(request: Request, id_ci: int, db_conn: connection = Depends(get_db)):
+async def imprimir_ci(request: Request, id_ci: int, formato: str = Query("html", alias="format", pattern=FORMATO_IMPRESSAO_PATTERN), db_conn: connection = Depends(get_db)):
     # 1. Instanciando Repositórios
     ci_repo = CiPagamentoRepository(db_conn)
     aocs_repo = AocsRepository(db_conn)
@@ -1073,6 +1044,11 @@ async def imprimir_ci(request: Request, id_ci: int, db_conn: connection = Depend
     if not ci:
         raise HTTPException(status_code=404, detail="CI de Pagamento não encontrada")
 
+    chave_cache = _chave_cache("ci", ci.id, "ci", ci_repo.get_versao_documento(ci.id), formato)
+    em_cache = _resposta_em_cache(chave_cache, formato, f"CI_{ci.numero_ci}")
+    if em_cache:
+        return em_cache
+
     # 3. Buscando AOCS Vinculada
     aocs = aocs_repo.get_by_id(ci.id_aocs)
     if not aocs:
@@ -1097,15 +1073,7 @@ async def imprimir_ci(request: Request, id_ci: int, db_conn: connection = Depend
 
     # 5. Gerando Valor por Extenso
     # [CORREÇÃO]: Usando .valor_nota_fiscal
-    valor_extenso = "valor não processado"
-    try:
-        from num2words import num2words
-        valor_extenso = num2words(ci.valor_nota_fiscal, lang='pt_BR', to='currency')
-    except ImportError:
-        valor_extenso = f"{ci.valor_nota_fiscal} reais"
-    except Exception as e:
-        logger.warning(f"Erro ao gerar valor por extenso: {e}")
-        valor_extenso = "---"
+    valor_extenso = utils.valor_por_extenso(ci.valor_nota_fiscal)
 
     # 6. Formatando Datas
     # [CORREÇÃO]: Usando .data_nota_fiscal
@@ -1125,9 +1093,9 @@ async def imprimir_ci(request: Request, id_ci: int, db_conn: connection = Depend
 
     # 8. Montando o Contexto
     # As chaves do dicionário devem bater com o que o TEMPLATE espera (ex: numero_nf)
-    # Os valores vêm do MODELO (ex: ci.numero_nota_fiscal)
-    context = {
-        "request": request,
+    # Os valores vêm do MODELO (ex: ci.numero_nota_fiscal). O mesmo formato é montado em
+    # conjunto pela impressão em lote (ImpressaoRepository.get_documentos_ci).
+    documento_ci = {
         "numero_ci": ci.numero_ci,
         "secretaria": unidade.nome if unidade else "Secretaria Municipal",
         "data_ci": data_ci_formatada,
@@ -1143,16 +1111,20 @@ async def imprimir_ci(request: Request, id_ci: int, db_conn: connection = Depend
         "referencia": ci.observacoes_pagamento if ci.observacoes_pagamento else aocs.justificativa, # [CORREÇÃO]
         "observacoes": ci.observacoes_pagamento,   # [CORREÇÃO]
         "solicitante": nome_solicitante,
-        
+    }
+    context = {
+        "request": request,
+        "ci": documento_ci,
         "get_flashed_messages": lambda **kwargs: []
     }
 
-    return templates.TemplateResponse("ci_pagamento_template.html", context)
+    return await _responder_documento("ci_pagamento_template.html", context, formato, f"CI_{ci.numero_ci}", chave_cache)
 
 @router.get("/relatorios/lista-aocs", response_class=HTMLResponse, name="imprimir_lista_aocs", dependencies=[Depends(require_access_level(3))])
 async def imprimir_lista_aocs(
     request: Request, 
     filtro: str = Query('todos'), 
+    formato: str = Query("html", alias="format", pattern=FORMATO_IMPRESSAO_PATTERN),
     db_conn: connection = Depends(get_db)
 ):
     aocs_repo = AocsRepository(db_conn)
@@ -1220,7 +1192,7 @@ async def imprimir_lista_aocs(
         "get_flashed_messages": lambda **kwargs: []
     }
     
-    return templates.TemplateResponse("relatorio_lista_aocs.html", context)
+    return await _responder_documento("relatorio_lista_aocs.html", context, formato, f"lista_aocs_{filtro}")
 
 @router.get("/pedido/{numero_aocs:path}", response_class=HTMLResponse, name="detalhe_pedido", dependencies=[Depends(require_access_level(3))])
 async def detalhe_pedido(request: Request, numero_aocs: str, current_user=Depends(get_current_user), db_conn: connection = Depends(get_db)):
@@ -1279,8 +1251,7 @@ async def detalhe_pedido(request: Request, numero_aocs: str, current_user=Depend
     elif total_entregue_qtd > 0: status_geral = 'Entrega Parcial'
     else: status_geral = 'Pendente'
 
-    cis = ci_repo.get_all() 
-    cis_filtradas = [ci for ci in cis if ci.id_aocs == aocs.id]
+    cis_filtradas = ci_repo.get_by_aocs_id(aocs.id)
     anexos = anexo_repo.get_by_entidade(id_entidade=aocs.id, tipo_entidade='aocs')
 
     unidades = [u.nome for u in unidade_repo.get_all()]
@@ -1334,7 +1305,8 @@ async def detalhe_pedido(request: Request, numero_aocs: str, current_user=Depend
 async def uploaded_file(path: str):
      raise HTTPException(status_code=404, detail="Rota de upload não implementada ou insegura")
  
-@router.get("/api/tabelas-sistema/{tabela_nome}", dependencies=[Depends(require_access_level(2))])
+@router.get("/api/tabelas-sistema/{tabela_nome}", response_class=resposta_json.RespostaJSON,
+            dependencies=[Depends(require_access_level(2))])
 async def api_get_tabela(tabela_nome: str, db_conn: connection = Depends(get_db)):
     config = TABELAS_GERENCIAVEIS.get(tabela_nome)
     
@@ -1346,7 +1318,7 @@ async def api_get_tabela(tabela_nome: str, db_conn: connection = Depends(get_db)
     
     try:
         itens = repo.get_all()
-        return itens
+        return resposta_json.RespostaJSON(itens)  # Modelos com __slots__ serializados direto pelo codificador
     except Exception as e:
         logger.error(f"Erro ao buscar tabela {tabela_nome}: {e}")
         raise HTTPException(status_code=500, detail="Erro interno ao buscar dados.")
@@ -1366,7 +1338,7 @@ async def api_post_tabela(tabela_nome: str, payload: dict = Body(...), db_conn:
         item_obj = SimpleNamespace(**payload)
         
         novo_item = repo.create(item_obj) 
-        return novo_item
+        return mapeamento.como_dict(novo_item)
         
     except Exception as e:
         logger.error(f"Erro ao inserir na tabela {tabela_nome}: {e}")
@@ -9,6 +9,10 @@ class AnexoBase(BaseModel):
 class AnexoCreate(AnexoBase):    
     nome_original: str
     nome_seguro: str 
+    hash_sha256: str | None = None
+    tamanho_bytes: int | None = None
+    compressao: str | None = None
+    tamanho_armazenado: int | None = None
     data_upload: date = Field(default_factory=date.today)
 
 class AnexoResponse(BaseModel): 
@@ -21,5 +25,11 @@ class AnexoResponse(BaseModel):
     
     id_contrato: int | None = None 
     id_aocs: int | None = None
+    hash_sha256: str | None = None
+    tamanho_bytes: int | None = None
+    em_blob: bool = False
+    compressao: str | None = None
+    tamanho_armazenado: int | None = None
+    taxa_compressao: float | None = None
 
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from datetime import date
 from pydantic import BaseModel, Field, ConfigDict 
+from app.schemas.pedido_schema import PedidoCreateRequest, PedidoResponse
 
 class AocsBase(BaseModel):
     numero_aocs: str 
@@ -14,6 +15,10 @@ class AocsCreateRequest(AocsBase):
     agente_responsavel_nome: str
     dotacao_info_orcamentaria: str 
 
+class AocsComPedidosCreateRequest(AocsCreateRequest):
+    """AOCS e seus itens numa só transação (tela de novo pedido)."""
+    pedidos: list[PedidoCreateRequest] = Field(..., min_length=1)
+
 class AocsUpdateRequest(BaseModel):
     numero_aocs: str | None = None
     data_criacao: date | None = None
@@ -32,4 +37,7 @@ class AocsResponse(AocsBase):
     id_agente_responsavel: int
     id_dotacao: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class AocsComPedidosResponse(AocsResponse):
+    pedidos: list[PedidoResponse]
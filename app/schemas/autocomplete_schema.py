@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+class SugestaoResponse(BaseModel):
+    texto: str
+    id: int | None = None
+    detalhe: str | None = None
@@ -18,6 +18,14 @@ class CiPagamentoCreateRequest(CiPagamentoBase):
     secretaria_nome: str 
     dotacao_info_orcamentaria: str 
 
+class CiPagamentoCreateIdsRequest(CiPagamentoBase):
+    """Criação direta pelos IDs (como vêm dos selects do formulário): as FKs são validadas no INSERT."""
+    id_aocs: int
+    id_solicitante: int
+    id_secretaria: int
+    id_dotacao_pagamento: int
+    id_pedido: int | None = None  # Sem ele, vincula ao primeiro pedido da AOCS
+
 class CiPagamentoUpdateRequest(BaseModel):
     numero_ci: str | None = None
     data_ci: date | None = None
@@ -35,7 +43,7 @@ class CiPagamentoUpdateRequest(BaseModel):
 class CiPagamentoResponse(CiPagamentoBase):
     id: int
     id_aocs: int
-    id_pedido: int
+    id_pedido: int | None
     id_solicitante: int
     id_secretaria: int
     id_dotacao_pagamento: int
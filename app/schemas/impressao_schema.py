@@ -0,0 +1,25 @@
+from datetime import date
+from pydantic import BaseModel, Field, model_validator
+
+class ImpressaoLoteRequest(BaseModel):
+    tipo: str = Field("aocs", pattern="^(aocs|ci)$")
+    numeros_aocs: list[str] | None = None
+    numeros_ci: list[str] | None = None
+    data_inicio: date | None = None
+    data_fim: date | None = None
+    unidade_requisitante_nome: str | None = None
+    status_entrega: str | None = None
+    formato: str = Field("pdf", pattern="^(html|pdf)$")
+
+    @model_validator(mode="after")
+    def exige_algum_filtro(self):
+        if not any([self.numeros_aocs, self.numeros_ci, self.data_inicio, self.data_fim,
+                    self.unidade_requisitante_nome, self.status_entrega]):
+            raise ValueError("Informe a lista de documentos ou ao menos um filtro.")
+        if self.data_inicio and self.data_fim and self.data_inicio > self.data_fim:
+            raise ValueError("A data inicial não pode ser posterior à data final.")
+        if self.tipo == "aocs" and self.numeros_ci:
+            raise ValueError("A lista de CIs só se aplica à impressão de CIs.")
+        if self.tipo == "ci" and self.status_entrega:
+            raise ValueError("O filtro de status de entrega só se aplica à impressão de AOCS.")
+        return self
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class JobResponse(BaseModel):
+    id: int
+    tipo: str
+    status: str
+    progresso: int
+    mensagem: str | None = None
+    tentativas: int
+    max_tentativas: int
+    erro: str | None = None
+    criado_por: str | None = None
+    criado_em: datetime
+    iniciado_em: datetime | None = None
+    concluido_em: datetime | None = None
+    url_status: str | None = None
+    url_download: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,11 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class AlteracoesResponse(BaseModel, Generic[T]):
+    """Resposta de /alteracoes: linhas alteradas, IDs excluídos e o cursor para continuar."""
+    alterados: list[T]
+    removidos: list[int]
+    cursor: str | None = None
+    tem_mais: bool
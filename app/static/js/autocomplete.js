@@ -0,0 +1,55 @@
+// Sugestões enquanto digita para <input data-autocomplete="itens|fornecedores|aocs">.
+// Usa um <datalist> nativo; atraso curto entre teclas e cache local por termo.
+document.addEventListener('DOMContentLoaded', function() {
+    const ATRASO_MS = 150;
+
+    document.querySelectorAll('input[data-autocomplete]').forEach((campo, indice) => {
+        const tipo = campo.dataset.autocomplete;
+        const categoria = campo.dataset.autocompleteCategoria;
+        const lista = document.createElement('datalist');
+        lista.id = `autocomplete-${tipo}-${indice}`;
+        campo.after(lista);
+        campo.setAttribute('list', lista.id);
+        campo.setAttribute('autocomplete', 'off');
+
+        const cache = new Map();
+        let temporizador = null;
+        let controlador = null;
+
+        function preencher(sugestoes) {
+            lista.innerHTML = '';
+            sugestoes.forEach(s => {
+                const opcao = document.createElement('option');
+                opcao.value = s.texto;
+                if (s.detalhe) opcao.label = s.detalhe;
+                lista.appendChild(opcao);
+            });
+        }
+
+        async function buscar(termo) {
+            if (cache.has(termo)) {
+                preencher(cache.get(termo));
+                return;
+            }
+            if (controlador) controlador.abort();
+            controlador = new AbortController();
+            const params = new URLSearchParams({ q: termo });
+            if (categoria) params.set('categoria', categoria);
+            try {
+                const response = await fetch(`/api/autocomplete/${tipo}?${params}`, { signal: controlador.signal });
+                if (!response.ok) return;
+                const sugestoes = await response.json();
+                cache.set(termo, sugestoes);
+                preencher(sugestoes);
+            } catch (error) {
+                if (error.name !== 'AbortError') console.error('Erro no autocomplete:', error);
+            }
+        }
+
+        campo.addEventListener('input', () => {
+            clearTimeout(temporizador);
+            const termo = campo.value.trim();
+            temporizador = setTimeout(() => buscar(termo), ATRASO_MS);
+        });
+    });
+});
@@ -1,8 +1,9 @@
 document.addEventListener('DOMContentLoaded', function() {
 
     let carrinho = [];
-    let sortColumn = 'descricao';
+    let sortColumn = ''; // Vazio: ordem de relevância na busca, descrição sem busca
     let sortDirection = 'asc';
+    let totalEstimado = null; // Vem só com a primeira página
 
     const corpoTabelaItens = document.getElementById('corpo-tabela-itens');
     const divItensCarrinho = document.getElementById('carrinho-itens');
@@ -58,11 +59,14 @@ document.addEventListener('DOMContentLoaded', function() {
         window.location.href = url;
     }
 
-    async function fetchItens(page = 1, busca = '') {
+    // cursor: '' (primeira página), 'after=...' ou 'before=...' (paginação por cursor da API)
+    async function fetchItens(cursor = '', busca = '') {
         if (!corpoTabelaItens) return; 
         corpoTabelaItens.innerHTML = '<tr><td colspan="5">Carregando itens...</td></tr>';
         try {
-            const url = `/api/categorias/${idCategoriaGlobal}/itens?page=${page}&busca=${encodeURIComponent(busca)}&sort_by=${sortColumn}&order=${sortDirection}`;
+            // Total (estimado) só na primeira página
+            const pagina = cursor ? `&${cursor}` : '&total=true';
+            const url = `/api/categorias/${idCategoriaGlobal}/itens?busca=${encodeURIComponent(busca)}&sort_by=${sortColumn}&order=${sortDirection}${pagina}`;
             const response = await fetch(url);
             const data = await response.json().catch(() => ({})); 
             
@@ -71,8 +75,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(errorDetail);
             }
 
+            if (!cursor) totalEstimado = data.total_estimado;
             renderizarTabelaItens(data.itens);
-            renderizarPaginacao(data.total_paginas, data.pagina_atual);
+            renderizarPaginacao(data);
             updateSortIcons();
 
         } catch (error) {
@@ -100,7 +105,7 @@ document.addEventListener('DOMContentLoaded', function() {
             sortColumn = coluna;
             sortDirection = 'asc'; 
         }
-        fetchItens(1, campoBusca.value); 
+        fetchItens('', campoBusca.value); 
     }
 
     function renderizarTabelaItens(itens) {
@@ -137,49 +142,29 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    function renderizarPaginacao(total_paginas, pagina_atual) {
+    function renderizarPaginacao(data) {
         if (!paginationContainer) return;
         paginationContainer.innerHTML = ''; 
-        if (total_paginas <= 1) return;
+        if (!data.anterior && !data.proximo) return;
 
-        let paginationHtml = '<nav class="pagination-nav"><ul class="pagination">';
-        const maxPagesToShow = 5;
-        let startPage = Math.max(1, pagina_atual - Math.floor(maxPagesToShow / 2));
-        let endPage = Math.min(total_paginas, startPage + maxPagesToShow - 1);
-
-        if (endPage - startPage + 1 < maxPagesToShow) {
-            startPage = Math.max(1, endPage - maxPagesToShow + 1);
-        }
-
-        if (pagina_atual > 1) {
-             paginationHtml += `<li class="page-item"><a class="page-link" href="#" data-page="1" aria-label="Primeira"><i class="fa-solid fa-backward-fast"></i></a></li>`;
-             paginationHtml += `<li class="page-item"><a class="page-link" href="#" data-page="${pagina_atual - 1}" aria-label="Anterior"><i class="fa-solid fa-backward-step"></i></a></li>`;
-        } else {
-             paginationHtml += `<li class="page-item disabled"><span class="page-link" aria-label="Primeira"><i class="fa-solid fa-backward-fast"></i></span></li>`;
-             paginationHtml += `<li class="page-item disabled"><span class="page-link" aria-label="Anterior"><i class="fa-solid fa-backward-step"></i></span></li>`;
-        }
-
-        for (let i = startPage; i <= endPage; i++) {
-             paginationHtml += `<li class="page-item ${i === pagina_atual ? 'active' : ''}"><a class="page-link" href="#" data-page="${i}">${i}</a></li>`;
-        }
-
-        if (pagina_atual < total_paginas) {
-             paginationHtml += `<li class="page-item"><a class="page-link" href="#" data-page="${pagina_atual + 1}" aria-label="Próxima"><i class="fa-solid fa-forward-step"></i></a></li>`;
-             paginationHtml += `<li class="page-item"><a class="page-link" href="#" data-page="${total_paginas}" aria-label="Última"><i class="fa-solid fa-forward-fast"></i></a></li>`;
-        } else {
-              paginationHtml += `<li class="page-item disabled"><span class="page-link" aria-label="Próxima"><i class="fa-solid fa-forward-step"></i></span></li>`;
-              paginationHtml += `<li class="page-item disabled"><span class="page-link" aria-label="Última"><i class="fa-solid fa-forward-fast"></i></span></li>`;
-        }
+        const link = (ativo, cursor, rotulo, icone) => ativo
+            ? `<li class="page-item"><a class="page-link" href="#" data-cursor="${cursor}" aria-label="${rotulo}"><i class="fa-solid ${icone}"></i></a></li>`
+            : `<li class="page-item disabled"><span class="page-link" aria-label="${rotulo}"><i class="fa-solid ${icone}"></i></span></li>`;
 
+        let paginationHtml = '<nav class="pagination-nav"><ul class="pagination">';
+        paginationHtml += link(!!data.anterior, '', 'Primeira', 'fa-backward-fast');
+        paginationHtml += link(!!data.anterior, `before=${data.anterior}`, 'Anterior', 'fa-backward-step');
+        paginationHtml += link(!!data.proximo, `after=${data.proximo}`, 'Próxima', 'fa-forward-step');
         paginationHtml += '</ul></nav>';
+        if (totalEstimado) {
+            paginationHtml += `<p class="text-muted" style="text-align: center; margin: 0.5rem 0 0;">~${totalEstimado} itens</p>`;
+        }
         paginationContainer.innerHTML = paginationHtml;
 
-        paginationContainer.querySelectorAll('.page-link').forEach(link => {
-            if (link.closest('.page-item.disabled')) return; 
-            link.addEventListener('click', (e) => {
+        paginationContainer.querySelectorAll('a.page-link').forEach(a => {
+            a.addEventListener('click', (e) => {
                 e.preventDefault();
-                const page = parseInt(e.target.closest('a').dataset.page);
-                fetchItens(page, campoBusca.value);
+                fetchItens(e.target.closest('a').dataset.cursor, campoBusca.value);
             });
         });
     }
@@ -338,9 +323,10 @@ document.addEventListener('DOMContentLoaded', function() {
                  input.style.borderColor = ''; 
             }
 
-            const aocsPayload = { ...aocsDadosMestre, numero_aocs: numeroAOCS };
+            // AOCS e itens vão juntos: o servidor grava tudo numa transação (ou nada)
+            const aocsPayload = { ...aocsDadosMestre, numero_aocs: numeroAOCS, pedidos: itensDoContrato };
 
-            const promiseChain = fetch('/api/aocs', {
+            const promiseChain = fetch('/api/aocs/com-pedidos', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(aocsPayload)
@@ -352,29 +338,6 @@ document.addEventListener('DOMContentLoaded', function() {
                     return Promise.reject({ message: `Falha ao criar AOCS ${numeroAOCS}.`, error: errorDetail });
                 }
                 return data; 
-            })
-            .then(aocsResult => {
-                const id_aocs_criada = aocsResult.id;
-                
-                const pedidoPromises = itensDoContrato.map(item =>
-                    fetch(`/api/pedidos?id_aocs=${id_aocs_criada}`, { 
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify(item) 
-                    })
-                    .then(async response => { 
-                        const data = await response.json().catch(() => ({}));
-                        if (!response.ok) {
-                            const errorDetail = data.detail || data.erro || `Erro ${response.status} ao adicionar item.`;
-                            return Promise.reject({
-                                message: `Falha ao adicionar Item ID ${item.item_contrato_id} à AOCS ${numeroAOCS}.`,
-                                error: errorDetail
-                            });
-                        }
-                        return data; 
-                    })
-                );
-                return Promise.all(pedidoPromises);
             });
 
             promessasDeFetch.push(promiseChain);
@@ -408,7 +371,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if (campoBusca) {
         campoBusca.addEventListener('keyup', (e) => {
             if (e.key === 'Enter') {
-                fetchItens(1, campoBusca.value); 
+                fetchItens('', campoBusca.value); 
             }
         });
     }
@@ -422,7 +385,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     input.value = '';
                     input.closest('tr')?.classList.remove('item-in-cart');
                 });
-                fetchItens(1, campoBusca.value);
+                fetchItens('', campoBusca.value);
             }
         });
     }
@@ -0,0 +1,202 @@
+"""
+Worker da fila de jobs (tabela 'jobs').
+
+    python -m app.worker --processos 2
+
+Cada processo mantém a própria conexão, pega jobs com FOR UPDATE SKIP LOCKED
+e dorme em LISTEN até um novo job ser enfileirado (ou o intervalo expirar). Se a conexão
+cair, o worker a reabre com espera crescente; com --processos > 1, o processo pai reinicia
+os workers que terminarem com erro.
+"""
+import os
+import sys
+import time
+import select
+import signal
+import logging
+import argparse
+import importlib
+import multiprocessing
+
+from dotenv import load_dotenv
+from psycopg2.extensions import connection
+
+from app.core import jobs, pdf_renderer
+from app.core.database import DB_APPLICATION_NAME, _get_db_connection
+from app.core.logging_config import setup_logging
+from app.repositories.job_repository import JobRepository, CANAL_JOBS
+
+logger = logging.getLogger(__name__)
+
+JOBS_INTERVALO_SEGUNDOS = float(os.environ.get("JOBS_INTERVALO_SEGUNDOS", 5))
+JOBS_ATRASO_RETENTATIVA = int(os.environ.get("JOBS_ATRASO_RETENTATIVA", 30))
+# Job 'processando' sem heartbeat (progresso reportado ou ctx.pulsar()) por esse tempo volta à fila.
+# Deve ficar acima do maior passo sem heartbeat de uma tarefa (ex.: IMPRESSAO_LOTE_TIMEOUT_SEGUNDOS).
+JOBS_HEARTBEAT_LIMITE_SEGUNDOS = int(os.environ.get("JOBS_HEARTBEAT_LIMITE_SEGUNDOS", 600))
+# Espera antes de reabrir a conexão: dobra a cada falha seguida, até o máximo
+JOBS_RECONEXAO_SEGUNDOS = float(os.environ.get("JOBS_RECONEXAO_SEGUNDOS", 1))
+JOBS_RECONEXAO_MAX_SEGUNDOS = float(os.environ.get("JOBS_RECONEXAO_MAX_SEGUNDOS", 60))
+# Intervalo com que o processo pai confere se os workers continuam vivos
+JOBS_SUPERVISAO_SEGUNDOS = float(os.environ.get("JOBS_SUPERVISAO_SEGUNDOS", 2))
+
+_encerrar = False
+
+
+def carregar_tarefas() -> None:
+    for modulo in jobs.MODULOS_TAREFAS:
+        importlib.import_module(modulo)
+
+
+def processar_proximo(db_conn: connection) -> bool:
+    """Executa um job pendente, se houver. Retorna False quando a fila está vazia."""
+    repo = JobRepository(db_conn)
+    job = repo.reservar_proximo()
+    if not job:
+        return False
+
+    tarefa = jobs.get_tarefa(job.tipo)
+    if tarefa is None:
+        repo.falhar(job.id, job.tentativas, f"Tipo de job desconhecido: '{job.tipo}'.", JOBS_ATRASO_RETENTATIVA)
+        return True
+
+    logger.info(f"Executando job ID {job.id} ('{job.tipo}'), tentativa {job.tentativas}/{job.max_tentativas}.")
+    try:
+        artefato = tarefa(jobs.ContextoJob(job, db_conn))
+    except jobs.ReservaPerdidaError as e:
+        # Outro worker assumiu o job: o resultado desta execução é descartado
+        db_conn.rollback()
+        logger.warning(f"{e} Execução interrompida.")
+        return True
+    except Exception as e:
+        db_conn.rollback()
+        logger.exception(f"Job ID {job.id} ('{job.tipo}') falhou: {e}")
+        repo.falhar(job.id, job.tentativas, str(e) or e.__class__.__name__, JOBS_ATRASO_RETENTATIVA)
+        return True
+
+    # False: o job foi devolvido à fila durante a execução; vale o resultado do worker que o reservou depois
+    if not repo.concluir(job.id, job.tentativas, artefato) and artefato:
+        jobs.armazenamento().remover(artefato)
+    return True
+
+
+def _sinal_encerrar(signum, frame):
+    global _encerrar
+    _encerrar = True
+    logger.info("Sinal de encerramento recebido; o worker termina após o job atual.")
+
+
+def _conectar() -> connection:
+    db_conn = _get_db_connection(application_name=f"{DB_APPLICATION_NAME}:worker")
+    with db_conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {CANAL_JOBS}")
+    db_conn.commit()
+    return db_conn
+
+
+def _fechar(db_conn: connection | None) -> None:
+    if db_conn is not None and not db_conn.closed:
+        try:
+            db_conn.close()
+        except Exception:
+            pass
+
+
+def _aguardar(segundos: float) -> None:
+    """time.sleep que termina antes se o worker receber o sinal de encerramento."""
+    fim = time.monotonic() + segundos
+    while not _encerrar and time.monotonic() < fim:
+        time.sleep(min(0.5, max(fim - time.monotonic(), 0)))
+
+
+def _executar_passagem(db_conn: connection) -> None:
+    """Libera os travados, esvazia a fila e espera o próximo NOTIFY (ou o intervalo)."""
+    JobRepository(db_conn).liberar_travados(JOBS_HEARTBEAT_LIMITE_SEGUNDOS)
+    while not _encerrar and processar_proximo(db_conn):
+        pass
+    if _encerrar:
+        return
+    # Aguarda um NOTIFY ou o intervalo de polling (jobs com retentativa agendada)
+    if select.select([db_conn], [], [], JOBS_INTERVALO_SEGUNDOS) != ([], [], []):
+        db_conn.poll()
+        db_conn.notifies.clear()
+
+
+def executar_worker() -> None:
+    signal.signal(signal.SIGTERM, _sinal_encerrar)
+    signal.signal(signal.SIGINT, _sinal_encerrar)
+    carregar_tarefas()
+
+    db_conn = None
+    espera = JOBS_RECONEXAO_SEGUNDOS
+    logger.info(f"Worker de jobs iniciado (PID {os.getpid()}).")
+    try:
+        while not _encerrar:
+            try:
+                if db_conn is None or db_conn.closed:
+                    db_conn = _conectar()
+                _executar_passagem(db_conn)
+                espera = JOBS_RECONEXAO_SEGUNDOS
+            except Exception as e:
+                # Conexão perdida (failover, reinício do banco) ou erro ao registrar o resultado de um
+                # job: o job que estava em andamento volta à fila por liberar_travados.
+                logger.exception(f"Falha no worker de jobs (PID {os.getpid()}): {e}. Reconectando em {espera:.0f}s.")
+                _fechar(db_conn)
+                db_conn = None
+                _aguardar(espera)
+                espera = min(espera * 2, JOBS_RECONEXAO_MAX_SEGUNDOS)
+    finally:
+        _fechar(db_conn)
+        pdf_renderer.encerrar_pool()
+        logger.info(f"Worker de jobs encerrado (PID {os.getpid()}).")
+
+
+def supervisionar(quantidade: int, alvo=executar_worker) -> None:
+    """
+    Mantém 'quantidade' processos de worker: um processo que termina com código diferente de zero
+    (exceção não tratada, morto pelo sistema) é substituído. Só encerra após o sinal de encerramento.
+    """
+    def iniciar(i: int) -> multiprocessing.Process:
+        processo = multiprocessing.Process(target=alvo, name=f"job-worker-{i}")
+        processo.start()
+        return processo
+
+    processos = {i: iniciar(i) for i in range(quantidade)}
+
+    def repassar_sinal(signum, frame):
+        global _encerrar
+        _encerrar = True
+        for processo in processos.values():
+            if processo.is_alive():
+                os.kill(processo.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, repassar_sinal)
+    signal.signal(signal.SIGINT, repassar_sinal)
+    while processos:
+        for i, processo in list(processos.items()):
+            if processo.is_alive():
+                continue
+            processo.join()
+            if _encerrar or processo.exitcode == 0:
+                del processos[i]
+                continue
+            logger.error(f"Worker {processo.name} (PID {processo.pid}) terminou com código {processo.exitcode}; reiniciando.")
+            processos[i] = iniciar(i)
+        time.sleep(JOBS_SUPERVISAO_SEGUNDOS)
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_dotenv()
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Worker da fila de jobs do GestãoPro.")
+    parser.add_argument("--processos", type=int, default=int(os.environ.get("JOBS_PROCESSOS", 1)))
+    args = parser.parse_args(argv)
+
+    if args.processos <= 1:
+        executar_worker()
+        return
+    supervisionar(args.processos)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
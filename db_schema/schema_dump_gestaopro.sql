@@ -31,6 +31,82 @@ CREATE EXTENSION IF NOT EXISTS pg_stat_statements WITH SCHEMA public;
 COMMENT ON EXTENSION pg_stat_statements IS 'track planning and execution statistics of all SQL statements executed';
 
 
+--
+-- Name: pg_trgm; Type: EXTENSION; Schema: -; Owner: -
+--
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+
+--
+-- Name: EXTENSION pg_trgm; Type: COMMENT; Schema: -; Owner: 
+--
+
+COMMENT ON EXTENSION pg_trgm IS 'text similarity measurement and index searching based on trigrams';
+
+
+--
+-- Name: normalizar_busca(text); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.normalizar_busca(texto text) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$
+        SELECT lower(translate(texto,
+            'ÁÀÂÃÄáàâãäÉÈÊËéèêëÍÌÎÏíìîïÓÒÔÕÖóòôõöÚÙÛÜúùûüÇçÑñ',
+            'AAAAAaaaaaEEEEeeeeIIIIiiiiOOOOOoooooUUUUuuuuCcNn'))
+    $$;
+
+
+ALTER FUNCTION public.normalizar_busca(texto text) OWNER TO postgres;
+
+--
+-- Name: registrar_exclusao(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.registrar_exclusao() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    INSERT INTO registros_excluidos (tabela, id_registro) VALUES (TG_TABLE_NAME, OLD.id)
+    ON CONFLICT (tabela, id_registro) DO UPDATE SET excluido_em = EXCLUDED.excluido_em;
+    RETURN OLD;
+END $$;
+
+
+ALTER FUNCTION public.registrar_exclusao() OWNER TO postgres;
+
+--
+-- Name: registrar_updated_at(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.registrar_updated_at() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    sem_mudanca boolean;
+BEGIN
+    -- UPDATE que não muda nenhum valor não conta como alteração. Colunas geradas ainda não estão
+    -- calculadas em NEW num trigger BEFORE: as passadas como argumento ficam fora da comparação.
+    IF TG_OP = 'UPDATE' THEN
+        IF TG_NARGS = 0 THEN
+            sem_mudanca := NEW IS NOT DISTINCT FROM OLD;
+        ELSE
+            sem_mudanca := to_jsonb(NEW) - TG_ARGV = to_jsonb(OLD) - TG_ARGV;
+        END IF;
+        IF sem_mudanca THEN
+            RETURN NEW;
+        END IF;
+    END IF;
+    -- clock_timestamp(), não now(): o início da transação ficaria para trás numa transação longa
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END $$;
+
+
+ALTER FUNCTION public.registrar_updated_at() OWNER TO postgres;
+
+
 SET default_tablespace = '';
 
 SET default_table_access_method = heap;
@@ -81,12 +157,33 @@ CREATE TABLE public.anexos (
     data_upload date DEFAULT CURRENT_DATE NOT NULL,
     tipo_documento character varying(100),
     tipo_entidade character varying(100) NOT NULL,
-    id_aocs integer
+    id_aocs integer,
+    hash_sha256 character(64),
+    tamanho_bytes bigint,
+    em_blob boolean DEFAULT false NOT NULL,
+    compressao character varying(10),
+    tamanho_armazenado bigint
 );
 
 
 ALTER TABLE public.anexos OWNER TO postgres;
 
+--
+-- Name: anexos_blobs; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.anexos_blobs (
+    hash_sha256 character(64) NOT NULL,
+    tamanho_bytes bigint NOT NULL,
+    referencias integer DEFAULT 0 NOT NULL,
+    criado_em timestamp with time zone DEFAULT now() NOT NULL,
+    compressao character varying(10),
+    tamanho_armazenado bigint
+);
+
+
+ALTER TABLE public.anexos_blobs OWNER TO postgres;
+
 --
 -- Name: anexos_id_seq; Type: SEQUENCE; Schema: public; Owner: postgres
 --
@@ -125,7 +222,8 @@ CREATE TABLE public.aocs (
     id_dotacao integer,
     numero_pedido character varying(100),
     tipo_pedido character varying(100),
-    empenho character varying(100)
+    empenho character varying(100),
+    updated_at timestamp with time zone DEFAULT now() NOT NULL
 );
 
 
@@ -253,7 +351,8 @@ CREATE TABLE public.contratos (
     id_instrumento_contratual integer,
     id_modalidade integer,
     id_numero_modalidade integer,
-    id_processo_licitatorio integer
+    id_processo_licitatorio integer,
+    updated_at timestamp with time zone DEFAULT now() NOT NULL
 );
 
 
@@ -362,7 +461,9 @@ CREATE TABLE public.itenscontrato (
     unidade_medida character varying(50) NOT NULL,
     quantidade numeric(15,3) NOT NULL,
     valor_unitario numeric(15,2) NOT NULL,
-    ativo boolean DEFAULT true NOT NULL
+    ativo boolean DEFAULT true NOT NULL,
+    descricao_busca text GENERATED ALWAYS AS (public.normalizar_busca(descricao)) STORED,
+    updated_at timestamp with time zone DEFAULT now() NOT NULL
 );
 
 
@@ -390,6 +491,54 @@ ALTER SEQUENCE public.itenscontrato_id_seq OWNER TO postgres;
 ALTER SEQUENCE public.itenscontrato_id_seq OWNED BY public.itenscontrato.id;
 
 
+--
+-- Name: jobs; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.jobs (
+    id integer NOT NULL,
+    tipo character varying(100) NOT NULL,
+    parametros jsonb DEFAULT '{}'::jsonb NOT NULL,
+    status character varying(20) DEFAULT 'pendente'::character varying NOT NULL,
+    progresso integer DEFAULT 0 NOT NULL,
+    mensagem text,
+    tentativas integer DEFAULT 0 NOT NULL,
+    max_tentativas integer DEFAULT 3 NOT NULL,
+    executar_apos timestamp with time zone DEFAULT now() NOT NULL,
+    artefato character varying(500),
+    erro text,
+    criado_por character varying(100),
+    criado_em timestamp with time zone DEFAULT now() NOT NULL,
+    iniciado_em timestamp with time zone,
+    concluido_em timestamp with time zone,
+    heartbeat_em timestamp with time zone
+);
+
+
+ALTER TABLE public.jobs OWNER TO postgres;
+
+--
+-- Name: jobs_id_seq; Type: SEQUENCE; Schema: public; Owner: postgres
+--
+
+CREATE SEQUENCE public.jobs_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public.jobs_id_seq OWNER TO postgres;
+
+--
+-- Name: jobs_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: postgres
+--
+
+ALTER SEQUENCE public.jobs_id_seq OWNED BY public.jobs.id;
+
+
 --
 -- Name: locaisentrega; Type: TABLE; Schema: public; Owner: postgres
 --
@@ -540,7 +689,8 @@ CREATE TABLE public.pedidos (
     quantidade_pedida numeric(15,3) NOT NULL,
     data_pedido date DEFAULT CURRENT_DATE NOT NULL,
     status_entrega character varying(50) DEFAULT 'Pendente'::character varying NOT NULL,
-    quantidade_entregue numeric(15,3) DEFAULT 0 NOT NULL
+    quantidade_entregue numeric(15,3) DEFAULT 0 NOT NULL,
+    updated_at timestamp with time zone DEFAULT now() NOT NULL
 );
 
 
@@ -602,6 +752,20 @@ ALTER SEQUENCE public.processoslicitatorios_id_seq OWNER TO postgres;
 ALTER SEQUENCE public.processoslicitatorios_id_seq OWNED BY public.processoslicitatorios.id;
 
 
+--
+-- Name: registros_excluidos; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.registros_excluidos (
+    tabela character varying(50) NOT NULL,
+    id_registro integer NOT NULL,
+    excluido_em timestamp with time zone DEFAULT clock_timestamp() NOT NULL
+);
+
+
+ALTER TABLE public.registros_excluidos OWNER TO postgres;
+
+
 --
 -- Name: tipos_documento; Type: TABLE; Schema: public; Owner: postgres
 --
@@ -771,6 +935,13 @@ ALTER TABLE ONLY public.instrumentocontratual ALTER COLUMN id SET DEFAULT nextva
 ALTER TABLE ONLY public.itenscontrato ALTER COLUMN id SET DEFAULT nextval('public.itenscontrato_id_seq'::regclass);
 
 
+--
+-- Name: jobs id; Type: DEFAULT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.jobs ALTER COLUMN id SET DEFAULT nextval('public.jobs_id_seq'::regclass);
+
+
 --
 -- Name: locaisentrega id; Type: DEFAULT; Schema: public; Owner: postgres
 --
@@ -850,6 +1021,14 @@ ALTER TABLE ONLY public.agentesresponsaveis
     ADD CONSTRAINT agentesresponsaveis_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: anexos_blobs anexos_blobs_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.anexos_blobs
+    ADD CONSTRAINT anexos_blobs_pkey PRIMARY KEY (hash_sha256);
+
+
 --
 -- Name: anexos anexos_nome_seguro_key; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -978,6 +1157,14 @@ ALTER TABLE ONLY public.itenscontrato
     ADD CONSTRAINT itenscontrato_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: jobs jobs_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.jobs
+    ADD CONSTRAINT jobs_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: locaisentrega locaisentrega_descricao_key; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -1058,6 +1245,14 @@ ALTER TABLE ONLY public.processoslicitatorios
     ADD CONSTRAINT processoslicitatorios_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: registros_excluidos registros_excluidos_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.registros_excluidos
+    ADD CONSTRAINT registros_excluidos_pkey PRIMARY KEY (tabela, id_registro);
+
+
 --
 -- Name: tipos_documento tipos_documento_nome_key; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -1106,6 +1301,20 @@ ALTER TABLE ONLY public.usuarios
     ADD CONSTRAINT usuarios_username_key UNIQUE (username);
 
 
+--
+-- Name: idx_anexos_hash_sha256; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_anexos_hash_sha256 ON public.anexos USING btree (hash_sha256) WHERE em_blob;
+
+
+--
+-- Name: idx_aocs_data_criacao_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_aocs_data_criacao_id ON public.aocs USING btree (data_criacao, id);
+
+
 --
 -- Name: idx_aocs_numero_aocs; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -1113,6 +1322,83 @@ ALTER TABLE ONLY public.usuarios
 CREATE INDEX idx_aocs_numero_aocs ON public.aocs USING btree (numero_aocs);
 
 
+--
+-- Name: idx_aocs_numero_aocs_prefixo; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_aocs_numero_aocs_prefixo ON public.aocs USING btree (upper((numero_aocs)::text) text_pattern_ops);
+
+
+--
+-- Name: idx_aocs_updated_at_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_aocs_updated_at_id ON public.aocs USING btree (updated_at, id);
+
+
+--
+-- Name: idx_ci_pagamento_data_ci_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_ci_pagamento_data_ci_id ON public.ci_pagamento USING btree (data_ci, id);
+
+
+--
+-- Name: idx_ci_pagamento_id_aocs; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_ci_pagamento_id_aocs ON public.ci_pagamento USING btree (id_aocs, data_ci DESC, id DESC);
+
+
+--
+-- Name: idx_contratos_data_fim_numero_contrato; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_contratos_data_fim_numero_contrato ON public.contratos USING btree (data_fim DESC, numero_contrato);
+
+
+--
+-- Name: idx_contratos_fornecedor_busca_trgm; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_contratos_fornecedor_busca_trgm ON public.contratos USING gin (public.normalizar_busca((fornecedor)::text) public.gin_trgm_ops);
+
+
+--
+-- Name: idx_contratos_fornecedor_prefixo; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_contratos_fornecedor_prefixo ON public.contratos USING btree (public.normalizar_busca((fornecedor)::text) text_pattern_ops);
+
+
+--
+-- Name: idx_contratos_updated_at_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_contratos_updated_at_id ON public.contratos USING btree (updated_at, id);
+
+
+--
+-- Name: idx_itenscontrato_descricao_busca_trgm; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_itenscontrato_descricao_busca_trgm ON public.itenscontrato USING gin (descricao_busca public.gin_trgm_ops);
+
+
+--
+-- Name: idx_itenscontrato_updated_at_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_itenscontrato_updated_at_id ON public.itenscontrato USING btree (updated_at, id);
+
+
+--
+-- Name: idx_jobs_fila; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_jobs_fila ON public.jobs USING btree (executar_apos, id) WHERE ((status)::text = 'pendente'::text);
+
+
 --
 -- Name: idx_pedidos_id_aocs; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -1120,6 +1406,76 @@ CREATE INDEX idx_aocs_numero_aocs ON public.aocs USING btree (numero_aocs);
 CREATE INDEX idx_pedidos_id_aocs ON public.pedidos USING btree (id_aocs);
 
 
+--
+-- Name: idx_pedidos_updated_at_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_pedidos_updated_at_id ON public.pedidos USING btree (updated_at, id);
+
+
+--
+-- Name: idx_registros_excluidos_tabela_excluido_em; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_registros_excluidos_tabela_excluido_em ON public.registros_excluidos USING btree (tabela, excluido_em, id_registro);
+
+
+--
+-- Name: aocs trg_aocs_exclusao; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_aocs_exclusao AFTER DELETE ON public.aocs FOR EACH ROW EXECUTE FUNCTION public.registrar_exclusao();
+
+
+--
+-- Name: aocs trg_aocs_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_aocs_updated_at BEFORE INSERT OR UPDATE ON public.aocs FOR EACH ROW EXECUTE FUNCTION public.registrar_updated_at();
+
+
+--
+-- Name: contratos trg_contratos_exclusao; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_contratos_exclusao AFTER DELETE ON public.contratos FOR EACH ROW EXECUTE FUNCTION public.registrar_exclusao();
+
+
+--
+-- Name: contratos trg_contratos_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_contratos_updated_at BEFORE INSERT OR UPDATE ON public.contratos FOR EACH ROW EXECUTE FUNCTION public.registrar_updated_at();
+
+
+--
+-- Name: itenscontrato trg_itenscontrato_exclusao; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_itenscontrato_exclusao AFTER DELETE ON public.itenscontrato FOR EACH ROW EXECUTE FUNCTION public.registrar_exclusao();
+
+
+--
+-- Name: itenscontrato trg_itenscontrato_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_itenscontrato_updated_at BEFORE INSERT OR UPDATE ON public.itenscontrato FOR EACH ROW EXECUTE FUNCTION public.registrar_updated_at('descricao_busca');
+
+
+--
+-- Name: pedidos trg_pedidos_exclusao; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_pedidos_exclusao AFTER DELETE ON public.pedidos FOR EACH ROW EXECUTE FUNCTION public.registrar_exclusao();
+
+
+--
+-- Name: pedidos trg_pedidos_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER trg_pedidos_updated_at BEFORE INSERT OR UPDATE ON public.pedidos FOR EACH ROW EXECUTE FUNCTION public.registrar_updated_at();
+
+
 --
 -- Name: aocs fk_agente_responsavel; Type: FK CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -0,0 +1,3 @@
+-- CIs de uma AOCS (detalhe do pedido, /api/ci-pagamento/por-aocs/{id}): uma leitura pelo
+-- índice, já na ordem de exibição, em vez de varrer ci_pagamento inteira
+CREATE INDEX idx_ci_pagamento_id_aocs ON ci_pagamento (id_aocs, data_ci DESC, id DESC);
@@ -0,0 +1,66 @@
+-- Sincronização incremental (/api/<coleção>/alteracoes?since=&cursor=): contratos, itens, AOCS e
+-- pedidos guardam o momento da última alteração (mantido por trigger, não pela aplicação) e as
+-- exclusões ficam registradas em registros_excluidos, para o cliente remover o que já baixou.
+CREATE FUNCTION registrar_updated_at() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    sem_mudanca boolean;
+BEGIN
+    -- UPDATE que não muda nenhum valor não conta como alteração. Colunas geradas ainda não estão
+    -- calculadas em NEW num trigger BEFORE: as passadas como argumento ficam fora da comparação.
+    IF TG_OP = 'UPDATE' THEN
+        IF TG_NARGS = 0 THEN
+            sem_mudanca := NEW IS NOT DISTINCT FROM OLD;
+        ELSE
+            sem_mudanca := to_jsonb(NEW) - TG_ARGV = to_jsonb(OLD) - TG_ARGV;
+        END IF;
+        IF sem_mudanca THEN
+            RETURN NEW;
+        END IF;
+    END IF;
+    -- clock_timestamp(), não now(): o início da transação ficaria para trás numa transação longa
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END $$;
+
+CREATE TABLE registros_excluidos (
+    tabela character varying(50) NOT NULL,
+    id_registro integer NOT NULL,
+    excluido_em timestamp with time zone DEFAULT clock_timestamp() NOT NULL,
+    CONSTRAINT registros_excluidos_pkey PRIMARY KEY (tabela, id_registro)
+);
+
+CREATE INDEX idx_registros_excluidos_tabela_excluido_em ON registros_excluidos (tabela, excluido_em, id_registro);
+
+CREATE FUNCTION registrar_exclusao() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    INSERT INTO registros_excluidos (tabela, id_registro) VALUES (TG_TABLE_NAME, OLD.id)
+    ON CONFLICT (tabela, id_registro) DO UPDATE SET excluido_em = EXCLUDED.excluido_em;
+    RETURN OLD;
+END $$;
+
+-- DEFAULT now() (estável) não reescreve a tabela: as linhas existentes ficam com o momento da migração
+ALTER TABLE contratos ADD COLUMN updated_at timestamp with time zone DEFAULT now() NOT NULL;
+ALTER TABLE itenscontrato ADD COLUMN updated_at timestamp with time zone DEFAULT now() NOT NULL;
+ALTER TABLE aocs ADD COLUMN updated_at timestamp with time zone DEFAULT now() NOT NULL;
+ALTER TABLE pedidos ADD COLUMN updated_at timestamp with time zone DEFAULT now() NOT NULL;
+
+-- (updated_at, id): a mesma ordem e o mesmo cursor (keyset) da consulta de alterações
+CREATE INDEX idx_contratos_updated_at_id ON contratos (updated_at, id);
+CREATE INDEX idx_itenscontrato_updated_at_id ON itenscontrato (updated_at, id);
+CREATE INDEX idx_aocs_updated_at_id ON aocs (updated_at, id);
+CREATE INDEX idx_pedidos_updated_at_id ON pedidos (updated_at, id);
+
+CREATE TRIGGER trg_contratos_updated_at BEFORE INSERT OR UPDATE ON contratos FOR EACH ROW EXECUTE FUNCTION registrar_updated_at();
+CREATE TRIGGER trg_itenscontrato_updated_at BEFORE INSERT OR UPDATE ON itenscontrato FOR EACH ROW EXECUTE FUNCTION registrar_updated_at('descricao_busca');
+CREATE TRIGGER trg_aocs_updated_at BEFORE INSERT OR UPDATE ON aocs FOR EACH ROW EXECUTE FUNCTION registrar_updated_at();
+CREATE TRIGGER trg_pedidos_updated_at BEFORE INSERT OR UPDATE ON pedidos FOR EACH ROW EXECUTE FUNCTION registrar_updated_at();
+
+-- AFTER DELETE também dispara nas exclusões em cascata (ex.: pedidos de uma AOCS excluída)
+CREATE TRIGGER trg_contratos_exclusao AFTER DELETE ON contratos FOR EACH ROW EXECUTE FUNCTION registrar_exclusao();
+CREATE TRIGGER trg_itenscontrato_exclusao AFTER DELETE ON itenscontrato FOR EACH ROW EXECUTE FUNCTION registrar_exclusao();
+CREATE TRIGGER trg_aocs_exclusao AFTER DELETE ON aocs FOR EACH ROW EXECUTE FUNCTION registrar_exclusao();
+CREATE TRIGGER trg_pedidos_exclusao AFTER DELETE ON pedidos FOR EACH ROW EXECUTE FUNCTION registrar_exclusao();
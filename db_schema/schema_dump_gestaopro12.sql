@@ -0,0 +1,4 @@
+-- Pulsação dos jobs em execução: renovada pelo worker a cada progresso reportado. Um job
+-- 'processando' sem pulsação recente teve o worker interrompido e volta à fila; um job longo,
+-- mas vivo, não é executado de novo por outro worker.
+ALTER TABLE jobs ADD COLUMN heartbeat_em timestamp with time zone;
@@ -0,0 +1,21 @@
+-- Fila de jobs em segundo plano (impressões em lote, exportações, importações)
+CREATE TABLE jobs (
+    id SERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    parametros JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    progresso INTEGER NOT NULL DEFAULT 0,
+    mensagem TEXT,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    max_tentativas INTEGER NOT NULL DEFAULT 3,
+    executar_apos TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    artefato VARCHAR(500),
+    erro TEXT,
+    criado_por VARCHAR(100),
+    criado_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    iniciado_em TIMESTAMP WITH TIME ZONE,
+    concluido_em TIMESTAMP WITH TIME ZONE
+);
+
+-- Índice parcial usado pelos workers para pegar o próximo job pendente
+CREATE INDEX idx_jobs_fila ON jobs (executar_apos, id) WHERE status = 'pendente';
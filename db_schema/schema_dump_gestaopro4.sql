@@ -0,0 +1,4 @@
+-- Integridade dos anexos: hash SHA-256 e tamanho calculados durante o upload
+ALTER TABLE anexos
+ADD COLUMN hash_sha256 CHAR(64),
+ADD COLUMN tamanho_bytes BIGINT;
@@ -0,0 +1,14 @@
+-- Armazenamento deduplicado de anexos: um blob por conteúdo (SHA-256), com contagem de referências
+CREATE TABLE anexos_blobs (
+    hash_sha256 CHAR(64) PRIMARY KEY,
+    tamanho_bytes BIGINT NOT NULL,
+    referencias INTEGER NOT NULL DEFAULT 0,
+    criado_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- Anexos antigos continuam como arquivo próprio em static/uploads (em_blob = false)
+-- até serem migrados com: python -m app.manutencao_anexos migrar-legado
+ALTER TABLE anexos ADD COLUMN em_blob BOOLEAN NOT NULL DEFAULT false;
+
+-- Usado na contagem de referências e no garbage collector
+CREATE INDEX idx_anexos_hash_sha256 ON anexos (hash_sha256) WHERE em_blob;
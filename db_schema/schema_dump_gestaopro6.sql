@@ -0,0 +1,13 @@
+-- Compressão em repouso dos anexos (brotli, 'br'). NULL = conteúdo guardado como foi enviado.
+-- tamanho_bytes continua sendo o tamanho original; tamanho_armazenado é o que ocupa no armazenamento.
+ALTER TABLE anexos_blobs
+    ADD COLUMN compressao VARCHAR(10),
+    ADD COLUMN tamanho_armazenado BIGINT;
+
+-- Cópia do formato do blob no anexo: o download decide a resposta sem consultar anexos_blobs
+ALTER TABLE anexos
+    ADD COLUMN compressao VARCHAR(10),
+    ADD COLUMN tamanho_armazenado BIGINT;
+
+UPDATE anexos_blobs SET tamanho_armazenado = tamanho_bytes WHERE tamanho_armazenado IS NULL;
+UPDATE anexos SET tamanho_armazenado = tamanho_bytes WHERE em_blob AND tamanho_armazenado IS NULL;
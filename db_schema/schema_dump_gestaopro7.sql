@@ -0,0 +1,22 @@
+-- Busca de itens sem diferenciar acentos e maiúsculas ("agua" encontra "Água Mineral").
+-- A coluna normalizada é gerada pelo próprio banco: não depende da aplicação para ficar em dia.
+CREATE FUNCTION normalizar_busca(texto TEXT) RETURNS TEXT
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$
+        SELECT lower(translate(texto,
+            'ÁÀÂÃÄáàâãäÉÈÊËéèêëÍÌÎÏíìîïÓÒÔÕÖóòôõöÚÙÛÜúùûüÇçÑñ',
+            'AAAAAaaaaaEEEEeeeeIIIIiiiiOOOOOoooooUUUUuuuuCcNn'))
+    $$;
+
+ALTER TABLE itenscontrato
+    ADD COLUMN descricao_busca TEXT GENERATED ALWAYS AS (normalizar_busca(descricao)) STORED;
+
+-- Índice trigram: atende LIKE '%termo%' e a ordenação por similarity().
+-- Requer a extensão pg_trgm (pacote contrib); sem ela a busca funciona, mas sem índice.
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX idx_itenscontrato_descricao_busca_trgm ON itenscontrato USING gin (descricao_busca gin_trgm_ops);
+EXCEPTION WHEN OTHERS THEN
+    RAISE WARNING 'pg_trgm indisponível (%): busca de itens sem índice trigram.', SQLERRM;
+END $$;
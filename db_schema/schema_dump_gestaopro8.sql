@@ -0,0 +1,13 @@
+-- Autocomplete (/api/autocomplete): buscas por prefixo atendidas por btree (text_pattern_ops
+-- permite LIKE 'prefixo%' independente da collation do banco)
+CREATE INDEX idx_aocs_numero_aocs_prefixo ON aocs (upper(numero_aocs) text_pattern_ops);
+CREATE INDEX idx_contratos_fornecedor_prefixo ON contratos (normalizar_busca(fornecedor) text_pattern_ops);
+
+-- Fornecedor por qualquer palavra do nome: trigram, quando a extensão pg_trgm existe
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX idx_contratos_fornecedor_busca_trgm ON contratos USING gin (normalizar_busca(fornecedor) gin_trgm_ops);
+EXCEPTION WHEN OTHERS THEN
+    RAISE WARNING 'pg_trgm indisponível (%): autocomplete de fornecedores sem índice trigram.', SQLERRM;
+END $$;
@@ -0,0 +1,5 @@
+-- Paginação por cursor (app/core/paginacao.py): a condição (chave, id) > (x, y) das listas
+-- da API é atendida por índice na mesma ordem, sem ler e descartar as páginas anteriores
+CREATE INDEX idx_aocs_data_criacao_id ON aocs (data_criacao, id);
+CREATE INDEX idx_ci_pagamento_data_ci_id ON ci_pagamento (data_ci, id);
+CREATE INDEX idx_contratos_data_fim_numero_contrato ON contratos (data_fim DESC, numero_contrato);
@@ -100,4 +100,445 @@ def test_fluxo_completo_anexo(test_client: TestClient, admin_auth_headers: dict,
     assert response_download_fail.status_code == 404, "O arquivo deveria ter sido removido, mas ainda foi encontrado."
 
     # Limpeza Extra (Opcional): Se o teste falhar antes do delete, o arquivo físico pode sobrar.
-    # Em um ambiente de teste real, usaríamos um diretório temporário configurado no conftest.py
\ No newline at end of file
+    # Em um ambiente de teste real, usaríamos um diretório temporário configurado no conftest.py
+@pytest.fixture
+def upload_dir_temporario(tmp_path, monkeypatch):
+    from app.core import anexo_storage
+    from app.routers import anexo_router
+    monkeypatch.setattr(anexo_storage, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(anexo_router, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+def _upload(test_client, headers, id_contrato, nome, conteudo):
+    return test_client.post(
+        "/api/anexos/upload/",
+        data={"id_entidade": id_contrato, "tipo_entidade": "contrato", "tipo_documento": "Documento de Teste"},
+        files={"file": (nome, conteudo, "text/plain")},
+        headers=headers
+    )
+
+def test_upload_calcula_hash_e_gera_nomes_unicos(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, upload_dir_temporario):
+    import hashlib
+    conteudo = b"mesmo nome, mesmo segundo"
+
+    primeiro = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nota fiscal.pdf", conteudo)
+    segundo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nota fiscal.pdf", conteudo)
+    assert primeiro.status_code == segundo.status_code == 201
+
+    anexo_1, anexo_2 = primeiro.json()["anexo"], segundo.json()["anexo"]
+    assert anexo_1["nome_seguro"] != anexo_2["nome_seguro"]
+    assert anexo_1["nome_seguro"].startswith(f"contrato/{setup_contrato_para_anexo}/")
+    assert anexo_1["nome_seguro"].endswith(".pdf")
+    assert anexo_1["nome_original"] == "nota fiscal.pdf"
+    assert anexo_1["hash_sha256"] == hashlib.sha256(conteudo).hexdigest()
+    assert anexo_1["tamanho_bytes"] == len(conteudo)
+
+    assert anexo_1["em_blob"] and anexo_2["em_blob"]
+
+def test_upload_acima_do_limite_retorna_413(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, blob_dir, monkeypatch):
+    from app.core import anexo_storage
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 10)
+
+    response = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "grande.txt", b"x" * 100)
+    assert response.status_code == 413
+    assert not [a for a in blob_dir.rglob("*") if a.is_file()]
+
+def test_upload_recusado_pelo_content_length(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, upload_dir_temporario, monkeypatch):
+    from app.core import anexo_storage, limite_upload
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 10)
+
+    response = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "enorme.txt", b"x" * (limite_upload.MARGEM_MULTIPART_BYTES + 100))
+    assert response.status_code == 413
+    assert response.json()["detail"] == "O arquivo excede o tamanho máximo permitido."
+
+def test_upload_tipo_entidade_invalido(test_client: TestClient, admin_auth_headers: dict, upload_dir_temporario):
+    response = test_client.post(
+        "/api/anexos/upload/",
+        data={"id_entidade": 1, "tipo_entidade": "../../etc", "tipo_documento": "X"},
+        files={"file": ("a.txt", b"a", "text/plain")},
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 400
+
+def _contar_referencias(db_session, hash_sha256):
+    with db_session.cursor() as cursor:
+        cursor.execute("SELECT referencias FROM anexos_blobs WHERE hash_sha256 = %s", (hash_sha256,))
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+def test_upload_duplicado_compartilha_blob(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, blob_dir):
+    from app.core import anexo_storage
+    conteudo = b"certidao negativa"
+
+    primeiro = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "certidao.pdf", conteudo).json()["anexo"]
+    segundo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "copia.pdf", conteudo).json()["anexo"]
+    hash_sha256 = primeiro["hash_sha256"]
+    caminho = anexo_storage.caminho_blob(hash_sha256)
+
+    arquivos = [a for a in blob_dir.rglob("*") if a.is_file()]
+    assert [str(a) for a in arquivos] == [caminho]
+    assert _contar_referencias(db_session, hash_sha256) == 2
+
+    assert test_client.delete(f"/api/anexos/{primeiro['id']}", headers=admin_auth_headers).status_code == 204
+    assert os.path.exists(caminho)
+    assert _contar_referencias(db_session, hash_sha256) == 1
+    download = test_client.get(f"/api/anexos/{segundo['id']}/download", headers=admin_auth_headers)
+    assert download.content == conteudo
+
+    assert test_client.delete(f"/api/anexos/{segundo['id']}", headers=admin_auth_headers).status_code == 204
+    assert not os.path.exists(caminho)
+    assert _contar_referencias(db_session, hash_sha256) is None
+
+def test_delete_com_falha_no_commit_mantem_arquivo(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, blob_dir, monkeypatch):
+    import psycopg2
+    from app.core import anexo_storage
+    from app.repositories.anexo_repository import AnexoRepository
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "unico.txt", b"conteudo unico").json()["anexo"]
+    caminho = anexo_storage.caminho_blob(anexo["hash_sha256"])
+
+    def commit_que_falha():
+        raise psycopg2.OperationalError("server closed the connection unexpectedly")
+    with monkeypatch.context() as m:
+        m.setattr(db_session, "commit", commit_que_falha)
+        with pytest.raises(psycopg2.OperationalError):
+            AnexoRepository(db_session).delete(anexo["id"])
+
+    # Rollback: registro e arquivo continuam
+    assert os.path.exists(caminho)
+    assert _contar_referencias(db_session, anexo["hash_sha256"]) == 1
+
+    assert AnexoRepository(db_session).delete(anexo["id"])[0] is True
+    assert not os.path.exists(caminho)
+
+def test_gc_remove_blobs_orfaos(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, blob_dir):
+    from app.core import anexo_storage
+    from app.manutencao_anexos import coletar_lixo
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "mantido.txt", b"em uso").json()["anexo"]
+
+    # Arquivo sem registro (upload revertido) e registro com contagem zerada
+    orfao = "a" * 64
+    os.makedirs(os.path.dirname(anexo_storage.caminho_blob(orfao)))
+    open(anexo_storage.caminho_blob(orfao), "wb").close()
+    zerado = "b" * 64
+    os.makedirs(os.path.dirname(anexo_storage.caminho_blob(zerado)))
+    open(anexo_storage.caminho_blob(zerado), "wb").close()
+    with db_session.cursor() as cursor:
+        cursor.execute("INSERT INTO anexos_blobs (hash_sha256, tamanho_bytes, referencias) VALUES (%s, 0, 0)", (zerado,))
+    db_session.commit()
+
+    resultado = coletar_lixo(db_session)
+
+    assert resultado["sem_referencia"] == 1 and resultado["arquivos_orfaos"] == 1
+    assert not os.path.exists(anexo_storage.caminho_blob(orfao))
+    assert not os.path.exists(anexo_storage.caminho_blob(zerado))
+    assert os.path.exists(anexo_storage.caminho_blob(anexo["hash_sha256"]))
+    assert _contar_referencias(db_session, anexo["hash_sha256"]) == 1
+
+def test_migrar_legado_move_arquivos_para_blobs(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, upload_dir_temporario):
+    from app.manutencao_anexos import migrar_legado
+    conteudo = b"upload antigo"
+    antigos = []
+    for nome in ("contrato/1/antigo-1.pdf", "contrato/1/antigo-2.pdf"):
+        (upload_dir_temporario / "contrato" / "1").mkdir(parents=True, exist_ok=True)
+        (upload_dir_temporario / nome).write_bytes(conteudo)
+        with db_session.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO anexos (id_contrato, nome_original, nome_seguro, tipo_entidade) VALUES (%s, %s, %s, 'contrato') RETURNING id",
+                (setup_contrato_para_anexo, "antigo.pdf", nome))
+            antigos.append(cursor.fetchone()[0])
+    db_session.commit()
+
+    assert migrar_legado(db_session) == 2
+
+    assert not [a for a in (upload_dir_temporario / "contrato").rglob("*") if a.is_file()]
+    download = test_client.get(f"/api/anexos/{antigos[0]}/download", headers=admin_auth_headers)
+    assert download.content == conteudo
+    import hashlib
+    assert _contar_referencias(db_session, hashlib.sha256(conteudo).hexdigest()) == 2
+
+def test_download_range_etag_e_304(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int):
+    conteudo = b"0123456789" * 10
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "digitalizado.pdf", conteudo).json()["anexo"]
+    url = f"/api/anexos/{anexo['id']}/download"
+
+    completo = test_client.get(url, headers=admin_auth_headers)
+    assert completo.headers["etag"] == f'"{anexo["hash_sha256"]}"'
+    assert completo.headers["accept-ranges"] == "bytes"
+
+    parcial = test_client.get(url, headers={**admin_auth_headers, "Range": "bytes=10-19"})
+    assert parcial.status_code == 206
+    assert parcial.content == conteudo[10:20]
+    assert parcial.headers["content-range"] == f"bytes 10-19/{len(conteudo)}"
+
+    revalidado = test_client.get(url, headers={**admin_auth_headers, "If-None-Match": completo.headers["etag"]})
+    assert revalidado.status_code == 304
+    assert revalidado.content == b""
+
+    por_data = test_client.get(url, headers={**admin_auth_headers, "If-Modified-Since": completo.headers["last-modified"]})
+    assert por_data.status_code == 304
+
+    outro = test_client.get(url, headers={**admin_auth_headers, "If-None-Match": '"outro"'})
+    assert outro.status_code == 200 and outro.content == conteudo
+
+def test_download_offload_para_proxy(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, monkeypatch):
+    from app.core import download
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "relatório.pdf", b"conteudo").json()["anexo"]
+    hash_sha256 = anexo["hash_sha256"]
+
+    monkeypatch.setattr(download, "DOWNLOAD_OFFLOAD", "x-accel-redirect")
+    response = test_client.get(f"/api/anexos/{anexo['id']}/download", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == f"/_anexos/{hash_sha256[:2]}/{hash_sha256[2:4]}/{hash_sha256}"
+    assert response.headers["content-disposition"] == "attachment; filename*=utf-8''relat%C3%B3rio.pdf"
+
+    monkeypatch.setattr(download, "DOWNLOAD_OFFLOAD", "x-sendfile")
+    response = test_client.get(f"/api/anexos/{anexo['id']}/download", headers=admin_auth_headers)
+    from app.core import anexo_storage
+    assert response.headers["x-sendfile"] == os.path.realpath(anexo_storage.caminho_blob(hash_sha256))
+
+def test_fluxo_anexo_com_armazenamento_s3(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, s3_falso, blob_dir, monkeypatch):
+    from app.core import anexo_storage
+    servidor, driver = s3_falso
+    monkeypatch.setattr(anexo_storage, "armazenamento", lambda: driver)
+    conteudo = b"nota fiscal no bucket"
+
+    primeiro = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nf.pdf", conteudo).json()["anexo"]
+    segundo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nf-copia.pdf", conteudo).json()["anexo"]
+    chave = f"anexos/{anexo_storage.chave_blob(primeiro['hash_sha256'])}"
+    assert list(servidor.objetos) == [chave]
+    assert not [a for a in blob_dir.rglob("*") if a.is_file()]  # temporários descartados
+
+    download = test_client.get(f"/api/anexos/{primeiro['id']}/download", headers=admin_auth_headers, follow_redirects=False)
+    assert download.status_code == 307
+    assert driver.cliente.get(download.headers["location"]).content == conteudo
+
+    test_client.delete(f"/api/anexos/{primeiro['id']}", headers=admin_auth_headers)
+    assert chave in servidor.objetos
+    test_client.delete(f"/api/anexos/{segundo['id']}", headers=admin_auth_headers)
+    assert chave not in servidor.objetos
+
+def test_migrar_armazenamento_copia_blobs_locais(s3_falso, blob_dir, monkeypatch):
+    import hashlib
+    from app.core import anexo_storage
+    from app.manutencao_anexos import migrar_armazenamento
+    servidor, driver = s3_falso
+    hash_sha256 = hashlib.sha256(b"blob local").hexdigest()
+    caminho = anexo_storage.caminho_blob(hash_sha256)
+    os.makedirs(os.path.dirname(caminho))
+    with open(caminho, "wb") as f:
+        f.write(b"blob local")
+
+    monkeypatch.setattr(anexo_storage, "armazenamento", lambda: driver)
+    assert migrar_armazenamento(str(blob_dir)) == 1
+    assert servidor.objetos[f"anexos/{anexo_storage.chave_blob(hash_sha256)}"] == b"blob local"
+
+    assert migrar_armazenamento(str(blob_dir), remover_origem=True) == 0  # Já presente no destino
+    assert not os.path.exists(caminho)
+
+def _imagem_png(largura: int, altura: int) -> bytes:
+    import io
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (largura, altura), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def test_thumbnail_gera_e_reaproveita_cache(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, monkeypatch):
+    import io
+    from PIL import Image
+    from app.core import miniaturas
+    anexo = test_client.post(
+        "/api/anexos/upload/",
+        data={"id_entidade": setup_contrato_para_anexo, "tipo_entidade": "contrato", "tipo_documento": "Foto"},
+        files={"file": ("entrega.PNG", _imagem_png(800, 600), "image/png")},
+        headers=admin_auth_headers
+    ).json()["anexo"]
+    url = f"/api/anexos/{anexo['id']}/thumbnail?size=100"
+
+    webp = test_client.get(url, headers={**admin_auth_headers, "Accept": "image/webp,*/*"})
+    assert webp.status_code == 200
+    assert webp.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(webp.content)).size == (128, 96)  # 100 -> tamanho fixo 128
+
+    chamadas = []
+    gerar_original = miniaturas.gerar
+    monkeypatch.setattr(miniaturas, "gerar", lambda *args: chamadas.append(args) or gerar_original(*args))
+    jpeg = test_client.get(url, headers=admin_auth_headers)
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    assert len(chamadas) == 1  # JPEG ainda não existia
+
+    chamadas.clear()
+    assert test_client.get(url, headers={**admin_auth_headers, "Accept": "image/webp"}).status_code == 200
+    assert chamadas == []  # Servida do cache
+
+    revalidada = test_client.get(url, headers={**admin_auth_headers, "Accept": "image/webp", "If-None-Match": webp.headers["etag"]})
+    assert revalidada.status_code == 304
+
+    test_client.delete(f"/api/anexos/{anexo['id']}", headers=admin_auth_headers)
+    assert not os.path.exists(miniaturas.caminho(anexo["hash_sha256"], 128, "webp"))
+
+def test_thumbnail_de_anexo_que_nao_e_imagem(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int):
+    pdf = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "contrato.pdf", b"%PDF-1.4").json()["anexo"]
+    assert test_client.get(f"/api/anexos/{pdf['id']}/thumbnail", headers=admin_auth_headers).status_code == 415
+
+    falsa = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "foto.jpg", b"nao sou jpeg").json()["anexo"]
+    assert test_client.get(f"/api/anexos/{falsa['id']}/thumbnail", headers=admin_auth_headers).status_code == 415
+
+def test_bundle_zip_dos_anexos_do_contrato(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, upload_dir_temporario, db_session):
+    import io
+    import zipfile
+    id_contrato = setup_contrato_para_anexo
+    _upload(test_client, admin_auth_headers, id_contrato, "nota.pdf", b"%PDF-1.4 nota")
+    _upload(test_client, admin_auth_headers, id_contrato, "nota.pdf", b"%PDF-1.4 outra nota")
+    _upload(test_client, admin_auth_headers, id_contrato, "planilha.csv", b"a;b\n1;2\n")
+    with db_session.cursor() as cursor:  # Anexo antigo cujo arquivo sumiu do disco
+        cursor.execute("INSERT INTO anexos (id_contrato, nome_original, nome_seguro, tipo_entidade) VALUES (%s, 'perdido.pdf', 'contrato/x/perdido.pdf', 'contrato')", (id_contrato,))
+    db_session.commit()
+
+    response = test_client.get(f"/api/anexos/bundle?tipo_entidade=contrato&id={id_contrato}", headers=admin_auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert f"anexos_contrato_{id_contrato}.zip" in response.headers["content-disposition"]
+    arquivo = zipfile.ZipFile(io.BytesIO(response.content))
+    nomes = sorted(arquivo.namelist())
+    assert nomes == ["ARQUIVOS_AUSENTES.txt", "Documento de Teste/nota (2).pdf", "Documento de Teste/nota.pdf", "Documento de Teste/planilha.csv"]
+    assert arquivo.read("Documento de Teste/planilha.csv") == b"a;b\n1;2\n"
+    assert "perdido.pdf" in arquivo.read("ARQUIVOS_AUSENTES.txt").decode()
+    conteudos = {arquivo.read("Documento de Teste/nota.pdf"), arquivo.read("Documento de Teste/nota (2).pdf")}
+    assert conteudos == {b"%PDF-1.4 nota", b"%PDF-1.4 outra nota"}
+
+def test_bundle_sem_anexos_e_tipo_invalido(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int):
+    assert test_client.get(f"/api/anexos/bundle?tipo_entidade=contrato&id={setup_contrato_para_anexo}", headers=admin_auth_headers).status_code == 404
+    assert test_client.get("/api/anexos/bundle?tipo_entidade=usuario&id=1", headers=admin_auth_headers).status_code == 400
+
+def _xml_nfe(itens: int = 200) -> bytes:
+    linhas = "".join(f"<det nItem=\"{i}\"><prod><xProd>PAPEL A4 75G</xProd><vProd>{i}.00</vProd></prod></det>" for i in range(itens))
+    return f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><NFe><infNFe>{linhas}</infNFe></NFe>".encode()
+
+def test_upload_comprime_xml_em_repouso(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, blob_dir):
+    from app.core import anexo_storage
+    conteudo = _xml_nfe()
+
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nfe.xml", conteudo).json()["anexo"]
+
+    assert anexo["compressao"] == "br"
+    assert anexo["tamanho_bytes"] == len(conteudo)
+    assert anexo["tamanho_armazenado"] == os.path.getsize(anexo_storage.caminho_blob(anexo["hash_sha256"]))
+    assert anexo["tamanho_armazenado"] < len(conteudo) and anexo["taxa_compressao"] > 1
+    with db_session.cursor() as cursor:
+        cursor.execute("SELECT compressao, tamanho_armazenado FROM anexos_blobs WHERE hash_sha256 = %s", (anexo["hash_sha256"],))
+        assert tuple(cursor.fetchone()) == ("br", anexo["tamanho_armazenado"])
+
+    url = f"/api/anexos/{anexo['id']}/download"
+    original = test_client.get(url, headers={**admin_auth_headers, "Accept-Encoding": "gzip"})
+    assert original.status_code == 200 and original.content == conteudo
+    assert "content-encoding" not in original.headers
+    assert original.headers["content-length"] == str(len(conteudo))
+    assert original.headers["etag"] == f'"{anexo["hash_sha256"]}"'
+
+    # Vai como está no disco; o httpx decodifica o brotli do lado do cliente
+    comprimido = test_client.get(url, headers={**admin_auth_headers, "Accept-Encoding": "br"})
+    assert comprimido.headers["content-encoding"] == "br"
+    assert comprimido.headers["content-length"] == str(anexo["tamanho_armazenado"])
+    assert comprimido.headers["vary"] == "Accept-Encoding"
+    assert comprimido.headers["etag"] == f'"{anexo["hash_sha256"]}-br"'
+    assert comprimido.content == conteudo
+
+    revalidado = test_client.get(url, headers={**admin_auth_headers, "Accept-Encoding": "gzip", "If-None-Match": original.headers["etag"]})
+    assert revalidado.status_code == 304
+
+def test_upload_nao_comprime_pdf_e_duplicata_herda_compressao(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, blob_dir):
+    conteudo_pdf = b"%PDF-1.4 " + b"0" * 5000
+    pdf = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "contrato.pdf", conteudo_pdf).json()["anexo"]
+    assert pdf["compressao"] is None and pdf["taxa_compressao"] is None
+
+    conteudo = _xml_nfe(50)
+    primeiro = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nfe.xml", conteudo).json()["anexo"]
+    # Mesmo conteúdo com extensão que não seria comprimida: reaproveita o blob já comprimido
+    segundo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nfe.dat", conteudo).json()["anexo"]
+    assert primeiro["compressao"] == segundo["compressao"] == "br"
+    assert segundo["tamanho_armazenado"] == primeiro["tamanho_armazenado"]
+
+    download = test_client.get(f"/api/anexos/{segundo['id']}/download", headers={**admin_auth_headers, "Accept-Encoding": "identity"})
+    assert download.content == conteudo
+
+def test_blob_comprimido_truncado_gera_erro(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, blob_dir):
+    from app.core import anexo_storage
+    conteudo = _xml_nfe()
+    anexo = _upload(test_client, admin_auth_headers, setup_contrato_para_anexo, "nfe.xml", conteudo).json()["anexo"]
+    caminho = anexo_storage.caminho_blob(anexo["hash_sha256"])
+    with open(caminho, "r+b") as f:
+        f.truncate(anexo["tamanho_armazenado"] // 2)
+
+    with pytest.raises(anexo_storage.BlobCorrompidoError, match="incompleto"):
+        b"".join(anexo_storage.ler_blob(anexo["hash_sha256"], anexo["compressao"]))
+
+def _inconsistencias_para_varredura(test_client, headers, id_contrato, db_session, upload_dir, blob_dir):
+    import time
+    from app.core import anexo_storage
+    (upload_dir / "contrato" / "1").mkdir(parents=True)
+    (upload_dir / "contrato" / "2").mkdir(parents=True)
+    for nome in ("contrato/1/ok.pdf", "contrato/1/orfao.pdf", "contrato/2/recente.pdf"):
+        (upload_dir / nome).write_bytes(b"legado")
+    antigo = time.time() - 2 * 86400
+    os.utime(upload_dir / "contrato/1/orfao.pdf", (antigo, antigo))
+
+    with db_session.cursor() as cursor:
+        for nome in ("contrato/1/ok.pdf", "contrato/1/sumiu.pdf"):
+            cursor.execute("INSERT INTO anexos (id_contrato, nome_original, nome_seguro, tipo_entidade) VALUES (%s, %s, %s, 'contrato')",
+                           (id_contrato, nome.rsplit("/", 1)[-1], nome))
+    db_session.commit()
+
+    sem_blob = _upload(test_client, headers, id_contrato, "nf.pdf", b"blob apagado por fora").json()["anexo"]
+    os.remove(anexo_storage.caminho_blob(sem_blob["hash_sha256"]))
+    return sem_blob
+
+def test_varredura_incremental_relata_e_corrige(test_client: TestClient, admin_auth_headers: dict, setup_contrato_para_anexo: int, db_session, upload_dir_temporario, blob_dir):
+    from app.core import varredura_anexos
+    sem_blob = _inconsistencias_para_varredura(test_client, admin_auth_headers, setup_contrato_para_anexo, db_session, upload_dir_temporario, blob_dir)
+
+    # Em trechos de 2 itens, retomando pelo cursor
+    totais, cursor, execucoes = {"arquivos_orfaos": 0, "registros_sem_arquivo": 0, "registros_verificados": 0}, None, 0
+    while True:
+        resultado = varredura_anexos.varrer(db_session, cursor=cursor, limite=2)
+        for chave in totais:
+            totais[chave] += resultado[chave]
+        execucoes += 1
+        cursor = resultado["cursor"]
+        if cursor is None:
+            break
+    assert execucoes >= 3
+    assert totais == {"arquivos_orfaos": 2, "registros_sem_arquivo": 2, "registros_verificados": 3}
+    assert (upload_dir_temporario / "contrato/1/orfao.pdf").exists()  # Só relatou
+
+    ocorrencias = []
+    corrigido = varredura_anexos.varrer(db_session, corrigir=True, ocorrencias=ocorrencias)
+    assert corrigido["corrigidos"] == 3
+    assert not (upload_dir_temporario / "contrato/1/orfao.pdf").exists()
+    assert (upload_dir_temporario / "contrato/2/recente.pdf").exists()  # Pode ser operação em andamento
+    assert {(o.tipo, o.acao) for o in ocorrencias} == {
+        ("arquivo_orfao", "removido"), ("arquivo_orfao", "mantido (recente)"), ("registro_sem_arquivo", "registro removido")}
+    assert test_client.get(f"/api/anexos/{sem_blob['id']}/download", headers=admin_auth_headers).status_code == 404
+    assert _contar_referencias(db_session, sem_blob["hash_sha256"]) is None
+
+    depois = varredura_anexos.varrer(db_session)
+    assert (depois["arquivos_orfaos"], depois["registros_sem_arquivo"], depois["registros_verificados"]) == (1, 0, 1)
+
+def test_varredura_como_job(test_client: TestClient, admin_auth_headers: dict, user_auth_headers: dict, setup_contrato_para_anexo: int, db_session, upload_dir_temporario, blob_dir, monkeypatch):
+    from app import worker
+    from app.core import jobs
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(blob_dir / "jobs"))
+    _inconsistencias_para_varredura(test_client, admin_auth_headers, setup_contrato_para_anexo, db_session, upload_dir_temporario, blob_dir)
+
+    assert test_client.post("/api/anexos/varredura", headers=user_auth_headers).status_code == 403
+    response = test_client.post("/api/anexos/varredura", headers=admin_auth_headers)
+    assert response.status_code == 202
+
+    assert worker.processar_proximo(db_session) is True
+    job = test_client.get(response.json()["url_status"], headers=admin_auth_headers).json()
+    assert job["status"] == "concluido"
+    relatorio = test_client.get(job["url_download"], headers=admin_auth_headers).content.decode("utf-8-sig")
+    assert "arquivo_orfao;contrato/1/orfao.pdf" in relatorio
+    assert "registro_sem_arquivo" in relatorio
+    assert (upload_dir_temporario / "contrato/1/orfao.pdf").exists()
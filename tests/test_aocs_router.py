@@ -109,4 +109,63 @@ def test_delete_aocs(test_client: TestClient, admin_auth_headers: dict, aocs_pay
         headers=admin_auth_headers
     )
    
-    assert response_get.status_code == 404
\ No newline at end of file
+    assert response_get.status_code == 404
+
+def test_create_aocs_duplicada_nao_cria_cadastros(test_client: TestClient, admin_auth_headers: dict, aocs_payload: dict):
+    response_create = test_client.post("/api/aocs/", json=aocs_payload, headers=admin_auth_headers)
+    assert response_create.status_code == 201
+    id_unidade = response_create.json()["id_unidade_requisitante"]
+
+    duplicada = {**aocs_payload, "unidade_requisitante_nome": "Unidade Só da Duplicada", "local_entrega_descricao": "Local de Teste (AOCS)"}
+    response_dup = test_client.post("/api/aocs/", json=duplicada, headers=admin_auth_headers)
+    assert response_dup.status_code == 409
+
+    # A AOCS e os cadastros auxiliares novos estão na mesma transação: nada fica da tentativa
+    unidades = test_client.get("/api/unidades/", headers=admin_auth_headers).json()
+    assert [u["nome"] for u in unidades] == ["Unidade de Teste (AOCS)"]
+
+    # Cadastro já existente é reaproveitado, não duplicado
+    outra = {**aocs_payload, "numero_aocs": "AOCS-002/2025-TESTE"}
+    response_outra = test_client.post("/api/aocs/", json=outra, headers=admin_auth_headers)
+    assert response_outra.status_code == 201
+    assert response_outra.json()["id_unidade_requisitante"] == id_unidade
+
+
+def test_create_aocs_com_pedidos_atomico(test_client: TestClient, admin_auth_headers: dict, aocs_payload: dict):
+    test_client.post("/api/categorias/", json={"nome": "Categoria (UOW)"}, headers=admin_auth_headers)
+    for rota, campo, valor in [("instrumentos", "nome", "Instrumento (UOW)"), ("modalidades", "nome", "Modalidade (UOW)"),
+                               ("numeros-modalidade", "numero_ano", "NumMod (UOW)"), ("processos-licitatorios", "numero", "PL (UOW)")]:
+        test_client.post(f"/api/{rota}/", json={campo: valor}, headers=admin_auth_headers)
+    contrato = {
+        "numero_contrato": "CT-UOW-1", "data_inicio": "2025-01-01", "data_fim": "2025-12-31",
+        "fornecedor": {"nome": "Fornecedor (UOW)", "cpf_cnpj": "11.111.111/0001-11"},
+        "categoria_nome": "Categoria (UOW)", "instrumento_nome": "Instrumento (UOW)", "modalidade_nome": "Modalidade (UOW)",
+        "numero_modalidade_str": "NumMod (UOW)", "processo_licitatorio_numero": "PL (UOW)"
+    }
+    assert test_client.post("/api/contratos/", json=contrato, headers=admin_auth_headers).status_code == 201
+    itens = []
+    for numero in (1, 2):
+        item = {"numero_item": numero, "unidade_medida": "UN", "quantidade": "10", "valor_unitario": "5.00",
+                "contrato_nome": "CT-UOW-1", "descricao": {"descricao": f"Item UOW {numero}"}}
+        resp_item = test_client.post("/api/itens/", json=item, headers=admin_auth_headers)
+        assert resp_item.status_code == 201
+        itens.append(resp_item.json()["id"])
+
+    payload = {**aocs_payload, "pedidos": [{"item_contrato_id": itens[0], "quantidade_pedida": "2"},
+                                           {"item_contrato_id": itens[1], "quantidade_pedida": "3"}]}
+    response = test_client.post("/api/aocs/com-pedidos", json=payload, headers=admin_auth_headers)
+    assert response.status_code == 201, response.json()
+    data = response.json()
+    assert data["numero_aocs"] == aocs_payload["numero_aocs"]
+    assert sorted(p["id_item_contrato"] for p in data["pedidos"]) == sorted(itens)
+
+    # Segundo item acima do saldo: nem a AOCS nem o primeiro pedido ficam gravados
+    falha = {**aocs_payload, "numero_aocs": "AOCS-UOW-FALHA",
+             "pedidos": [{"item_contrato_id": itens[0], "quantidade_pedida": "1"},
+                         {"item_contrato_id": itens[1], "quantidade_pedida": "999"}]}
+    response_falha = test_client.post("/api/aocs/com-pedidos", json=falha, headers=admin_auth_headers)
+    assert response_falha.status_code == 400
+    todas = test_client.get("/api/aocs/", headers=admin_auth_headers).json()
+    assert [a["numero_aocs"] for a in todas] == [aocs_payload["numero_aocs"]]
+    pedidos = test_client.get("/api/pedidos/", headers=admin_auth_headers).json()
+    assert len(pedidos) == 2
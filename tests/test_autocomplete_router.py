@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.extensions import connection
+
+@pytest.fixture
+def dados_autocomplete(db_session: connection) -> dict:
+    with db_session.cursor() as cursor:
+        cursor.execute("INSERT INTO categorias (nome) VALUES ('Copa e Cozinha') RETURNING id")
+        id_categoria = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO categorias (nome) VALUES ('Limpeza') RETURNING id")
+        id_outra_categoria = cursor.fetchone()[0]
+        contratos = {}
+        for numero, categoria, fornecedor, cnpj in (
+            ("CT-01/2025", id_categoria, "Comercial Água Viva Ltda", "11.111.111/0001-11"),
+            ("CT-02/2025", id_categoria, "Comercial Água Viva Ltda", "11.111.111/0001-11"),
+            ("CT-03/2025", id_outra_categoria, "Distribuidora Agualinda", "22.222.222/0001-22"),
+        ):
+            cursor.execute(
+                "INSERT INTO contratos (id_categoria, numero_contrato, fornecedor, cpf_cnpj, data_inicio, data_fim) "
+                "VALUES (%s, %s, %s, %s, '2025-01-01', '2025-12-31') RETURNING id", (categoria, numero, fornecedor, cnpj))
+            contratos[numero] = cursor.fetchone()[0]
+        for numero, (contrato, descricao) in enumerate((
+            ("CT-01/2025", "Água mineral 500ml"), ("CT-02/2025", "Copo para água"),
+            ("CT-03/2025", "Água sanitária 1L"), ("CT-01/2025", "Café torrado"),
+        ), start=1):
+            cursor.execute(
+                "INSERT INTO itenscontrato (id_contrato, numero_item, descricao, unidade_medida, quantidade, valor_unitario) "
+                "VALUES (%s, %s, %s, 'UN', 10, 1)", (contratos[contrato], numero, descricao))
+        for numero in ("2025/001", "2025/002", "2024/100"):
+            cursor.execute("INSERT INTO aocs (numero_aocs, numero_pedido) VALUES (%s, %s)", (numero, f"P-{numero}"))
+    db_session.commit()
+    return {"id_categoria": id_categoria}
+
+def test_autocomplete_itens(test_client: TestClient, user_auth_headers: dict, dados_autocomplete: dict):
+    response = test_client.get("/api/autocomplete/itens", params={"q": "agua"}, headers=user_auth_headers)
+    assert response.status_code == 200
+    sugestoes = {s["texto"]: s for s in response.json()}
+    assert set(sugestoes) == {"Água mineral 500ml", "Água sanitária 1L", "Copo para água"}
+    assert set(sugestoes["Água mineral 500ml"]) == {"texto", "id", "detalhe"}  # Só o necessário para a lista
+    assert sugestoes["Água mineral 500ml"]["detalhe"] == "CT-01/2025"
+    assert "max-age" in response.headers["cache-control"]
+
+    da_categoria = test_client.get("/api/autocomplete/itens", params={"q": "agua", "categoria": dados_autocomplete["id_categoria"], "limite": 1}, headers=user_auth_headers)
+    assert [s["texto"] for s in da_categoria.json()] == ["Água mineral 500ml"]
+
+    assert test_client.get("/api/autocomplete/itens", params={"q": "a"}, headers=user_auth_headers).json() == []
+
+def test_autocomplete_fornecedores_e_aocs(test_client: TestClient, user_auth_headers: dict, dados_autocomplete: dict):
+    fornecedores = test_client.get("/api/autocomplete/fornecedores", params={"q": "AGUA"}, headers=user_auth_headers).json()
+    # Um por nome (dois contratos do mesmo fornecedor); prefixo do nome vem antes
+    assert fornecedores == [
+        {"texto": "Comercial Água Viva Ltda", "id": None, "detalhe": "11.111.111/0001-11"},
+        {"texto": "Distribuidora Agualinda", "id": None, "detalhe": "22.222.222/0001-22"},
+    ]
+    assert [f["texto"] for f in test_client.get("/api/autocomplete/fornecedores", params={"q": "distr"}, headers=user_auth_headers).json()] == ["Distribuidora Agualinda"]
+
+    aocs = test_client.get("/api/autocomplete/aocs", params={"q": "2025/"}, headers=user_auth_headers).json()
+    assert [(a["texto"], a["detalhe"]) for a in aocs] == [("2025/001", "P-2025/001"), ("2025/002", "P-2025/002")]
+
+def test_autocomplete_cache_e_tipo_invalido(test_client: TestClient, user_auth_headers: dict, dados_autocomplete: dict, db_session: connection):
+    assert len(test_client.get("/api/autocomplete/aocs", params={"q": "2024"}, headers=user_auth_headers).json()) == 1
+    with db_session.cursor() as cursor:
+        cursor.execute("INSERT INTO aocs (numero_aocs) VALUES ('2024/200')")
+    db_session.commit()
+    # Servido do cache até o TTL expirar
+    assert len(test_client.get("/api/autocomplete/aocs", params={"q": " 2024 "}, headers=user_auth_headers).json()) == 1
+    assert len(test_client.get("/api/autocomplete/aocs", params={"q": "2024/"}, headers=user_auth_headers).json()) == 2
+
+    assert test_client.get("/api/autocomplete/usuarios", params={"q": "adm"}, headers=user_auth_headers).status_code == 400
+    assert test_client.get("/api/autocomplete/itens", params={"q": "agua"}).status_code == 401
@@ -353,4 +353,82 @@ def test_get_itens_com_saldo_por_categoria(
     assert item_na_lista["descricao"]["descricao"] == "Item para Cálculo de Saldo"
     assert item_na_lista["quantidade"] == "100.000" 
     assert item_na_lista["total_pedido"] == "10.000"
-    assert item_na_lista["saldo"] == "90.000"
\ No newline at end of file
+    assert item_na_lista["saldo"] == "90.000"
+
+def test_busca_de_itens_sem_acento_e_por_relevancia(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    setup_scenario_saldo_item: int,
+    db_session: connection
+):
+    id_categoria = setup_scenario_saldo_item
+    with db_session.cursor() as cursor:
+        cursor.execute("SELECT id FROM contratos WHERE numero_contrato = 'CT-SALDO-100'")
+        id_contrato = cursor.fetchone()[0]
+        for numero, descricao in ((2, "Copo descartável para ÁGUA 200ml"), (3, "Água"), (4, "Café torrado")):
+            cursor.execute(
+                "INSERT INTO itenscontrato (id_contrato, numero_item, descricao, unidade_medida, quantidade, valor_unitario) "
+                "VALUES (%s, %s, %s, 'UN', 10, 1)", (id_contrato, numero, descricao))
+    db_session.commit()
+
+    def buscar(termo, **extra):
+        response = test_client.get(f"/api/categorias/{id_categoria}/itens", params={"busca": termo, **extra}, headers=admin_auth_headers)
+        assert response.status_code == 200
+        return [i["descricao"]["descricao"] for i in response.json()["itens"]]
+
+    assert buscar("agua") == ["Água", "Copo descartável para ÁGUA 200ml"]
+    assert buscar("saldo CALCULO") == ["Item para Cálculo de Saldo"]  # Palavras em qualquer ordem
+    assert buscar("agua", sort_by="numero_item") == ["Copo descartável para ÁGUA 200ml", "Água"]
+    assert buscar("100%") == [] and buscar("_") == []  # Curingas do LIKE são literais
+    assert "descricao_busca" not in test_client.get(f"/api/categorias/{id_categoria}/itens", headers=admin_auth_headers).json()["itens"][0]
+
+    ui = test_client.get(f"/categoria/{id_categoria}/contratos", params={"busca": "cafe"}, headers=admin_auth_headers)
+    assert "Café torrado" in ui.text and "Água" not in ui.text
+
+def test_itens_por_categoria_paginados_por_cursor(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    setup_scenario_saldo_item: int,
+    db_session: connection
+):
+    id_categoria = setup_scenario_saldo_item
+    with db_session.cursor() as cursor:
+        cursor.execute("SELECT id FROM contratos WHERE numero_contrato = 'CT-SALDO-100'")
+        id_contrato = cursor.fetchone()[0]
+        for numero in range(2, 15):
+            cursor.execute(
+                "INSERT INTO itenscontrato (id_contrato, numero_item, descricao, unidade_medida, quantidade, valor_unitario) "
+                "VALUES (%s, %s, %s, 'UN', 10, 1)", (id_contrato, numero, f"Item {numero:02d}"))
+    db_session.commit()
+
+    def pagina(**params):
+        response = test_client.get(f"/api/categorias/{id_categoria}/itens",
+                                   params={"sort_by": "numero_item", "order": "desc", **params}, headers=admin_auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    primeira = pagina(total="true")
+    assert [i["numero_item"] for i in primeira["itens"]] == list(range(14, 4, -1))
+    assert primeira["anterior"] is None and primeira["proximo"]
+    assert primeira["total_estimado"] > 0 and primeira["total_paginas"] >= 1
+
+    segunda = pagina(after=primeira["proximo"])
+    assert [i["numero_item"] for i in segunda["itens"]] == [4, 3, 2, 1]
+    assert segunda["proximo"] is None and segunda["total_estimado"] is None
+
+    assert pagina(before=segunda["anterior"])["itens"] == primeira["itens"]
+
+    # Cursor de outra ordenação não é aceito
+    outra_ordem = test_client.get(f"/api/categorias/{id_categoria}/itens",
+                                  params={"after": primeira["proximo"]}, headers=admin_auth_headers)
+    assert outra_ordem.status_code == 400
+
+    # Por relevância a tupla do cursor inclui as colunas calculadas da relevância
+    relevancia = pagina(busca="item", sort_by="relevancia")
+    resto = pagina(busca="item", sort_by="relevancia", after=relevancia["proximo"])
+    assert len(relevancia["itens"]) == 10 and len(resto["itens"]) == 4
+    assert {i["id"] for i in relevancia["itens"]}.isdisjoint(i["id"] for i in resto["itens"])
+    assert "relevancia" not in resto["itens"][0]
+
+    ui = test_client.get(f"/categoria/{id_categoria}/contratos", params={"sort_by": "numero_item"}, headers=admin_auth_headers)
+    assert "after=" in ui.text and "Item 10" in ui.text and "Item 12" not in ui.text
@@ -207,6 +207,62 @@ def test_create_ci_pagamento_duplicado(
     
     assert response.status_code == 409
 
+def _payload_por_ids(test_client: TestClient, admin_auth_headers: dict, id_aocs: int, **extra) -> dict:
+    aocs = test_client.get(f"/api/aocs/{id_aocs}", headers=admin_auth_headers).json()
+    payload = {
+        "numero_ci": "CI-IDS-001",
+        "data_ci": date.today().isoformat(),
+        "numero_nota_fiscal": "NF-IDS-001",
+        "data_nota_fiscal": date.today().isoformat(),
+        "valor_nota_fiscal": "250.00",
+        "id_aocs": id_aocs,
+        "id_solicitante": aocs["id_agente_responsavel"],
+        "id_secretaria": aocs["id_unidade_requisitante"],
+        "id_dotacao_pagamento": aocs["id_dotacao"],
+    }
+    payload.update(extra)
+    return payload
+
+def test_create_ci_por_ids_vincula_primeiro_pedido(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_pedido_pronto: dict
+):
+    payload = _payload_por_ids(test_client, admin_auth_headers, setup_pedido_pronto["id_aocs"])
+
+    response = test_client.post("/api/ci-pagamento/por-ids", json=payload, headers=admin_auth_headers)
+
+    assert response.status_code == 201, response.json()
+    data = response.json()
+    assert data["numero_ci"] == "CI-IDS-001"
+    assert data["id_aocs"] == setup_pedido_pronto["id_aocs"]
+    assert data["id_pedido"] == setup_pedido_pronto["id_pedido"]
+
+def test_create_ci_por_ids_fk_inexistente(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_pedido_pronto: dict
+):
+    payload = _payload_por_ids(test_client, admin_auth_headers, setup_pedido_pronto["id_aocs"], id_solicitante=999999)
+
+    response = test_client.post("/api/ci-pagamento/por-ids", json=payload, headers=admin_auth_headers)
+
+    assert response.status_code == 400
+    assert "Solicitante" in response.json()["detail"]
+    assert "999999" in response.json()["detail"]
+
+def test_create_ci_por_ids_duplicado(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_ci_pronta: dict, 
+    setup_pedido_pronto: dict
+):
+    payload = _payload_por_ids(test_client, admin_auth_headers, setup_pedido_pronto["id_aocs"], numero_ci="CI-TESTE-123")
+
+    response = test_client.post("/api/ci-pagamento/por-ids", json=payload, headers=admin_auth_headers)
+
+    assert response.status_code == 409
+
 def test_get_all_ci_pagamentos(
     test_client: TestClient, 
     admin_auth_headers: dict,
@@ -255,6 +311,23 @@ def test_get_ci_by_pedido_id(
     assert data["id_pedido"] == id_pedido
     assert data["numero_ci"] == "CI-TESTE-123"
 
+def test_get_cis_by_aocs_id(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_ci_pronta: dict,
+    setup_pedido_pronto: dict
+):
+    id_aocs = setup_pedido_pronto["id_aocs"]
+
+    response = test_client.get(f"/api/ci-pagamento/por-aocs/{id_aocs}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [ci["id"] for ci in data] == [setup_ci_pronta["id_ci"]]
+
+    response = test_client.get(f"/api/ci-pagamento/por-aocs/{id_aocs + 999}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
 def test_update_ci_pagamento(
     test_client: TestClient, 
     admin_auth_headers: dict, 
@@ -1,5 +1,7 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
+from app.core.database import _get_db_connection
 from datetime import date
 
 @pytest.fixture
@@ -79,6 +81,40 @@ def test_get_all_contratos(test_client: TestClient, admin_auth_headers: dict, co
     assert len(data) >= 1
     assert any(c["numero_contrato"] == contrato_payload["numero_contrato"] for c in data)
 
+def test_get_all_contratos_ndjson_por_accept(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict):
+    test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers)
+
+    response = test_client.get("/api/contratos/", headers={**admin_auth_headers, "Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    contrato, = [json.loads(linha) for linha in response.text.splitlines()]
+    assert contrato["numero_contrato"] == contrato_payload["numero_contrato"]
+    assert contrato["fornecedor"]["nome"] == contrato_payload["fornecedor"]["nome"]
+
+def test_get_all_contratos_com_fields(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict):
+    test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers)
+    test_client.post("/api/contratos/", json={**contrato_payload, "numero_contrato": "CT-FIELDS-2"}, headers=admin_auth_headers)
+
+    response = test_client.get("/api/contratos/?fields=numero_contrato,id,fornecedor&limite=1", headers=admin_auth_headers)
+
+    assert response.status_code == 200
+    contrato, = response.json()
+    assert list(contrato) == ["numero_contrato", "id", "fornecedor"]
+    assert contrato["fornecedor"]["nome"] == contrato_payload["fornecedor"]["nome"]
+
+    # O cursor da próxima página continua válido sem as colunas de ordenação na resposta
+    proxima = test_client.get(response.links["next"]["url"], headers=admin_auth_headers)
+    assert proxima.status_code == 200
+    assert [list(c) for c in proxima.json()] == [["numero_contrato", "id", "fornecedor"]]
+    assert proxima.json()[0]["id"] != contrato["id"]
+
+def test_get_all_contratos_fields_invalido(test_client: TestClient, admin_auth_headers: dict):
+    response = test_client.get("/api/contratos/?fields=id,senha", headers=admin_auth_headers)
+
+    assert response.status_code == 400
+    assert "senha" in response.json()["detail"]
+
 def test_update_contrato(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict):
     response_create = test_client.post(
         "/api/contratos/",
@@ -171,4 +207,87 @@ def test_update_contrato_not_found(test_client: TestClient, admin_auth_headers:
 
 def test_delete_contrato_not_found(test_client: TestClient, admin_auth_headers: dict):
     response = test_client.delete(f"/api/contratos/999999", headers=admin_auth_headers)
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+def test_get_all_contratos_paginado_por_cursor(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict):
+    # data_fim DESC, numero_contrato ASC: direções mistas na mesma ordenação
+    for numero, data_fim in (("CT-A", "2025-06-30"), ("CT-B", "2025-12-31"), ("CT-C", "2025-06-30"),
+                             ("CT-D", "2026-01-31"), ("CT-E", "2025-06-30")):
+        payload = {**contrato_payload, "numero_contrato": numero, "data_fim": data_fim}
+        assert test_client.post("/api/contratos/", json=payload, headers=admin_auth_headers).status_code == 201
+
+    vistos, url, params = [], "/api/contratos/", {"limite": 2, "total": "true"}
+    while url:
+        response = test_client.get(url, params=params, headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        vistos.extend(c["numero_contrato"] for c in response.json())
+        url, params = response.links.get("next", {}).get("url"), None
+        if not vistos[2:]:
+            assert "prev" not in response.links
+            assert int(response.headers["x-total-estimado"]) > 0
+
+    assert vistos == ["CT-D", "CT-B", "CT-A", "CT-C", "CT-E"]
+
+    # Volta uma página a partir da última
+    anterior = test_client.get(response.links["prev"]["url"], headers=admin_auth_headers)
+    assert [c["numero_contrato"] for c in anterior.json()] == ["CT-A", "CT-C"]
+
+    invalido = test_client.get("/api/contratos/", params={"after": "lixo"}, headers=admin_auth_headers)
+    assert invalido.status_code == 400
+
+def test_alteracoes_contratos_desde_o_cursor(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict, monkeypatch):
+    monkeypatch.setattr("app.core.sincronizacao.SYNC_ATRASO_SEGUNDOS", 0)
+    id_a = test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers).json()["id"]
+    id_b = test_client.post("/api/contratos/", json={**contrato_payload, "numero_contrato": "CT-SYNC-B"}, headers=admin_auth_headers).json()["id"]
+
+    primeira = test_client.get("/api/contratos/alteracoes?limite=1", headers=admin_auth_headers).json()
+    assert [c["id"] for c in primeira["alterados"]] == [id_a]
+    assert primeira["tem_mais"] is True
+    segunda = test_client.get(f"/api/contratos/alteracoes?cursor={primeira['cursor']}", headers=admin_auth_headers).json()
+    assert [c["id"] for c in segunda["alterados"]] == [id_b]
+    assert (segunda["removidos"], segunda["tem_mais"]) == ([], False)
+
+    # Nada mudou: o mesmo cursor volta, para a próxima sincronização
+    vazia = test_client.get(f"/api/contratos/alteracoes?cursor={segunda['cursor']}", headers=admin_auth_headers).json()
+    assert vazia == {"alterados": [], "removidos": [], "cursor": segunda["cursor"], "tem_mais": False}
+
+    test_client.put(f"/api/contratos/{id_a}", json={"data_fim": "2026-01-31"}, headers=admin_auth_headers)
+    test_client.delete(f"/api/contratos/{id_b}", headers=admin_auth_headers)
+    depois = test_client.get(f"/api/contratos/alteracoes?cursor={segunda['cursor']}", headers=admin_auth_headers).json()
+    assert [(c["id"], c["data_fim"]) for c in depois["alterados"]] == [(id_a, "2026-01-31")]
+    assert depois["removidos"] == [id_b]
+
+def test_alteracoes_contratos_com_transacao_de_escrita_aberta(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict, monkeypatch):
+    monkeypatch.setattr("app.core.sincronizacao.SYNC_ATRASO_SEGUNDOS", 0)
+    id_a = test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers).json()["id"]
+    id_b = test_client.post("/api/contratos/", json={**contrato_payload, "numero_contrato": "CT-SYNC-B"}, headers=admin_auth_headers).json()["id"]
+    cursor_inicial = test_client.get("/api/contratos/alteracoes", headers=admin_auth_headers).json()["cursor"]
+
+    # Outra conexão altera A e segura a transação (ex.: esperando um lock) enquanto B é alterado e confirmado
+    outra_conexao = _get_db_connection()
+    try:
+        with outra_conexao.cursor() as cursor:
+            cursor.execute("UPDATE contratos SET data_fim = '2027-03-31' WHERE id = %s", (id_a,))
+        test_client.put(f"/api/contratos/{id_b}", json={"data_fim": "2026-01-31"}, headers=admin_auth_headers)
+
+        durante = test_client.get(f"/api/contratos/alteracoes?cursor={cursor_inicial}", headers=admin_auth_headers).json()
+        # B foi escrito depois do início da transação aberta: fica para depois, com o cursor parado
+        assert durante["alterados"] == []
+        assert durante["cursor"] == cursor_inicial
+        outra_conexao.commit()
+    finally:
+        outra_conexao.close()
+
+    depois = test_client.get(f"/api/contratos/alteracoes?cursor={durante['cursor']}", headers=admin_auth_headers).json()
+    assert sorted((c["id"], c["data_fim"]) for c in depois["alterados"]) == [(id_a, "2027-03-31"), (id_b, "2026-01-31")]
+
+def test_alteracoes_contratos_since_e_cursor_invalido(test_client: TestClient, admin_auth_headers: dict, contrato_payload: dict, monkeypatch):
+    monkeypatch.setattr("app.core.sincronizacao.SYNC_ATRASO_SEGUNDOS", 0)
+    test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers)
+
+    response = test_client.get("/api/contratos/alteracoes", params={"since": "2999-01-01T00:00:00+00:00"}, headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["alterados"] == []
+
+    response = test_client.get("/api/contratos/alteracoes?cursor=invalido", headers=admin_auth_headers)
+    assert response.status_code == 400
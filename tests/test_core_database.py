@@ -51,4 +51,114 @@ def test_get_db_falha_na_conexao(monkeypatch):
         list(get_db())
         
     assert "Simulated DB connection failure in get_db" in str(excinfo.value)
-    print("\n[Pytest] PASSOU: get_db trata falha na conexão.")
\ No newline at end of file
+    print("\n[Pytest] PASSOU: get_db trata falha na conexão.")
+def test_uow_confirma_uma_vez_e_desfaz_tudo_na_falha(db_session):
+    from app.core.transacao import uow
+    from app.repositories.unidade_repository import UnidadeRepository
+    from app.schemas.unidade_schema import UnidadeRequest
+
+    repo = UnidadeRepository(db_session)
+    with pytest.raises(RuntimeError):
+        with uow(db_session):
+            repo.create(UnidadeRequest(nome="Unidade UOW A"))  # o commit do repositório não encerra a transação
+            repo.create(UnidadeRequest(nome="Unidade UOW B"))
+            raise RuntimeError("falha depois das gravações")
+
+    assert repo.get_by_nome("Unidade UOW A") is None
+    assert repo.get_by_nome("Unidade UOW B") is None
+
+    with uow(db_session):
+        repo.create(UnidadeRequest(nome="Unidade UOW A"))
+    assert db_session.nivel_uow == 0
+    assert repo.get_by_nome("Unidade UOW A") is not None
+
+def test_uow_aninhado_desfaz_so_o_savepoint(db_session):
+    import psycopg2
+    from app.core.transacao import uow
+    from app.repositories.unidade_repository import UnidadeRepository
+    from app.schemas.unidade_schema import UnidadeRequest
+
+    repo = UnidadeRepository(db_session)
+    with uow(db_session):
+        repo.create(UnidadeRequest(nome="Unidade Externa"))
+        with pytest.raises(psycopg2.IntegrityError):
+            with uow(db_session):
+                repo.create(UnidadeRequest(nome="Unidade Interna"))
+                repo.create(UnidadeRequest(nome="Unidade Externa"))  # duplicada: falha só este bloco
+        repo.create(UnidadeRequest(nome="Unidade Depois"))
+
+    assert repo.get_by_nome("Unidade Externa") is not None
+    assert repo.get_by_nome("Unidade Interna") is None
+    assert repo.get_by_nome("Unidade Depois") is not None
+    assert db_session.savepoints == []
+
+def test_uow_nao_confirma_transacao_abortada(db_session):
+    from app.core.transacao import TransacaoAbortadaError, uow
+    from app.repositories.unidade_repository import UnidadeRepository
+    from app.schemas.unidade_schema import UnidadeRequest
+
+    repo = UnidadeRepository(db_session)
+    with pytest.raises(TransacaoAbortadaError):
+        with uow(db_session):
+            repo.create(UnidadeRequest(nome="Unidade Abortada"))
+            # Repositório que captura o erro e devolve um valor padrão: o rollback é no-op aqui
+            try:
+                with db_session.cursor() as cursor:
+                    cursor.execute("SELECT 1 / 0")
+            except Exception:
+                db_session.rollback()
+
+    assert db_session.nivel_uow == 0
+    assert repo.get_by_nome("Unidade Abortada") is None
+
+def _request_falso(metodo: str, rota: str):
+    from types import SimpleNamespace
+    from starlette.requests import Request
+    return Request({"type": "http", "method": metodo, "headers": [], "route": SimpleNamespace(name=rota)})
+
+def test_get_db_leitura_em_autocommit_somente_leitura():
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+    gerador = get_db(_request_falso("GET", "detalhe_pedido"))
+    conn = next(gerador)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT current_setting('application_name'), current_setting('transaction_read_only')")
+            assert tuple(cursor.fetchone()) == ("gestaopro:detalhe_pedido", "on")
+        # Depois do SELECT, nenhuma transação fica aberta na conexão
+        assert conn.autocommit
+        assert conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+    finally:
+        gerador.close()
+    assert conn.closed
+
+def test_get_db_escrita_com_transacao_e_timeout(monkeypatch):
+    monkeypatch.setattr("app.core.database.DB_STATEMENT_TIMEOUT_MS", 1234)
+
+    gerador = get_db(_request_falso("POST", "create_aocs"))
+    conn = next(gerador)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT current_setting('statement_timeout'), current_setting('transaction_read_only')")
+            assert tuple(cursor.fetchone()) == ("1234ms", "off")
+        assert not conn.autocommit
+    finally:
+        gerador.close()
+
+def test_iterar_cursor_nomeado_em_conexao_de_leitura():
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+    from app.core import mapeamento
+
+    gerador = get_db(_request_falso("GET", "get_all_pedidos"))
+    conn = next(gerador)
+    try:
+        linhas = mapeamento.iterar(conn, "SELECT g AS n FROM generate_series(1, %s) AS g", (25,), int, ("n",), lote=10)
+        assert next(linhas) == 1
+        # Durante a leitura: transação aberta só para o cursor nomeado
+        assert not conn.autocommit
+        assert list(linhas) == list(range(2, 26))
+        # Ao terminar, a conexão volta ao autocommit sem transação pendente
+        assert conn.autocommit
+        assert conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+    finally:
+        gerador.close()
@@ -0,0 +1,182 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+
+from app import worker
+from app.core import impressao_lote, jobs
+
+@pytest.fixture
+def setup_aocs_para_lote(test_client: TestClient, admin_auth_headers: dict, tmp_path, monkeypatch) -> list[str]:
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path / "jobs"))
+
+    test_client.post("/api/categorias/", json={"nome": "Categoria Lote"}, headers=admin_auth_headers)
+    test_client.post("/api/instrumentos/", json={"nome": "Instrumento Lote"}, headers=admin_auth_headers)
+    test_client.post("/api/modalidades/", json={"nome": "Modalidade Lote"}, headers=admin_auth_headers)
+    test_client.post("/api/numeros-modalidade/", json={"numero_ano": "NumMod Lote"}, headers=admin_auth_headers)
+    test_client.post("/api/processos-licitatorios/", json={"numero": "PL Lote"}, headers=admin_auth_headers)
+    contrato_payload = {
+        "numero_contrato": "CT-LOTE-1/2025",
+        "data_inicio": "2025-01-01", "data_fim": "2025-12-31",
+        "fornecedor": {"nome": "Fornecedor Lote", "cpf_cnpj": "12.345.678/0001-99"},
+        "categoria_nome": "Categoria Lote", "instrumento_nome": "Instrumento Lote",
+        "modalidade_nome": "Modalidade Lote", "numero_modalidade_str": "NumMod Lote",
+        "processo_licitatorio_numero": "PL Lote"
+    }
+    assert test_client.post("/api/contratos/", json=contrato_payload, headers=admin_auth_headers).status_code == 201
+
+    item_payload = {
+        "numero_item": 1, "unidade_medida": "UN", "quantidade": 100, "valor_unitario": 10.0,
+        "contrato_nome": "CT-LOTE-1/2025",
+        "descricao": {"descricao": "Item do Lote"}
+    }
+    resp_item = test_client.post("/api/itens/", json=item_payload, headers=admin_auth_headers)
+    assert resp_item.status_code == 201
+    id_item = resp_item.json()["id"]
+
+    numeros = []
+    for i, unidade in enumerate(["Unidade Lote A", "Unidade Lote B", "Unidade Lote A"], start=1):
+        aocs_payload = {
+            "numero_aocs": f"AOCS-LOTE-{i}/2025",
+            "data_criacao": date(2025, 3, i).isoformat(),
+            "justificativa": f"Justificativa Lote {i}",
+            "unidade_requisitante_nome": unidade,
+            "local_entrega_descricao": "Local Lote",
+            "agente_responsavel_nome": "Agente Lote",
+            "dotacao_info_orcamentaria": "Dotação Lote"
+        }
+        resp_aocs = test_client.post("/api/aocs/", json=aocs_payload, headers=admin_auth_headers)
+        assert resp_aocs.status_code == 201
+        id_aocs = resp_aocs.json()["id"]
+        resp_pedido = test_client.post(
+            f"/api/pedidos/?id_aocs={id_aocs}",
+            json={"item_contrato_id": id_item, "quantidade_pedida": i, "id_aocs": id_aocs},
+            headers=admin_auth_headers
+        )
+        assert resp_pedido.status_code == 201
+        numeros.append(aocs_payload["numero_aocs"])
+    return numeros
+
+def test_impressao_lote_html_por_filtro(test_client: TestClient, admin_auth_headers: dict, setup_aocs_para_lote: list[str], db_session):
+    response = test_client.post(
+        "/api/impressao-lote/",
+        json={"unidade_requisitante_nome": "Unidade Lote A", "formato": "html"},
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["tipo"] == "impressao_lote"
+    assert job["status"] == "pendente"
+    assert job["url_status"].endswith(f"/api/jobs/{job['id']}")
+
+    assert worker.processar_proximo(db_session) is True
+
+    status_resp = test_client.get(f"/api/jobs/{job['id']}", headers=admin_auth_headers)
+    assert status_resp.status_code == 200
+    assert status_resp.json()["status"] == "concluido"
+    assert status_resp.json()["progresso"] == 100
+    assert status_resp.json()["url_download"].endswith(f"/api/jobs/{job['id']}/download")
+
+    download = test_client.get(f"/api/jobs/{job['id']}/download", headers=admin_auth_headers)
+    assert download.status_code == 200
+    assert "text/html" in download.headers["content-type"]
+    html = download.text
+    assert html.count('class="documento-lote"') == 2
+    assert "AOCS-LOTE-1/2025" in html and "AOCS-LOTE-3/2025" in html
+    assert "AOCS-LOTE-2/2025" not in html
+    assert "Fornecedor Lote" in html
+    assert "R$ 30,00" in html
+
+def test_impressao_lote_pdf_por_lista(test_client: TestClient, admin_auth_headers: dict, setup_aocs_para_lote: list[str], db_session, monkeypatch):
+    def fake_render_pdf_sync(html: str, timeout: float | None = None) -> bytes:
+        assert html.count('class="documento-lote"') == 3
+        return b"%PDF-1.7 lote"
+
+    monkeypatch.setattr("app.core.pdf_renderer.render_pdf_sync", fake_render_pdf_sync)
+
+    response = test_client.post("/api/impressao-lote/", json={"numeros_aocs": setup_aocs_para_lote}, headers=admin_auth_headers)
+    assert response.status_code == 202
+    assert worker.processar_proximo(db_session) is True
+
+    download = test_client.get(f"/api/jobs/{response.json()['id']}/download", headers=admin_auth_headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content == b"%PDF-1.7 lote"
+
+def test_impressao_lote_falha_volta_para_fila(test_client: TestClient, admin_auth_headers: dict, setup_aocs_para_lote: list[str], db_session, monkeypatch):
+    from app.core.pdf_renderer import PdfIndisponivelError
+
+    def fake_render_pdf_sync(html: str, timeout: float | None = None) -> bytes:
+        raise PdfIndisponivelError("WeasyPrint não está disponível neste servidor.")
+
+    monkeypatch.setattr("app.core.pdf_renderer.render_pdf_sync", fake_render_pdf_sync)
+
+    response = test_client.post("/api/impressao-lote/", json={"data_inicio": "2025-03-01"}, headers=admin_auth_headers)
+    id_job = response.json()["id"]
+    assert worker.processar_proximo(db_session) is True
+
+    status_resp = test_client.get(f"/api/jobs/{id_job}", headers=admin_auth_headers).json()
+    assert status_resp["status"] == "pendente"
+    assert status_resp["tentativas"] == 1
+    assert "WeasyPrint" in status_resp["erro"]
+    assert test_client.get(f"/api/jobs/{id_job}/download", headers=admin_auth_headers).status_code == 409
+
+def test_impressao_lote_sem_filtro_retorna_422(test_client: TestClient, admin_auth_headers: dict):
+    response = test_client.post("/api/impressao-lote/", json={"formato": "pdf"}, headers=admin_auth_headers)
+    assert response.status_code == 422
+
+def test_impressao_lote_sem_resultados_retorna_404(test_client: TestClient, admin_auth_headers: dict):
+    response = test_client.post("/api/impressao-lote/", json={"numeros_aocs": ["NAO-EXISTE"]}, headers=admin_auth_headers)
+    assert response.status_code == 404
+
+def test_impressao_lote_acima_do_limite_retorna_400(test_client: TestClient, admin_auth_headers: dict, setup_aocs_para_lote: list[str], monkeypatch):
+    monkeypatch.setattr(impressao_lote, "LOTE_MAX_DOCUMENTOS", 2)
+    response = test_client.post("/api/impressao-lote/", json={"numeros_aocs": setup_aocs_para_lote}, headers=admin_auth_headers)
+    assert response.status_code == 400
+
+def test_impressao_lote_ci_html(test_client: TestClient, admin_auth_headers: dict, setup_aocs_para_lote: list[str], db_session):
+    with db_session.cursor() as cur:
+        cur.execute("SELECT p.id, a.numero_aocs FROM pedidos p JOIN aocs a ON a.id = p.id_aocs WHERE a.numero_aocs = ANY(%s)", (setup_aocs_para_lote,))
+        pedidos = {numero: id_pedido for id_pedido, numero in cur.fetchall()}
+
+    for i, numero_aocs in enumerate(setup_aocs_para_lote[:2], start=1):
+        ci_payload = {
+            "numero_ci": f"CI-LOTE-{i}/2025",
+            "data_ci": date(2025, 4, i).isoformat(),
+            "valor": "25.00",
+            "observacao": f"Pagamento Lote {i}",
+            "numero_nota_fiscal": f"NF-LOTE-{i}",
+            "data_nota_fiscal": date(2025, 3, 20).isoformat(),
+            "valor_nota_fiscal": "25.00",
+            "aocs_numero": numero_aocs,
+            "solicitante_nome": "Agente Lote",
+            "secretaria_nome": "Unidade Lote A",
+            "dotacao_info_orcamentaria": "Dotação Lote"
+        }
+        resp_ci = test_client.post(f"/api/ci-pagamento/?id_pedido={pedidos[numero_aocs]}", json=ci_payload, headers=admin_auth_headers)
+        assert resp_ci.status_code == 201
+
+    response = test_client.post(
+        "/api/impressao-lote/",
+        json={"tipo": "ci", "numeros_ci": ["CI-LOTE-1/2025", "CI-LOTE-2/2025"], "formato": "html"},
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 202
+    assert worker.processar_proximo(db_session) is True
+
+    download = test_client.get(f"/api/jobs/{response.json()['id']}/download", headers=admin_auth_headers)
+    assert download.status_code == 200
+    html = download.text
+    assert html.count('class="documento-lote"') == 2
+    assert "CI-LOTE-1/2025" in html and "CI-LOTE-2/2025" in html
+    assert "NF-LOTE-1" in html
+    assert "Fornecedor Lote" in html
+    assert "Agente Lote" in html
+
+def test_impressao_lote_ci_sem_resultados_retorna_404(test_client: TestClient, admin_auth_headers: dict):
+    response = test_client.post("/api/impressao-lote/", json={"tipo": "ci", "numeros_ci": ["NAO-EXISTE"]}, headers=admin_auth_headers)
+    assert response.status_code == 404
+    assert "Nenhuma CI" in response.json()["detail"]
+
+def test_impressao_lote_ci_com_status_entrega_retorna_422(test_client: TestClient, admin_auth_headers: dict):
+    response = test_client.post("/api/impressao-lote/", json={"tipo": "ci", "status_entrega": "Pendente"}, headers=admin_auth_headers)
+    assert response.status_code == 422
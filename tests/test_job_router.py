@@ -0,0 +1,221 @@
+import os
+import sys
+import multiprocessing
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+
+from app import worker
+from app.core import jobs
+from app.repositories.job_repository import JobRepository
+
+@jobs.tarefa("teste_sucesso")
+def _tarefa_sucesso(ctx: jobs.ContextoJob) -> str:
+    ctx.reportar(50, "Metade do caminho.")
+    return ctx.gravar_artefato("resultado.txt", f"ok {ctx.parametros['valor']}".encode())
+
+@jobs.tarefa("teste_falha")
+def _tarefa_falha(ctx: jobs.ContextoJob) -> None:
+    raise RuntimeError("falha proposital")
+
+@jobs.tarefa("teste_reserva_perdida")
+def _tarefa_reserva_perdida(ctx: jobs.ContextoJob) -> str:
+    # Simula liberar_travados + reserva por outro worker durante a execução
+    with ctx.db_conn.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET tentativas = tentativas + 1 WHERE id = %s", (ctx.job.id,))
+    ctx.db_conn.commit()
+    ctx.reportar(50)
+    return ctx.gravar_artefato("resultado.txt", b"nao deveria gravar")
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path / "jobs"))
+    return tmp_path / "jobs"
+
+def test_job_concluido_com_artefato(test_client: TestClient, admin_auth_headers: dict, db_session, jobs_dir):
+    job = JobRepository(db_session).create("teste_sucesso", {"valor": 42}, criado_por="test_admin_user")
+
+    assert worker.processar_proximo(db_session) is True
+    assert worker.processar_proximo(db_session) is False
+
+    response = test_client.get(f"/api/jobs/{job.id}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "concluido"
+    assert data["progresso"] == 100
+    assert data["mensagem"] == "Metade do caminho."
+    assert data["tentativas"] == 1
+
+    download = test_client.get(data["url_download"], headers=admin_auth_headers)
+    assert download.status_code == 200
+    assert download.content == b"ok 42"
+
+def test_artefato_em_armazenamento_compartilhado(test_client: TestClient, admin_auth_headers: dict, db_session, s3_falso, tmp_path, monkeypatch):
+    servidor, driver = s3_falso
+    monkeypatch.setattr(jobs, "armazenamento", lambda: driver)
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path / "worker"))
+    job = JobRepository(db_session).create("teste_sucesso", {"valor": 7}, criado_por="test_admin_user")
+    assert worker.processar_proximo(db_session) is True
+
+    job = JobRepository(db_session).get_by_id(job.id)
+    assert job.artefato == f"{job.id}/1/resultado.txt"
+    assert f"anexos/{job.artefato}" in servidor.objetos
+    assert not [a for a in (tmp_path / "worker").rglob("*") if a.is_file()]  # temporário descartado
+
+    # O web (outra máquina) não tem o disco do worker: lê do bucket
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path / "web"))
+    download = test_client.get(f"/api/jobs/{job.id}/download", headers=admin_auth_headers)
+    assert download.status_code == 200
+    assert download.content == b"ok 7"
+    assert download.headers["content-type"].startswith("text/plain")
+
+    servidor.objetos.clear()
+    assert test_client.get(f"/api/jobs/{job.id}/download", headers=admin_auth_headers).status_code == 410
+
+def test_job_com_falha_e_retentado_ate_o_limite(db_session, jobs_dir):
+    repo = JobRepository(db_session)
+    job = repo.create("teste_falha", {}, max_tentativas=2)
+
+    assert worker.processar_proximo(db_session) is True
+    job = repo.get_by_id(job.id)
+    assert job.status == "pendente"
+    assert job.erro == "falha proposital"
+    # A retentativa só fica disponível após o atraso
+    assert worker.processar_proximo(db_session) is False
+
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET executar_apos = now() WHERE id = %s", (job.id,))
+    db_session.commit()
+
+    assert worker.processar_proximo(db_session) is True
+    job = repo.get_by_id(job.id)
+    assert job.status == "erro"
+    assert job.tentativas == 2
+    assert job.concluido_em is not None
+
+def test_job_de_tipo_desconhecido_falha(db_session):
+    repo = JobRepository(db_session)
+    job = repo.create("tipo_inexistente", {}, max_tentativas=1)
+    assert worker.processar_proximo(db_session) is True
+    job = repo.get_by_id(job.id)
+    assert job.status == "erro"
+    assert "desconhecido" in job.erro
+
+def test_liberar_jobs_travados(db_session):
+    repo = JobRepository(db_session)
+    job = repo.create("teste_sucesso", {"valor": 1})
+    assert repo.reservar_proximo().id == job.id
+
+    # Job longo, mas com heartbeat recente: o worker continua vivo
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET iniciado_em = now() - interval '2 hours' WHERE id = %s", (job.id,))
+    db_session.commit()
+    assert repo.liberar_travados(3600) == 0
+
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET heartbeat_em = now() - interval '2 hours' WHERE id = %s", (job.id,))
+    db_session.commit()
+
+    assert repo.liberar_travados(3600) == 1
+    assert repo.get_by_id(job.id).status == "pendente"
+
+def test_contexto_renova_heartbeat(db_session, monkeypatch):
+    repo = JobRepository(db_session)
+    repo.create("teste_sucesso", {"valor": 1})
+    job = repo.reservar_proximo()
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET heartbeat_em = now() - interval '1 hour' WHERE id = %s", (job.id,))
+    db_session.commit()
+    ctx = jobs.ContextoJob(job, db_session)
+
+    ctx.pulsar()  # Dentro do intervalo mínimo: não grava
+    assert repo.liberar_travados(600) == 1
+
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET status = 'processando', heartbeat_em = now() - interval '1 hour' WHERE id = %s", (job.id,))
+    db_session.commit()
+    monkeypatch.setattr(jobs, "JOBS_HEARTBEAT_INTERVALO_SEGUNDOS", 0)
+    ctx.pulsar()
+    assert repo.liberar_travados(600) == 0
+
+def test_worker_antigo_nao_altera_job_reservado_por_outro(db_session):
+    repo = JobRepository(db_session)
+    repo.create("teste_sucesso", {"valor": 1})
+    antigo = repo.reservar_proximo()
+
+    # O worker antigo parou de pulsar: o job volta à fila e outro worker o reserva
+    with db_session.cursor() as cursor:
+        cursor.execute("UPDATE jobs SET heartbeat_em = now() - interval '2 hours' WHERE id = %s", (antigo.id,))
+    db_session.commit()
+    assert repo.liberar_travados(3600) == 1
+    atual = repo.reservar_proximo()
+    assert atual.id == antigo.id and atual.tentativas == antigo.tentativas + 1
+
+    assert repo.registrar_heartbeat(antigo.id, antigo.tentativas) is False
+    assert repo.atualizar_progresso(antigo.id, antigo.tentativas, 90) is False
+    assert repo.concluir(antigo.id, antigo.tentativas, "resultado.txt") is False
+    assert repo.falhar(antigo.id, antigo.tentativas, "erro antigo") is None
+    job = repo.get_by_id(atual.id)
+    assert job.status == "processando" and job.progresso == 0 and job.erro is None
+
+    assert repo.concluir(atual.id, atual.tentativas) is True
+    # Falha tardia sobre um job concluído não o devolve à fila
+    assert repo.falhar(atual.id, atual.tentativas, "erro tardio") is None
+    assert repo.get_by_id(atual.id).status == "concluido"
+
+def test_tarefa_que_perde_a_reserva_e_descartada(db_session, jobs_dir):
+    repo = JobRepository(db_session)
+    job = repo.create("teste_reserva_perdida", {})
+
+    assert worker.processar_proximo(db_session) is True
+    job = repo.get_by_id(job.id)
+    assert job.status == "processando"  # Segue com o worker que o reservou depois
+    assert job.erro is None and job.artefato is None
+
+def test_job_de_outro_usuario_nao_visivel(test_client: TestClient, user_auth_headers: dict, db_session):
+    job = JobRepository(db_session).create("teste_sucesso", {"valor": 1}, criado_por="outro_usuario")
+    # Nível 3 não acessa a rota (exige nível 2)
+    assert test_client.get(f"/api/jobs/{job.id}", headers=user_auth_headers).status_code == 403
+
+def test_job_inexistente(test_client: TestClient, admin_auth_headers: dict):
+    assert test_client.get("/api/jobs/999", headers=admin_auth_headers).status_code == 404
+
+def test_worker_reconecta_apos_queda_da_conexao(monkeypatch):
+    conexoes = []
+    def conectar():
+        conexoes.append(MagicMock(closed=0))
+        return conexoes[-1]
+    passagens = iter([psycopg2.OperationalError("server closed the connection unexpectedly"), None])
+    def passagem(db_conn):
+        erro = next(passagens)
+        if erro:
+            raise erro
+        monkeypatch.setattr(worker, "_encerrar", True)
+
+    monkeypatch.setattr(worker.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(worker, "_conectar", conectar)
+    monkeypatch.setattr(worker, "_executar_passagem", passagem)
+    monkeypatch.setattr(worker, "JOBS_RECONEXAO_SEGUNDOS", 0.01)
+
+    worker.executar_worker()
+
+    assert len(conexoes) == 2
+    conexoes[0].close.assert_called_once()
+
+def _worker_que_falha_na_primeira_vez(diretorio: str) -> None:
+    marcador = os.path.join(diretorio, multiprocessing.current_process().name)
+    if not os.path.exists(marcador):
+        open(marcador, "w").close()
+        sys.exit(1)
+    os.rename(marcador, f"{marcador}.reiniciado")
+
+def test_supervisor_reinicia_worker_que_termina_com_erro(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(worker, "JOBS_SUPERVISAO_SEGUNDOS", 0.05)
+    monkeypatch.setattr(worker, "_encerrar", False)
+
+    worker.supervisionar(2, alvo=lambda: _worker_que_falha_na_primeira_vez(str(tmp_path)))
+
+    assert sorted(os.listdir(tmp_path)) == ["job-worker-0.reiniciado", "job-worker-1.reiniciado"]
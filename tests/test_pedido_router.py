@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from datetime import date
@@ -214,6 +215,37 @@ def test_get_all_pedidos(
     assert len(data) > 0
     assert any(pedido["id"] == id_pedido_criado for pedido in data)
 
+def test_get_all_pedidos_ndjson(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_pedido_pronto: dict
+):
+    response = test_client.get("/api/pedidos/?stream=1", headers=admin_auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert linhas == test_client.get("/api/pedidos/", headers=admin_auth_headers).json()
+    assert linhas[0]["id"] == setup_pedido_pronto["id_pedido"]
+    assert Decimal(linhas[0]["quantidade_pedida"]) == setup_pedido_pronto["quantidade_pedida"]
+
+def test_listagens_com_fields_iguais_a_completa(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_pedido_pronto: dict
+):
+    for url, fields in [("/api/pedidos/", "quantidade_pedida,id,data_pedido"),
+                        ("/api/itens/", "descricao,valor_unitario"),
+                        ("/api/aocs/", "numero_aocs,id_dotacao"),
+                        ("/api/ci-pagamento/", "id,valor_nota_fiscal")]:
+        completa = test_client.get(url, headers=admin_auth_headers).json()
+
+        parcial = test_client.get(f"{url}?fields={fields}", headers=admin_auth_headers)
+
+        assert parcial.status_code == 200, url
+        campos = [c for c in completa[0] if c in fields.split(",")] if completa else []
+        assert parcial.json() == [{c: registro[c] for c in campos} for registro in completa], url
+
 def test_get_pedidos_by_aocs_id(
     test_client: TestClient, 
     admin_auth_headers: dict, 
@@ -232,4 +264,25 @@ def test_get_pedidos_by_aocs_id(
     assert isinstance(data, list)
     assert len(data) > 0
     assert data[0]["id"] == id_pedido_criado
-    assert data[0]["id_aocs"] == id_aocs
\ No newline at end of file
+    assert data[0]["id_aocs"] == id_aocs
+def test_alteracoes_pedidos_entrega_e_exclusao(
+    test_client: TestClient, 
+    admin_auth_headers: dict, 
+    setup_pedido_pronto: dict,
+    monkeypatch
+):
+    monkeypatch.setattr("app.core.sincronizacao.SYNC_ATRASO_SEGUNDOS", 0)
+    id_pedido = setup_pedido_pronto["id_pedido"]
+
+    inicial = test_client.get("/api/pedidos/alteracoes", headers=admin_auth_headers).json()
+    assert [p["id"] for p in inicial["alterados"]] == [id_pedido]
+
+    test_client.put(f"/api/pedidos/{id_pedido}/registrar-entrega",
+                    json={"quantidade": 5, "data_entrega": date.today().isoformat(), "nota_fiscal": "NF-SYNC"},
+                    headers=admin_auth_headers)
+    entrega = test_client.get(f"/api/pedidos/alteracoes?cursor={inicial['cursor']}", headers=admin_auth_headers).json()
+    assert Decimal(entrega["alterados"][0]["quantidade_entregue"]) == Decimal("5")
+
+    test_client.delete(f"/api/pedidos/{id_pedido}", headers=admin_auth_headers)
+    exclusao = test_client.get(f"/api/pedidos/alteracoes?cursor={entrega['cursor']}", headers=admin_auth_headers).json()
+    assert (exclusao["alterados"], exclusao["removidos"]) == ([], [id_pedido])
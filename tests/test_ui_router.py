@@ -141,6 +141,74 @@ def test_imprimir_aocs(test_client: TestClient, admin_auth_headers: dict, setup_
     assert numero_aocs_teste in response.text
     assert cenario["nome_fornecedor"] in response.text
 
+def test_imprimir_aocs_pdf(test_client: TestClient, admin_auth_headers: dict, setup_full_pedido_scenario: dict, monkeypatch):
+    cenario = setup_full_pedido_scenario
+    html_recebido = {}
+
+    async def fake_render_pdf(html: str) -> bytes:
+        html_recebido["html"] = html
+        return b"%PDF-1.7 fake"
+
+    monkeypatch.setattr("app.core.pdf_renderer.render_pdf", fake_render_pdf)
+
+    response = test_client.get(
+        f"/pedido/{cenario['numero_aocs']}/imprimir?format=pdf",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert 'filename="AOCS_AOCS-UI-789-2025.pdf"' in response.headers["content-disposition"]
+    assert response.content == b"%PDF-1.7 fake"
+    assert cenario["nome_fornecedor"] in html_recebido["html"]
+
+def test_imprimir_aocs_pdf_timeout_retorna_504(test_client: TestClient, admin_auth_headers: dict, setup_full_pedido_scenario: dict, monkeypatch):
+    from app.core.pdf_renderer import PdfTimeoutError
+
+    async def fake_render_pdf(html: str) -> bytes:
+        raise PdfTimeoutError("A geração do PDF excedeu 30 segundos.")
+
+    monkeypatch.setattr("app.core.pdf_renderer.render_pdf", fake_render_pdf)
+
+    response = test_client.get(
+        f"/pedido/{setup_full_pedido_scenario['numero_aocs']}/imprimir?format=pdf",
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 504
+
+def test_imprimir_aocs_pdf_servido_do_cache_ate_alteracao(test_client: TestClient, admin_auth_headers: dict, setup_full_pedido_scenario: dict, monkeypatch):
+    cenario = setup_full_pedido_scenario
+    renderizacoes = []
+
+    async def fake_render_pdf(html: str) -> bytes:
+        renderizacoes.append(html)
+        return f"%PDF-1.7 v{len(renderizacoes)}".encode()
+
+    monkeypatch.setattr("app.core.pdf_renderer.render_pdf", fake_render_pdf)
+    url = f"/pedido/{cenario['numero_aocs']}/imprimir?format=pdf"
+
+    primeira = test_client.get(url, headers=admin_auth_headers)
+    segunda = test_client.get(url, headers=admin_auth_headers)
+    assert primeira.status_code == segunda.status_code == 200
+    assert segunda.content == primeira.content == b"%PDF-1.7 v1"
+    assert 'filename="AOCS_AOCS-UI-789-2025.pdf"' in segunda.headers["content-disposition"]
+    assert len(renderizacoes) == 1
+
+    id_aocs = test_client.get(f"/api/aocs/numero/{cenario['numero_aocs']}", headers=admin_auth_headers).json()["id"]
+    resp_update = test_client.put(f"/api/aocs/{id_aocs}", json={"justificativa": "Justificativa Alterada"}, headers=admin_auth_headers)
+    assert resp_update.status_code == 200
+
+    terceira = test_client.get(url, headers=admin_auth_headers)
+    assert terceira.content == b"%PDF-1.7 v2"
+    assert "Justificativa Alterada" in renderizacoes[-1]
+
+def test_imprimir_aocs_formato_invalido(test_client: TestClient, admin_auth_headers: dict, setup_full_pedido_scenario: dict):
+    response = test_client.get(
+        f"/pedido/{setup_full_pedido_scenario['numero_aocs']}/imprimir?format=docx",
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 422
+
 def test_imprimir_pendentes(test_client: TestClient, admin_auth_headers: dict, setup_full_pedido_scenario: dict):
     cenario = setup_full_pedido_scenario
     numero_aocs_teste = cenario["numero_aocs"]
@@ -456,4 +524,14 @@ def test_admin_usuarios_ui_loads_data(
     assert "Gerenciar Usuários" in response.text
     
     assert "test_admin_user" in response.text
-    assert "test_user_user" in response.text
\ No newline at end of file
+    assert "test_user_user" in response.text
+
+
+def test_api_tabelas_sistema_lista_e_insere(test_client: TestClient, admin_auth_headers: dict):
+    response_post = test_client.post("/api/tabelas-sistema/unidade-requisitante", json={"nome": "Unidade Tabela Sistema"}, headers=admin_auth_headers)
+    assert response_post.status_code == 200
+    assert response_post.json()["nome"] == "Unidade Tabela Sistema"
+
+    response_get = test_client.get("/api/tabelas-sistema/unidade-requisitante", headers=admin_auth_headers)
+    assert response_get.status_code == 200
+    assert response_get.json() == [{"id": response_post.json()["id"], "nome": "Unidade Tabela Sistema"}]
@@ -0,0 +1,19 @@
+from app.core import cache_ttl
+from app.core.cache_ttl import CacheTTL
+
+
+def test_cache_expira_e_descarta_menos_usados(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(cache_ttl.time, "monotonic", lambda: agora[0])
+    cache = CacheTTL(ttl_segundos=30, max_itens=2)
+
+    cache.guardar("a", [1])
+    cache.guardar("b", [2])
+    assert cache.obter("a") == [1]      # 'a' passa a ser o mais recente
+    cache.guardar("c", [3])             # Excede o limite: sai 'b'
+    assert cache.obter("b") is None and cache.obter("c") == [3]
+
+    agora[0] += 31
+    assert cache.obter("a", "expirado") == "expirado"
+    assert len(cache) == 1
+    print("\n[Cache TTL] Expiração e limite PASSOU")
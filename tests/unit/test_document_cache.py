@@ -0,0 +1,64 @@
+import os
+from app.core import document_cache
+
+
+def test_salvar_e_obter_documento():
+    nome = document_cache.nome_documento("aocs", "abc123", "pdf")
+    caminho = document_cache.salvar("aocs", 1, nome, b"%PDF conteudo")
+
+    assert document_cache.obter("aocs", 1, nome) == caminho
+    with open(caminho, "rb") as f:
+        assert f.read() == b"%PDF conteudo"
+    print("\n[Cache Documentos] Salvar/obter PASSOU")
+
+
+def test_obter_versao_inexistente_retorna_none():
+    assert document_cache.obter("aocs", 1, document_cache.nome_documento("aocs", "nada", "html")) is None
+    print("\n[Cache Documentos] Miss PASSOU")
+
+
+def test_nova_versao_substitui_anterior_da_mesma_variante():
+    antigo = document_cache.nome_documento("aocs", "v1", "pdf")
+    outro_formato = document_cache.nome_documento("aocs", "v1", "html")
+    novo = document_cache.nome_documento("aocs", "v2", "pdf")
+    document_cache.salvar("aocs", 1, antigo, b"v1")
+    document_cache.salvar("aocs", 1, outro_formato, b"v1")
+    document_cache.salvar("aocs", 1, novo, b"v2")
+
+    assert document_cache.obter("aocs", 1, antigo) is None
+    assert document_cache.obter("aocs", 1, outro_formato) is not None
+    assert document_cache.obter("aocs", 1, novo) is not None
+    print("\n[Cache Documentos] Substituição de versão PASSOU")
+
+
+def test_invalidar_remove_documentos_da_entidade():
+    nome = document_cache.nome_documento("ci", "v1", "pdf")
+    document_cache.salvar("ci", 7, nome, b"x")
+    document_cache.salvar("ci", 8, nome, b"y")
+
+    document_cache.invalidar("ci", 7)
+    document_cache.invalidar("ci", 99)  # Sem cache: não deve falhar
+
+    assert document_cache.obter("ci", 7, nome) is None
+    assert document_cache.obter("ci", 8, nome) is not None
+    print("\n[Cache Documentos] Invalidação PASSOU")
+
+
+def test_limite_remove_menos_usados(monkeypatch):
+    nomes = [document_cache.nome_documento("aocs", "v1", "pdf") for _ in range(3)]
+
+    for id_entidade, nome in enumerate(nomes, start=1):
+        caminho = document_cache.salvar("aocs", id_entidade, nome, b"x" * 100)
+        os.utime(caminho, (id_entidade, id_entidade))
+
+    monkeypatch.setattr(document_cache, "CACHE_MAX_BYTES", 350)
+
+    # Acessar o documento 1 o torna o mais recente; o 2 vira o menos usado
+    document_cache.obter("aocs", 1, nomes[0])
+    document_cache.salvar("aocs", 4, nomes[0], b"x" * 100)
+
+    assert document_cache.obter("aocs", 1, nomes[0]) is not None
+    assert document_cache.obter("aocs", 2, nomes[1]) is None
+    assert document_cache.obter("aocs", 3, nomes[2]) is not None
+    assert document_cache.obter("aocs", 4, nomes[0]) is not None
+    print("\n[Cache Documentos] Evicção LRU PASSOU")
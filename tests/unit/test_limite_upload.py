@@ -0,0 +1,54 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from fastapi.testclient import TestClient
+
+from app.core import anexo_storage
+from app.core.limite_upload import LimiteUploadMiddleware, MARGEM_MULTIPART_BYTES
+
+
+async def _receber(request: Request):
+    corpo = await request.body()
+    return JSONResponse({"bytes": len(corpo)})
+
+
+def _client() -> TestClient:
+    app = Starlette(routes=[Route("/upload", _receber, methods=["POST"]), Route("/outro", _receber, methods=["POST"])])
+    app.add_middleware(LimiteUploadMiddleware, caminhos=("/upload",))
+    return TestClient(app)
+
+
+def test_corpo_dentro_do_limite_passa(monkeypatch):
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 1000)
+    response = _client().post("/upload", content=b"x" * 500)
+    assert response.status_code == 200
+    assert response.json() == {"bytes": 500}
+    print("\n[Limite Upload] Dentro do limite PASSOU")
+
+
+def test_content_length_acima_do_limite_recusado(monkeypatch):
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 0)
+    response = _client().post("/upload", content=b"x" * (MARGEM_MULTIPART_BYTES + 1))
+    assert response.status_code == 413
+    print("\n[Limite Upload] Content-Length PASSOU")
+
+
+def test_corpo_chunked_acima_do_limite_recusado(monkeypatch):
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 0)
+
+    def blocos():
+        for _ in range(10):
+            yield b"x" * (MARGEM_MULTIPART_BYTES // 4)
+
+    response = _client().post("/upload", content=blocos())
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    print("\n[Limite Upload] Chunked PASSOU")
+
+
+def test_outras_rotas_ignoradas(monkeypatch):
+    monkeypatch.setattr(anexo_storage, "ANEXO_MAX_BYTES", 0)
+    response = _client().post("/outro", content=b"x" * (MARGEM_MULTIPART_BYTES + 1))
+    assert response.status_code == 200
+    print("\n[Limite Upload] Outras rotas PASSOU")
@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import mapeamento
+from app.models.pedido_model import Pedido
+from app.repositories.pedido_repository import COLUNAS_PEDIDO
+
+
+def _cursor(*colunas):
+    return SimpleNamespace(description=[SimpleNamespace(name=c) for c in colunas])
+
+
+def test_mapear_por_posicao_em_qualquer_ordem_de_colunas():
+    # SELECT p.*, a.data_criacao AS data_pedido: data_pedido vem por último
+    cursor = _cursor("id", "id_item_contrato", "id_aocs", "quantidade_pedida", "status_entrega",
+                     "quantidade_entregue", "data_pedido")
+    linhas = [(1, 10, 100, Decimal("2.5"), "Pendente", Decimal("0"), date(2025, 1, 2))]
+
+    pedido, = mapeamento.mapear(cursor, linhas, Pedido, COLUNAS_PEDIDO)
+
+    assert (pedido.id, pedido.id_aocs, pedido.data_pedido, pedido.status_entrega) == (1, 100, date(2025, 1, 2), "Pendente")
+    assert not hasattr(pedido, "__dict__")  # __slots__: sem dicionário por instância
+
+
+def test_extrator_uma_coluna_e_coluna_ausente():
+    assert mapeamento.extrator(_cursor("a", "b"), ("b",))((1, 2)) == (2,)
+    with pytest.raises(KeyError):
+        mapeamento.extrator(_cursor("a"), ("b",))
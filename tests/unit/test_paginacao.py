@@ -0,0 +1,30 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core import paginacao
+
+
+def test_cursor_ida_e_volta_e_assinatura():
+    token = paginacao.codificar([date(2025, 3, 1), Decimal("10.50"), 0.25, 7], "abc")
+
+    assert "=" not in token  # base64url sem padding: vai na URL como está
+    assert paginacao.decodificar(token, "abc", 4) == ["2025-03-01", "10.50", 0.25, 7]
+    with pytest.raises(paginacao.CursorInvalidoError):
+        paginacao.decodificar(token, "outra-ordenacao", 4)
+    with pytest.raises(paginacao.CursorInvalidoError):
+        paginacao.decodificar(token, "abc", 2)
+    for lixo in ("", "nao-e-base64!", paginacao.codificar([[1, 2]], "abc"), paginacao.codificar([None], "abc")):
+        with pytest.raises(paginacao.CursorInvalidoError):
+            paginacao.decodificar(lixo, "abc", 1)
+
+
+def test_condicao_tupla_e_direcoes_mistas():
+    ordem = paginacao._ordem(["-data", "-id"])
+    assert paginacao._condicao(ordem, ["2025-01-01", 5], False) == ("(data, id) < (%s, %s)", ["2025-01-01", 5])
+    assert paginacao._condicao(ordem, ["2025-01-01", 5], True) == ("(data, id) > (%s, %s)", ["2025-01-01", 5])
+
+    sql, params = paginacao._condicao(paginacao._ordem(["-data", "numero"]), ["2025-01-01", "CT-1"], False)
+    assert sql == "((data < %s) OR (data = %s AND numero > %s))"
+    assert params == ["2025-01-01", "2025-01-01", "CT-1"]
@@ -0,0 +1,102 @@
+import time
+import signal
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from unittest.mock import MagicMock
+from app.core import pdf_renderer
+
+@pytest.fixture
+def assets_fake(monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "_assets", {"/static/images/brasao.png": b"PNGDATA"})
+
+def test_url_fetcher_serve_asset_pre_carregado(assets_fake):
+    resultado = pdf_renderer._url_fetcher("http://gestaopro.local/static/images/brasao.png")
+    assert resultado["string"] == b"PNGDATA"
+    assert resultado["mime_type"] == "image/png"
+
+def test_url_fetcher_le_outros_arquivos_estaticos(assets_fake):
+    resultado = pdf_renderer._url_fetcher("http://gestaopro.local/static/style.css")
+    assert len(resultado["string"]) > 0
+
+def test_url_fetcher_bloqueia_path_traversal(assets_fake):
+    with pytest.raises(ValueError):
+        pdf_renderer._url_fetcher("http://gestaopro.local/static/../core/security.py")
+
+def test_url_fetcher_bloqueia_recursos_externos(assets_fake):
+    with pytest.raises(ValueError) as exc:
+        pdf_renderer._url_fetcher("https://fonts.googleapis.com/css2?family=Roboto")
+    assert "bloqueado" in str(exc.value)
+
+def test_renderizar_sem_weasyprint_levanta_indisponivel(monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "_html_class", None)
+    with pytest.raises(pdf_renderer.PdfIndisponivelError):
+        pdf_renderer._renderizar("<p>teste</p>")
+
+def test_renderizar_usa_font_config_e_fetcher(monkeypatch):
+    mock_html_class = MagicMock()
+    mock_html_class.return_value.write_pdf.return_value = b"%PDF"
+    font_config = object()
+    monkeypatch.setattr(pdf_renderer, "_html_class", mock_html_class)
+    monkeypatch.setattr(pdf_renderer, "_font_config", font_config)
+
+    assert pdf_renderer._renderizar("<p>teste</p>") == b"%PDF"
+    _, kwargs = mock_html_class.call_args
+    assert kwargs["url_fetcher"] is pdf_renderer._url_fetcher
+    mock_html_class.return_value.write_pdf.assert_called_once_with(font_config=font_config)
+
+def test_renderizar_interrompe_apos_timeout_mesmo_com_except_generico(monkeypatch):
+    def write_pdf_lento(font_config=None):
+        try:
+            time.sleep(5)
+        except Exception:
+            pass  # o WeasyPrint captura exceções genéricas em vários pontos
+        return b"%PDF"
+
+    mock_html_class = MagicMock()
+    mock_html_class.return_value.write_pdf.side_effect = write_pdf_lento
+    monkeypatch.setattr(pdf_renderer, "_html_class", mock_html_class)
+
+    inicio = time.monotonic()
+    with pytest.raises(pdf_renderer.PdfTimeoutError):
+        pdf_renderer._renderizar("<p>teste</p>", timeout=0.1)
+    assert time.monotonic() - inicio < 2
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+def _render_preso(html, timeout=None):
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)  # simula código C que não volta ao interpretador
+    time.sleep(60)
+
+def test_render_pdf_encerra_worker_preso(monkeypatch):
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    executor.submit(int).result()  # inicia o worker
+    processo, = executor._processes.values()
+    monkeypatch.setattr(pdf_renderer, "_executor", executor)
+    monkeypatch.setattr(pdf_renderer, "_renderizar", _render_preso)
+    monkeypatch.setattr(pdf_renderer, "_semaforo", None)
+    monkeypatch.setattr(pdf_renderer, "PDF_TIMEOUT_SEGUNDOS", 0.2)
+    monkeypatch.setattr(pdf_renderer, "PDF_MARGEM_ENCERRAMENTO", 0.2)
+
+    with pytest.raises(pdf_renderer.PdfTimeoutError):
+        asyncio.run(pdf_renderer.render_pdf("<p>teste</p>"))
+
+    processo.join(5)
+    assert not processo.is_alive()
+    assert pdf_renderer._executor is None
+
+def test_render_pdf_sync_encerra_worker_preso(monkeypatch):
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    executor.submit(int).result()
+    processo, = executor._processes.values()
+    monkeypatch.setattr(pdf_renderer, "_executor", executor)
+    monkeypatch.setattr(pdf_renderer, "_renderizar", _render_preso)
+    monkeypatch.setattr(pdf_renderer, "PDF_MARGEM_ENCERRAMENTO", 0.2)
+
+    with pytest.raises(pdf_renderer.PdfTimeoutError):
+        pdf_renderer.render_pdf_sync("<p>teste</p>", timeout=0.2)
+
+    processo.join(5)
+    assert not processo.is_alive()
+    assert pdf_renderer._executor is None
@@ -0,0 +1,70 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core import resposta_json
+from app.models.descricao_item_vo import DescricaoItem
+from app.models.item_model import Item
+from app.models.pedido_model import Pedido
+from app.schemas.item_schema import ItemResponse
+from app.schemas.pedido_schema import PedidoResponse
+
+
+def _item(id: int, marca: str | None = "Marca") -> Item:
+    return Item(id=id, id_contrato=7, numero_item=id, descricao_obj=DescricaoItem("Papel A4"),
+                unidade_medida="Resma", quantidade=Decimal("10.50"), valor_unitario=Decimal("25.00"),
+                ativo=True, marca=marca)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def codificador(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(resposta_json, "orjson", None)
+    elif resposta_json.orjson is None:
+        pytest.skip("orjson não instalado")
+    return request.param
+
+
+def test_listagem_sem_validacao_igual_a_validada(codificador):
+    itens = [_item(1), _item(2, marca=None)]
+
+    rapida = resposta_json.listagem(itens, ItemResponse, validar=False)
+    validada = resposta_json.listagem(itens, ItemResponse, validar=True)
+
+    assert json.loads(rapida.body) == json.loads(validada.body)
+    assert json.loads(rapida.body)[0]["descricao"] == {"descricao": "Papel A4"}
+    assert json.loads(rapida.body)[0]["valor_unitario"] == "25.00"
+
+
+def test_listagem_decimal_data_e_cabecalhos(codificador):
+    pedido = Pedido(id=1, id_item_contrato=10, id_aocs=100, quantidade_pedida=Decimal("2.5"),
+                    status_entrega="Pendente", quantidade_entregue=Decimal("0"), data_pedido=date(2025, 1, 2))
+
+    resposta = resposta_json.listagem([pedido], PedidoResponse, {"x-total-estimado": "1"}, validar=False)
+
+    assert resposta.headers["x-total-estimado"] == "1"
+    assert resposta.headers["content-type"] == "application/json"
+    dados, = json.loads(resposta.body)
+    assert (dados["quantidade_pedida"], dados["data_pedido"]) == ("2.5", "2025-01-02")
+
+
+def test_resposta_serializa_modelos_com_slots(codificador):
+    corpo = resposta_json.dumps([DescricaoItem("Caneta")])
+    assert json.loads(corpo) == [{"descricao": "Caneta"}]
+
+    with pytest.raises(TypeError):
+        resposta_json.dumps(object())
+
+
+def test_listagem_com_campos_na_ordem_do_schema(codificador):
+    campos = resposta_json.campos(" descricao,id ,", ItemResponse)
+
+    resposta = resposta_json.listagem([_item(1)], ItemResponse, validar=True, campos=campos)
+
+    assert campos == ("id", "descricao")
+    assert json.loads(resposta.body) == [{"id": 1, "descricao": {"descricao": "Papel A4"}}]
+    assert resposta_json.campos(None, ItemResponse) is None
+    with pytest.raises(resposta_json.CampoInvalidoError):
+        resposta_json.campos("id,preco", ItemResponse)
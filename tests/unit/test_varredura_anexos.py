@@ -0,0 +1,17 @@
+from app.core.varredura_anexos import percorrer_uploads
+
+
+def test_percorrer_uploads_em_ordem_e_retomando_pelo_cursor(tmp_path):
+    for nome in ("aocs/10/b.pdf", "aocs/10/a.pdf", "aocs/9/c.pdf", "contrato/1/x.pdf", "contrato/1-a/y.pdf", "raiz.txt"):
+        (tmp_path / nome).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / nome).write_bytes(b"x")
+
+    todos = list(percorrer_uploads(str(tmp_path)))
+    assert todos == ["aocs/10/a.pdf", "aocs/10/b.pdf", "aocs/9/c.pdf", "contrato/1/x.pdf", "contrato/1-a/y.pdf", "raiz.txt"]
+
+    for i, cursor in enumerate(todos):
+        assert list(percorrer_uploads(str(tmp_path), cursor)) == todos[i + 1:]
+    # Cursor de um arquivo que já não existe: continua do próximo na ordem
+    assert list(percorrer_uploads(str(tmp_path), "aocs/10/aa.pdf")) == todos[1:]
+    assert list(percorrer_uploads(str(tmp_path / "inexistente"))) == []
+    print("\n[Varredura de anexos] Percurso incremental PASSOU")
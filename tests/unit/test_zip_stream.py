@@ -0,0 +1,32 @@
+import io
+import zipfile
+from datetime import date
+
+from app.core import zip_stream
+
+
+def test_gerar_zip_em_partes_com_entradas_armazenadas_e_comprimidas():
+    bloco = b"x" * 65536
+    entradas = [
+        zip_stream.EntradaZip("Notas/nota.pdf", lambda: iter([bloco] * 4), date(2025, 3, 1)),
+        zip_stream.EntradaZip("Notas/nfe.xml", lambda: iter([b"<nfe>" * 1000]), date(2025, 3, 1)),
+    ]
+
+    partes = list(zip_stream.gerar_zip(entradas))
+
+    assert len(partes) > 4  # Entregue à medida que é lido, não de uma vez no final
+    arquivo = zipfile.ZipFile(io.BytesIO(b"".join(partes)))
+    assert arquivo.testzip() is None
+    assert arquivo.read("Notas/nota.pdf") == bloco * 4
+    assert arquivo.getinfo("Notas/nota.pdf").compress_type == zipfile.ZIP_STORED
+    assert arquivo.getinfo("Notas/nfe.xml").compress_type == zipfile.ZIP_DEFLATED
+    assert arquivo.getinfo("Notas/nfe.xml").date_time[:3] == (2025, 3, 1)
+    print("\n[ZIP Streaming] Geração em partes PASSOU")
+
+
+def test_nomes_unicos():
+    nomes = ["A/nota.pdf", "A/nota.pdf", "A/NOTA.pdf", "A/sem_extensao", "A/sem_extensao"]
+    assert list(zip_stream.nomes_unicos(nomes)) == [
+        "A/nota.pdf", "A/nota (2).pdf", "A/NOTA (3).pdf", "A/sem_extensao", "A/sem_extensao (2)"
+    ]
+    print("\n[ZIP Streaming] Nomes únicos PASSOU")